@@ -1,9 +1,11 @@
-import glob
 import json
 import logging
+import os
 import pandas as pd
+import subprocess
 import sys
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from .utils import (
     fetch_instruments_list,
@@ -13,6 +15,7 @@ from .utils import (
 )
 from .StrongFundamentalsStockList import goodStocks
 from .FetchPricesKite import download_historical_quotes
+from . import hist_data, indicator_store, universe_cache
 
 logger = logging.getLogger("Auto_Trade_Logger")
 ROOT = Path(__file__).resolve().parents[1]
@@ -52,6 +55,29 @@ def add_excluded_symbol(symbol: str, reason: str = "persistent_fetch_failure") -
     EXCLUSION_LIST_PATH.write_text(json.dumps({"excluded": sorted(excluded), "log": entries[-200:]}, indent=2))
 
 
+def start_indicator_materialization() -> None:
+    """Refresh the backtest indicator store in a detached, low-priority process.
+
+    ``create_master`` runs at market open, so the process waits for the close
+    (``--after-close``) rather than competing with the live ticker.
+    """
+    if not indicator_store.STORE_ENABLED:
+        return
+    try:
+        subprocess.Popen(
+            [sys.executable, str(ROOT / "scripts" / "materialize_indicators.py"), "--after-close"],
+            cwd=str(ROOT),
+            env={**os.environ, "AT_RESEARCH_MODE": "1"},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            preexec_fn=lambda: os.nice(10),
+        )
+        logger.info("Started indicator store materialization.")
+    except Exception as e:
+        logger.warning(f"Could not start indicator store materialization: {e}")
+
+
 def create_master(message_queue):
     """
     Creates a master list of instruments with their respective tokens, downloads historical quotes,
@@ -61,11 +87,16 @@ def create_master(message_queue):
         List[int]: A list of instrument tokens that have been processed.
     """
     try:
-        # Fetch instrument master list and good stocks list
+        # Fetch instrument master list, holdings and good stocks list concurrently
+        # (independent network calls; the screener is the slowest).
         try:
-            instrument_master = fetch_instruments_list()
-            holdings = fetch_holdings()
-            ticker_tape_list = goodStocks()
+            with ThreadPoolExecutor(max_workers=3, thread_name_prefix="universe") as pool:
+                instrument_master_f = pool.submit(fetch_instruments_list)
+                holdings_f = pool.submit(fetch_holdings)
+                ticker_tape_list_f = pool.submit(goodStocks)
+                instrument_master = instrument_master_f.result()
+                holdings = holdings_f.result()
+                ticker_tape_list = ticker_tape_list_f.result()
             logger.info(
                 "Fetched instrument master, holdings, and good stock lists successfully."
             )
@@ -126,17 +157,16 @@ def create_master(message_queue):
         try:
             download_historical_quotes(df=mapped_df)
             logger.info("Downloaded historical quotes for mapped instruments.")
+            start_indicator_materialization()
         except Exception as e:
             logger.error(
                 f"Error downloading historical quotes: {str(e)}\n{traceback.format_exc()}"
             )
             sys.exit(1)
 
-        # Fetch all files from the Hist_Data directory
+        # Symbols with downloaded history (flat files or partition directories)
         try:
-            files = glob.glob("intermediary_files/Hist_Data/*")
-            # Extract file names (symbols) without extensions and directory path
-            fetched_symbols = [file.split("/")[2].split(".")[0] for file in files]
+            fetched_symbols = hist_data.list_symbols(hist_data.HIST_DIR)
             # Create DataFrame from fetched symbols
             fetched_data = pd.DataFrame(fetched_symbols, columns=["Symbol"])
             logger.info("Fetched data from downloaded historical quotes.")
@@ -150,7 +180,10 @@ def create_master(message_queue):
         try:
             merged_df = pd.merge(fetched_data, mapped_df, on="Symbol", how="inner")
             # Save the final DataFrame to a CSV file
-            merged_df.to_feather("intermediary_files/Instruments.feather")
+            # Atomic replace: a running Apply_Rules reloads this file when it changes.
+            tmp_path = f"intermediary_files/.Instruments.{os.getpid()}.feather"
+            merged_df.reset_index(drop=True).to_feather(tmp_path)
+            os.replace(tmp_path, "intermediary_files/Instruments.feather")
             logger.info(f"WatchList Count: {len(merged_df)}")
         except Exception as e:
             logger.error(
@@ -185,6 +218,11 @@ def create_master(message_queue):
                                     logger.info(f"Added RSI paper ledger symbol {sym} (token {extra_token}) to ticker subscription")
             except Exception:
                 pass
+            previous = universe_cache.load_tokens()
+            added, removed = universe_cache.diff_tokens(previous, tokens)
+            if previous:
+                logger.info(f"Universe vs cached: +{len(added)} / -{len(removed)} tokens")
+            universe_cache.save(tokens, merged_df["Symbol"].astype(str))
             return tokens
         else:
             logger.error(
@@ -198,3 +236,16 @@ def create_master(message_queue):
             f"An unexpected error occurred: {str(e)}\n{traceback.format_exc()}"
         )
         sys.exit(1)
+
+
+def refresh_universe(message_queue, updates, baseline_tokens):
+    """Background ``create_master`` for a ticker already running on ``baseline_tokens``.
+
+    Tokens the refresh adds are put on ``updates`` for the ticker to
+    hot-subscribe. Dropped tokens stay subscribed until the next session.
+    """
+    tokens = create_master(message_queue)
+    added, removed = universe_cache.diff_tokens(baseline_tokens, tokens)
+    if added:
+        updates.put(added)
+    message_queue.put(f"Universe refresh done: +{len(added)} / -{len(removed)} vs cached start")
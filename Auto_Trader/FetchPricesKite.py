@@ -16,10 +16,11 @@ from Auto_Trader.utils import (
     read_session_data,
 )
 from filelock import FileLock
+from Auto_Trader import hist_data
 from Auto_Trader.my_secrets import API_KEY
 
 # Constants for fetched-data tracking and storage
-HIST_DIR = "intermediary_files/Hist_Data"
+HIST_DIR = str(hist_data.HIST_DIR)
 CACHE_INSTRUMENTS_FILE = "intermediary_files/instruments_cache.json"
 
 # Kite API interval limits and batch settings
@@ -113,17 +114,10 @@ def download_symbol_data(symbol, fetched_mgr, api_key, access_token, token_map):
         return symbol, False, 0
 
     try:
-        feather_path = os.path.join(HIST_DIR, f"{symbol}.feather")
-    except Exception as e:
-        print(f"[Error] Constructing feather path for '{symbol}': {e}")
-        return symbol, False, 0
-
-    existing_df = None
-    try:
-        if os.path.exists(feather_path):
-            existing_df = pd.read_feather(feather_path)
-            last_ts = pd.to_datetime(existing_df["Date"], errors="coerce").max()
-            if pd.isna(last_ts):
+        # Only the newest partition's Date column is read to find the resume point.
+        if hist_data.resolve_symbol(HIST_DIR, symbol) is not None:
+            last_ts = hist_data.last_timestamp(HIST_DIR, symbol)
+            if last_ts is None or pd.isna(last_ts):
                 raise ValueError("No valid timestamp in historical data")
             if _is_intraday_interval():
                 start_date = last_ts.to_pydatetime() + _interval_to_timedelta(
@@ -232,22 +226,10 @@ def download_symbol_data(symbol, fetched_mgr, api_key, access_token, token_map):
     except Exception as e:
         print(f"[Error] Dropping today's partial bar for '{symbol}': {e}")
 
-    # Merge with existing history if available
-    if existing_df is not None and len(existing_df) > 0:
-        try:
-            existing_df["Date"] = pd.to_datetime(existing_df["Date"], errors="coerce")
-            if not _is_intraday_interval():
-                existing_df["Date"] = existing_df["Date"].dt.date
-            df = pd.concat([existing_df, df], ignore_index=True)
-            df.drop_duplicates(subset=["Date"], keep="last", inplace=True)
-            df.sort_values("Date", inplace=True)
-            df.reset_index(drop=True, inplace=True)
-        except Exception as e:
-            print(f"[Warning] Could not merge existing data for {symbol}: {e}")
-
+    # Merge into stored history; in the partitioned layout only this year's file is rewritten.
     try:
         os.makedirs(HIST_DIR, exist_ok=True)
-        df.to_feather(feather_path)
+        rows = hist_data.append_symbol(HIST_DIR, symbol, df)
     except Exception as e:
         print(f"[Error] Saving feather for '{symbol}': {e}")
         return symbol, False, 0
@@ -257,7 +239,7 @@ def download_symbol_data(symbol, fetched_mgr, api_key, access_token, token_map):
     except Exception as e:
         print(f"[Error] Marking '{symbol}' fetched after save: {e}")
 
-    return symbol, True, len(df)
+    return symbol, True, rows
 
 
 def download_historical_quotes(df):
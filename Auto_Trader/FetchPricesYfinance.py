@@ -1,5 +1,4 @@
 import os
-import pandas as pd
 import yfinance as yf
 import ray
 from tqdm import tqdm
@@ -9,11 +8,12 @@ from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 import json
 from filelock import FileLock
+from Auto_Trader import hist_data
 
 # JSON file to store fetched symbols and dates
 FETCHED_DATA_FILE = "intermediary_files/fetched_data.json"
 LOCK_FILE = "intermediary_files/fetched_data.lock"
-HIST_DIR = "intermediary_files/Hist_Data"
+HIST_DIR = str(hist_data.HIST_DIR)
 
 
 # Ray actor to manage shared state
@@ -51,11 +51,9 @@ def download_ticker_data(ticker, fetched_data_manager):
         return True
 
     # Determine start date for incremental update
-    feather_path = os.path.join(HIST_DIR, f"{ticker}.feather")
-    if os.path.exists(feather_path):
-        existing = pd.read_feather(feather_path)
-        last_date = pd.to_datetime(existing["Date"]).max().date()
-        start_date = last_date + timedelta(days=1)
+    last_ts = hist_data.last_timestamp(HIST_DIR, ticker)
+    if last_ts is not None:
+        start_date = last_ts.date() + timedelta(days=1)
     else:
         # No existing data → fetch the last 3 months
         start_date = datetime.now().date() - relativedelta(months=3)
@@ -96,7 +94,7 @@ def download_ticker_data(ticker, fetched_data_manager):
         data = data.iloc[:-1]
 
     os.makedirs(HIST_DIR, exist_ok=True)
-    data.to_feather(feather_path)
+    hist_data.append_symbol(HIST_DIR, ticker, data)
 
     # Mark as done
     ray.get(fetched_data_manager.mark_fetched.remote(ticker))
@@ -0,0 +1,350 @@
+"""Projected, symbol-filtered reads and canonical writes of ``Hist_Data``.
+
+Loaders used to glob the whole directory and ``pd.read_feather`` every file
+with all of its columns, even when they only needed a handful of symbols'
+closes. ``load_frames`` opens only the requested symbols' files, resolves the
+date/OHLCV column aliases from the Arrow footer and reads just those columns
+(memory-mapped, so unused columns are never decompressed). Optional
+``start``/``end`` predicates trim rows before the pandas conversion.
+
+Frames come back indexed by a tz-naive ``DatetimeIndex`` named ``date`` with
+canonical lowercase field columns (``open``, ``high``, ``low``, ``close``,
+``volume``). ``read_history`` returns the writer's ``Date``/OHLCV column
+layout instead, and ``read_raw`` every stored column, for callers that used to
+``pd.read_feather`` a symbol file.
+
+Writes go through ``write_symbol``/``append_symbol``. They enforce one typed
+schema (``CANONICAL_SCHEMA``: naive ``Date`` timestamps and float64 OHLCV)
+and store a symbol in one of two layouts:
+
+- ``flat``: ``Hist_Data/<SYMBOL>.feather``, the legacy layout;
+- ``partitioned``: ``Hist_Data/<SYMBOL>/<YEAR>.feather``. A daily append
+  rewrites only the current year's file, and date-bounded reads skip whole
+  years.
+
+``AT_HIST_LAYOUT`` chooses the layout for writes. Readers in this module
+accept either layout, and a symbol written in one layout has its copy in the
+other removed.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+DATE_ALIASES = ("date", "Date", "datetime")
+FIELD_ALIASES = {
+    "open": ("open", "Open", "OPEN"),
+    "high": ("high", "High", "HIGH"),
+    "low": ("low", "Low", "LOW"),
+    "close": ("close", "Close", "CLOSE"),
+    "volume": ("volume", "Volume", "VOLUME"),
+}
+
+
+CANONICAL_COLUMNS = ("Date", "Open", "High", "Low", "Close", "Volume")
+CANONICAL_SCHEMA = pa.schema(
+    [("Date", pa.timestamp("ns"))] + [(c, pa.float64()) for c in CANONICAL_COLUMNS[1:]]
+)
+HIST_DIR = Path(__file__).resolve().parents[1] / "intermediary_files" / "Hist_Data"
+LAYOUTS = ("flat", "partitioned")
+HIST_LAYOUT = os.getenv("AT_HIST_LAYOUT", "flat").strip().lower()
+if HIST_LAYOUT not in LAYOUTS:
+    HIST_LAYOUT = "flat"
+
+
+def symbol_path(hist_dir: Path, symbol: str) -> Path:
+    return Path(hist_dir) / f"{symbol}.feather"
+
+
+def partition_dir(hist_dir: Path, symbol: str) -> Path:
+    return Path(hist_dir) / symbol
+
+
+def _partitions(path: Path) -> dict[int, Path]:
+    """``{year: file}`` inside a symbol's partition directory."""
+    out: dict[int, Path] = {}
+    for p in path.glob("*.feather"):
+        if p.stem.isdigit():
+            out[int(p.stem)] = p
+    return dict(sorted(out.items()))
+
+
+def resolve_symbol(hist_dir: Path, symbol: str) -> Optional[Path]:
+    """The symbol's partition directory or flat file, whichever exists (partitioned first)."""
+    part = partition_dir(hist_dir, symbol)
+    if part.is_dir() and _partitions(part):
+        return part
+    flat = symbol_path(hist_dir, symbol)
+    return flat if flat.is_file() else None
+
+
+def symbol_stamp(hist_dir: Path, symbol: str) -> Optional[tuple[int, int]]:
+    """``(mtime_ns, size)`` that changes whenever the symbol's stored history does."""
+    path = resolve_symbol(hist_dir, symbol)
+    if path is None:
+        return None
+    files = list(_partitions(path).values()) if path.is_dir() else [path]
+    try:
+        stats = [f.stat() for f in files]
+    except OSError:
+        return None
+    return max(st.st_mtime_ns for st in stats), sum(st.st_size for st in stats)
+
+
+def list_symbols(hist_dir: Path) -> list[str]:
+    hist_dir = Path(hist_dir)
+    if not hist_dir.is_dir():
+        return []
+    names = {p.stem for p in hist_dir.glob("*.feather")}
+    names.update(p.name for p in hist_dir.iterdir() if p.is_dir() and _partitions(p))
+    return sorted(names)
+
+
+def _schema_names(path: Path) -> list[str]:
+    try:
+        with pa.memory_map(str(path)) as source:
+            return list(pa.ipc.open_file(source).schema.names)
+    except pa.ArrowInvalid:
+        # Feather v1 files have no IPC footer; fall back to a full read.
+        return list(feather.read_table(path).column_names)
+
+
+def _to_timestamp(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize(None) if ts.tzinfo is not None else ts
+
+
+def _read_columns(path: Path, columns: list[str], start=None, end=None) -> pa.Table:
+    """Projected read of a flat file, or of the partitions overlapping ``start``..``end``."""
+    if not path.is_dir():
+        return feather.read_table(path, columns=columns, memory_map=True)
+    first = _to_timestamp(start).year if start is not None else None
+    last = _to_timestamp(end).year if end is not None else None
+    tables = [
+        feather.read_table(p, columns=columns, memory_map=True)
+        for year, p in _partitions(path).items()
+        if (first is None or year >= first) and (last is None or year <= last)
+    ]
+    if not tables:
+        return pa.table({c: pa.array([], type=CANONICAL_SCHEMA.field(c).type) for c in columns})
+    return pa.concat_tables(tables)
+
+
+def read_symbol(
+    path: Path,
+    fields: Sequence[str] = ("close",),
+    start=None,
+    end=None,
+    optional: Sequence[str] = (),
+) -> Optional[pd.DataFrame]:
+    """One symbol's ``fields`` between ``start`` and ``end`` (inclusive), or ``None``.
+
+    ``path`` is a flat file or a partition directory. ``None`` means the data
+    is unreadable or lacks a date column or one of the requested fields.
+    ``optional`` fields are read only when the file has them.
+    """
+    try:
+        if path.is_dir():
+            parts = _partitions(path)
+            if not parts:
+                return None
+            names = set(_schema_names(next(iter(parts.values()))))
+        else:
+            names = set(_schema_names(path))
+        date_col = next((c for c in DATE_ALIASES if c in names), None)
+        src = {f: next((c for c in FIELD_ALIASES.get(f, (f,)) if c in names), None) for f in fields}
+        if date_col is None or any(c is None for c in src.values()):
+            return None
+        for f in optional:
+            col = next((c for c in FIELD_ALIASES.get(f, (f,)) if c in names), None)
+            if col is not None and f not in src:
+                src[f] = col
+        table = _read_columns(path, [date_col, *dict.fromkeys(src.values())], start, end)
+        dates = pd.to_datetime(table.column(date_col).to_pandas())
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+        keep = None
+        if start is not None:
+            keep = (dates >= _to_timestamp(start)).to_numpy()
+        if end is not None:
+            upto = (dates <= _to_timestamp(end)).to_numpy()
+            keep = upto if keep is None else keep & upto
+        if keep is not None:
+            table = table.filter(pa.array(keep))
+            dates = dates[keep]
+        frame = pd.DataFrame(
+            {f: table.column(c).to_numpy() for f, c in src.items()},
+            index=pd.DatetimeIndex(dates.to_numpy(), name="date"),
+        )
+    except Exception:
+        return None
+    return frame.sort_index()
+
+
+def load_frames(
+    hist_dir: Path,
+    symbols: Optional[Iterable[str]] = None,
+    fields: Sequence[str] = ("close",),
+    start=None,
+    end=None,
+    optional: Sequence[str] = (),
+) -> dict[str, pd.DataFrame]:
+    """``{symbol: frame}`` for ``symbols`` (every file when ``None``); unusable files are skipped.
+
+    Only the requested symbols' files are opened, so pricing a few positions
+    does not touch the rest of the directory.
+    """
+    if symbols is None:
+        wanted = list_symbols(hist_dir)
+    else:
+        wanted = sorted(set(symbols))
+    out: dict[str, pd.DataFrame] = {}
+    for sym in wanted:
+        path = resolve_symbol(hist_dir, sym)
+        if path is None:
+            continue
+        frame = read_symbol(path, fields, start=start, end=end, optional=optional)
+        if frame is not None:
+            out[sym] = frame
+    return out
+
+
+def read_history(hist_dir: Path, symbol: str, start=None, end=None) -> Optional[pd.DataFrame]:
+    """One symbol in the canonical ``Date``/OHLCV column layout (``Date`` as a column), or ``None``."""
+    path = resolve_symbol(hist_dir, symbol)
+    if path is None:
+        return None
+    frame = read_symbol(path, ("close",), start=start, end=end, optional=("open", "high", "low", "volume"))
+    if frame is None:
+        return None
+    return _canonical(frame.reset_index().rename(columns={"date": "Date"}))
+
+
+def read_raw(hist_dir: Path, symbol: str) -> Optional[pd.DataFrame]:
+    """Every stored column of one symbol, partitions concatenated in year order, or ``None``.
+
+    For callers that used to ``pd.read_feather`` a symbol file and need columns
+    beyond OHLCV that a legacy flat file may still carry.
+    """
+    path = resolve_symbol(hist_dir, symbol)
+    if path is None:
+        return None
+    if not path.is_dir():
+        return pd.read_feather(path)
+    return pd.concat([pd.read_feather(p) for p in _partitions(path).values()], ignore_index=True)
+
+
+# ── Writes ───────────────────────────────────────────────────
+
+
+def _canonical(df: pd.DataFrame) -> pd.DataFrame:
+    out = pd.DataFrame(index=range(len(df)))
+    for col in CANONICAL_COLUMNS:
+        src = next((c for c in ((col,) + FIELD_ALIASES.get(col.lower(), ())) if c in df.columns), None)
+        if col == "Date" and src is None:
+            src = next((c for c in DATE_ALIASES if c in df.columns), None)
+        if src is None:
+            out[col] = pd.Series(pd.NaT if col == "Date" else float("nan"), index=out.index)
+        else:
+            out[col] = df[src].to_numpy()
+    dates = pd.to_datetime(out["Date"], errors="coerce")
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    out["Date"] = dates.astype("datetime64[ns]")
+    for col in CANONICAL_COLUMNS[1:]:
+        out[col] = pd.to_numeric(out[col], errors="coerce").astype("float64")
+    out = out.dropna(subset=["Date"]).drop_duplicates("Date", keep="last")
+    return out.sort_values("Date").reset_index(drop=True)
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` coerced to ``CANONICAL_SCHEMA``: aliases resolved, tz dropped, deduplicated on
+    ``Date`` (last wins), sorted. A date index is used when there is no date column."""
+    if not any(c in df.columns for c in DATE_ALIASES) and df.index.name in DATE_ALIASES:
+        df = df.reset_index()
+    return _canonical(df)
+
+
+def _write_table(frame: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(frame, schema=CANONICAL_SCHEMA, preserve_index=False)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    feather.write_feather(table, tmp)
+    tmp.replace(path)
+
+
+def _remove_partitions(hist_dir: Path, symbol: str) -> None:
+    part = partition_dir(hist_dir, symbol)
+    if part.is_dir():
+        for p in _partitions(part).values():
+            p.unlink(missing_ok=True)
+        try:
+            part.rmdir()
+        except OSError:
+            pass
+
+
+def write_symbol(hist_dir: Path, symbol: str, df: pd.DataFrame, layout: Optional[str] = None) -> int:
+    """Replace a symbol's stored history with ``df``; returns rows written."""
+    layout = layout or HIST_LAYOUT
+    frame = normalize_frame(df)
+    if layout == "partitioned":
+        part = partition_dir(hist_dir, symbol)
+        old = _partitions(part) if part.is_dir() else {}
+        years = frame["Date"].dt.year
+        for year, chunk in frame.groupby(years, sort=True):
+            _write_table(chunk.reset_index(drop=True), part / f"{int(year)}.feather")
+        for year, p in old.items():
+            if year not in set(years.tolist()):
+                p.unlink(missing_ok=True)
+        symbol_path(hist_dir, symbol).unlink(missing_ok=True)
+    else:
+        _write_table(frame, symbol_path(hist_dir, symbol))
+        _remove_partitions(hist_dir, symbol)
+    return len(frame)
+
+
+def append_symbol(hist_dir: Path, symbol: str, df: pd.DataFrame, layout: Optional[str] = None) -> int:
+    """Merge ``df`` into a symbol's history (new rows win on equal ``Date``); returns rows written.
+
+    In the partitioned layout only the years present in ``df`` are read and
+    rewritten. A symbol still stored in the other layout is migrated by a
+    full rewrite.
+    """
+    layout = layout or HIST_LAYOUT
+    new = normalize_frame(df)
+    existing = resolve_symbol(hist_dir, symbol)
+    if layout != "partitioned" or existing is None or not existing.is_dir():
+        old = read_history(hist_dir, symbol) if existing is not None else None
+        merged = new if old is None else pd.concat([old, new], ignore_index=True)
+        return write_symbol(hist_dir, symbol, merged, layout=layout)
+    written = 0
+    part = partition_dir(hist_dir, symbol)
+    for year, chunk in new.groupby(new["Date"].dt.year, sort=True):
+        path = part / f"{int(year)}.feather"
+        if path.is_file():
+            old = feather.read_table(path).to_pandas()
+            chunk = pd.concat([old, chunk], ignore_index=True)
+        chunk = _canonical(chunk)
+        _write_table(chunk, path)
+        written += len(chunk)
+    return written
+
+
+def last_timestamp(hist_dir: Path, symbol: str) -> Optional[pd.Timestamp]:
+    """Latest stored ``Date`` for ``symbol`` (reads one column, one partition), or ``None``."""
+    path = resolve_symbol(hist_dir, symbol)
+    if path is None:
+        return None
+    if path.is_dir():
+        path = list(_partitions(path).values())[-1]
+    frame = read_symbol(path, ())
+    if frame is None or not len(frame.index):
+        return None
+    return frame.index.max()
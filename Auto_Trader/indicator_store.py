@@ -0,0 +1,216 @@
+"""Backtest indicator cache: nightly materialized ``Indicators()`` frames, one per symbol.
+
+Backtests and parameter sweeps each loaded five years of ``Hist_Data`` per
+symbol and re-ran the full ``utils.Indicators()`` pipeline on it.
+``materialize`` does that work once, after the close, across a process pool;
+``rule_backtest.load_indicator_frames`` is the reader. Live paths (market-open
+warmup, paper shadow, options support) still compute their own indicators.
+It writes every symbol's indicator frame to
+``AT_INDICATOR_STORE_DIR/<version>/<SYMBOL>.feather`` plus a ``.json`` entry
+that records:
+
+- ``version``: a hash of the source of ``Indicators`` and every helper in
+  its module that it reaches. Editing the indicator code moves the store to
+  a new directory, and stale versions are pruned on the next run;
+- ``source``: the ``hist_data.symbol_stamp`` of the history it was built
+  from. ``IndicatorStore.load`` serves a frame only while that stamp still
+  matches, so a frame never lags its history.
+
+Frames are built with the same history preparation as
+``rule_backtest.load_indicator_frames`` (``prepare_history``), so a stored
+frame is identical to a fresh compute. Set ``AT_INDICATOR_STORE=0`` to
+bypass the store.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from . import hist_data
+
+logger = logging.getLogger("Auto_Trade_Logger")
+
+ROOT = Path(__file__).resolve().parents[1]
+HIST_DIR = hist_data.HIST_DIR
+STORE_DIR = Path(os.getenv("AT_INDICATOR_STORE_DIR", str(ROOT / "intermediary_files" / "indicator_store")))
+STORE_ENABLED = os.getenv("AT_INDICATOR_STORE", "1").strip().lower() not in {"0", "false", "no", "off"}
+STORE_FORMAT = 1
+
+IndicatorFn = Callable[[pd.DataFrame], pd.DataFrame]
+
+
+def _default_indicators() -> IndicatorFn:
+    from .utils import Indicators
+
+    return Indicators
+
+
+# ── Versioning ───────────────────────────────────────────────
+
+
+def _code_names(code) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+
+def code_version(indicators: Optional[IndicatorFn] = None) -> str:
+    """Hash of ``indicators``' source and of the same-module functions it calls, transitively."""
+    import talib
+
+    indicators = indicators or _default_indicators()
+    module = inspect.getmodule(indicators)
+    sources: dict[str, str] = {}
+    stack = [indicators]
+    while stack:
+        fn = stack.pop()
+        if fn.__name__ in sources:
+            continue
+        sources[fn.__name__] = inspect.getsource(fn)
+        for name in _code_names(fn.__code__):
+            obj = getattr(module, name, None)
+            if inspect.isfunction(obj) and obj.__module__ == indicators.__module__:
+                stack.append(obj)
+    h = hashlib.blake2b(digest_size=8)
+    h.update(f"{STORE_FORMAT}|{talib.__version__}|{pd.__version__}".encode())
+    for name in sorted(sources):
+        h.update(sources[name].encode())
+    return h.hexdigest()
+
+
+# ── Computation ──────────────────────────────────────────────
+
+
+def prepare_history(df: pd.DataFrame) -> pd.DataFrame:
+    """Date-indexed, deduplicated (last wins), sorted copy of a ``Hist_Data`` frame."""
+    df = df.copy()
+    if "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+        df = df.dropna(subset=["Date"]).drop_duplicates(subset=["Date"], keep="last").set_index("Date")
+    return df.sort_index()
+
+
+# ── Store ────────────────────────────────────────────────────
+
+
+class IndicatorStore:
+    """Versioned per-symbol indicator frames derived from one ``Hist_Data`` directory."""
+
+    def __init__(
+        self,
+        store_dir: Optional[Path] = None,
+        hist_dir: Optional[Path] = None,
+        indicators: Optional[IndicatorFn] = None,
+        version: Optional[str] = None,
+    ):
+        self.store_dir = Path(store_dir or STORE_DIR)
+        self.hist_dir = Path(hist_dir or HIST_DIR)
+        self.indicators = indicators
+        self.version = version or code_version(indicators)
+        self.root = self.store_dir / self.version
+
+    def _paths(self, symbol: str) -> tuple[Path, Path]:
+        return self.root / f"{symbol}.feather", self.root / f"{symbol}.json"
+
+    def _meta(self, symbol: str) -> Optional[dict]:
+        """The entry's metadata when it was built from the symbol's current history."""
+        try:
+            meta = json.loads(self._paths(symbol)[1].read_text())
+        except (OSError, ValueError):
+            return None
+        stamp = hist_data.symbol_stamp(self.hist_dir, symbol)
+        if meta.get("version") != self.version or stamp is None or meta.get("source") != list(stamp):
+            return None
+        return meta
+
+    def load(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Stored ``Indicators()`` frame (``Date`` index), or ``None`` when missing or stale."""
+        if self._meta(symbol) is None:
+            return None
+        try:
+            frame = feather.read_feather(self._paths(symbol)[0])
+        except Exception:
+            return None
+        return frame.set_index("Date")
+
+    def build(self, symbol: str) -> str:
+        """Materialize one symbol; returns ``fresh``, ``written`` or ``missing``."""
+        if self._meta(symbol) is not None:
+            return "fresh"
+        stamp = hist_data.symbol_stamp(self.hist_dir, symbol)
+        hist = hist_data.read_history(self.hist_dir, symbol)
+        if stamp is None or hist is None or hist.empty:
+            return "missing"
+        indicators = self.indicators or _default_indicators()
+        frame = indicators(prepare_history(hist))
+        meta = {
+            "version": self.version,
+            "source": list(stamp),
+            "rows": int(len(frame)),
+        }
+        data_path, meta_path = self._paths(symbol)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = data_path.with_name(f".{data_path.name}.{os.getpid()}.tmp")
+        feather.write_feather(frame.reset_index(), tmp)
+        tmp.replace(data_path)
+        tmp_meta = meta_path.with_name(f".{meta_path.name}.{os.getpid()}.tmp")
+        tmp_meta.write_text(json.dumps(meta))
+        tmp_meta.replace(meta_path)
+        return "written"
+
+    def prune(self) -> None:
+        """Remove entries built by other indicator-code versions."""
+        if not self.store_dir.is_dir():
+            return
+        for path in self.store_dir.iterdir():
+            if path.is_dir() and path.name != self.version:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def _build_chunk(store: IndicatorStore, symbols: list[str]) -> dict[str, str]:
+    out = {}
+    for sym in symbols:
+        try:
+            out[sym] = store.build(sym)
+        except Exception as e:
+            logger.warning(f"[INDICATOR-STORE] {sym}: {e}")
+            out[sym] = "error"
+    return out
+
+
+def materialize(
+    symbols: Optional[Iterable[str]] = None,
+    hist_dir: Optional[Path] = None,
+    store_dir: Optional[Path] = None,
+    workers: int = 0,
+    indicators: Optional[IndicatorFn] = None,
+) -> dict[str, int]:
+    """Build every stale entry (all ``Hist_Data`` symbols by default); returns status counts."""
+    store = IndicatorStore(store_dir=store_dir, hist_dir=hist_dir, indicators=indicators)
+    wanted = sorted(set(symbols)) if symbols is not None else hist_data.list_symbols(store.hist_dir)
+    results: dict[str, str] = {}
+    if workers and workers > 1 and len(wanted) > 1:
+        chunks = [wanted[i::workers] for i in range(workers) if wanted[i::workers]]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            for part in pool.map(_build_chunk, [store] * len(chunks), chunks):
+                results.update(part)
+    else:
+        results = _build_chunk(store, wanted)
+    store.prune()
+    counts: dict[str, int] = {}
+    for status in results.values():
+        counts[status] = counts.get(status, 0) + 1
+    return counts
@@ -0,0 +1,221 @@
+"""Daily on-disk Kite instrument master with indexed lookups.
+
+``kite.instruments()`` is a multi-megabyte dump that used to be downloaded and
+scanned linearly for every option contract resolution. This module stores the
+NSE/BSE/NFO dumps once per trading day as a feather table under
+``intermediary_files/instrument_master/`` and builds in-memory indexes on
+``(exchange, tradingsymbol)`` and ``(exchange, name, instrument_type, strike)``
+with expiries sorted inside each key, so contract lookups are a dict hit plus
+a binary search.
+
+Callers pass their own authenticated ``KiteConnect``; nothing here imports the
+broker session helpers, so scripts and ``utils`` can share it without cycles.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("Auto_Trade_Logger")
+
+ROOT = Path(__file__).resolve().parents[1]
+MASTER_DIR = Path(os.getenv("AT_INSTRUMENT_MASTER_DIR", str(ROOT / "intermediary_files" / "instrument_master")))
+# BSE before NSE so symbol -> token maps built by overwriting prefer NSE.
+DEFAULT_EXCHANGES = ("BSE", "NSE", "NFO")
+KEEP_DAYS = 3
+
+COLUMNS = [
+    "instrument_token",
+    "exchange_token",
+    "tradingsymbol",
+    "name",
+    "expiry",
+    "strike",
+    "tick_size",
+    "lot_size",
+    "instrument_type",
+    "segment",
+    "exchange",
+]
+CONTRACT_KEYS = ["tradingsymbol", "instrument_token", "exchange_token", "expiry", "lot_size", "strike", "instrument_type", "name"]
+
+_CACHE: dict[Path, tuple[float, "InstrumentMaster"]] = {}
+
+
+def _master_path(day: date) -> Path:
+    return MASTER_DIR / f"instruments_{day:%Y%m%d}.feather"
+
+
+def _to_frame(rows: Iterable[dict[str, Any]]) -> pd.DataFrame:
+    df = pd.DataFrame(list(rows))
+    for col in COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    df = df[COLUMNS].copy()
+    df["instrument_token"] = pd.to_numeric(df["instrument_token"], errors="coerce").fillna(0).astype("int64")
+    df["exchange_token"] = df["exchange_token"].fillna("").astype(str)
+    for col in ("tradingsymbol", "instrument_type", "segment", "exchange"):
+        df[col] = df[col].fillna("").astype(str).str.strip().str.upper()
+    df["name"] = df["name"].fillna("").astype(str).str.strip().str.upper()
+    df["expiry"] = pd.to_datetime(df["expiry"], errors="coerce")
+    df["strike"] = pd.to_numeric(df["strike"], errors="coerce").fillna(0.0).astype(float)
+    df["tick_size"] = pd.to_numeric(df["tick_size"], errors="coerce").astype(float)
+    df["lot_size"] = pd.to_numeric(df["lot_size"], errors="coerce").fillna(0).astype("int64")
+    return df.reset_index(drop=True)
+
+
+class InstrumentMaster:
+    """Read-only instrument table plus lookup indexes."""
+
+    def __init__(self, frame: pd.DataFrame, as_of: date | None = None):
+        self.frame = frame.reset_index(drop=True)
+        self.as_of = as_of
+        self._by_symbol: dict[tuple[str, str], int] = {
+            (ex, sym): i
+            for i, (ex, sym) in enumerate(zip(self.frame["exchange"], self.frame["tradingsymbol"]))
+        }
+
+        dated = self.frame[self.frame["expiry"].notna()]
+        order = dated.sort_values(
+            ["exchange", "name", "instrument_type", "strike", "expiry", "tradingsymbol"], kind="mergesort"
+        )
+        self._dated_pos = order.index.to_numpy()
+        self._dated_expiry = order["expiry"].to_numpy(dtype="datetime64[ns]").view("int64")
+        self._slices: dict[tuple[str, str, str, float], tuple[int, int]] = {}
+        keys = zip(order["exchange"], order["name"], order["instrument_type"], order["strike"])
+        start, prev = 0, None
+        for i, key in enumerate(keys):
+            if key != prev:
+                if prev is not None:
+                    self._slices[prev] = (start, i)
+                start, prev = i, key
+        if prev is not None:
+            self._slices[prev] = (start, len(order))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def record(self, pos: int) -> dict[str, Any]:
+        row = self.frame.iloc[int(pos)]
+        expiry = row["expiry"]
+        return {
+            "instrument_token": int(row["instrument_token"]),
+            "exchange_token": row["exchange_token"],
+            "tradingsymbol": row["tradingsymbol"],
+            "name": row["name"],
+            "expiry": expiry.date().isoformat() if pd.notna(expiry) else None,
+            "strike": float(row["strike"]),
+            "tick_size": None if pd.isna(row["tick_size"]) else float(row["tick_size"]),
+            "lot_size": int(row["lot_size"]),
+            "instrument_type": row["instrument_type"],
+            "segment": row["segment"],
+            "exchange": row["exchange"],
+        }
+
+    def lookup(self, tradingsymbol: str, exchange: str = "NFO") -> dict[str, Any] | None:
+        pos = self._by_symbol.get((exchange.upper(), str(tradingsymbol).strip().upper()))
+        return None if pos is None else self.record(pos)
+
+    def _slice(self, name: str, instrument_type: str, strike: float, exchange: str) -> tuple[int, int]:
+        key = (exchange.upper(), str(name).strip().upper(), str(instrument_type).strip().upper(), float(strike))
+        return self._slices.get(key, (0, 0))
+
+    def contracts(self, name: str, instrument_type: str, strike: float = 0.0, exchange: str = "NFO") -> list[dict[str, Any]]:
+        """Every expiry for one (name, type, strike), ordered by expiry then tradingsymbol."""
+        lo, hi = self._slice(name, instrument_type, strike, exchange)
+        return [self.record(p) for p in self._dated_pos[lo:hi]]
+
+    def nearest_expiry_on_or_after(
+        self,
+        name: str,
+        instrument_type: str,
+        strike: float,
+        when: date | datetime | str,
+        *,
+        exchange: str = "NFO",
+        month: int | None = None,
+    ) -> dict[str, Any] | None:
+        """First contract expiring on/after ``when`` (optionally only in calendar ``month``)."""
+        lo, hi = self._slice(name, instrument_type, strike, exchange)
+        if lo == hi:
+            return None
+        cutoff = pd.Timestamp(when)
+        if cutoff.tzinfo is not None:
+            cutoff = cutoff.tz_convert("UTC").tz_localize(None)
+        cutoff_ns = cutoff.normalize().as_unit("ns").value
+        i = lo + int(np.searchsorted(self._dated_expiry[lo:hi], cutoff_ns, side="left"))
+        while i < hi:
+            pos = self._dated_pos[i]
+            if month is None or self.frame.at[pos, "expiry"].month == month:
+                return self.record(pos)
+            i += 1
+        return None
+
+    def equities(self) -> pd.DataFrame:
+        """EQ rows in the shape ``utils.fetch_instruments_list`` has always returned."""
+        eq = self.frame[self.frame["instrument_type"] == "EQ"]
+        return eq[["instrument_token", "tradingsymbol", "exchange"]].reset_index(drop=True)
+
+
+def refresh_instrument_master(kite, *, day: date | None = None, exchanges: Iterable[str] = DEFAULT_EXCHANGES) -> InstrumentMaster:
+    """Download the instrument dumps for ``exchanges`` and persist today's table."""
+    day = day or date.today()
+    rows: list[dict[str, Any]] = []
+    for exchange in exchanges:
+        dump = kite.instruments(exchange) or []
+        for inst in dump:
+            inst = dict(inst)
+            inst.setdefault("exchange", exchange)
+            rows.append(inst)
+    frame = _to_frame(rows)
+    path = _master_path(day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    frame.to_feather(tmp)
+    os.replace(tmp, path)
+    for old in sorted(MASTER_DIR.glob("instruments_*.feather"))[:-KEEP_DAYS]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+    master = InstrumentMaster(frame, as_of=day)
+    _CACHE[path] = (path.stat().st_mtime, master)
+    logger.info("Instrument master refreshed: %d rows (%s)", len(frame), path.name)
+    return master
+
+
+def _load_path(path: Path) -> InstrumentMaster:
+    mtime = path.stat().st_mtime
+    cached = _CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    day = datetime.strptime(path.stem.split("_")[-1], "%Y%m%d").date()
+    master = InstrumentMaster(pd.read_feather(path), as_of=day)
+    _CACHE[path] = (mtime, master)
+    return master
+
+
+def load_instrument_master(kite=None, *, day: date | None = None, allow_stale: bool = True) -> InstrumentMaster:
+    """Today's master from memory/disk, downloading it once via ``kite`` if missing.
+
+    Without a ``kite`` client the newest table on disk is used when
+    ``allow_stale`` is set; otherwise ``FileNotFoundError`` is raised.
+    """
+    day = day or date.today()
+    path = _master_path(day)
+    if path.exists():
+        return _load_path(path)
+    if kite is not None:
+        return refresh_instrument_master(kite, day=day)
+    existing = sorted(MASTER_DIR.glob("instruments_*.feather")) if MASTER_DIR.exists() else []
+    if allow_stale and existing:
+        logger.warning("Instrument master for %s missing; using %s", day, existing[-1].name)
+        return _load_path(existing[-1])
+    raise FileNotFoundError(f"instrument master not available for {day} in {MASTER_DIR}")
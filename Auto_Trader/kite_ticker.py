@@ -1,15 +1,23 @@
 from kiteconnect import KiteTicker
 from Auto_Trader.my_secrets import API_KEY
 from Auto_Trader.utils import read_session_data
+from Auto_Trader.universe_cache import follow_token_updates
 import logging
+import threading
 import traceback
 
 logger = logging.getLogger("Auto_Trade_Logger")
 
 
-def run_ticker(sub_tokens, q):
+def run_ticker(sub_tokens, q, token_updates=None):
+    """Stream quotes for ``sub_tokens`` into ``q``.
+
+    Token lists read from ``token_updates`` (if given) are subscribed while
+    the socket is live, e.g. late additions from a background universe refresh.
+    """
     global queue
     queue = q
+    sub_tokens = list(sub_tokens or [])
     kws = KiteTicker(api_key=API_KEY, access_token=read_session_data())
 
     def on_ticks(ws, ticks):
@@ -18,8 +26,9 @@ def run_ticker(sub_tokens, q):
     def on_connect(ws, response):
         if sub_tokens:
             logger.info("Starting Ticker")
-            ws.subscribe(sub_tokens)
-            ws.set_mode(ws.MODE_QUOTE, sub_tokens)
+            tokens = list(sub_tokens)
+            ws.subscribe(tokens)
+            ws.set_mode(ws.MODE_QUOTE, tokens)
         else:
             logger.error("No subscription tokens provided.")
 
@@ -41,10 +50,31 @@ def run_ticker(sub_tokens, q):
             except Exception as e:
                 logger.error(f"Reconnect failed: {e}")
 
+    def subscribe_live(tokens):
+        # Socket writes must happen on the reactor thread; if not connected
+        # yet, on_connect subscribes the (already extended) sub_tokens.
+        from twisted.internet import reactor
+
+        def _send():
+            if kws.is_connected():
+                kws.subscribe(tokens)
+                kws.set_mode(kws.MODE_QUOTE, tokens)
+                logger.info(f"Hot-subscribed {len(tokens)} tokens")
+
+        reactor.callFromThread(_send)
+
     kws.on_ticks = on_ticks
     kws.on_connect = on_connect
     kws.on_close = on_close
 
+    if token_updates is not None:
+        threading.Thread(
+            target=follow_token_updates,
+            args=(token_updates, sub_tokens, subscribe_live),
+            name="ticker-token-updates",
+            daemon=True,
+        ).start()
+
     kws.connect()
 
 
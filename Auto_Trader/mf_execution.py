@@ -54,6 +54,9 @@ class MFExecutionConfig:
     )
 
 
+MF_INDEX_DIR = Path(os.getenv("AT_MF_INDEX_DIR", str(Path("intermediary_files") / "mf_index")))
+
+
 REBALANCE_PROFILES: dict[str, dict[str, Any]] = {
     "aggressive": {
         "description": "Tilts new MF allocation toward higher-beta equity funds and trims conservative funds first.",
@@ -217,21 +220,46 @@ def fetch_mf_holdings_index(kite) -> dict[str, dict[str, Any]]:
     return out
 
 
+def _mf_instrument_text(row: dict[str, Any]) -> str:
+    return " ".join(str(row.get(key) or "") for key in ("tradingsymbol", "name", "scheme_name", "amc")).lower()
+
+
+def load_mf_instruments_daily(kite) -> list[dict[str, Any]]:
+    """Kite MF instrument list, downloaded at most once per day for discovery."""
+    path = MF_INDEX_DIR / "kite_mf_instruments.json"
+    today = datetime.now().date().isoformat()
+    try:
+        cached = json.loads(path.read_text())
+        if cached.get("day") == today:
+            return list(cached.get("rows") or [])
+    except Exception:
+        pass
+    rows = list(kite.mf_instruments() or [])
+    try:
+        MF_INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"day": today, "rows": rows}, default=str))
+        tmp.replace(path)
+    except Exception:
+        pass
+    return rows
+
+
 def search_mf_instruments(kite, query: str, limit: int = 20) -> list[dict[str, Any]]:
     query_lc = query.strip().lower()
     if not query_lc:
         return []
-    matches = []
-    for row in kite.mf_instruments() or []:
-        text = " ".join(
-            str(row.get(key) or "")
-            for key in ("tradingsymbol", "name", "scheme_name", "amc")
-        ).lower()
-        if query_lc in text:
-            matches.append(row)
-        if len(matches) >= limit:
-            break
-    return matches
+    from .mf_scheme_index import load_scheme_index
+
+    rows = load_mf_instruments_daily(kite)
+    index = load_scheme_index(
+        [_mf_instrument_text(row) for row in rows],
+        "kite_mf_instruments",
+        str.split,
+        directory=MF_INDEX_DIR,
+        trigrams=True,
+    )
+    return [rows[i] for i in index.substring(query_lc, limit=limit)]
 
 
 def normalize_order(raw: dict[str, Any], default_tag: str = "mf_manual") -> MFOrderRequest:
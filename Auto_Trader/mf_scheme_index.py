@@ -0,0 +1,191 @@
+"""Prebuilt fund-name index for resolving MF holdings against long scheme lists.
+
+Matching a holding used to tokenize, normalize and score every name in the
+MFAPI (or Kite) scheme list on each call. ``SchemeIndex`` does that work once
+per list: a token inverted index gives, for a query, exactly the schemes that
+share at least one token along with the overlap counts, and a lazily built
+trigram index narrows substring searches to names containing every trigram of
+the query. Callers keep their own final scoring and only run it on those
+candidates.
+
+Indexes are keyed by a hash of the name list, memoized in-process and
+persisted under the directory the caller passes, so they are rebuilt only
+when the list changes. The module imports nothing from the package, so the
+dashboard and the portfolio tracker load it by file path without running
+``Auto_Trader/__init__``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import pickle
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence
+
+import numpy as np
+
+INDEX_VERSION = 1
+
+_MEMO: dict[str, "SchemeIndex"] = {}
+_LOCK = threading.Lock()
+
+
+def _list_key(variant: str, texts: Sequence[str]) -> str:
+    h = hashlib.sha1(f"{variant}:{INDEX_VERSION}\x1e".encode())
+    h.update("\x1f".join(texts).encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+class SchemeIndex:
+    """Token and trigram inverted indexes over a fixed list of names."""
+
+    def __init__(
+        self,
+        texts: Sequence[str],
+        tokenizer: Callable[[str], Iterable[str]],
+        normalizer: Optional[Callable[[str], str]] = None,
+        key: str = "",
+    ):
+        self.key = key
+        self.texts = [str(t) for t in texts]
+        self.lower = [t.lower() for t in self.texts]
+        self.norms = [normalizer(t) for t in self.texts] if normalizer else list(self.lower)
+        postings: dict[str, list[int]] = {}
+        doc_len = np.zeros(len(self.texts), dtype=np.int64)
+        for i, text in enumerate(self.texts):
+            toks = set(tokenizer(text))
+            doc_len[i] = len(toks)
+            for tok in toks:
+                postings.setdefault(tok, []).append(i)
+        self.postings = {tok: np.asarray(ids, dtype=np.int64) for tok, ids in postings.items()}
+        self.doc_len = doc_len
+        self._trigrams: Optional[dict[str, np.ndarray]] = None
+        self._contains: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def to_state(self) -> dict:
+        state = self.__dict__.copy()
+        state["_contains"] = {}
+        return state
+
+    @classmethod
+    def from_state(cls, state: dict) -> "SchemeIndex":
+        index = cls.__new__(cls)
+        index.__dict__.update(state)
+        return index
+
+    def docs_with(self, token: str) -> np.ndarray:
+        return self.postings.get(token, np.empty(0, dtype=np.int64))
+
+    def overlap(self, tokens: Iterable[str], within: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        """``(ids, counts)`` of names sharing at least one of ``tokens``.
+
+        ``counts`` is the number of distinct query tokens each name contains;
+        ids are ascending so ties keep list order. ``within`` restricts the
+        result to a subset of ids.
+        """
+        hits = [self.postings[t] for t in set(tokens) if t in self.postings]
+        if not hits:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        counts = np.bincount(np.concatenate(hits), minlength=len(self.texts))
+        if within is not None:
+            mask = np.zeros(len(self.texts), dtype=bool)
+            mask[within] = True
+            counts = np.where(mask, counts, 0)
+        ids = np.flatnonzero(counts)
+        return ids, counts[ids]
+
+    def contains(self, needle: str) -> np.ndarray:
+        """Boolean mask of lowercased names containing ``needle`` (memoized)."""
+        mask = self._contains.get(needle)
+        if mask is None:
+            mask = np.fromiter((needle in t for t in self.lower), dtype=bool, count=len(self.lower))
+            self._contains[needle] = mask
+        return mask
+
+    def _trigram_index(self) -> dict[str, np.ndarray]:
+        if self._trigrams is None:
+            grams: dict[str, list[int]] = {}
+            for i, text in enumerate(self.lower):
+                for g in {text[j:j + 3] for j in range(len(text) - 2)}:
+                    grams.setdefault(g, []).append(i)
+            self._trigrams = {g: np.asarray(ids, dtype=np.int64) for g, ids in grams.items()}
+        return self._trigrams
+
+    def substring(self, query: str, limit: Optional[int] = None) -> list[int]:
+        """Ids of names whose lowercased text contains ``query``, in list order."""
+        q = str(query).lower()
+        if len(q) < 3:
+            ids: Iterable[int] = range(len(self.lower))
+        else:
+            grams = self._trigram_index()
+            postings = sorted((grams.get(q[j:j + 3]) for j in range(len(q) - 2)), key=lambda p: 0 if p is None else len(p))
+            if postings[0] is None:
+                return []
+            cand = postings[0]
+            for p in postings[1:]:
+                cand = np.intersect1d(cand, p, assume_unique=True)
+                if not cand.size:
+                    return []
+            ids = cand.tolist()
+        out = []
+        for i in ids:
+            if q in self.lower[i]:
+                out.append(int(i))
+                if limit is not None and len(out) >= limit:
+                    break
+        return out
+
+
+def load_scheme_index(
+    texts: Sequence[str],
+    variant: str,
+    tokenizer: Callable[[str], Iterable[str]],
+    normalizer: Optional[Callable[[str], str]] = None,
+    directory: Optional[Path] = None,
+    trigrams: bool = False,
+) -> SchemeIndex:
+    """Index for ``texts``, reusing the in-process or persisted copy when the list is unchanged.
+
+    ``variant`` names the tokenizer/normalizer pair; one persisted index is
+    kept per variant and replaced when the list changes. ``trigrams`` builds
+    the substring index up front so it is persisted too. Without a
+    ``directory`` the index is only memoized in-process.
+    """
+    texts = [str(t) for t in texts]
+    key = _list_key(variant, texts)
+    with _LOCK:
+        hit = _MEMO.get(variant)
+        if hit is not None and hit.key == key:
+            return hit
+    path = Path(directory) / f"scheme_index_{variant}.pkl" if directory is not None else None
+    index = None
+    if path is not None:
+        try:
+            with path.open("rb") as fh:
+                state = pickle.load(fh)
+            if isinstance(state, dict) and state.get("key") == key:
+                index = SchemeIndex.from_state(state)
+        except Exception:
+            index = None
+    if index is None:
+        index = SchemeIndex(texts, tokenizer, normalizer, key=key)
+        if trigrams:
+            index._trigram_index()
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+                with tmp.open("wb") as fh:
+                    # Plain state, so the file stays loadable if the class moves again.
+                    pickle.dump(index.to_state(), fh, protocol=pickle.HIGHEST_PROTOCOL)
+                tmp.replace(path)
+            except Exception:
+                # Persisting is an optimization; an in-memory index is still usable.
+                pass
+    with _LOCK:
+        _MEMO[variant] = index
+    return index
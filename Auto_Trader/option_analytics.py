@@ -0,0 +1,286 @@
+"""Vectorized implied volatility and Greeks for NIFTY option chains.
+
+Prices are Black-Scholes-Merton on the index spot (``model="bs"``, with a
+continuous dividend yield) or Black-76 on a futures/forward price
+(``model="black76"``, i.e. BSM with ``q == r``). Implied volatility is solved
+for whole arrays at once with a bracketed Newton iteration: every element
+keeps a [lo, hi] volatility bracket, takes a Newton step when it lands inside
+the bracket and bisects otherwise, so deep ITM/OTM strikes with tiny vega
+still converge.
+
+``chain_analytics`` maps a long (contract x bar) option frame to
+IV/Delta/Gamma/Theta/Vega, using ``UL_Close`` from
+``options_support.load_underlying_context`` when the frame does not already
+carry it, and memoizes results per (contract, bar, price, underlying).
+
+Conventions: ``Theta`` is per calendar day, ``Vega`` per 1 volatility point,
+``Delta``/``Gamma`` are with respect to the underlying passed in.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+RISK_FREE_RATE = float(os.getenv("AT_OPTIONS_RISK_FREE_RATE", "0.065"))
+DIVIDEND_YIELD = float(os.getenv("AT_OPTIONS_DIVIDEND_YIELD", "0.0"))
+EXPIRY_CLOSE = pd.Timedelta(hours=15, minutes=30)
+CACHE_MAX_ROWS = int(os.getenv("AT_OPTION_GREEKS_CACHE_MAX", "500000"))
+SIGMA_LO = 1e-4
+SIGMA_HI = 5.0
+GREEK_COLUMNS = ["IV", "Delta", "Gamma", "Theta", "Vega"]
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+# (r, q, model) -> frame indexed by (tradingsymbol, bar ns) holding Close,
+# UL_Close and GREEK_COLUMNS; a row is reused only if both prices still match.
+_CACHE: dict[tuple[float, float, str], pd.DataFrame] = {}
+
+
+def _pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def _carry(r: float, q: float, model: str) -> float:
+    if model == "black76":
+        return r
+    if model != "bs":
+        raise ValueError(f"unknown option model {model!r}")
+    return q
+
+
+def _d1_d2(s, k, t, sigma, r, q):
+    vol_t = sigma * np.sqrt(t)
+    d1 = (np.log(s / k) + (r - q + 0.5 * sigma * sigma) * t) / vol_t
+    return d1, d1 - vol_t
+
+
+def option_price(underlying, strike, t_years, sigma, is_call, *, r: float = RISK_FREE_RATE, q: float = DIVIDEND_YIELD, model: str = "bs") -> np.ndarray:
+    s, k, t, sigma, is_call = np.broadcast_arrays(
+        np.asarray(underlying, float), np.asarray(strike, float), np.asarray(t_years, float),
+        np.asarray(sigma, float), np.asarray(is_call, bool),
+    )
+    q = _carry(r, q, model)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(s, k, t, sigma, r, q)
+        call = s * np.exp(-q * t) * ndtr(d1) - k * np.exp(-r * t) * ndtr(d2)
+        put = k * np.exp(-r * t) * ndtr(-d2) - s * np.exp(-q * t) * ndtr(-d1)
+    return np.where(is_call, call, put)
+
+
+def implied_volatility(
+    price,
+    underlying,
+    strike,
+    t_years,
+    is_call,
+    *,
+    r: float = RISK_FREE_RATE,
+    q: float = DIVIDEND_YIELD,
+    model: str = "bs",
+    tol: float = 1e-8,
+    max_iter: int = 60,
+) -> np.ndarray:
+    """Implied volatility for every element; NaN where no volatility fits the price.
+
+    ``tol`` is the volatility accuracy (price error / vega).
+    """
+    p, s, k, t, is_call = np.broadcast_arrays(
+        np.asarray(price, float), np.asarray(underlying, float), np.asarray(strike, float),
+        np.asarray(t_years, float), np.asarray(is_call, bool),
+    )
+    qq = _carry(r, q, model)
+    shape = p.shape
+    p, s, k, t, is_call = (a.ravel() for a in (p, s, k, t, is_call))
+    out = np.full(p.shape, np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        disc_s = s * np.exp(-qq * t)
+        disc_k = k * np.exp(-r * t)
+        lower = np.where(is_call, np.maximum(disc_s - disc_k, 0.0), np.maximum(disc_k - disc_s, 0.0))
+        upper = np.where(is_call, disc_s, disc_k)
+    ok = np.isfinite(p) & np.isfinite(s) & np.isfinite(k) & (s > 0) & (k > 0) & (t > 0) & (p > lower) & (p < upper)
+    idx = np.flatnonzero(ok)
+    if idx.size == 0:
+        return out.reshape(shape)
+
+    p, s, k, t, is_call = p[idx], s[idx], k[idx], t[idx], is_call[idx]
+    lo = np.full(idx.size, SIGMA_LO)
+    hi = np.full(idx.size, SIGMA_HI)
+    # Brenner-Subrahmanyam ATM guess, clipped into the bracket.
+    sigma = np.clip(_SQRT_2PI * p / (s * np.sqrt(t)), 0.05, 2.0)
+    done = np.zeros(idx.size, dtype=bool)
+    price_tol = 1e-12 * np.maximum(1.0, p)
+    for _ in range(max_iter):
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            d1, d2 = _d1_d2(s, k, t, sigma, r, qq)
+            model_price = np.where(
+                is_call,
+                s * np.exp(-qq * t) * ndtr(d1) - k * np.exp(-r * t) * ndtr(d2),
+                k * np.exp(-r * t) * ndtr(-d2) - s * np.exp(-qq * t) * ndtr(-d1),
+            )
+            diff = model_price - p
+            vega = s * np.exp(-qq * t) * _pdf(d1) * np.sqrt(t)
+            done |= (np.abs(diff) < price_tol) | (np.abs(diff) < tol * vega)
+            if done.all():
+                break
+            hi = np.where(diff > 0, sigma, hi)
+            lo = np.where(diff <= 0, sigma, lo)
+            step = sigma - diff / vega
+        bisect = ~np.isfinite(step) | (step <= lo) | (step >= hi)
+        sigma = np.where(done, sigma, np.where(bisect, 0.5 * (lo + hi), step))
+    out[idx] = np.where(done, sigma, np.nan)
+    return out.reshape(shape)
+
+
+def option_greeks(
+    underlying,
+    strike,
+    t_years,
+    sigma,
+    is_call,
+    *,
+    r: float = RISK_FREE_RATE,
+    q: float = DIVIDEND_YIELD,
+    model: str = "bs",
+) -> dict[str, np.ndarray]:
+    """Delta, gamma, theta (per day) and vega (per vol point) for every element."""
+    s, k, t, sigma, is_call = np.broadcast_arrays(
+        np.asarray(underlying, float), np.asarray(strike, float), np.asarray(t_years, float),
+        np.asarray(sigma, float), np.asarray(is_call, bool),
+    )
+    q = _carry(r, q, model)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(s, k, t, sigma, r, q)
+        sqrt_t = np.sqrt(t)
+        carry_s = s * np.exp(-q * t)
+        disc_k = k * np.exp(-r * t)
+        pdf_d1 = _pdf(d1)
+        delta = np.where(is_call, np.exp(-q * t) * ndtr(d1), np.exp(-q * t) * (ndtr(d1) - 1.0))
+        gamma = np.exp(-q * t) * pdf_d1 / (s * sigma * sqrt_t)
+        decay = -carry_s * pdf_d1 * sigma / (2.0 * sqrt_t)
+        theta = np.where(
+            is_call,
+            decay - r * disc_k * ndtr(d2) + q * carry_s * ndtr(d1),
+            decay + r * disc_k * ndtr(-d2) - q * carry_s * ndtr(-d1),
+        )
+        vega = carry_s * pdf_d1 * sqrt_t
+    return {"Delta": delta, "Gamma": gamma, "Theta": theta / 365.0, "Vega": vega / 100.0}
+
+
+def years_to_expiry(bar_time, expiry) -> np.ndarray:
+    """Calendar years from each bar to the 15:30 close on expiry day.
+
+    Daily bars stamped at midnight are treated as that day's close.
+    """
+    bars = pd.to_datetime(pd.Series(bar_time), errors="coerce").reset_index(drop=True)
+    exp = pd.to_datetime(pd.Series(expiry), errors="coerce").reset_index(drop=True)
+    if getattr(bars.dt, "tz", None) is not None:
+        bars = bars.dt.tz_localize(None)
+    if getattr(exp.dt, "tz", None) is not None:
+        exp = exp.dt.tz_localize(None)
+    bars = bars.where(bars != bars.dt.normalize(), bars + EXPIRY_CLOSE)
+    delta = (exp.dt.normalize() + EXPIRY_CLOSE) - bars
+    return (delta.dt.total_seconds() / (365.0 * 86400.0)).to_numpy(dtype=float)
+
+
+def _compute(frame: pd.DataFrame, r: float, q: float, model: str) -> np.ndarray:
+    price = frame["Close"].to_numpy(dtype=float)
+    ul = frame["UL_Close"].to_numpy(dtype=float)
+    strike = frame["strike"].to_numpy(dtype=float)
+    is_call = frame["option_type"].astype(str).str.upper().eq("CE").to_numpy()
+    t = years_to_expiry(frame["Date"], frame["expiry"])
+    iv = implied_volatility(price, ul, strike, t, is_call, r=r, q=q, model=model)
+    greeks = option_greeks(ul, strike, t, iv, is_call, r=r, q=q, model=model)
+    return np.column_stack([iv, greeks["Delta"], greeks["Gamma"], greeks["Theta"], greeks["Vega"]])
+
+
+def chain_analytics(
+    frame: pd.DataFrame,
+    *,
+    underlying: pd.DataFrame | None = None,
+    underlying_symbol: str = "NIFTY50_INDEX",
+    r: float = RISK_FREE_RATE,
+    q: float = DIVIDEND_YIELD,
+    model: str = "bs",
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """Add ``GREEK_COLUMNS`` to a long option frame.
+
+    ``frame`` needs Date, Close, strike, expiry and option_type (CE/PE);
+    ``tradingsymbol`` is optional. Results are cached per (contract, bar) and
+    reused while Close and UL_Close are unchanged.
+    ``UL_Close`` is merged as-of from ``underlying`` (or the memoized
+    ``load_underlying_context``) when missing.
+    """
+    out = frame.copy()
+    if out.empty:
+        for col in GREEK_COLUMNS:
+            out[col] = pd.Series(dtype=float)
+        return out
+    if "UL_Close" not in out.columns:
+        if underlying is None:
+            from .options_support import load_underlying_context
+
+            underlying = load_underlying_context(underlying_symbol)
+        if underlying is None or underlying.empty:
+            for col in GREEK_COLUMNS:
+                out[col] = np.nan
+            return out
+        order = np.argsort(pd.to_datetime(out["Date"]).to_numpy(), kind="mergesort")
+        merged = pd.merge_asof(
+            out.iloc[order][["Date"]].reset_index(),
+            underlying[["Date", "UL_Close"]].sort_values("Date"),
+            on="Date",
+            direction="backward",
+        ).set_index("index")
+        out["UL_Close"] = merged["UL_Close"].reindex(out.index)
+    if "tradingsymbol" not in out.columns:
+        out["tradingsymbol"] = ""
+
+    values = np.full((len(out), len(GREEK_COLUMNS)), np.nan)
+    close = out["Close"].to_numpy(dtype=float)
+    ul_close = out["UL_Close"].to_numpy(dtype=float)
+    # Contract terms are part of the key: without a tradingsymbol, different
+    # strikes/expiries/sides on the same bar would otherwise share an entry.
+    key = pd.MultiIndex.from_arrays([
+        out["tradingsymbol"].astype(str).to_numpy(),
+        pd.to_datetime(out["Date"]).to_numpy(dtype="datetime64[ns]").view("int64"),
+        out["strike"].to_numpy(dtype=float),
+        pd.to_datetime(out["expiry"], errors="coerce").to_numpy(dtype="datetime64[ns]").view("int64"),
+        out["option_type"].astype(str).str.upper().to_numpy(),
+    ])
+    cache_key = (float(r), float(q), model)
+    miss = np.ones(len(out), dtype=bool)
+    cached = _CACHE.get(cache_key) if use_cache else None
+    if cached is not None:
+        found = cached.reindex(key)
+        hit = (found["Close"].to_numpy() == close) & (found["UL_Close"].to_numpy() == ul_close)
+        values[hit] = found[GREEK_COLUMNS].to_numpy()[hit]
+        miss = ~hit
+
+    if miss.any():
+        computed = _compute(out.loc[miss], r, q, model)
+        values[miss] = computed
+        if use_cache:
+            fresh = pd.DataFrame(computed, columns=GREEK_COLUMNS, index=key[miss])
+            fresh.insert(0, "UL_Close", ul_close[miss])
+            fresh.insert(0, "Close", close[miss])
+            if cached is None or len(cached) + len(fresh) > CACHE_MAX_ROWS:
+                cached = fresh
+            else:
+                cached = pd.concat([cached, fresh])
+            _CACHE[cache_key] = cached[~cached.index.duplicated(keep="last")]
+
+    for i, col in enumerate(GREEK_COLUMNS):
+        out[col] = values[:, i]
+    return out
+
+
+def chain_snapshot(frame: pd.DataFrame, **kwargs: Any) -> pd.DataFrame:
+    """Greeks on the latest bar of every contract in a long frame."""
+    latest = frame.sort_values("Date", kind="mergesort").groupby("tradingsymbol", sort=False).tail(1)
+    return chain_analytics(latest, **kwargs).reset_index(drop=True)
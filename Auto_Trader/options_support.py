@@ -4,16 +4,20 @@ import json
 import os
 import re
 from pathlib import Path
+from typing import Mapping
 
 import numpy as np
 import pandas as pd
 
+from . import hist_data
+from . import option_analytics
 from . import utils as at_utils
 
 ROOT = Path(__file__).resolve().parents[1]
 HIST_DIR = ROOT / "intermediary_files" / "Hist_Data"
 OPTIONS_MANIFEST = ROOT / "intermediary_files" / "options" / "nifty_options_universe.json"
 OPTION_SYMBOL_RE = re.compile(r"^[A-Z0-9]+\d+(CE|PE)$")
+_UNDERLYING_CACHE: dict[str, tuple[tuple[int, int], pd.DataFrame | None]] = {}
 
 
 def parse_symbol_list(value: str) -> list[str]:
@@ -122,12 +126,9 @@ def discover_option_symbols() -> list[str]:
     side_filter = os.getenv("AT_OPTIONS_LAB_SIDE", "BOTH").strip().upper()
     max_symbols = max(1, int(os.getenv("AT_OPTIONS_LAB_MAX_SYMBOLS", "12")))
 
-    if not HIST_DIR.exists():
-        return []
-
     candidates = []
-    for path in sorted(HIST_DIR.glob("*.feather")):
-        symbol = path.stem.upper()
+    for name in hist_data.list_symbols(HIST_DIR):
+        symbol = name.upper()
         if not looks_like_option_symbol(symbol):
             continue
         if underlyings and not any(symbol.startswith(u) for u in underlyings):
@@ -140,11 +141,11 @@ def discover_option_symbols() -> list[str]:
 
 
 
-def load_underlying_context(underlying_symbol: str = "NIFTY50_INDEX") -> pd.DataFrame | None:
-    path = HIST_DIR / f"{underlying_symbol}.feather"
-    if not path.exists():
+def _build_underlying_context(symbol: str) -> pd.DataFrame | None:
+    raw = hist_data.read_raw(HIST_DIR, symbol)
+    if raw is None:
         return None
-    df = normalize_ohlcv(pd.read_feather(path))
+    df = normalize_ohlcv(raw)
     if df.empty:
         return None
     df = at_utils.Indicators(df)
@@ -165,8 +166,24 @@ def load_underlying_context(underlying_symbol: str = "NIFTY50_INDEX") -> pd.Data
     return keep.dropna(subset=["Date"]).sort_values("Date").reset_index(drop=True)
 
 
+def load_underlying_context(underlying_symbol: str = "NIFTY50_INDEX") -> pd.DataFrame | None:
+    """Underlying indicator context, recomputed only when its stored history changes.
+
+    The returned frame is shared between callers; treat it as read-only.
+    """
+    stamp = hist_data.symbol_stamp(HIST_DIR, underlying_symbol)
+    if stamp is None:
+        _UNDERLYING_CACHE.pop(underlying_symbol, None)
+        return None
+    cached = _UNDERLYING_CACHE.get(underlying_symbol)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    context = _build_underlying_context(underlying_symbol)
+    _UNDERLYING_CACHE[underlying_symbol] = (stamp, context)
+    return context
 
-def enrich_option_frame(raw_df: pd.DataFrame, underlying_symbol: str = "NIFTY50_INDEX") -> pd.DataFrame:
+
+def _prepare_option_frame(raw_df: pd.DataFrame) -> pd.DataFrame:
     df = normalize_ohlcv(raw_df)
     if df.empty:
         return df
@@ -191,15 +208,66 @@ def enrich_option_frame(raw_df: pd.DataFrame, underlying_symbol: str = "NIFTY50_
     df["RangePct"] = ((df["High"] - df["Low"]) / df["Close"].replace(0, np.nan)).replace([np.inf, -np.inf], np.nan).fillna(0.0)
 
     df = at_utils.Indicators(df)
-    df = df.ffill().dropna(subset=["Close"]).reset_index(drop=True)
-
-    ul = load_underlying_context(underlying_symbol)
+    return df.ffill().dropna(subset=["Close"]).sort_values("Date", kind="mergesort").reset_index(drop=True)
+
+
+def enrich_option_frames(
+    raw_frames: Mapping[str, pd.DataFrame],
+    underlying_symbol: str = "NIFTY50_INDEX",
+    errors: dict[str, str] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Enrich many option frames against one underlying context.
+
+    Per-contract OI features and indicators are computed per frame; the
+    underlying as-of join is a single ``merge_asof`` over all frames' dates and
+    Greeks are solved for all contracts in one ``chain_analytics`` pass.
+    When ``errors`` is given, frames that fail are recorded there and skipped
+    instead of raising.
+    """
+    prepared: dict[str, pd.DataFrame] = {}
+    for key, raw_df in raw_frames.items():
+        try:
+            prepared[key] = _prepare_option_frame(raw_df)
+        except Exception as exc:
+            if errors is None:
+                raise
+            errors[key] = str(exc)
+
+    live = [key for key, df in prepared.items() if not df.empty]
+    ul = load_underlying_context(underlying_symbol) if live else None
     if ul is not None and not ul.empty:
-        df = pd.merge_asof(
-            df.sort_values("Date"),
-            ul.sort_values("Date"),
+        dates = pd.concat([prepared[key]["Date"] for key in live], ignore_index=True)
+        order = np.argsort(dates.to_numpy(), kind="mergesort")
+        joined = pd.merge_asof(
+            pd.DataFrame({"Date": dates.to_numpy()[order], "_row": order}),
+            ul,
             on="Date",
             direction="backward",
-        )
+        ).sort_values("_row", kind="mergesort")
+        joined = joined.drop(columns=["Date", "_row"]).reset_index(drop=True)
+        start = 0
+        for key in live:
+            df = prepared[key]
+            block = joined.iloc[start:start + len(df)].reset_index(drop=True)
+            start += len(df)
+            prepared[key] = pd.concat([df, block], axis=1)
+
+    for key in live:
+        prepared[key] = prepared[key].ffill().reset_index(drop=True)
+
+    greek_keys = [key for key in live if {"strike", "expiry", "UL_Close"}.issubset(prepared[key].columns)]
+    if greek_keys:
+        cols = ["tradingsymbol", "Date", "Close", "strike", "expiry", "option_type", "UL_Close"]
+        chain = pd.concat([prepared[key][cols] for key in greek_keys], ignore_index=True)
+        greeks = option_analytics.chain_analytics(chain)[option_analytics.GREEK_COLUMNS]
+        start = 0
+        for key in greek_keys:
+            df = prepared[key]
+            block = greeks.iloc[start:start + len(df)].reset_index(drop=True)
+            start += len(df)
+            prepared[key] = pd.concat([df.drop(columns=option_analytics.GREEK_COLUMNS, errors="ignore"), block], axis=1)
+    return prepared
+
 
-    return df.ffill().reset_index(drop=True)
+def enrich_option_frame(raw_df: pd.DataFrame, underlying_symbol: str = "NIFTY50_INDEX") -> pd.DataFrame:
+    return enrich_option_frames({"": raw_df}, underlying_symbol)[""]
@@ -0,0 +1,403 @@
+"""Parallel parameter sweeps over a shared-memory indicator panel.
+
+Strategy labs used to start one worker per variant that each reloaded
+``Hist_Data`` and re-ran ``Indicators()``, which is what pushed the nightly lab
+into OOM and left ``spawn_main`` orphans behind. Here the panel is built once,
+packed into a single ``multiprocessing.shared_memory`` block, and a bounded
+process pool attaches to it zero-copy.
+
+Each finished variant is appended as one JSON line to the results file, so a
+crashed or timed-out sweep resumes where it stopped. Variants are first run on
+a probe slice of the universe; a variant whose probe result is Pareto-dominated
+(lower return and deeper drawdown) by enough peers is abandoned before the full
+run.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import hashlib
+import json
+import logging
+import math
+import multiprocessing as mp
+import os
+import signal
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from . import rule_backtest
+
+logger = logging.getLogger("Auto_Trade_Logger")
+
+DEFAULT_MAX_WORKERS = max(1, int(os.getenv("AT_SWEEP_MAX_WORKERS", str(max(1, (os.cpu_count() or 2) - 1)))))
+DEFAULT_PROBE_FRACTION = float(os.getenv("AT_SWEEP_PROBE_FRACTION", "0.25"))
+DEFAULT_ABANDON_DOMINATED_BY = max(0, int(os.getenv("AT_SWEEP_ABANDON_DOMINATED_BY", "3")))
+FINISHED_STATUSES = {"done", "abandoned"}
+
+_PR_SET_PDEATHSIG = 1
+
+
+# ---------- shared panel ----------
+@dataclass(frozen=True)
+class PanelSpec:
+    """Picklable description of a packed panel; enough for a worker to attach."""
+
+    shm_name: str
+    columns: tuple[str, ...]
+    symbols: tuple[str, ...]
+    offsets: tuple[int, ...]
+
+    @property
+    def rows(self) -> int:
+        return self.offsets[-1]
+
+
+def _panel_arrays(buf, spec: PanelSpec) -> tuple[np.ndarray, np.ndarray]:
+    rows, cols = spec.rows, len(spec.columns)
+    values = np.ndarray((rows, cols), dtype="float64", buffer=buf)
+    dates = np.ndarray((rows,), dtype="int64", buffer=buf, offset=rows * cols * 8)
+    return values, dates
+
+
+def _frames_from_arrays(values: np.ndarray, dates: np.ndarray, spec: PanelSpec) -> dict[str, pd.DataFrame]:
+    frames: dict[str, pd.DataFrame] = {}
+    for i, symbol in enumerate(spec.symbols):
+        lo, hi = spec.offsets[i], spec.offsets[i + 1]
+        index = pd.DatetimeIndex(dates[lo:hi].view("datetime64[ns]"), name="Date")
+        frames[symbol] = pd.DataFrame(values[lo:hi], index=index, columns=list(spec.columns), copy=False)
+    return frames
+
+
+class SharedPanel:
+    """Owner side of a packed indicator panel.
+
+    Numeric columns of every frame are stored as one ``float64`` matrix (rows
+    of all symbols stacked, union of columns, missing columns as NaN) followed
+    by the ``int64`` bar timestamps. The rule engine reads every column via
+    ``pd.to_numeric(...)``, so the float cast is lossless for backtests.
+    """
+
+    def __init__(self, frames: dict[str, pd.DataFrame]):
+        usable = {sym: df for sym, df in frames.items() if df is not None and not df.empty}
+        columns: list[str] = []
+        seen: set[str] = set()
+        for df in usable.values():
+            for col in df.columns:
+                if col == "Date" or col in seen:
+                    continue
+                if pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]):
+                    seen.add(col)
+                    columns.append(col)
+        symbols = list(usable)
+        offsets = [0]
+        for sym in symbols:
+            offsets.append(offsets[-1] + len(usable[sym]))
+
+        rows = offsets[-1]
+        size = max(1, rows * (len(columns) + 1) * 8)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.spec = PanelSpec(
+            shm_name=self._shm.name,
+            columns=tuple(columns),
+            symbols=tuple(symbols),
+            offsets=tuple(offsets),
+        )
+        values, dates = _panel_arrays(self._shm.buf, self.spec)
+        for i, sym in enumerate(symbols):
+            df = usable[sym]
+            lo, hi = offsets[i], offsets[i + 1]
+            block = df.reindex(columns=columns)
+            values[lo:hi] = block.apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            bar_dates = rule_backtest._bar_dates(df)
+            dates[lo:hi] = bar_dates.as_unit("ns").asi8
+        del values, dates
+
+    def frames(self) -> dict[str, pd.DataFrame]:
+        """Read-only frame views over the shared block (no copy)."""
+        values, dates = _panel_arrays(self._shm.buf, self.spec)
+        values.flags.writeable = False
+        return _frames_from_arrays(values, dates, self.spec)
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+        try:
+            self._shm.close()
+        except BufferError:
+            # Views handed out by frames() are still alive; the unlink below
+            # still releases the segment once they are collected.
+            pass
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = None
+
+    def __enter__(self) -> "SharedPanel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------- worker side ----------
+_WORKER_SHM: shared_memory.SharedMemory | None = None
+_WORKER_FRAMES: dict[str, pd.DataFrame] | None = None
+
+
+def _die_with_parent() -> None:
+    # Linux only: have the kernel SIGTERM this worker if the sweep parent dies,
+    # so a killed supervisor never leaves orphaned pool workers behind.
+    try:
+        libc = ctypes.CDLL("libc.so.6", use_errno=True)
+        libc.prctl(_PR_SET_PDEATHSIG, signal.SIGTERM)
+    except Exception:
+        pass
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    # Attaching must not register the segment with the resource tracker,
+    # otherwise a worker exit would unlink the panel under its siblings.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no ``track`` argument
+        original = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = original
+
+
+def _init_worker(spec: PanelSpec) -> None:
+    global _WORKER_SHM, _WORKER_FRAMES
+    _die_with_parent()
+    _WORKER_SHM = _attach_untracked(spec.shm_name)
+    values, dates = _panel_arrays(_WORKER_SHM.buf, spec)
+    values.flags.writeable = False
+    _WORKER_FRAMES = _frames_from_arrays(values, dates, spec)
+
+
+def _evaluate(frames: dict[str, pd.DataFrame], params: dict, symbols: Iterable[str] | None, backtest_kwargs: dict) -> dict:
+    if symbols is not None:
+        frames = {sym: frames[sym] for sym in symbols if sym in frames}
+    result = rule_backtest.run_backtest(
+        frames,
+        buy_config=params.get("buy") or None,
+        sell_config=params.get("sell") or None,
+        **backtest_kwargs,
+    )
+    return variant_metrics(result, backtest_kwargs.get("initial_capital", 1_000_000.0))
+
+
+def _run_in_worker(params: dict, symbols: tuple[str, ...] | None, backtest_kwargs: dict) -> dict:
+    if _WORKER_FRAMES is None:
+        raise RuntimeError("sweep worker was not initialised with a panel")
+    return _evaluate(_WORKER_FRAMES, params, symbols, backtest_kwargs)
+
+
+# ---------- helpers ----------
+def variant_id(params: dict) -> str:
+    """Stable id for a parameter set (independent of dict ordering)."""
+    blob = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:12]
+
+
+def variant_metrics(result: rule_backtest.BacktestResult, initial_capital: float = 1_000_000.0) -> dict:
+    summary = dict(result.summary)
+    final_equity = float(summary.get("final_equity") or initial_capital)
+    summary["total_return_pct"] = (final_equity / initial_capital - 1.0) * 100.0 if initial_capital else None
+    return {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in summary.items()}
+
+
+def load_results(path: Path) -> dict[str, dict]:
+    """Latest record per variant id; a torn final line from a crash is ignored."""
+    records: dict[str, dict] = {}
+    if not path.exists():
+        return records
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            vid = rec.get("variant_id")
+            if vid:
+                records[vid] = rec
+    return records
+
+
+def _append_result(path: Path, record: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(record, default=str)
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write(line + "\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+
+
+def _dominates(a: dict, b: dict) -> bool:
+    ra, rb = a.get("total_return_pct"), b.get("total_return_pct")
+    da, db = a.get("max_drawdown_pct"), b.get("max_drawdown_pct")
+    if ra is None or rb is None:
+        return False
+    # max_drawdown_pct is negative (or zero); larger is shallower.
+    da = 0.0 if da is None else da
+    db = 0.0 if db is None else db
+    return ra >= rb and da >= db and (ra > rb or da > db)
+
+
+def dominated_counts(probes: dict[str, dict]) -> dict[str, int]:
+    """How many other probe results Pareto-dominate each variant's probe."""
+    return {
+        vid: sum(1 for other, m in probes.items() if other != vid and _dominates(m, metrics))
+        for vid, metrics in probes.items()
+    }
+
+
+def probe_symbols(symbols: Iterable[str], fraction: float) -> tuple[str, ...]:
+    ordered = sorted(symbols)
+    if not ordered:
+        return ()
+    take = max(1, int(math.ceil(len(ordered) * min(max(fraction, 0.0), 1.0))))
+    return tuple(ordered[:take])
+
+
+def _mp_context():
+    methods = mp.get_all_start_methods()
+    return mp.get_context("fork" if "fork" in methods else "spawn")
+
+
+# ---------- sweep ----------
+def run_sweep(
+    frames: dict[str, pd.DataFrame],
+    variants: list[dict],
+    *,
+    results_path: Path | str,
+    max_workers: int | None = None,
+    probe_fraction: float | None = None,
+    abandon_dominated_by: int | None = None,
+    backtest_kwargs: dict | None = None,
+) -> list[dict]:
+    """Backtest every variant and return one record per variant, in input order.
+
+    ``variants`` are dicts of the lab shape ``{"name": ..., "buy": {...},
+    "sell": {...}}``. The first variant is treated as the baseline and is never
+    abandoned. ``max_workers <= 1`` runs in-process, which is what tests and
+    debugging want. Records already finished in ``results_path`` are reused.
+    A variant whose backtest raised comes back with ``status="error"`` and the
+    message in ``error``; it is not treated as finished, so a rerun retries it.
+    """
+    results_path = Path(results_path)
+    max_workers = DEFAULT_MAX_WORKERS if max_workers is None else max(1, int(max_workers))
+    probe_fraction = DEFAULT_PROBE_FRACTION if probe_fraction is None else float(probe_fraction)
+    abandon_dominated_by = DEFAULT_ABANDON_DOMINATED_BY if abandon_dominated_by is None else int(abandon_dominated_by)
+    backtest_kwargs = dict(backtest_kwargs or {})
+
+    by_id: dict[str, dict] = {}
+    for params in variants:
+        by_id.setdefault(variant_id(params), params)
+    baseline_id = variant_id(variants[0]) if variants else None
+
+    existing = load_results(results_path)
+    finished = {vid: rec for vid, rec in existing.items() if vid in by_id and rec.get("status") in FINISHED_STATUSES}
+    probes = {
+        vid: rec["probe"]
+        for vid, rec in existing.items()
+        if vid in by_id and isinstance(rec.get("probe"), dict)
+    }
+    pending = [vid for vid in by_id if vid not in finished]
+    failed: dict[str, dict] = {}
+    if finished:
+        logger.info("Sweep resume: %d finished, %d pending (%s)", len(finished), len(pending), results_path)
+
+    def _record(vid: str, status: str, **extra: Any) -> dict:
+        params = by_id[vid]
+        rec = {
+            "variant_id": vid,
+            "name": params.get("name"),
+            "params": {k: v for k, v in params.items() if k != "name"},
+            "status": status,
+            "updated_at": datetime.now().isoformat(),
+            **extra,
+        }
+        _append_result(results_path, rec)
+        return rec
+
+    all_symbols = [sym for sym, df in frames.items() if df is not None and not df.empty]
+    use_probe = (
+        abandon_dominated_by > 0
+        and 0.0 < probe_fraction < 1.0
+        and len(all_symbols) > 1
+        and len(set(pending) | set(probes)) > abandon_dominated_by
+    )
+    probe_set = probe_symbols(all_symbols, probe_fraction) if use_probe else None
+
+    panel: SharedPanel | None = None
+    executor: ProcessPoolExecutor | None = None
+    try:
+        if max_workers > 1 and pending:
+            panel = SharedPanel(frames)
+            executor = ProcessPoolExecutor(
+                max_workers=min(max_workers, len(pending)),
+                mp_context=_mp_context(),
+                initializer=_init_worker,
+                initargs=(panel.spec,),
+            )
+
+        def _map(vids: list[str], symbols: tuple[str, ...] | None):
+            if executor is None:
+                for vid in vids:
+                    try:
+                        yield vid, _evaluate(frames, by_id[vid], symbols, backtest_kwargs), None
+                    except Exception as exc:
+                        yield vid, None, exc
+                return
+            futures: dict[Future, str] = {
+                executor.submit(_run_in_worker, by_id[vid], symbols, backtest_kwargs): vid for vid in vids
+            }
+            for fut in as_completed(futures):
+                exc = fut.exception()
+                yield futures[fut], (None if exc else fut.result()), exc
+
+        if use_probe:
+            to_probe = [vid for vid in pending if vid not in probes]
+            for vid, metrics, exc in _map(to_probe, probe_set):
+                if exc is not None:
+                    logger.warning("Sweep probe failed for %s: %s", vid, exc)
+                    continue
+                probes[vid] = metrics
+                _record(vid, "probed", probe=metrics)
+            counts = dominated_counts(probes)
+            survivors = []
+            for vid in pending:
+                if vid != baseline_id and counts.get(vid, 0) >= abandon_dominated_by:
+                    finished[vid] = _record(vid, "abandoned", probe=probes[vid], dominated_by=counts[vid])
+                else:
+                    survivors.append(vid)
+            pending = survivors
+
+        for vid, metrics, exc in _map(pending, None):
+            if exc is not None:
+                logger.warning("Sweep variant %s failed: %s", vid, exc)
+                failed[vid] = _record(vid, "error", error=str(exc)[:500], probe=probes.get(vid))
+                continue
+            finished[vid] = _record(vid, "done", metrics=metrics, probe=probes.get(vid))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if panel is not None:
+            panel.close()
+
+    return [finished.get(vid) or failed[vid] for vid in by_id if vid in finished or vid in failed]
@@ -0,0 +1,329 @@
+"""Shared-memory live price board.
+
+Live prices used to travel between processes through ``reports/live_prices.json``,
+with every writer doing its own read-merge-rewrite of the file and every reader
+re-parsing it. The board is a memory-mapped file with one fixed slot per symbol
+(last price, exchange timestamp, write timestamp, source, sequence number):
+
+* writers (``rt_compute`` as the primary feed, ``kite_ws_price_fallback`` while
+  the primary is stale) update slots in place;
+* readers in any process map the same file and read without locks. Each slot
+  carries a seqlock counter that is odd while the slot is being written, so a
+  torn read is detected and retried.
+
+Symbols are only ever appended to the slot directory (under an ``flock``), so a
+reader's symbol → slot map stays valid and is extended when the header's used
+count grows. ``export_json`` writes the old ``live_prices.json`` payload for
+legacy readers and ``load_live_payload`` returns that same payload from the
+board, falling back to the JSON file when no board exists.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import math
+import mmap
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+
+logger = logging.getLogger("Auto_Trade_Logger")
+
+ROOT = Path(__file__).resolve().parents[1]
+BOARD_PATH = Path(os.getenv("AT_PRICE_BOARD_PATH", str(ROOT / "intermediary_files" / "price_board.bin")))
+BOARD_SLOTS = max(16, int(os.getenv("AT_PRICE_BOARD_SLOTS", "8192")))
+LEGACY_JSON_PATH = ROOT / "reports" / "live_prices.json"
+
+PRIMARY_SOURCE = "wednesday_kite_ticker"
+FALLBACK_SOURCE = "kite_ws_fallback"
+# Slot/header source ids; index 0 means "never written".
+SOURCES = ("", PRIMARY_SOURCE, FALLBACK_SOURCE)
+_MAX_SOURCES = 8
+
+MAGIC = b"ATPB"
+BOARD_VERSION = 1
+HEADER_SIZE = 256
+READ_RETRIES = 64
+
+HEADER_DTYPE = np.dtype(
+    {
+        "names": ["magic", "version", "slots", "used", "last_write", "last_pid"],
+        "formats": ["S4", "<u4", "<u4", "<u4", ("<f8", _MAX_SOURCES), ("<i8", _MAX_SOURCES)],
+        "offsets": [0, 4, 8, 12, 16, 16 + 8 * _MAX_SOURCES],
+        "itemsize": HEADER_SIZE,
+    }
+)
+SLOT_DTYPE = np.dtype(
+    {
+        "names": ["seq", "price", "exch_ts", "write_ts", "source", "symbol"],
+        "formats": ["<u8", "<f8", "<f8", "<f8", "u1", "S31"],
+        "offsets": [0, 8, 16, 24, 32, 33],
+        "itemsize": 64,
+    }
+)
+
+
+def _source_id(source: str) -> int:
+    try:
+        return SOURCES.index(source)
+    except ValueError:
+        raise ValueError(f"unknown price source {source!r}") from None
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+
+
+def _epoch(value: Any) -> float:
+    if isinstance(value, datetime):
+        try:
+            return value.timestamp()
+        except (OverflowError, OSError, ValueError):
+            return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class PriceBoard:
+    """One process's mapping of the shared price board file."""
+
+    def __init__(self, path: Path | None = None, create: bool = False, slots: int | None = None):
+        self.path = Path(path or BOARD_PATH)
+        if create and not self.path.exists():
+            self._create(slots or BOARD_SLOTS)
+        self._fd = os.open(self.path, os.O_RDWR)
+        try:
+            self._mm = mmap.mmap(self._fd, 0)
+        except Exception:
+            os.close(self._fd)
+            raise
+        head = np.frombuffer(self._mm[:HEADER_SIZE], dtype=HEADER_DTYPE) if len(self._mm) >= HEADER_SIZE else None
+        if head is None or head["magic"][0] != MAGIC or int(head["version"][0]) != BOARD_VERSION:
+            self._mm.close()
+            os.close(self._fd)
+            raise ValueError(f"{self.path} is not a v{BOARD_VERSION} price board")
+        buf = np.frombuffer(self._mm, dtype=np.uint8)
+        self._header = buf[:HEADER_SIZE].view(HEADER_DTYPE)
+        self.capacity = int(self._header["slots"][0])
+        self._slots = buf[HEADER_SIZE:HEADER_SIZE + self.capacity * SLOT_DTYPE.itemsize].view(SLOT_DTYPE)
+        self._index: dict[str, int] = {}
+        self._known = 0
+        self._lock = threading.Lock()
+
+    def _create(self, slots: int) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = BOARD_VERSION
+        header["slots"] = slots
+        with tmp.open("wb") as fh:
+            fh.write(header.tobytes())
+            fh.truncate(HEADER_SIZE + slots * SLOT_DTYPE.itemsize)
+        try:
+            # Never replace a board another process created in the meantime.
+            os.link(tmp, self.path)
+        except FileExistsError:
+            pass
+        except OSError:
+            if not self.path.exists():
+                tmp.replace(self.path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        self._header = self._slots = None  # release buffer exports before closing the map
+        try:
+            self._mm.close()
+        finally:
+            os.close(self._fd)
+
+    # ── Directory ────────────────────────────────────────────────
+
+    def _sync_index(self) -> None:
+        used = int(self._header["used"][0])
+        if used > self._known:
+            names = self._slots["symbol"][self._known:used]
+            for offset, raw in enumerate(names.tolist()):
+                self._index[raw.decode()] = self._known + offset
+            self._known = used
+
+    def _slot_ids(self, symbols: Iterable[str], allocate: bool) -> tuple[list[str], np.ndarray]:
+        self._sync_index()
+        symbols = [str(s) for s in symbols]
+        missing = [s for s in dict.fromkeys(symbols) if s not in self._index]
+        if missing and allocate:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._sync_index()
+                used = self._known
+                for sym in missing:
+                    if sym in self._index:
+                        continue
+                    raw = sym.encode()
+                    if used >= self.capacity or len(raw) > SLOT_DTYPE["symbol"].itemsize:
+                        logger.warning("Price board: no slot for %s (capacity %s)", sym, self.capacity)
+                        continue
+                    self._slots["symbol"][used] = raw
+                    used += 1
+                # Publish the new names only after they are in place.
+                self._header["used"][0] = used
+                self._sync_index()
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        keep = [s for s in symbols if s in self._index]
+        return keep, np.fromiter((self._index[s] for s in keep), dtype=np.int64, count=len(keep))
+
+    def symbols(self) -> list[str]:
+        with self._lock:
+            self._sync_index()
+            return list(self._index)
+
+    # ── Writes ───────────────────────────────────────────────────
+
+    def publish(
+        self,
+        prices: Mapping[str, float],
+        source: str,
+        exch_times: Mapping[str, Any] | None = None,
+        now: float | None = None,
+    ) -> int:
+        """Write ``prices`` (symbol → last price) for ``source``; returns slots written."""
+        src = _source_id(source)
+        now = time.time() if now is None else float(now)
+        with self._lock:
+            syms, ids = self._slot_ids([s for s, px in prices.items() if px and px > 0], allocate=True)
+            if ids.size:
+                # Duplicate ids would bump a slot's seq twice per step; names are unique here.
+                px = np.fromiter((float(prices[s]) for s in syms), dtype=np.float64, count=len(syms))
+                exch = np.fromiter(
+                    (_epoch((exch_times or {}).get(s)) for s in syms), dtype=np.float64, count=len(syms)
+                )
+                seq = self._slots["seq"]
+                seq[ids] += 1  # odd: readers retry these slots
+                self._slots["price"][ids] = px
+                self._slots["exch_ts"][ids] = exch
+                self._slots["write_ts"][ids] = now
+                self._slots["source"][ids] = src
+                seq[ids] += 1
+            self._header["last_write"][0, src] = now
+            self._header["last_pid"][0, src] = os.getpid()
+        return int(ids.size)
+
+    # ── Reads ────────────────────────────────────────────────────
+
+    def read(self, symbols: Iterable[str] | None = None) -> dict[str, dict[str, Any]]:
+        """Consistent ``{symbol: {price, exch_ts, write_ts, source}}`` for written slots."""
+        with self._lock:
+            if symbols is None:
+                self._sync_index()
+                syms = list(self._index)
+                ids = np.arange(len(syms), dtype=np.int64)
+            else:
+                syms, ids = self._slot_ids(symbols, allocate=False)
+        if not ids.size:
+            return {}
+        out = np.empty(ids.size, dtype=SLOT_DTYPE)
+        pending = np.arange(ids.size)
+        for attempt in range(READ_RETRIES):
+            if attempt >= 4:
+                time.sleep(0.0001)  # let a writer that is mid-batch finish
+            before = self._slots["seq"][ids[pending]]
+            out[pending] = self._slots[ids[pending]]
+            after = self._slots["seq"][ids[pending]]
+            pending = pending[(before != after) | (before % 2 == 1)]
+            if not pending.size:
+                break
+        else:
+            logger.warning("Price board: %s slots still being written after %s retries", pending.size, READ_RETRIES)
+            out["seq"][pending] = 0
+        result: dict[str, dict[str, Any]] = {}
+        for sym, rec in zip(syms, out.tolist()):
+            seq, price, exch_ts, write_ts, src, _ = rec
+            if not seq or not price > 0:
+                continue
+            result[sym] = {
+                "price": price,
+                "exch_ts": None if math.isnan(exch_ts) else exch_ts,
+                "write_ts": write_ts,
+                "source": SOURCES[src] if src < len(SOURCES) else "",
+            }
+        return result
+
+    def last_write(self, source: str) -> float | None:
+        ts = float(self._header["last_write"][0, _source_id(source)])
+        return ts or None
+
+    def snapshot(self, symbols: Iterable[str] | None = None) -> dict[str, Any]:
+        """The board in the legacy ``live_prices.json`` layout; ``{}`` before any write."""
+        writes = self._header["last_write"][0]
+        src = int(np.argmax(writes))
+        if not writes[src]:
+            return {}
+        rows = self.read(symbols)
+        return {
+            "time": _iso(float(writes[src])),
+            "prices": {s: r["price"] for s, r in rows.items()},
+            "price_times": {s: _iso(r["write_ts"]) for s, r in rows.items()},
+            "source": SOURCES[src],
+            "source_pid": int(self._header["last_pid"][0, src]),
+        }
+
+    def export_json(self, path: Path | None = None, symbols: Iterable[str] | None = None) -> None:
+        payload = self.snapshot(symbols)
+        if not payload:
+            return
+        path = Path(path or LEGACY_JSON_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".json.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")))
+        tmp.replace(path)
+
+
+_BOARDS: dict[Path, PriceBoard] = {}
+_BOARDS_LOCK = threading.Lock()
+
+
+def open_board(path: Path | None = None, create: bool = False) -> PriceBoard | None:
+    """This process's mapping of the board at ``path``, or ``None`` if unavailable."""
+    path = Path(path or BOARD_PATH)
+    with _BOARDS_LOCK:
+        board = _BOARDS.get(path)
+        if board is not None:
+            return board
+        try:
+            board = PriceBoard(path, create=create)
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            logger.warning("Price board %s unavailable: %s", path, exc)
+            return None
+        _BOARDS[path] = board
+        return board
+
+
+def load_live_payload(
+    json_path: Path | None = None,
+    symbols: Iterable[str] | None = None,
+    board_path: Path | None = None,
+) -> dict[str, Any]:
+    """Legacy live-price payload from the board, else from ``json_path``; ``{}`` if neither."""
+    board = open_board(board_path)
+    if board is not None:
+        payload = board.snapshot(symbols)
+        if payload:
+            return payload
+    try:
+        payload = json.loads(Path(json_path or LEGACY_JSON_PATH).read_text())
+    except Exception:
+        return {}
+    return payload if isinstance(payload, dict) else {}
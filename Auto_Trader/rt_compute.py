@@ -5,6 +5,7 @@ import pandas as pd
 import sys
 from Auto_Trader.KITE_TRIGGER_ORDER import handle_decisions
 from Auto_Trader.utils import process_stock_and_decide, load_instruments_data
+from Auto_Trader import hist_data, price_board
 import logging
 import traceback
 import queue  # Import Python's queue module for handling empty exceptions
@@ -20,76 +21,44 @@ _PAPER_ALERT_COOLDOWN = max(30, int(os.getenv("AT_PAPER_ALERT_COOLDOWN", "300"))
 _ALERTED_BUY_SYMBOLS = set()   # Symbols that have been BUY-alerted; cleared only when they SELL
 _ALERTED_SELL_SYMBOLS = set()   # Symbols that have been SELL-alerted; cleared only when they BUY
 
-# Live price feed for external paper ledger consumers (e.g., RSI momentum tracker).
-# Only writes prices for symbols tracked by the paper ledger to avoid I/O spam.
+# Live price feed for external consumers (RSI momentum paper ledger, status
+# pushes, dashboard). Every tick batch goes to the shared-memory price board;
+# the legacy JSON snapshot is exported at most every AT_LIVE_PRICE_INTERVAL s.
 _LIVE_PRICE_PATH = "reports/live_prices.json"
 _LIVE_PRICE_INTERVAL = int(os.getenv("AT_LIVE_PRICE_INTERVAL", "5"))  # seconds
 _LAST_LIVE_PRICE_DUMP = 0.0
+_INSTRUMENTS_PATH = "intermediary_files/Instruments.feather"
 
 
 def _publish_live_prices(data: list, instruments_dict: dict) -> None:
-    """Write symbol→last_price for symbols tracked by the paper ledger."""
+    """Write symbol→last_price for every ticking symbol to the price board."""
     global _LAST_LIVE_PRICE_DUMP
 
-    now = datetime.now().timestamp()
-    if now - _LAST_LIVE_PRICE_DUMP < _LIVE_PRICE_INTERVAL:
-        return
-    _LAST_LIVE_PRICE_DUMP = now
-
-    # Only track symbols the paper ledger actually holds
-    import json as _json
-
-    try:
-        tracked = _json.load(open(f"reports/paper_ledger_rsi_momentum_state.json"))
-        wanted = set(tracked.get("positions", {}).keys())
-    except Exception:
-        wanted = set()
-
-    if not wanted:
-        return
-
     prices: dict[str, float] = {}
+    exch_times: dict[str, object] = {}
     for stock in data:
         symbol = stock.get("Symbol", stock.get("tradingsymbol", ""))
-        if symbol in wanted:
-            px = float(stock.get("last_price", 0.0) or 0.0)
-            if px > 0:
-                prices[symbol] = px
+        if not symbol:
+            continue
+        px = float(stock.get("last_price", 0.0) or 0.0)
+        if px > 0:
+            prices[symbol] = px
+            exch_times[symbol] = stock.get("exchange_timestamp") or stock.get("last_trade_time")
     if not prices:
         return
 
     try:
-        # Maintain a rolling cache. Tick batches may not contain every wanted
-        # symbol, so overwriting with only the current batch causes partial MTM.
-        existing = {}
-        try:
-            with open(_LIVE_PRICE_PATH) as f:
-                existing = _json.load(f)
-        except Exception:
-            existing = {}
-
-        now_str = datetime.now().isoformat(timespec="seconds")
-        merged_prices = existing.get("prices", {}) if isinstance(existing.get("prices"), dict) else {}
-        price_times = existing.get("price_times", {}) if isinstance(existing.get("price_times"), dict) else {}
-
-        for symbol, px in prices.items():
-            merged_prices[symbol] = px
-            price_times[symbol] = now_str
-
-        # Keep only symbols currently wanted by the paper ledger.
-        merged_prices = {s: p for s, p in merged_prices.items() if s in wanted}
-        price_times = {s: t for s, t in price_times.items() if s in wanted}
-
-        with open(_LIVE_PRICE_PATH, "w") as f:
-            _json.dump({
-                "time": now_str,
-                "prices": merged_prices,
-                "price_times": price_times,
-                "source": "wednesday_kite_ticker",
-                "source_pid": os.getpid(),
-            }, f)
+        board = price_board.open_board(create=True)
+        if board is None:
+            return
+        board.publish(prices, price_board.PRIMARY_SOURCE, exch_times)
+
+        now = datetime.now().timestamp()
+        if now - _LAST_LIVE_PRICE_DUMP >= _LIVE_PRICE_INTERVAL:
+            _LAST_LIVE_PRICE_DUMP = now
+            board.export_json(_LIVE_PRICE_PATH)
     except Exception:
-        pass
+        logger.debug(f"Live price publish failed: {traceback.format_exc()}")
 
 
 def _load_paper_live_state() -> dict:
@@ -271,6 +240,14 @@ def _update_intraday_bar(stock_data, bar_ts, bar_state, last_cum_volume):
     stock_data["volume_traded"] = curr_bar["volume"]
 
 
+def _instruments_stamp():
+    try:
+        st = os.stat(_INSTRUMENTS_PATH)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 def Apply_Rules(q, message_queue):
     """RSI Momentum monitor — replaces RULE_SET engine.
 
@@ -281,6 +258,7 @@ def Apply_Rules(q, message_queue):
     Only the algo changed: RULE_SET buy/sell decisions replaced with RSI status reporting.
     """
     instruments_dict = load_instruments_data()
+    instruments_stamp = _instruments_stamp()
     _last_push_hour = -1  # Track last hour we pushed RSI status
 
     while True:
@@ -301,6 +279,14 @@ def Apply_Rules(q, message_queue):
                 except queue.Empty:
                     break
 
+            # A background universe refresh rewrites Instruments.feather after
+            # the ticker has started; pick up metadata for hot-subscribed tokens.
+            stamp = _instruments_stamp()
+            if stamp != instruments_stamp:
+                load_instruments_data.cache_clear()
+                instruments_dict = load_instruments_data()
+                instruments_stamp = stamp
+
             # Enrich tick data with instrument metadata
             for stock_data in data:
                 instrument_token = stock_data.get("instrument_token")
@@ -351,31 +337,22 @@ def _send_rsi_momentum_status(message_queue):
 
         # ── 2. Load live prices ──
         live_prices = {}
-        live_path = Path("reports/live_prices.json")
-        if live_path.exists():
-            try:
-                live = json.loads(live_path.read_text())
-                live_prices = live.get("prices", {})
-            except Exception as e:
-                logger.warning(f"[RSI-STATUS] Failed to read live prices: {e}")
+        try:
+            live = price_board.load_live_payload(Path(_LIVE_PRICE_PATH), symbols=positions)
+            live_prices = live.get("prices", {})
+        except Exception as e:
+            logger.warning(f"[RSI-STATUS] Failed to read live prices: {e}")
 
-        # ── 3. Load Hist_Data fallback ──
-        import pandas as pd
-        hist_dir = Path("intermediary_files/Hist_Data")
+        # ── 3. Load Hist_Data fallback (held symbols only) ──
+        hist_dir = hist_data.HIST_DIR
         prices_fallback = {}
         if hist_dir.is_dir():
             try:
-                feather_files = sorted(hist_dir.glob("*.feather"))
-                for f in feather_files:
-                    try:
-                        df = pd.read_feather(f)
-                        close_col = "close" if "close" in df.columns else ("Close" if "Close" in df.columns else None)
-                        if close_col:
-                            last = df[close_col].ffill().iloc[-1]
-                            sym = f.stem
-                            prices_fallback[sym] = float(last)
-                    except Exception as e:
-                        logger.warning(f"[RSI-STATUS] Failed to read fallback {f.name}: {e}")
+                frames = hist_data.load_frames(hist_dir, symbols=positions, fields=("close",))
+                for sym, df in frames.items():
+                    last = df["close"].ffill()
+                    if len(last) and last.notna().iloc[-1]:
+                        prices_fallback[sym] = float(last.iloc[-1])
             except Exception as e:
                 logger.warning(f"[RSI-STATUS] Failed to scan Hist_Data: {e}")
 
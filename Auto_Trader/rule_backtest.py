@@ -0,0 +1,888 @@
+"""Vectorized backtest of the live BUY (RULE_SET_7) and SELL (RULE_SET_2) rules.
+
+The live rules look at ``df.iloc[-1]`` only, so replaying them over years of
+history means one call per bar. This module evaluates the same gate
+definitions as whole-column boolean arrays, then walks position state
+(stop-loss, first_seen_date, partial-exit tiers, dip guard) per symbol in a
+tight scalar loop that only runs while a position is open.
+
+Decisions are taken at the bar close, which is what the live engine sees once
+the day's last tick has been folded into ``Hist_Data``.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+import talib
+
+from . import RULE_SET_2, RULE_SET_7
+
+# Gates whose failure blocks a BUY outright (RULE_SET_7 ``hard_blocks``), in live order.
+HARD_BLOCK_NAMES = [
+    "obv_overextended",
+    "rsi_floor",
+    "overbought_guard",
+    "atr_band",
+    "extension_atr",
+    "supertrend_price",
+    "supertrend_direction",
+    "weekly_trend",
+    "macd_signal_cross",
+    "mmi_risk_off",
+    "vwap",
+    "ich_cloud",
+    "sar",
+    "cci",
+    "di_cross",
+    "di_plus",
+    "mfi",
+    "stochrsi",
+    "aroon",
+    "trix",
+    "ppo_rising",
+    "roc",
+    "vortex",
+    "macd_hist_rising",
+    "ema_cross",
+    "bb_pctb",
+    "bb_width",
+    "sr_resistance_room",
+    "sr_round_guard",
+]
+
+ENTRY_MODES = ["pullback_mode", "breakout_mode", "meanrev_mode", "structure_bounce_mode", "structure_breakout_mode"]
+
+
+def _col(df: pd.DataFrame, name: str, default: float = np.nan) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), default, dtype="float64")
+    return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype="float64")
+
+
+def _prev(values: np.ndarray, fill: Any = np.nan) -> np.ndarray:
+    out = np.empty_like(values)
+    if len(values):
+        out[0] = fill
+        out[1:] = values[:-1]
+    return out
+
+
+def _py_min(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Python's ``min(a, b)`` keeps ``a`` unless ``b < a`` (so a NaN ``a`` survives).
+    return np.where(b < a, b, a)
+
+
+def _floor_denominator(values: np.ndarray, floor: float) -> np.ndarray:
+    # Python's ``max(floor, x)`` returns ``floor`` for NaN ``x``.
+    return np.where(values > floor, values, floor)
+
+
+def _bar_dates(df: pd.DataFrame) -> pd.DatetimeIndex:
+    if "Date" in df.columns:
+        return pd.DatetimeIndex(pd.to_datetime(df["Date"], errors="coerce"))
+    return pd.DatetimeIndex(pd.to_datetime(df.index, errors="coerce"))
+
+
+# ---------- BUY side (RULE_SET_7.evaluate_signal) ----------
+def buy_signal_frame(
+    df: pd.DataFrame,
+    *,
+    config: dict | None = None,
+    mmi: float | pd.Series | np.ndarray | None = None,
+) -> pd.DataFrame:
+    """Evaluate every RULE_SET_7 gate for every bar of an ``Indicators()`` frame.
+
+    Returns one boolean column per gate/mode/hard block plus ``decision_buy``.
+    Row ``t`` equals ``evaluate_signal(df.iloc[: t + 1], ...)``. ``mmi`` replaces
+    the live ``get_mmi_now()`` call; ``None`` means "no MMI reading" (gate passes).
+    """
+    cfg = {**RULE_SET_7.CONFIG, **(config or {})}
+    n = len(df)
+
+    close = _col(df, "Close")
+    high = _col(df, "High")
+    low = _col(df, "Low")
+    prev_close = _prev(close)
+    prev_high = _prev(high)
+    ema20 = _col(df, "EMA20")
+    ema50 = _col(df, "EMA50")
+    ema200 = _col(df, "EMA200")
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        trend_ok = (close > ema20) & (ema20 > ema50)
+        trend_ok &= ~np.isfinite(ema200) | (ema50 > ema200)
+        trend_slope_ok = (ema20 >= _prev(ema20)) & (ema50 >= _prev(ema50))
+
+        adx = _col(df, "ADX")
+        adx_ok = adx >= cfg["adx_min"]
+        adx_strong = adx >= cfg["adx_strong_min"]
+
+        macd = _col(df, "MACD")
+        macd_sig = _col(df, "MACD_Signal")
+        macd_hist = _col(df, "MACD_Hist")
+        prev_macd_hist = _prev(macd_hist)
+        macd_rising = macd_hist > prev_macd_hist
+        macd_signal_ok = macd > macd_sig
+
+        vol = _col(df, "Volume")
+        vol_sma = _col(df, "SMA_20_Volume")
+        vol_ok = vol > cfg["volume_confirm_mult"] * vol_sma
+
+        cmf = _col(df, "CMF")
+        cmf_gate = np.where(adx_strong, cfg["cmf_strong_min"], np.where(~adx_ok, cfg["cmf_weak_min"], cfg["cmf_base_min"]))
+        cmf_ok = (cmf >= cmf_gate) & (cmf > _prev(cmf))
+
+        z = _col(df, "OBV_ZScore20")
+        obv = _col(df, "OBV")
+        obv_ema20 = _col(df, "OBV_EMA20")
+        obv_trend = obv > obv_ema20
+        # _slope_up over the last 3 points reduces to comparing the window ends.
+        obv_slope = np.zeros(n, dtype=bool)
+        if n >= 3:
+            obv_slope[2:] = obv_ema20[2:] > obv_ema20[:-2]
+        obv_ok = (np.isfinite(z) & (z >= cfg["obv_min_zscore"]) & obv_trend) | (obv_trend & obv_slope)
+        obv_overextended = np.isfinite(z) & (z > cfg["max_obv_zscore"])
+
+        prior_high_break = close > prev_high
+        hhv20 = _col(df, "HHV_20")
+        prev_hhv20 = _prev(hhv20)
+        highN_break = np.isfinite(hhv20) & np.isfinite(prev_hhv20) & (close > hhv20) & (prev_close <= prev_hhv20)
+
+        rsi = _col(df, "RSI")
+        prev_rsi = _prev(rsi)
+        rsi_floor_ok = rsi >= cfg["rsi_floor"]
+        rsi_slope_up = rsi >= prev_rsi
+        overbought_guard = np.isfinite(z) & (z >= 2.0) & (rsi >= 75)
+        stoch_k = _col(df, "Stochastic_%K")
+
+        st_dir_raw = _col(df, "Supertrend_Direction")
+        supertrend_dir = np.where(np.isnan(st_dir_raw), True, st_dir_raw != 0)
+        supertrend = _col(df, "Supertrend")
+        weekly_sma_20 = _col(df, "Weekly_SMA_20")
+        weekly_sma_200 = _col(df, "Weekly_SMA_200")
+
+        atr = _col(df, "ATR")
+        has_atr = np.isfinite(atr) & (close > 0)
+        atr_pct = np.where(has_atr, atr / close, np.nan)
+        atr_band_ok = np.where(has_atr, (cfg["min_atr_pct"] <= atr_pct) & (atr_pct <= cfg["max_atr_pct"]), True)
+        extension_atr = np.where(has_atr, (close - ema20) / np.maximum(atr, 1e-9), np.nan)
+        extension_ok = np.where(has_atr, extension_atr <= cfg["max_extension_atr"], True)
+
+        supertrend_price_ok = ~np.isfinite(supertrend) | (close >= supertrend)
+        weekly_both = np.isfinite(weekly_sma_20) & np.isfinite(weekly_sma_200)
+        weekly_trend_ok = np.where(weekly_both, weekly_sma_20 >= weekly_sma_200, True)
+
+        strong_regime = trend_ok & adx_strong & (cmf >= 0.05) & obv_trend
+        rsi_pull_gate = np.where(strong_regime, 50.0, 55.0)
+        rsi_momo_gate = np.where(strong_regime, 55.0, 60.0)
+        rsi_pullback_trigger = (prev_rsi < rsi_pull_gate) & (rsi >= rsi_pull_gate) & rsi_slope_up
+        rsi_momo_trigger = (prev_rsi < rsi_momo_gate) & (rsi >= rsi_momo_gate) & rsi_slope_up
+
+        if mmi is None:
+            mmi_ok = np.ones(n, dtype=bool)
+        else:
+            mmi_arr = np.broadcast_to(np.asarray(mmi, dtype="float64"), (n,))
+            mmi_ok = np.isnan(mmi_arr) | (mmi_arr < cfg["mmi_risk_off"])
+
+        vwap = _col(df, "VWAP")
+        vwap_ok = np.ones(n, dtype=bool)
+        if cfg["vwap_buy_above"] >= 1:
+            vwap_ok = ~np.isfinite(vwap) | (close >= vwap)
+
+        ich_bull = _col(df, "ICH_CLOUD_BULL")
+        ich_cloud_ok = np.ones(n, dtype=bool)
+        if cfg["ich_cloud_bull"] >= 1:
+            ich_cloud_ok = ~np.isfinite(ich_bull) | (ich_bull != 0)
+
+        sar = _col(df, "SAR")
+        sar_ok = np.ones(n, dtype=bool)
+        if cfg["sar_buy_enabled"] >= 1:
+            sar_ok = ~np.isfinite(sar) | (close >= sar)
+
+        cci = _col(df, "CCI")
+        cci_ok = ~np.isfinite(cci) | (cci >= cfg["cci_buy_min"])
+
+        plus_di = _col(df, "PLUS_DI")
+        minus_di = _col(df, "MINUS_DI")
+        di_cross_ok = np.ones(n, dtype=bool)
+        if cfg["di_cross_enabled"] >= 1:
+            di_cross_ok = ~(np.isfinite(plus_di) & np.isfinite(minus_di)) | (plus_di >= minus_di)
+        di_plus_ok = np.ones(n, dtype=bool)
+        if cfg["di_plus_min"] > 0:
+            di_plus_ok = ~np.isfinite(plus_di) | (plus_di >= cfg["di_plus_min"])
+
+        mfi = _col(df, "MFI")
+        mfi_ok = ~np.isfinite(mfi) | (mfi >= cfg["mfi_buy_min"])
+        stochrsi_k = _col(df, "StochRSI_K")
+        stochrsi_ok = ~np.isfinite(stochrsi_k) | (stochrsi_k <= cfg["stochrsi_buy_max"])
+        aroonosc = _col(df, "AROONOSC")
+        aroon_ok = ~np.isfinite(aroonosc) | (aroonosc >= cfg["aroon_osc_min"])
+        trix = _col(df, "TRIX")
+        trix_ok = ~np.isfinite(trix) | (trix >= cfg["trix_buy_min"])
+
+        ppo_hist = _col(df, "PPO_Hist")
+        ppo_prev = _prev(ppo_hist)
+        ppo_rising = np.isfinite(ppo_hist) & np.isfinite(ppo_prev) & (ppo_hist > ppo_prev)
+        ppo_rising_ok = ppo_rising | (cfg["ppo_hist_rising_enabled"] < 1)
+
+        roc = _col(df, "ROC")
+        roc_ok = ~np.isfinite(roc) | (roc >= cfg["roc_buy_min"])
+        vortex_bull = _col(df, "VORTEX_BULL")
+        vortex_ok = (np.isfinite(vortex_bull) & (vortex_bull > 0)) | (cfg["vortex_bull_enabled"] < 1)
+
+        macd_rising_internal = np.isfinite(macd_hist) & np.isfinite(prev_macd_hist) & (macd_hist > prev_macd_hist)
+        macd_rising_ok = macd_rising_internal | (cfg["macd_hist_rising_enabled"] < 1)
+
+        ema_cross_921 = _col(df, "EMA_CROSS_9_21")
+        ema_cross_ok = (np.isfinite(ema_cross_921) & (ema_cross_921 > 0)) | (cfg["ema_cross_buy_enabled"] < 1)
+
+        bb_pctb = _col(df, "BB_PercentB")
+        bb_pctb_ok = ~np.isfinite(bb_pctb) | (bb_pctb <= cfg["bb_pctb_buy_max"])
+        bb_width = _col(df, "BB_Width")
+        bb_width_ok = ~np.isfinite(bb_width) | (bb_width >= cfg["bb_width_min"])
+
+        # --- Chart-structure / support-resistance context ---
+        sr_support = _col(df, "SR_Support")
+        sr_resistance = _col(df, "SR_Resistance")
+        prev_sr_resistance = _prev(sr_resistance)
+        near_support_pct = cfg["sr_near_support_pct"]
+        breakout_buffer = cfg["sr_breakout_buffer_pct"]
+        low_or_close = _py_min(low, close)
+
+        sr_near_support = (
+            np.isfinite(sr_support)
+            & (close >= sr_support * (1.0 - breakout_buffer))
+            & (low_or_close <= sr_support * (1.0 + near_support_pct))
+        )
+        sr_bounce_trigger = sr_near_support & (close > prev_close) & rsi_slope_up
+
+        support_levels = np.vstack([_col(df, "Pivot_S1"), _col(df, "Pivot_S2"), _col(df, "Prev_5D_Low")])
+        support_eligible = np.isfinite(support_levels) & (support_levels <= close * (1.0 + near_support_pct))
+        pivot_support = np.where(support_eligible, support_levels, -np.inf).max(axis=0)
+        pivot_support = np.where(support_eligible.any(axis=0), pivot_support, np.nan)
+        pivot_bounce_trigger = (
+            np.isfinite(pivot_support)
+            & (low_or_close <= pivot_support * (1.0 + near_support_pct))
+            & (close >= pivot_support)
+            & (close > prev_close)
+            & rsi_slope_up
+        )
+
+        prev_res = np.where(np.isfinite(prev_sr_resistance), prev_sr_resistance, sr_resistance)
+        sr_breakout_trigger = (
+            np.isfinite(sr_resistance)
+            & (close > sr_resistance * (1.0 + breakout_buffer))
+            & (prev_close <= prev_res * (1.0 + breakout_buffer))
+        )
+        resistance_levels = np.vstack([_col(df, "Pivot_R1"), _col(df, "Pivot_R2"), _col(df, "Prev_5D_High")])
+        resistance_eligible = np.isfinite(resistance_levels) & (resistance_levels >= prev_close * (1.0 - near_support_pct))
+        pivot_breakout_level = np.where(resistance_eligible, resistance_levels, np.inf).min(axis=0)
+        pivot_breakout_level = np.where(resistance_eligible.any(axis=0), pivot_breakout_level, np.nan)
+        pivot_breakout_trigger = np.isfinite(pivot_breakout_level) & (close > pivot_breakout_level * (1.0 + breakout_buffer))
+
+        sr_resistance_room_ok = np.ones(n, dtype=bool)
+        if cfg["sr_resistance_room_pct"] > 0:
+            resistance_dist = (sr_resistance - close) / np.maximum(close, 1e-9)
+            room = (resistance_dist >= cfg["sr_resistance_room_pct"]) | (close > sr_resistance * (1.0 + breakout_buffer))
+            sr_resistance_room_ok = ~np.isfinite(sr_resistance) | room
+
+        round_resistance = _col(df, "Round_Resistance")
+        round_dist = _col(df, "Round_Resistance_Dist_Pct")
+        sr_round_guard_ok = np.ones(n, dtype=bool)
+        if cfg["sr_round_guard_pct"] > 0:
+            round_breakout = np.isfinite(round_resistance) & (close > round_resistance * (1.0 + breakout_buffer))
+            sr_round_guard_ok = ~np.isfinite(round_dist) | (round_dist >= cfg["sr_round_guard_pct"]) | round_breakout
+
+        vpoc = _col(df, "Volume_Profile_POC")
+        prev_vpoc = _prev(vpoc)
+        sr_vpoc_reclaim = np.isfinite(vpoc) & np.isfinite(prev_vpoc) & (prev_close < prev_vpoc) & (close >= vpoc)
+
+        stoch_pull_ok = ~np.isfinite(stoch_k) | (stoch_k <= cfg["stoch_pull_max"])
+        stoch_momo_ok = ~np.isfinite(stoch_k) | (stoch_k <= cfg["stoch_momo_max"])
+
+        pullback_mode = (
+            trend_ok & trend_slope_ok & adx_ok & vol_ok & cmf_ok & obv_ok & macd_rising
+            & rsi_pullback_trigger & stoch_pull_ok & (close >= ema20)
+        )
+        breakout_mode = (
+            trend_ok & trend_slope_ok & adx_strong & vol_ok & cmf_ok & obv_ok & macd_rising
+            & stoch_momo_ok & (rsi_momo_trigger | highN_break | prior_high_break)
+        )
+
+        meanrev_rsi_oversold = np.isfinite(rsi) & (rsi <= cfg["meanrev_rsi_oversold"])
+        meanrev_rsi_max = np.isfinite(rsi) & (rsi <= cfg["meanrev_rsi_max"])
+        meanrev_bb_bounce = np.isfinite(bb_pctb) & (bb_pctb <= cfg["meanrev_bb_pctb_max"]) & rsi_slope_up
+        meanrev_adx_low = adx <= cfg["meanrev_adx_max"]
+        meanrev_cci_oversold = ~np.isfinite(cci) | (cci <= cfg["meanrev_cci_min"])
+        meanrev_stoch_oversold = ~np.isfinite(stoch_k) | (stoch_k <= cfg["meanrev_stoch_k_max"])
+        meanrev_score = (
+            meanrev_rsi_oversold.astype(int) + meanrev_bb_bounce + meanrev_adx_low + meanrev_cci_oversold
+            + meanrev_stoch_oversold + meanrev_rsi_max + rsi_slope_up
+        )
+        meanrev_mode = (cfg["meanrev_enabled"] >= 1) & (meanrev_score >= 4) & meanrev_rsi_oversold & rsi_slope_up
+
+        structure_bounce_context = sr_bounce_trigger | pivot_bounce_trigger | ((cfg["sr_vpoc_reclaim_enabled"] >= 1) & sr_vpoc_reclaim)
+        structure_bounce_mode = (cfg["sr_bounce_enabled"] >= 1) & (
+            (trend_ok | (close >= ema50)) & structure_bounce_context & (vol_ok | cmf_ok)
+            & rsi_slope_up & sr_resistance_room_ok & sr_round_guard_ok
+        )
+        structure_breakout_context = sr_breakout_trigger | pivot_breakout_trigger
+        structure_breakout_mode = (cfg["sr_breakout_enabled"] >= 1) & (
+            trend_slope_ok & adx_ok & vol_ok & structure_breakout_context & macd_rising
+        )
+
+    not_meanrev = ~meanrev_mode
+    not_breakout = ~(structure_breakout_mode | breakout_mode)
+    blocks = {
+        "obv_overextended": obv_overextended,
+        "rsi_floor": ~rsi_floor_ok & not_meanrev,
+        "overbought_guard": overbought_guard,
+        "atr_band": ~atr_band_ok,
+        "extension_atr": ~extension_ok,
+        "supertrend_price": ~supertrend_price_ok & not_meanrev,
+        "supertrend_direction": ~supertrend_dir & not_meanrev,
+        "weekly_trend": ~weekly_trend_ok & not_meanrev,
+        "macd_signal_cross": ~macd_signal_ok & not_meanrev,
+        "mmi_risk_off": ~mmi_ok,
+        "vwap": ~vwap_ok & not_meanrev,
+        "ich_cloud": ~ich_cloud_ok & not_meanrev,
+        "sar": ~sar_ok & not_meanrev,
+        "cci": ~cci_ok & not_meanrev,
+        "di_cross": ~di_cross_ok & not_meanrev,
+        "di_plus": ~di_plus_ok & not_meanrev,
+        "mfi": ~mfi_ok & not_meanrev,
+        "stochrsi": ~stochrsi_ok & not_meanrev,
+        "aroon": ~aroon_ok & not_meanrev,
+        "trix": ~trix_ok & not_meanrev,
+        "ppo_rising": ~ppo_rising_ok & not_meanrev,
+        "roc": ~roc_ok & not_meanrev,
+        "vortex": ~vortex_ok & not_meanrev,
+        "macd_hist_rising": ~macd_rising_ok & not_meanrev,
+        "ema_cross": ~ema_cross_ok & not_meanrev,
+        "bb_pctb": ~bb_pctb_ok & not_meanrev,
+        "bb_width": ~bb_width_ok & not_meanrev,
+        "sr_resistance_room": ~sr_resistance_room_ok & not_breakout,
+        "sr_round_guard": ~sr_round_guard_ok & not_breakout,
+    }
+    block_matrix = np.vstack([np.asarray(blocks[name], dtype=bool) for name in HARD_BLOCK_NAMES])
+    any_block = block_matrix.any(axis=0)
+    any_mode = pullback_mode | breakout_mode | meanrev_mode | structure_bounce_mode | structure_breakout_mode
+
+    enough_history = np.arange(n) >= 2
+    out = pd.DataFrame(
+        {
+            "trend_ok": trend_ok,
+            "trend_slope_ok": trend_slope_ok,
+            "adx_ok": adx_ok,
+            "adx_strong": adx_strong,
+            "volume_confirm": vol_ok,
+            "cmf_ok": cmf_ok,
+            "obv_ok": obv_ok,
+            "macd_signal_ok": macd_signal_ok,
+            "macd_hist_rising": macd_rising,
+            "rsi_floor_ok": rsi_floor_ok,
+            "atr_band_ok": atr_band_ok,
+            "extension_ok": extension_ok,
+            "supertrend_price_ok": supertrend_price_ok,
+            "supertrend_direction_ok": supertrend_dir,
+            "weekly_trend_ok": weekly_trend_ok,
+            "mmi_ok": mmi_ok,
+            "rsi_pullback_trigger": rsi_pullback_trigger,
+            "rsi_momo_trigger": rsi_momo_trigger,
+            "prior_high_break": prior_high_break,
+            "highN_break": highN_break,
+            "sr_bounce_context": structure_bounce_context,
+            "sr_breakout_context": structure_breakout_context,
+            "pullback_mode": pullback_mode,
+            "breakout_mode": breakout_mode,
+            "meanrev_mode": meanrev_mode,
+            "structure_bounce_mode": structure_bounce_mode,
+            "structure_breakout_mode": structure_breakout_mode,
+            **{f"block_{name}": block_matrix[i] for i, name in enumerate(HARD_BLOCK_NAMES)},
+            "hard_block_count": block_matrix.sum(axis=0),
+            "decision_buy": enough_history & ~any_block & any_mode,
+        },
+        index=df.index,
+    )
+    out.loc[~enough_history, [c for c in out.columns if c != "hard_block_count"]] = False
+    return out
+
+
+# ---------- SELL side (RULE_SET_2.buy_or_sell) ----------
+def sell_feature_arrays(df: pd.DataFrame, *, config: dict | None = None) -> dict[str, np.ndarray]:
+    """Per-bar inputs of RULE_SET_2 that do not depend on position state."""
+    cfg = {**RULE_SET_2.CONFIG, **(config or {})}
+    n = len(df)
+    idx = np.arange(n)
+    close = _col(df, "Close")
+    low = _col(df, "Low")
+
+    atr = _col(df, "ATR")
+    atr = np.where(np.isfinite(atr) & (atr > 0), atr, np.maximum(0.01, cfg["min_atr_fallback_frac"] * close))
+
+    if "Volume" in df.columns:
+        vol = _col(df, "Volume")
+        vol_mean = pd.Series(vol).rolling(20).mean().to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rv = np.where(idx >= 19, vol / _floor_denominator(vol_mean, 1e-12), 1.0)
+    else:
+        rv = np.ones(n)
+
+    bb_period = int(cfg["bb_period"])
+    if n:
+        ub, mb, lb = talib.BBANDS(close, timeperiod=bb_period, nbdevup=2, nbdevdn=2)
+    else:
+        ub = mb = lb = np.array([], dtype="float64")
+    have_bb = (idx >= bb_period - 1) & np.isfinite(ub) & np.isfinite(mb) & np.isfinite(lb)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        width = _floor_denominator(ub - lb, 1e-9)
+        curr_b = np.where(have_bb & (idx >= bb_period), (close - lb) / width, np.nan)
+        prev_b = np.where(have_bb & (idx >= bb_period), _prev((close - lb) / width), np.nan)
+
+    donch_period = int(cfg["donch_period"])
+    have_donch = idx >= donch_period - 1
+    donch_low = _prev(pd.Series(low).rolling(donch_period).min().to_numpy())
+
+    ema10 = _col(df, "EMA10")
+    return {
+        "close": close,
+        "low": low,
+        "atr": atr,
+        "rsi": _col(df, "RSI"),
+        "ema10": ema10,
+        "prev_ema10": _prev(ema10),
+        "prev_close": _prev(close),
+        "ema50": _col(df, "EMA50"),
+        "macd_hist": _col(df, "MACD_Hist"),
+        "rv": rv,
+        "have_bb": have_bb,
+        "mb": mb,
+        "curr_b": curr_b,
+        "prev_b": prev_b,
+        "have_donch": have_donch,
+        "donch_low": donch_low,
+    }
+
+
+@dataclass
+class PositionState:
+    """Mirror of one ``Holdings.json`` entry plus the holding's average price."""
+
+    average_price: float
+    stop_loss: float | None = None
+    first_seen_date: date | None = None
+
+
+def _dip_guard_blocks_sell(symbol: str, today: date, profit_pct: float, rsi: float, macd_hist: float) -> bool:
+    if symbol.upper() not in RULE_SET_2._DIP_HOLD_SYMBOLS:
+        return False
+    if RULE_SET_2._DIP_NO_SELL_UNTIL:
+        try:
+            if np.datetime64(today) <= np.datetime64(RULE_SET_2._DIP_NO_SELL_UNTIL):
+                return True
+        except Exception:
+            pass
+    if math.isfinite(profit_pct) and (-RULE_SET_2._DIP_MAX_DRAWDOWN_PCT <= profit_pct < 0):
+        rsi_bad = math.isfinite(rsi) and rsi <= RULE_SET_2._DIP_STRONG_BREAK_RSI
+        macd_bad = math.isfinite(macd_hist) and macd_hist <= RULE_SET_2._DIP_STRONG_BREAK_MACD
+        if not (rsi_bad and macd_bad):
+            return True
+    return False
+
+
+def evaluate_exit(
+    i: int,
+    symbol: str,
+    today: date,
+    state: PositionState,
+    f: dict[str, np.ndarray],
+    cfg: dict,
+    is_etf_like: bool,
+) -> tuple[str, str]:
+    """One RULE_SET_2 decision at bar ``i``; mutates ``state`` like the JSON store would.
+
+    Returns ``(decision, reason)`` where decision is ``SELL``, ``HOLD`` or
+    ``PARTIAL_SELL_<pct>``.
+    """
+    last_price = float(f["close"][i])
+    day_low = float(f["low"][i])
+    average_price = state.average_price
+
+    if state.first_seen_date is None:
+        state.first_seen_date = today
+    stop_loss = state.stop_loss
+
+    last_atr = float(f["atr"][i])
+    last_rsi = float(f["rsi"][i])
+    have_rsi = math.isfinite(last_rsi)
+    ema10 = float(f["ema10"][i])
+    have_ema10 = math.isfinite(ema10)
+    ema50 = float(f["ema50"][i])
+    macd_hist = float(f["macd_hist"][i])
+    have_hist = math.isfinite(macd_hist)
+    have_bb = bool(f["have_bb"][i])
+    curr_b = float(f["curr_b"][i])
+    prev_b = float(f["prev_b"][i])
+    have_donch = bool(f["have_donch"][i])
+    donch_low = float(f["donch_low"][i])
+
+    profit_pct = ((last_price - average_price) / average_price) * 100.0
+
+    def _maybe_sell(reason: str) -> tuple[str, str]:
+        if _dip_guard_blocks_sell(symbol, today, profit_pct, last_rsi, macd_hist):
+            return "HOLD", "dip_guard_hold"
+        return "SELL", reason
+
+    bars_in_trade = float(max(0, (today - state.first_seen_date).days))
+    review_window_hit = (not is_etf_like) and cfg["equity_review_start_bars"] <= bars_in_trade <= cfg["equity_review_end_bars"]
+
+    new_sl = stop_loss if stop_loss is not None else (last_price - 2.0 * last_atr)
+    if profit_pct >= cfg["breakeven_trigger_pct"]:
+        new_sl = max(new_sl, average_price * (1.0 + cfg["breakeven_buffer_pct"] / 100.0))
+
+    partial_exit = None
+    # load_position_state_json() normalizes entries down to stop_loss/first_seen_date,
+    # so live never reads partial_exit_tiers back; every bar starts from an empty list.
+    exited_tiers: list[str] = []
+    if cfg["partial_exit_enabled"]:
+        for tier, (tgt_pct, exit_frac, sl_floor_mult) in enumerate(cfg["partial_exit_ladder"]):
+            if str(tier) in exited_tiers:
+                continue
+            if profit_pct >= tgt_pct:
+                partial_exit = exit_frac
+                exited_tiers = list(exited_tiers) + [str(tier)]
+                new_sl = max(new_sl, average_price * sl_floor_mult)
+                break
+
+    if math.isfinite(day_low) and math.isfinite(new_sl) and day_low <= new_sl:
+        return _maybe_sell("hard_breach")
+
+    hist_bearish = have_hist and macd_hist < cfg["hist_bearish_threshold"]
+    ema10_break = False
+    if have_ema10 and i >= 1:
+        ema10_2 = float(f["prev_ema10"][i])
+        both_below = math.isfinite(ema10_2) and last_price < ema10 and float(f["prev_close"][i]) < ema10_2
+        ema10_break = both_below and (ema10 - last_price) > cfg["ema_break_atr_mult"] * last_atr
+
+    if last_price < average_price:
+        if have_donch and last_price < donch_low:
+            return _maybe_sell("loss_donchian")
+        if ema10_break:
+            return _maybe_sell("loss_ema10_break")
+        if hist_bearish:
+            new_sl = max(new_sl, last_price - 1.0 * last_atr)
+        if have_rsi and last_rsi < 40:
+            return _maybe_sell("loss_rsi_capitulation")
+    else:
+        for thresh, rule in cfg["profit_ladder"]:
+            if profit_pct >= thresh:
+                lvl = max(last_price - float(rule["k"]) * last_atr, average_price * float(rule["floor_mult"]))
+                new_sl = max(new_sl, lvl)
+                break
+        if hist_bearish:
+            new_sl = max(new_sl, last_price - 0.9 * last_atr)
+        if have_rsi and hist_bearish and last_rsi < cfg["momentum_exit_rsi"]:
+            return _maybe_sell("profit_momentum_failure")
+        if math.isfinite(prev_b) and math.isfinite(curr_b) and have_bb:
+            if prev_b >= 1.0 and curr_b < 0.5 and last_price < float(f["mb"][i]):
+                new_sl = max(new_sl, last_price - 0.9 * last_atr)
+        if ema10_break and have_rsi and last_rsi < 50:
+            return _maybe_sell("profit_ema10_break")
+        if have_donch and last_price < donch_low:
+            return _maybe_sell("profit_donchian")
+        if math.isfinite(ema50) and float(f["rv"][i]) > cfg["relative_volume_exit"] and last_price < ema50:
+            return _maybe_sell("profit_rvol_ema50")
+
+    if review_window_hit and profit_pct < cfg["equity_review_max_profit_pct"]:
+        weak_rsi = have_rsi and last_rsi < cfg["equity_review_rsi"]
+        weak_macd = have_hist and macd_hist < cfg["equity_review_macd_hist"]
+        below_ema10 = have_ema10 and last_price < ema10
+        if (weak_rsi and weak_macd) or (below_ema10 and weak_macd):
+            return _maybe_sell("mid_hold_review")
+        if below_ema10 and weak_rsi:
+            new_sl = max(new_sl, last_price - 0.75 * last_atr)
+
+    meanrev_rsi_exit = have_rsi and last_rsi >= cfg["meanrev_exit_rsi"]
+    meanrev_bb_exit = have_bb and math.isfinite(curr_b) and curr_b >= cfg["meanrev_exit_bb_pctb"]
+    meanrev_time_exit = bars_in_trade >= cfg["meanrev_exit_bars"]
+    if meanrev_rsi_exit or meanrev_bb_exit or meanrev_time_exit:
+        if profit_pct > 0:
+            return _maybe_sell("meanrev_take_profit")
+        if meanrev_time_exit and profit_pct < 0:
+            return _maybe_sell("meanrev_time_cut")
+
+    if is_etf_like:
+        time_stop_bars = cfg["fund_time_stop_bars"]
+        time_stop_min_profit_pct = cfg["fund_time_stop_min_profit_pct"]
+    else:
+        time_stop_bars = cfg["equity_time_stop_bars"]
+        time_stop_min_profit_pct = cfg["equity_time_stop_min_profit_pct"]
+    if bars_in_trade >= time_stop_bars and profit_pct < time_stop_min_profit_pct:
+        return _maybe_sell("time_stop")
+
+    if math.isfinite(new_sl):
+        if new_sl > last_price:
+            new_sl = last_price
+        if stop_loss is None or new_sl > stop_loss:
+            state.stop_loss = round(float(new_sl), 2)
+        if math.isfinite(day_low) and day_low <= new_sl:
+            return _maybe_sell("stop_breach_low")
+        if last_price <= new_sl:
+            return _maybe_sell("stop_breach_close")
+
+    if partial_exit is not None and partial_exit > 0:
+        return f"PARTIAL_SELL_{int(partial_exit * 100)}", f"partial_exit_tier_{exited_tiers[-1]}"
+    return "HOLD", ""
+
+
+# ---------- Simulation ----------
+@dataclass
+class BacktestResult:
+    trades: pd.DataFrame
+    equity: pd.Series
+    gate_attribution: pd.DataFrame
+    exit_attribution: pd.DataFrame
+    summary: dict[str, Any]
+
+
+def simulate_symbol(
+    symbol: str,
+    df: pd.DataFrame,
+    *,
+    buy_config: dict | None = None,
+    sell_config: dict | None = None,
+    mmi: float | pd.Series | np.ndarray | None = None,
+    signals: pd.DataFrame | None = None,
+) -> tuple[list[dict[str, Any]], pd.DataFrame]:
+    """Walk one symbol's bars: enter on ``decision_buy`` at the close, exit on RULE_SET_2 SELL.
+
+    Sell evaluation starts the bar after entry (the first bar the position
+    shows up in holdings), which is also when live stamps ``first_seen_date``.
+    Like ``apply_trading_rules``, ``PARTIAL_SELL_*`` only tightens state and
+    does not reduce the position. Returns the trade list and the buy-signal frame.
+    """
+    sell_cfg = {**RULE_SET_2.CONFIG, **(sell_config or {})}
+    if signals is None:
+        signals = buy_signal_frame(df, config=buy_config, mmi=mmi)
+    feats = sell_feature_arrays(df, config=sell_cfg)
+    dates = _bar_dates(df)
+    days = [ts.date() if not pd.isna(ts) else None for ts in dates]
+    close = feats["close"]
+    buys = signals["decision_buy"].to_numpy(dtype=bool)
+    mode_matrix = signals[ENTRY_MODES].to_numpy(dtype=bool)
+    is_etf_like = RULE_SET_2._is_etf_like_symbol(symbol)
+
+    trades: list[dict[str, Any]] = []
+    n = len(df)
+    i = 0
+    while i < n:
+        # Jump straight to the next buy signal; flat bars need no state.
+        nxt = np.flatnonzero(buys[i:])
+        if not len(nxt):
+            break
+        entry = i + int(nxt[0])
+        entry_price = float(close[entry])
+        if not (math.isfinite(entry_price) and entry_price > 0):
+            i = entry + 1
+            continue
+        state = PositionState(average_price=entry_price)
+        partials: list[str] = []
+        exit_idx, exit_reason = None, "open"
+        for j in range(entry + 1, n):
+            if days[j] is None or not math.isfinite(close[j]):
+                continue
+            decision, reason = evaluate_exit(j, symbol, days[j], state, feats, sell_cfg, is_etf_like)
+            if decision == "SELL":
+                exit_idx, exit_reason = j, reason
+                break
+            if decision.startswith("PARTIAL_SELL_"):
+                partials.append(reason)
+        last = exit_idx if exit_idx is not None else n - 1
+        exit_price = float(close[last])
+        trades.append(
+            {
+                "symbol": symbol,
+                "entry_index": entry,
+                "exit_index": last,
+                "entry_date": dates[entry],
+                "exit_date": dates[last],
+                "entry_price": entry_price,
+                "exit_price": exit_price,
+                "return_pct": (exit_price / entry_price - 1.0) * 100.0,
+                "bars_held": last - entry,
+                "entry_modes": [m for m, hit in zip(ENTRY_MODES, mode_matrix[entry]) if hit],
+                "exit_reason": exit_reason,
+                "partial_exit_signals": partials,
+                "closed": exit_idx is not None,
+            }
+        )
+        if exit_idx is None:
+            break
+        # A symbol sold on bar j can be re-bought from the next bar onwards.
+        i = exit_idx + 1
+    return trades, signals
+
+
+def _symbol_pnl(df: pd.DataFrame, trades: list[dict[str, Any]], trade_notional: float, cost_bps: float) -> pd.Series:
+    close = pd.Series(_col(df, "Close"), index=_bar_dates(df)).ffill()
+    qty = np.zeros(len(close))
+    costs = np.zeros(len(close))
+    for trade in trades:
+        shares = math.floor(trade_notional / trade["entry_price"])
+        if shares <= 0:
+            continue
+        # Held from the entry close through the exit close.
+        qty[trade["entry_index"] + 1 : trade["exit_index"] + 1] += shares
+        costs[trade["entry_index"]] += shares * trade["entry_price"] * cost_bps / 1e4
+        if trade["closed"]:
+            costs[trade["exit_index"]] += shares * trade["exit_price"] * cost_bps / 1e4
+    pnl = qty * close.diff().fillna(0.0).to_numpy() - costs
+    return pd.Series(pnl, index=close.index)
+
+
+def _max_drawdown_pct(equity: pd.Series) -> float:
+    if equity.empty:
+        return 0.0
+    peak = equity.cummax()
+    return float(((equity / peak) - 1.0).min() * 100.0)
+
+
+def run_backtest(
+    frames: dict[str, pd.DataFrame],
+    *,
+    buy_config: dict | None = None,
+    sell_config: dict | None = None,
+    mmi: float | pd.Series | None = None,
+    initial_capital: float = 1_000_000.0,
+    trade_notional: float = 50_000.0,
+    cost_bps: float = 0.0,
+) -> BacktestResult:
+    """Backtest the live rule pair over many symbols' ``Indicators()`` frames.
+
+    Every symbol trades independently with a fixed notional per entry, so
+    results do not depend on symbol iteration order. ``buy_config`` and
+    ``sell_config`` override ``RULE_SET_7.CONFIG`` / ``RULE_SET_2.CONFIG``
+    for parameter sweeps without touching env vars.
+    """
+    all_trades: list[dict[str, Any]] = []
+    pnl_parts: list[pd.Series] = []
+    gate_pass: dict[str, float] = {}
+    block_bars: dict[str, float] = {}
+    sole_block_bars: dict[str, float] = {}
+    flat_bars = 0
+
+    for symbol, df in frames.items():
+        if df is None or df.empty:
+            continue
+        mmi_arr = None
+        if isinstance(mmi, pd.Series):
+            mmi_arr = mmi.reindex(_bar_dates(df)).to_numpy(dtype="float64")
+        elif mmi is not None:
+            mmi_arr = float(mmi)
+        trades, signals = simulate_symbol(symbol, df, buy_config=buy_config, sell_config=sell_config, mmi=mmi_arr, signals=None)
+        all_trades.extend(trades)
+        pnl_parts.append(_symbol_pnl(df, trades, trade_notional, cost_bps))
+
+        in_position = np.zeros(len(df), dtype=bool)
+        for trade in trades:
+            in_position[trade["entry_index"] + 1 : trade["exit_index"] + 1] = True
+        flat = ~in_position
+        flat[:2] = False
+        flat_bars += int(flat.sum())
+        for name in signals.columns:
+            if name.startswith("block_"):
+                gate = name[len("block_"):]
+                blocked = signals[name].to_numpy(dtype=bool) & flat
+                block_bars[gate] = block_bars.get(gate, 0) + int(blocked.sum())
+                sole = blocked & (signals["hard_block_count"].to_numpy() == 1)
+                sole_block_bars[gate] = sole_block_bars.get(gate, 0) + int(sole.sum())
+            elif name not in {"hard_block_count", "decision_buy"}:
+                gate_pass[name] = gate_pass.get(name, 0) + int((signals[name].to_numpy(dtype=bool) & flat).sum())
+
+    rows = [
+        {"gate": gate, "kind": "condition", "pass_rate": passed / flat_bars if flat_bars else np.nan}
+        for gate, passed in gate_pass.items()
+    ] + [
+        {
+            "gate": gate,
+            "kind": "hard_block",
+            "pass_rate": 1.0 - blocked / flat_bars if flat_bars else np.nan,
+            "blocking_bars": blocked,
+            "sole_blocker_bars": sole_block_bars.get(gate, 0),
+        }
+        for gate, blocked in block_bars.items()
+    ]
+    gate_attribution = pd.DataFrame(rows)
+
+    trades_df = pd.DataFrame(all_trades)
+    if trades_df.empty:
+        exit_attribution = pd.DataFrame(columns=["exit_reason", "trades", "win_rate_pct", "avg_return_pct"])
+    else:
+        grouped = trades_df.groupby("exit_reason")["return_pct"]
+        exit_attribution = pd.DataFrame(
+            {
+                "trades": grouped.size(),
+                "win_rate_pct": grouped.apply(lambda r: float((r > 0).mean() * 100.0)),
+                "avg_return_pct": grouped.mean(),
+            }
+        ).reset_index()
+
+    if pnl_parts:
+        pnl = pd.concat(pnl_parts, axis=1).fillna(0.0).sum(axis=1).sort_index()
+        pnl = pnl.groupby(level=0).sum()
+    else:
+        pnl = pd.Series(dtype="float64")
+    equity = initial_capital + pnl.cumsum()
+
+    summary: dict[str, Any] = {
+        "symbols": len(frames),
+        "trades": int(len(trades_df)),
+        "win_rate_pct": float((trades_df["return_pct"] > 0).mean() * 100.0) if len(trades_df) else None,
+        "avg_return_pct": float(trades_df["return_pct"].mean()) if len(trades_df) else None,
+        "final_equity": float(equity.iloc[-1]) if len(equity) else initial_capital,
+        "max_drawdown_pct": _max_drawdown_pct(equity),
+    }
+    if len(equity) >= 2:
+        years = max((equity.index[-1] - equity.index[0]).days / 365.25, 1e-9)
+        summary["cagr_pct"] = float(((equity.iloc[-1] / initial_capital) ** (1.0 / years) - 1.0) * 100.0)
+    return BacktestResult(
+        trades=trades_df,
+        equity=equity,
+        gate_attribution=gate_attribution,
+        exit_attribution=exit_attribution,
+        summary=summary,
+    )
+
+
+def load_indicator_frames(
+    symbols: Iterable[str],
+    *,
+    loader: Callable[[str], pd.DataFrame | None] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Load ``Hist_Data`` feathers and run the live ``Indicators()`` pipeline once per symbol.
+
+    With the default loader, frames the nightly ``indicator_store`` built from
+    the current history are loaded instead of recomputed.
+    """
+    from . import indicator_store
+    from .utils import Indicators, load_historical_data
+
+    store = indicator_store.IndicatorStore() if loader is None and indicator_store.STORE_ENABLED else None
+    loader = loader or load_historical_data
+    frames: dict[str, pd.DataFrame] = {}
+    for symbol in symbols:
+        stored = store.load(symbol) if store is not None else None
+        if stored is not None:
+            frames[symbol] = stored
+            continue
+        df = loader(symbol)
+        if df is None or df.empty:
+            continue
+        frames[symbol] = Indicators(indicator_store.prepare_history(df))
+    return frames
@@ -0,0 +1,180 @@
+"""Panel Wilder ATR and SuperTrend over many symbols at once.
+
+``utils.Indicators`` computes ``talib.ATR`` and then ``compute_supertrend`` one
+symbol at a time, and the paper ledger re-implemented the same thing with a
+pure-Python ATR loop per holding. This module runs both over ``(bars × symbols)``
+High/Low/Close matrices: the Wilder recursion steps through time once with
+vector operations across every column, and the SuperTrend band/flip logic and
+forward-fill are whole-matrix array ops.
+
+Results match ``talib.ATR`` followed by ``utils.compute_supertrend`` on each
+column's own bars. Columns may start with NaN padding (shorter histories);
+``stack_bars`` builds such a matrix from per-symbol frames right-aligned on
+their latest bar, so row ``-1`` is every symbol's most recent bar.
+
+``SuperTrendState`` carries the recursive tails (last close, ATR, bands and
+SuperTrend value), so appending a day only needs ``advance`` instead of a
+recompute over the whole history.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+ATR_PERIOD = 14
+
+
+def stack_bars(frames: Mapping[str, pd.DataFrame], columns: Sequence[str] = ("High", "Low", "Close")):
+    """``(symbols, {column: matrix})`` with each symbol's bars right-aligned on the last row."""
+    symbols = list(frames)
+    depth = max((len(frames[s]) for s in symbols), default=0)
+    mats = {c: np.full((depth, len(symbols)), np.nan) for c in columns}
+    for j, sym in enumerate(symbols):
+        df = frames[sym]
+        n = len(df)
+        if not n:
+            continue
+        for c in columns:
+            mats[c][depth - n:, j] = df[c].to_numpy(dtype="float64")
+    return symbols, mats
+
+
+def _first_valid(*arrays: np.ndarray) -> np.ndarray:
+    """Per column, the first row where every input is finite (``talib``'s begin index)."""
+    ok = np.ones(arrays[0].shape, dtype=bool)
+    for a in arrays:
+        ok &= ~np.isnan(a)
+    return np.where(ok.any(axis=0), ok.argmax(axis=0), ok.shape[0])
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+    return np.maximum(np.maximum(high - low, np.abs(prev - high)), np.abs(low - prev))
+
+
+def wilder_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = ATR_PERIOD) -> np.ndarray:
+    """``talib.ATR`` for every column of 2-D ``high``/``low``/``close``."""
+    high, low, close = (np.asarray(a, dtype="float64") for a in (high, low, close))
+    rows, cols = close.shape
+    tr = true_range(high, low, close)
+    start = _first_valid(high, low, close)
+    seed_row = start + period
+    atr = np.full((rows, cols), np.nan)
+    col_idx = np.arange(cols)
+    live = seed_row < rows
+    if not live.any():
+        return atr
+    # Seed: simple mean of TR over the first ``period`` bars after the start,
+    # summed in order like TA-Lib's SMA.
+    seed = np.zeros(cols)
+    for k in range(1, period + 1):
+        seed = seed + tr[np.minimum(start + k, rows - 1), col_idx]
+    seed = seed / period
+    prev = np.full(cols, np.nan)
+    first = int(seed_row[live].min())
+    for t in range(first, rows):
+        seeding = seed_row == t
+        prev = np.where(seeding, seed, (prev * (period - 1) + tr[t]) / period)
+        atr[t] = prev
+    return atr
+
+
+def _supertrend_from(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    atr: np.ndarray,
+    multiplier: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    hl2 = (high + low) * 0.5
+    up = hl2 + multiplier * atr
+    dn = hl2 - multiplier * atr
+    up_shift = np.vstack([np.full((1, up.shape[1]), np.nan), up[:-1]])
+    dn_shift = np.vstack([np.full((1, dn.shape[1]), np.nan), dn[:-1]])
+    raw = np.where(close > up_shift, dn, np.where(close < dn_shift, up, np.nan))
+    # Forward-fill down each column (rows before the first flip stay NaN via raw[0]).
+    rows = np.arange(raw.shape[0])[:, None]
+    last = np.maximum.accumulate(np.where(np.isnan(raw), 0, rows), axis=0)
+    st = raw[last, np.arange(raw.shape[1])]
+    return st, up, dn, hl2
+
+
+def supertrend(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    multiplier: float = 2.0,
+    period: int = ATR_PERIOD,
+    atr: Optional[np.ndarray] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """``(supertrend, direction)`` matrices, as ``compute_supertrend`` gives per column."""
+    high, low, close = (np.asarray(a, dtype="float64") for a in (high, low, close))
+    if atr is None:
+        atr = wilder_atr(high, low, close, period)
+    st, _, _, _ = _supertrend_from(high, low, close, atr, multiplier)
+    return st, close > st
+
+
+@dataclass
+class SuperTrendState:
+    """Per-symbol recursive tails needed to extend ATR/SuperTrend by one bar."""
+
+    symbols: list[str]
+    multiplier: float
+    period: int
+    close: np.ndarray
+    atr: np.ndarray
+    up: np.ndarray
+    dn: np.ndarray
+    st: np.ndarray
+
+    @classmethod
+    def from_bars(
+        cls,
+        symbols: Sequence[str],
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        multiplier: float = 2.0,
+        period: int = ATR_PERIOD,
+    ) -> tuple["SuperTrendState", np.ndarray, np.ndarray]:
+        """Full computation plus the state at the last row; returns ``(state, st, direction)``."""
+        high, low, close = (np.asarray(a, dtype="float64") for a in (high, low, close))
+        atr = wilder_atr(high, low, close, period)
+        st, up, dn, _ = _supertrend_from(high, low, close, atr, multiplier)
+        state = cls(list(symbols), float(multiplier), int(period), close[-1].copy(), atr[-1].copy(), up[-1].copy(), dn[-1].copy(), st[-1].copy())
+        return state, st, close > st
+
+    def advance(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Consume one new bar per symbol; returns that bar's ``(supertrend, direction)``.
+
+        Symbols whose ATR is not seeded yet stay NaN; rebuild them with
+        ``from_bars`` once they have ``period + 1`` bars.
+        """
+        high, low, close = (np.asarray(a, dtype="float64").reshape(-1) for a in (high, low, close))
+        tr = np.maximum(np.maximum(high - low, np.abs(self.close - high)), np.abs(low - self.close))
+        atr = (self.atr * (self.period - 1) + tr) / self.period
+        hl2 = (high + low) * 0.5
+        up = hl2 + self.multiplier * atr
+        dn = hl2 - self.multiplier * atr
+        raw = np.where(close > self.up, dn, np.where(close < self.dn, up, np.nan))
+        st = np.where(np.isnan(raw), self.st, raw)
+        self.close, self.atr, self.up, self.dn, self.st = close, atr, up, dn, st
+        return st, close > st
+
+    def to_dict(self) -> dict:
+        return {
+            "symbols": list(self.symbols),
+            "multiplier": self.multiplier,
+            "period": self.period,
+            **{k: [None if np.isnan(v) else float(v) for v in getattr(self, k)] for k in ("close", "atr", "up", "dn", "st")},
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "SuperTrendState":
+        arrays = {k: np.array([np.nan if v is None else v for v in d[k]], dtype="float64") for k in ("close", "atr", "up", "dn", "st")}
+        return cls(list(d["symbols"]), float(d["multiplier"]), int(d["period"]), **arrays)
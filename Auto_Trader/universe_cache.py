@@ -0,0 +1,78 @@
+"""Last built trading universe, for starting the ticker before the refresh finishes.
+
+``create_master`` used to run every universe fetch (instrument dump,
+holdings, the Tickertape screener, the Hist_Data download) inline before
+``wednesday.start_processes`` could start the ticker. The final token list is
+now also saved to ``AT_UNIVERSE_CACHE_PATH`` (default
+``intermediary_files/universe_cache.json``). The next session subscribes to
+that cached universe immediately, runs the refresh in the background, and
+hot-subscribes whatever the refresh adds (``diff_tokens`` +
+``follow_token_updates``). Set ``AT_UNIVERSE_FAST_START=0`` to block on the
+refresh as before.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence
+
+logger = logging.getLogger("Auto_Trade_Logger")
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_PATH = Path(os.getenv("AT_UNIVERSE_CACHE_PATH", str(ROOT / "intermediary_files" / "universe_cache.json")))
+FAST_START = os.getenv("AT_UNIVERSE_FAST_START", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def load_tokens(path: Optional[Path] = None) -> list[int]:
+    """Instrument tokens of the last built universe (``[]`` when there is none)."""
+    try:
+        data = json.loads(Path(path or CACHE_PATH).read_text())
+        return [int(t) for t in data.get("tokens", [])]
+    except (OSError, ValueError, TypeError, AttributeError):
+        return []
+
+
+def save(tokens: Iterable[int], symbols: Iterable[str] = (), path: Optional[Path] = None) -> None:
+    path = Path(path or CACHE_PATH)
+    payload = {
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "tokens": [int(t) for t in tokens],
+        "symbols": sorted({str(s) for s in symbols}),
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload))
+        tmp.replace(path)
+    except OSError as e:
+        logger.warning(f"Could not save universe cache {path}: {e}")
+
+
+def diff_tokens(old: Sequence[int], new: Sequence[int]) -> tuple[list[int], list[int]]:
+    """``(added, removed)``, each in its source list's order."""
+    old_set, new_set = set(old), set(new)
+    return [t for t in new if t not in old_set], [t for t in old if t not in new_set]
+
+
+def follow_token_updates(updates, subscribed: list[int], subscribe: Callable[[list[int]], None]) -> None:
+    """Subscribe every batch of tokens read from ``updates`` until a ``None`` arrives.
+
+    ``subscribed`` is extended in place so a reconnect resubscribes the
+    additions too; tokens already in it are skipped.
+    """
+    while True:
+        batch = updates.get()
+        if batch is None:
+            return
+        fresh = [int(t) for t in dict.fromkeys(batch) if int(t) not in subscribed]
+        if not fresh:
+            continue
+        subscribed.extend(fresh)
+        try:
+            subscribe(fresh)
+        except Exception as e:
+            logger.error(f"Hot-subscribe of {len(fresh)} tokens failed: {e}")
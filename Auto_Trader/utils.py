@@ -22,7 +22,8 @@ from requests.exceptions import RequestException
 from sqlalchemy import create_engine
 
 # Import rule set modules
-from . import RULE_SET_2, RULE_SET_7
+from . import RULE_SET_2, RULE_SET_7, hist_data
+from .instrument_master import load_instrument_master
 from .news_sentiment import apply_news_overlay
 from .tickertape_data import get_mmi_indicator, is_market_open_via_tickertape
 from .my_secrets import (
@@ -889,7 +890,9 @@ def Indicators(
 
 def load_historical_data(symbol):
     try:
-        df = pd.read_feather(f"intermediary_files/Hist_Data/{symbol}.feather")
+        df = hist_data.read_history(hist_data.HIST_DIR, symbol)
+        if df is None:
+            raise FileNotFoundError(f"no usable history for {symbol}")
         return df
     except Exception as e:
         logger.error(f"Error loading {symbol}.feather: {e}")
@@ -1191,17 +1194,9 @@ def fetch_instruments_list(kite=None):
     try:
         kite = kite or get_kite_client()
 
-        # Fetch instruments
-        instruments = kite.instruments()
-
-        # Filter for NSE stocks only
-        nse_stocks = [
-            instrument
-            for instrument in instruments
-            if instrument["instrument_type"] == "EQ"
-        ]
-        df = pd.DataFrame(nse_stocks)[["instrument_token", "tradingsymbol", "exchange"]]
-        return df
+        # Daily instrument master (downloaded at most once per day, shared with
+        # the option contract resolvers); keep the EQ rows only.
+        return load_instrument_master(kite).equities()
 
     except Exception as e:
         logger.error(
@@ -13,24 +13,36 @@ from __future__ import annotations
 import datetime as dt
 import json
 import re
-from dataclasses import dataclass
+import sys
 from difflib import SequenceMatcher
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Callable
+from typing import List, Tuple, Optional, Dict
 
 import numpy as np
 import pandas as pd
 import requests
 import streamlit as st
 
+_DASH_DIR = Path(__file__).resolve().parent
+if str(_DASH_DIR) not in sys.path:
+    sys.path.insert(0, str(_DASH_DIR))
+
+import mf_nav_store as nav_store  # noqa: E402
+from mf_dash_utils import load_scheme_index  # noqa: E402
+from mf_scan import greedy_diversify, lookback_mask, monthly_return_matrix, pairwise_abs_corr, risk_metrics  # noqa: E402
+from mf_swp import (  # noqa: E402
+    find_max_starting_withdrawal_percent,
+    infer_tax_profile_from_name,
+    longevity_for_withdrawal,
+    monte_carlo_swp_survival,
+    simulate_swp_multifund_inflation,
+)
+
 # --------------------------------------------------------------------
 # Data fetchers (MFAPI)
 # --------------------------------------------------------------------
 
 SCHEME_LIST_URL = "https://api.mfapi.in/mf"
-NAV_URL_TEMPLATE = "https://api.mfapi.in/mf/{scheme_code}"
-NAV_CACHE_DIR = Path(__file__).resolve().parent / ".nav_cache"
-NAV_DISK_CACHE_MAX_AGE_HOURS = 24
 PORTFOLIO_TRACKER_PATH = Path(__file__).resolve().parents[1] / "reports" / "portfolio_tracker_latest.json"
 MAX_COMPARE_FUNDS = 20
 FUND_NAME_STOPWORDS = {
@@ -39,42 +51,6 @@ FUND_NAME_STOPWORDS = {
     "yearly", "annual", "bonus", "payout", "reinvestment",
 }
 
-def _nav_cache_path(scheme_code: int) -> Path:
-    return NAV_CACHE_DIR / f"{int(scheme_code)}.csv"
-
-def _load_nav_from_disk_cache(scheme_code: int, max_age_hours: int = NAV_DISK_CACHE_MAX_AGE_HOURS) -> Optional[pd.DataFrame]:
-    path = _nav_cache_path(scheme_code)
-    if not path.exists():
-        return None
-    try:
-        age_sec = dt.datetime.now().timestamp() - path.stat().st_mtime
-        if age_sec > max_age_hours * 3600:
-            return None
-        df = pd.read_csv(path, parse_dates=["date"])
-        if "date" not in df.columns or "nav" not in df.columns:
-            return None
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
-        df = df.dropna(subset=["date", "nav"]).sort_values("date").reset_index(drop=True)
-        if df.empty:
-            return None
-        return df[["date", "nav"]]
-    except Exception:
-        return None
-
-def _save_nav_to_disk_cache(scheme_code: int, nav_df: pd.DataFrame) -> None:
-    if nav_df is None or nav_df.empty:
-        return
-    try:
-        NAV_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        path = _nav_cache_path(scheme_code)
-        tmp = path.with_suffix(".tmp")
-        nav_df[["date", "nav"]].to_csv(tmp, index=False)
-        tmp.replace(path)
-    except Exception:
-        # Disk cache is best-effort; ignore cache write failures.
-        pass
-
 @st.cache_data(show_spinner="Loading mutual fund universe...", ttl=6 * 3600)
 def fetch_scheme_list() -> pd.DataFrame:
     r = requests.get(SCHEME_LIST_URL, timeout=60)
@@ -90,21 +66,7 @@ def fetch_scheme_list() -> pd.DataFrame:
 
 @st.cache_data(show_spinner=False, ttl=3 * 3600)
 def fetch_nav_history(scheme_code: int) -> pd.DataFrame:
-    cached = _load_nav_from_disk_cache(scheme_code)
-    if cached is not None:
-        return cached
-
-    r = requests.get(NAV_URL_TEMPLATE.format(scheme_code=scheme_code), timeout=30)
-    r.raise_for_status()
-    jd = r.json()
-    df = pd.DataFrame(jd["data"])
-    df["date"] = pd.to_datetime(df["date"], format="%d-%m-%Y", errors="coerce")
-    df = df.dropna(subset=["date"]).sort_values("date").reset_index(drop=True)
-    df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
-    df = df.dropna(subset=["nav"]).reset_index(drop=True)
-    out = df[["date", "nav"]]
-    _save_nav_to_disk_cache(scheme_code, out)
-    return out
+    return nav_store.fetch_nav_history(scheme_code)
 
 @st.cache_data(show_spinner=False, ttl=3 * 3600)
 def fetch_monthly_returns(scheme_code: int) -> pd.DataFrame:
@@ -153,6 +115,11 @@ def load_current_mf_holdings() -> pd.DataFrame:
         })
     return pd.DataFrame(rows)
 
+def _scheme_name_index(scheme_df: pd.DataFrame):
+    return load_scheme_index(
+        scheme_df["scheme_name"].astype(str).tolist(), "fund_tokens", _fund_tokens, normalizer=_normalize_fund_text
+    )
+
 def match_holding_to_scheme_name(holding_name: str, scheme_df: pd.DataFrame) -> Optional[str]:
     if scheme_df.empty:
         return None
@@ -161,30 +128,22 @@ def match_holding_to_scheme_name(holding_name: str, scheme_df: pd.DataFrame) ->
     if not tokens:
         return None
 
-    candidates = scheme_df.copy()
-    candidates["scheme_name_norm"] = candidates["scheme_name"].map(_normalize_fund_text)
-
+    index = _scheme_name_index(scheme_df)
+    pool = np.arange(len(index))
     strong_tokens = [tok for tok in tokens if len(tok) >= 4][:3] or tokens[:2]
     for tok in strong_tokens[:2]:
-        mask = candidates["scheme_name_norm"].str.contains(rf"\b{re.escape(tok)}\b", regex=True, na=False)
-        if mask.any():
-            candidates = candidates[mask].copy()
-
-    if candidates.empty:
-        candidates = scheme_df.copy()
-        candidates["scheme_name_norm"] = candidates["scheme_name"].map(_normalize_fund_text)
+        narrowed = np.intersect1d(pool, index.docs_with(tok), assume_unique=True)
+        if narrowed.size:
+            pool = narrowed
 
     desired_direct = "direct" in name_norm
-    token_set = set(tokens)
-    scored: list[tuple[float, str]] = []
-    for _, row in candidates.iterrows():
-        scheme_name = str(row["scheme_name"])
-        scheme_norm = str(row["scheme_name_norm"])
-        scheme_tokens = set(_fund_tokens(scheme_norm))
-        overlap = len(token_set & scheme_tokens)
-        if overlap == 0:
-            continue
-        score = overlap * 12.0 + SequenceMatcher(None, name_norm, scheme_norm).ratio() * 10.0
+    ids, overlaps = index.overlap(tokens, within=pool)
+    if not ids.size:
+        return None
+
+    def _score(i: int, overlap: int, ratio: float) -> float:
+        scheme_norm = index.norms[i]
+        score = overlap * 12.0 + ratio * 10.0
         if desired_direct and "direct" in scheme_norm:
             score += 3.0
         if "growth" in scheme_norm:
@@ -193,13 +152,25 @@ def match_holding_to_scheme_name(holding_name: str, scheme_df: pd.DataFrame) ->
             score -= 2.0
         if "idcw" in scheme_norm or "dividend" in scheme_norm:
             score -= 3.0
-        scored.append((score, scheme_name))
-
-    if not scored:
-        return None
-    scored.sort(key=lambda x: x[0], reverse=True)
-    top_score, top_name = scored[0]
-    return top_name if top_score >= 12.0 else None
+        return score
+
+    # Branch and bound: SequenceMatcher is the expensive term, so candidates are
+    # visited by an upper bound on their score (ratio <= real_quick_ratio, which
+    # only needs lengths) and the scan stops once no remaining one can win.
+    lens = np.fromiter((len(index.norms[i]) for i in ids), dtype=float, count=len(ids))
+    ceiling = overlaps * 12.0 + 10.0 * 2.0 * np.minimum(lens, len(name_norm)) / np.maximum(lens + len(name_norm), 1.0) + 5.0
+    best_score, best_id = -np.inf, -1
+    for k in np.argsort(-ceiling, kind="stable"):
+        if ceiling[k] < best_score - 1e-9:
+            break
+        i, overlap = int(ids[k]), int(overlaps[k])
+        matcher = SequenceMatcher(None, name_norm, index.norms[i])
+        if _score(i, overlap, matcher.quick_ratio()) < best_score - 1e-9:
+            continue
+        score = _score(i, overlap, matcher.ratio())
+        if score > best_score or (score == best_score and i < best_id):
+            best_score, best_id = score, i
+    return index.texts[best_id] if best_score >= 12.0 else None
 
 def resolve_current_mf_defaults(scheme_df: pd.DataFrame) -> tuple[list[str], dict[str, float], pd.DataFrame, list[str]]:
     holdings_df = load_current_mf_holdings()
@@ -548,32 +519,9 @@ def estimate_proj_cagr(
     return float(blended), diag
 
 # --------------------------------------------------------------------
-# SWP simulation (inflation step-ups)
+# SWP inputs (the simulations live in mf_swp)
 # --------------------------------------------------------------------
 
-@dataclass
-class ExitLoadRule:
-    days: int
-    pct: float
-
-def infer_tax_profile_from_name(name: str) -> str:
-    n = str(name).lower()
-    debt_rx = r"(liquid|overnight|ultra\s*short|low\s*duration|short\s*duration|corporate\s*bond|gilt|money market|debt)"
-    if re.search(debt_rx, n):
-        return "Debt"
-    return "Equity"
-
-def _tax_rate_for_holding_days(profile: str, holding_days: int, cfg: Dict[str, float]) -> float:
-    if profile == "Debt":
-        th = int(cfg.get("debt_ltcg_days", 1095))
-        st = float(cfg.get("debt_stcg_rate", 0.30))
-        lt = float(cfg.get("debt_ltcg_rate", 0.20))
-        return lt if holding_days >= th else st
-    th = int(cfg.get("equity_ltcg_days", 365))
-    st = float(cfg.get("equity_stcg_rate", 0.15))
-    lt = float(cfg.get("equity_ltcg_rate", 0.10))
-    return lt if holding_days >= th else st
-
 def build_joint_monthly_return_panel(histories: Dict[str, pd.DataFrame], end_date) -> pd.DataFrame:
     series = {}
     end_ts = pd.Timestamp(end_date)
@@ -591,428 +539,6 @@ def build_joint_monthly_return_panel(histories: Dict[str, pd.DataFrame], end_dat
     panel = pd.concat(series, axis=1, join="inner").dropna()
     return panel
 
-def simulate_swp_inflation(
-    nav_series: pd.DataFrame,
-    start_date,
-    corpus_value: float,
-    start_withdrawal_monthly: float,
-    annual_inflation: float,
-    max_years: Optional[int] = None,
-    max_extra_years: int = 80,
-) -> pd.DataFrame:
-    if nav_series.empty or corpus_value <= 0 or start_withdrawal_monthly < 0:
-        return pd.DataFrame(columns=["date","nav","withdrawal","units_left","portfolio_value"])
-    start_month = pd.Timestamp(start_date).normalize().replace(day=1)
-    df = nav_series.copy()
-    df = df[df["date"] >= start_month].reset_index(drop=True)
-    if df.empty:
-        return pd.DataFrame(columns=["date","nav","withdrawal","units_left","portfolio_value"])
-    if max_years is None:
-        horizon_months = 12 * max_extra_years
-    else:
-        horizon_months = 12 * (max_years + max_extra_years)
-    need_until = start_month + pd.offsets.MonthBegin(max(0, horizon_months - 1))
-    while df["date"].iloc[-1] < need_until:
-        growth = (float(df["nav"].iloc[-1]) / max(float(df["nav"].iloc[-2]) if len(df) > 1 else float(df["nav"].iloc[-1]), 1e-9)) - 1.0
-        next_date = df["date"].iloc[-1] + pd.offsets.MonthBegin(1)
-        next_nav = float(df["nav"].iloc[-1]) * (1.0 + growth)
-        df = pd.concat([df, pd.DataFrame({"date":[next_date], "nav":[next_nav]})], ignore_index=True)
-    first_row = nearest_nav_on_or_after(df, start_month)
-    if first_row is None or float(first_row["nav"]) <= 0:
-        return pd.DataFrame(columns=["date","nav","withdrawal","units_left","portfolio_value"])
-    units_left = corpus_value / float(first_row["nav"])
-    rows = []
-    start_w = float(start_withdrawal_monthly)
-    infl = float(annual_inflation)
-    for i, m in enumerate(month_range(start_month, need_until)):
-        row = nearest_nav_on_or_after(df, m)
-        if row is None:
-            break
-        nav_val = float(row["nav"])
-        year_no = i // 12
-        w_this = start_w * ((1.0 + infl) ** year_no)
-        units_to_sell = w_this / nav_val if nav_val > 0 else np.inf
-        if units_to_sell > units_left + 1e-12:
-            rows.append({"date": pd.Timestamp(m), "nav": nav_val, "withdrawal": w_this, "units_left": 0.0, "portfolio_value": 0.0})
-            break
-        units_left -= units_to_sell
-        portfolio_value = units_left * nav_val
-        rows.append({"date": pd.Timestamp(m), "nav": nav_val, "withdrawal": w_this, "units_left": units_left, "portfolio_value": portfolio_value})
-    return pd.DataFrame(rows)
-
-def simulate_swp_multifund_inflation(
-    nav_map: Dict[str, pd.DataFrame],
-    start_date,
-    corpus_value: float,
-    start_withdrawal_monthly: float,
-    annual_inflation: float,
-    target_weights: Dict[str, float],
-    rebalance_every_months: int = 24,
-    max_years: Optional[int] = None,
-    max_extra_years: int = 80,
-    withdrawal_mode: str = "lowest_return",
-    fund_tax_profiles: Optional[Dict[str, str]] = None,
-    tax_cfg: Optional[Dict[str, float]] = None,
-    exit_load_days: int = 365,
-    exit_load_pct: float = 0.01,
-    use_guardrails: bool = False,
-    guardrail_upper_mult: float = 1.20,
-    guardrail_lower_mult: float = 0.80,
-    guardrail_cut_pct: float = 0.10,
-    guardrail_raise_pct: float = 0.05,
-) -> pd.DataFrame:
-    out_cols = [
-        "date",
-        "nav",
-        "withdrawal",
-        "units_left",
-        "portfolio_value",
-        "draw_from",
-        "rebalanced",
-        "tax_paid",
-        "exit_load_paid",
-        "spending_mult",
-        "stop_reason",
-    ]
-    if (not nav_map) or corpus_value <= 0 or start_withdrawal_monthly < 0:
-        return pd.DataFrame(columns=out_cols)
-
-    start_month = pd.Timestamp(start_date).normalize().replace(day=1)
-    if max_years is None:
-        horizon_months = 12 * max_extra_years
-    else:
-        horizon_months = 12 * (max_years + max_extra_years)
-    need_until = start_month + pd.offsets.MonthBegin(max(0, horizon_months - 1))
-
-    start_navs: Dict[str, float] = {}
-    for nm, df in nav_map.items():
-        if df is None or df.empty:
-            continue
-        row = nearest_nav_on_or_after(df, start_month)
-        if row is None:
-            continue
-        nv = float(row["nav"])
-        if nv > 0:
-            start_navs[nm] = nv
-    if not start_navs:
-        return pd.DataFrame(columns=out_cols)
-
-    active = list(start_navs.keys())
-    w = np.array([max(0.0, float(target_weights.get(nm, 0.0))) for nm in active], dtype=float)
-    if float(w.sum()) <= 0:
-        w = np.ones(len(active), dtype=float) / len(active)
-    else:
-        w = w / float(w.sum())
-    w_map = {nm: float(wi) for nm, wi in zip(active, w)}
-    if tax_cfg is None:
-        tax_cfg = {
-            "equity_stcg_rate": 0.15,
-            "equity_ltcg_rate": 0.10,
-            "equity_ltcg_days": 365,
-            "debt_stcg_rate": 0.30,
-            "debt_ltcg_rate": 0.20,
-            "debt_ltcg_days": 1095,
-        }
-    if fund_tax_profiles is None:
-        fund_tax_profiles = {nm: infer_tax_profile_from_name(nm) for nm in active}
-
-    lots: Dict[str, List[Dict[str, object]]] = {
-        nm: [
-            {
-                "units": (float(corpus_value) * w_map[nm] / start_navs[nm]),
-                "buy_date": pd.Timestamp(start_month),
-                "buy_nav": float(start_navs[nm]),
-            }
-        ]
-        for nm in active
-    }
-
-    def _fund_units(nm: str) -> float:
-        return float(sum(float(l["units"]) for l in lots.get(nm, [])))
-
-    def _fund_value(nm: str, navs_now: Dict[str, float]) -> float:
-        return _fund_units(nm) * float(navs_now.get(nm, 0.0))
-
-    def _cleanup_lots(nm: str):
-        lots[nm] = [l for l in lots.get(nm, []) if float(l["units"]) > 1e-12]
-
-    def _marginal_cost_score(nm: str, nav_now: float, ts) -> float:
-        ll = lots.get(nm, [])
-        if not ll:
-            return 1e9
-        lot0 = ll[0]
-        hold_days = max(0, int((pd.Timestamp(ts) - pd.Timestamp(lot0["buy_date"])).days))
-        profile = fund_tax_profiles.get(nm, "Equity")
-        tax_rate = _tax_rate_for_holding_days(profile, hold_days, tax_cfg)
-        gain_ratio = max(0.0, (float(nav_now) - float(lot0["buy_nav"])) / max(float(nav_now), 1e-9))
-        load_rate = float(exit_load_pct) if hold_days < int(exit_load_days) else 0.0
-        return float(tax_rate * gain_ratio + load_rate)
-
-    def _sell_gross_fifo(nm: str, gross_target: float, nav_now: float, ts) -> Tuple[float, float, float]:
-        rem = float(max(0.0, gross_target))
-        sold = 0.0
-        tax_paid = 0.0
-        exit_paid = 0.0
-        profile = fund_tax_profiles.get(nm, "Equity")
-        ll = lots.get(nm, [])
-        for lot in ll:
-            if rem <= 1e-9:
-                break
-            u = float(lot["units"])
-            if u <= 1e-12:
-                continue
-            gross_avail = u * float(nav_now)
-            gross_part = min(gross_avail, rem)
-            if gross_part <= 0:
-                continue
-            units_sell = gross_part / max(float(nav_now), 1e-9)
-            buy_nav = float(lot["buy_nav"])
-            hold_days = max(0, int((pd.Timestamp(ts) - pd.Timestamp(lot["buy_date"])).days))
-            gain = max(0.0, (float(nav_now) - buy_nav) * units_sell)
-            tax_rate = _tax_rate_for_holding_days(profile, hold_days, tax_cfg)
-            tax_paid += gain * tax_rate
-            load_rate = float(exit_load_pct) if hold_days < int(exit_load_days) else 0.0
-            exit_paid += gross_part * load_rate
-            lot["units"] = u - units_sell
-            sold += gross_part
-            rem -= gross_part
-        _cleanup_lots(nm)
-        return float(sold), float(tax_paid), float(exit_paid)
-
-    spending_mult = 1.0
-    rows = []
-    start_w = float(start_withdrawal_monthly)
-    infl = float(annual_inflation)
-    initial_wr = (12.0 * start_w) / max(float(corpus_value), 1e-9)
-
-    for i, m in enumerate(month_range(start_month, need_until)):
-        navs: Dict[str, float] = {}
-        for nm in active:
-            row = nearest_nav_on_or_after(nav_map[nm], m)
-            if row is None:
-                continue
-            nv = float(row["nav"])
-            if nv > 0:
-                navs[nm] = nv
-        if not navs:
-            break
-
-        did_rebalance = bool(rebalance_every_months > 0 and i > 0 and (i % rebalance_every_months == 0))
-        if did_rebalance:
-            total_pre = sum(_fund_value(nm, navs) for nm in active)
-            if total_pre <= 0:
-                break
-            for nm in active:
-                nv = float(navs.get(nm, 0.0))
-                if nv > 0:
-                    target_units = (total_pre * w_map[nm]) / nv
-                    lots[nm] = [{"units": target_units, "buy_date": pd.Timestamp(m), "buy_nav": nv}]
-
-        year_no = i // 12
-        base_w = start_w * ((1.0 + infl) ** year_no)
-        if use_guardrails and i > 0 and (i % 12 == 0):
-            total_now_raw = sum(_fund_value(nm, navs) for nm in active)
-            total_now = max(1e-9, total_now_raw)
-            wr_now = (12.0 * base_w * spending_mult) / total_now
-            if wr_now > initial_wr * float(guardrail_upper_mult):
-                spending_mult = max(0.0, spending_mult * (1.0 - float(guardrail_cut_pct)))
-            elif wr_now < initial_wr * float(guardrail_lower_mult):
-                spending_mult = spending_mult * (1.0 + float(guardrail_raise_pct))
-
-        w_this = base_w * spending_mult
-        sold_amt = {nm: 0.0 for nm in active}
-        tax_paid_m = 0.0
-        exit_paid_m = 0.0
-        amt_left = float(w_this)
-
-        while amt_left > 1e-9:
-            candidates = [nm for nm in active if _fund_units(nm) > 1e-12 and float(navs.get(nm, 0.0)) > 0.0]
-            if not candidates:
-                break
-            if withdrawal_mode == "tax_aware":
-                candidates.sort(
-                    key=lambda nm: (
-                        _marginal_cost_score(nm, float(navs[nm]), m),
-                        (float(navs[nm]) / max(float(start_navs[nm]), 1e-9)) - 1.0,
-                    )
-                )
-            else:
-                candidates.sort(key=lambda nm: ((float(navs[nm]) / max(float(start_navs[nm]), 1e-9)) - 1.0))
-            draw_nm = candidates[0]
-            max_amt = _fund_value(draw_nm, navs)
-            sell_amt = min(max_amt, amt_left)
-            if sell_amt <= 0:
-                break
-            sold, tx, ld = _sell_gross_fifo(draw_nm, sell_amt, float(navs[draw_nm]), m)
-            sold_amt[draw_nm] += sold
-            tax_paid_m += tx
-            exit_paid_m += ld
-            amt_left -= sold
-
-        total_value_raw = sum(_fund_value(nm, navs) for nm in active)
-        total_value = max(0.0, total_value_raw)
-        denom = sum(max(0.0, _fund_units(nm)) for nm in active)
-        nav_proxy = (total_value_raw / denom) if denom > 1e-12 else 0.0
-        draw_from = max(sold_amt, key=sold_amt.get) if float(max(sold_amt.values())) > 0 else ""
-        rows.append(
-            {
-                "date": pd.Timestamp(m),
-                "nav": nav_proxy,
-                "withdrawal": w_this,
-                "units_left": denom,
-                "portfolio_value": total_value,
-                "draw_from": draw_from,
-                "rebalanced": did_rebalance,
-                "tax_paid": tax_paid_m,
-                "exit_load_paid": exit_paid_m,
-                "spending_mult": spending_mult,
-                "stop_reason": "",
-            }
-        )
-        if amt_left > 1e-9:
-            rows[-1]["stop_reason"] = "insufficient_liquidity_for_withdrawal"
-            rows[-1]["portfolio_value"] = 0.0
-            break
-        if total_value <= 0:
-            rows[-1]["stop_reason"] = "corpus_depleted"
-            rows[-1]["portfolio_value"] = 0.0
-            break
-
-    return pd.DataFrame(rows)
-
-def find_max_starting_withdrawal_percent(
-    nav_series: pd.DataFrame,
-    start_date,
-    corpus_value: float,
-    annual_inflation: float,
-    years_needed: int,
-    sim_fn: Optional[Callable[[float], pd.DataFrame]] = None,
-) -> Tuple[float, pd.DataFrame]:
-    if corpus_value <= 0:
-        return 0.0, pd.DataFrame()
-    horizon_end = pd.Timestamp(start_date).normalize().replace(day=1) + pd.offsets.MonthBegin(max(0, years_needed * 12 - 1))
-    lo, hi = 0.0, 0.10
-    best_pct = 0.0
-    best_df = pd.DataFrame()
-    for _ in range(12):
-        start_w = hi * corpus_value
-        sim = sim_fn(start_w) if sim_fn is not None else simulate_swp_inflation(nav_series, start_date, corpus_value, start_w, annual_inflation, max_years=years_needed)
-        lasted_to = sim["date"].iloc[-1] if not sim.empty else pd.Timestamp(start_date)
-        if not sim.empty and lasted_to >= horizon_end:
-            best_pct = hi; best_df = sim; hi *= 2.0
-            if hi > 0.50: break
-        else:
-            break
-    for _ in range(36):
-        mid = 0.5 * (lo + hi)
-        start_w = mid * corpus_value
-        sim = sim_fn(start_w) if sim_fn is not None else simulate_swp_inflation(nav_series, start_date, corpus_value, start_w, annual_inflation, max_years=years_needed)
-        lasted_to = sim["date"].iloc[-1] if not sim.empty else pd.Timestamp(start_date)
-        if not sim.empty and lasted_to >= horizon_end:
-            best_pct = mid; best_df = sim; lo = mid
-        else:
-            hi = mid
-    return best_pct, best_df
-
-def longevity_for_withdrawal(
-    nav_series: pd.DataFrame,
-    start_date,
-    corpus_value: float,
-    start_withdrawal_monthly: float,
-    annual_inflation: float,
-    sim_fn: Optional[Callable[[float], pd.DataFrame]] = None,
-) -> Tuple[int, pd.DataFrame]:
-    sim = sim_fn(start_withdrawal_monthly) if sim_fn is not None else simulate_swp_inflation(nav_series, start_date, corpus_value, start_withdrawal_monthly, annual_inflation, max_years=None, max_extra_years=100)
-    return len(sim), sim
-
-def monte_carlo_swp_survival(
-    start_date,
-    years_needed: int,
-    paths: int,
-    random_seed: int,
-    start_nav_map: Dict[str, float],
-    return_panel: pd.DataFrame,
-    corpus_value: float,
-    start_withdrawal_monthly: float,
-    annual_inflation: float,
-    target_weights: Dict[str, float],
-    withdrawal_mode: str,
-    fund_tax_profiles: Dict[str, str],
-    tax_cfg: Dict[str, float],
-    exit_load_days: int,
-    exit_load_pct: float,
-    use_guardrails: bool,
-    guardrail_upper_mult: float,
-    guardrail_lower_mult: float,
-    guardrail_cut_pct: float,
-    guardrail_raise_pct: float,
-) -> Dict[str, float]:
-    months = int(max(1, years_needed * 12))
-    if return_panel is None or return_panel.empty or len(return_panel) < 12 or not start_nav_map:
-        return {"survival_prob": np.nan, "p10_end": np.nan, "p50_end": np.nan, "p90_end": np.nan, "paths": 0}
-
-    funds = [f for f in start_nav_map.keys() if f in return_panel.columns]
-    if not funds:
-        return {"survival_prob": np.nan, "p10_end": np.nan, "p50_end": np.nan, "p90_end": np.nan, "paths": 0}
-
-    rp = return_panel[funds].dropna()
-    if rp.empty:
-        return {"survival_prob": np.nan, "p10_end": np.nan, "p50_end": np.nan, "p90_end": np.nan, "paths": 0}
-
-    rng = np.random.default_rng(int(random_seed))
-    start_month = pd.Timestamp(start_date).normalize().replace(day=1)
-    horizon_end = start_month + pd.offsets.MonthBegin(max(0, months - 1))
-    successes = 0
-    endings = []
-
-    for _ in range(int(max(1, paths))):
-        idx = rng.integers(0, len(rp), size=months)
-        sampled = rp.iloc[idx].reset_index(drop=True)
-        nav_map = {}
-        dates = [start_month + pd.offsets.MonthBegin(i) for i in range(months)]
-        for nm in funds:
-            navs = [float(start_nav_map[nm])]
-            for t in range(1, months):
-                r = float(sampled.loc[t, nm])
-                navs.append(max(1e-9, navs[-1] * (1.0 + r)))
-            nav_map[nm] = pd.DataFrame({"date": dates, "nav": navs})
-
-        sim = simulate_swp_multifund_inflation(
-            nav_map=nav_map,
-            start_date=start_date,
-            corpus_value=corpus_value,
-            start_withdrawal_monthly=start_withdrawal_monthly,
-            annual_inflation=annual_inflation,
-            target_weights=target_weights,
-            rebalance_every_months=24,
-            max_years=years_needed,
-            max_extra_years=0,
-            withdrawal_mode=withdrawal_mode,
-            fund_tax_profiles=fund_tax_profiles,
-            tax_cfg=tax_cfg,
-            exit_load_days=exit_load_days,
-            exit_load_pct=exit_load_pct,
-            use_guardrails=use_guardrails,
-            guardrail_upper_mult=guardrail_upper_mult,
-            guardrail_lower_mult=guardrail_lower_mult,
-            guardrail_cut_pct=guardrail_cut_pct,
-            guardrail_raise_pct=guardrail_raise_pct,
-        )
-        lasted_to = sim["date"].iloc[-1] if not sim.empty else pd.Timestamp(start_date)
-        survived = (not sim.empty) and (lasted_to >= horizon_end)
-        if survived:
-            successes += 1
-        endings.append(float(sim["portfolio_value"].iloc[-1]) if not sim.empty else 0.0)
-
-    endings_arr = np.array(endings, dtype=float)
-    return {
-        "survival_prob": float(successes / max(1, len(endings))),
-        "p10_end": float(np.nanpercentile(endings_arr, 10)),
-        "p50_end": float(np.nanpercentile(endings_arr, 50)),
-        "p90_end": float(np.nanpercentile(endings_arr, 90)),
-        "paths": int(len(endings)),
-    }
-
 # --------------------------------------------------------------------
 # NEW: P&C universe scan — diversified top 5 with PROGRESS + decorrelation modes
 # --------------------------------------------------------------------
@@ -1112,127 +638,58 @@ def universe_scan_top5(
         return [], pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
     vol_pen, down_pen = profile_penalties(profile)
-    rows = []
-    rets_map: Dict[int, pd.Series] = {}
-    names_map: Dict[int, str] = {}
-    style_map: Dict[int, str] = {}
+    names_map: Dict[int, str] = dict(zip(universe["scheme_code"].astype(int), universe["scheme_name"].astype(str)))
     total = max(1, len(universe))
 
-    # Stage 1: risk-adjusted ranking
-    for i, (_, row) in enumerate(universe.iterrows(), start=1):
-        name = str(row["scheme_name"])
-        code = int(row["scheme_code"])
-        upd(0.05 + 0.55 * (i / total), f"Scanning: {name}")
-
-        mr = fetch_monthly_returns(code)
-        if mr.empty:
-            continue
-        end = mr["date"].iloc[-1]
-        start_cut = end - pd.DateOffset(months=lookback_months)
-        mrw = mr[mr["date"] > start_cut].copy()
-        if len(mrw) < min_months:
-            continue
-
-        ret_arr = _clean_monthly_returns(mrw["ret"].to_numpy(dtype=float))
-        if len(ret_arr) < min_months:
-            continue
-        ann_ret, ann_vol = annualize_from_monthlies(ret_arr)
-        if not np.isfinite(ann_ret) or not np.isfinite(ann_vol):
-            continue
-        neg = ret_arr[ret_arr < 0]
-        down_vol = float(np.std(neg, ddof=1)) * np.sqrt(12.0) if len(neg) > 1 else 0.0
-        if not np.isfinite(down_vol):
-            down_vol = 0.0
-
-        score = float(ann_ret - vol_pen * ann_vol - down_pen * down_vol)
-        style = infer_style_bucket(name)
-        rows.append(
-            {
-                "Fund": name,
-                "scheme_code": code,
-                "Style": style,
-                "months": len(mrw),
-                "AnnRet": ann_ret,
-                "AnnVol": ann_vol,
-                "DownVol": down_vol,
-                "Score": score,
-            }
-        )
-        rets_map[code] = mrw.set_index("date")["ret"]
-        names_map[code] = name
-        style_map[code] = style
-
-    if not rows:
+    # Stage 1: concurrent NAV load + vectorized risk-adjusted ranking
+    histories = nav_store.load_nav_histories(
+        universe["scheme_code"].astype(int).tolist(),
+        progress_cb=lambda done, _total: upd(0.05 + 0.55 * (done / total), f"Scanning {done}/{total} funds"),
+    )
+    months, all_codes, rets = monthly_return_matrix(histories)
+    window = lookback_mask(months, rets, lookback_months)
+    m = risk_metrics(rets, window, vol_pen, down_pen)
+    viable = (m["months"] >= min_months) & (m["clean"] >= min_months) & np.isfinite(m["AnnRet"])
+    if not viable.any():
         upd(1.0, "No viable funds found")
         return [], pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
-    cand = pd.DataFrame(rows).sort_values("Score", ascending=False).reset_index(drop=True)
+    style_map: Dict[int, str] = {int(c): infer_style_bucket(names_map[int(c)]) for c in all_codes[viable]}
+    cand = pd.DataFrame(
+        {
+            "Fund": [names_map[int(c)] for c in all_codes[viable]],
+            "scheme_code": all_codes[viable],
+            "Style": [style_map[int(c)] for c in all_codes[viable]],
+            "months": m["months"][viable],
+            "AnnRet": m["AnnRet"][viable],
+            "AnnVol": m["AnnVol"][viable],
+            "DownVol": m["DownVol"][viable],
+            "Score": m["Score"][viable],
+            "_col": np.flatnonzero(viable),
+        }
+    ).sort_values("Score", ascending=False).reset_index(drop=True)
     # Keep a practical top slice for correlation math.
     cand_top = cand.head(min(150, len(cand))).copy()
+    cols = cand_top["_col"].to_numpy()
+    cand = cand.drop(columns="_col")
 
-    # Stage 2: pairwise absolute Pearson correlation on aligned panel
+    # Stage 2: pairwise absolute Pearson correlation on the aligned panel
     upd(0.65, "Computing correlations")
-    series_list = []
-    for code in cand_top["scheme_code"]:
-        s = rets_map.get(int(code))
-        if s is not None:
-            s = s.copy()
-            s.name = int(code)
-            series_list.append(s)
-    if not series_list:
-        upd(1.0, "No aligned returns")
-        return [], pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-
-    ret_df = pd.concat(series_list, axis=1, join="outer").sort_index()
-    pearson_abs = ret_df.corr().abs().fillna(0.0)
-
-    codes = [int(c) for c in pearson_abs.index]
-    score_map = cand_top.drop_duplicates(subset=["scheme_code"]).set_index("scheme_code")["Score"].to_dict()
+    codes = [int(c) for c in cand_top["scheme_code"]]
+    corr = pairwise_abs_corr(rets[:, cols], window[:, cols])
+    pearson_abs = pd.DataFrame(corr, index=codes, columns=codes)
 
     # Stage 3: deterministic diversified greedy selection
     upd(0.78, "Selecting diversified top 5")
-    selected: List[int] = []
-    for code in cand_top["scheme_code"]:
-        c = int(code)
-        if c in codes:
-            selected.append(c)
-            break
-
-    while len(selected) < 5:
-        best_code = None
-        best_eff = -1e9
-        for c in codes:
-            if c in selected:
-                continue
-            corr_vals = [float(pearson_abs.loc[c, s]) for s in selected] if selected else [0.0]
-            max_corr = max(corr_vals)
-            if max_corr > corr_cap:
-                continue
-            avg_corr = float(np.mean(corr_vals))
-            style_pen = 0.12 if (one_per_bucket and any(style_map.get(c) == style_map.get(s) for s in selected)) else 0.0
-            eff = float(score_map.get(c, 0.0)) - 0.60 * avg_corr - style_pen
-            if eff > best_eff:
-                best_eff = eff
-                best_code = c
-
-        if best_code is None:
-            # Fallback: relax hard cap to avoid empty outcomes.
-            candidates = []
-            for c in codes:
-                if c in selected:
-                    continue
-                corr_vals = [float(pearson_abs.loc[c, s]) for s in selected] if selected else [0.0]
-                max_corr = max(corr_vals)
-                style_pen = 0.12 if (one_per_bucket and any(style_map.get(c) == style_map.get(s) for s in selected)) else 0.0
-                eff = float(score_map.get(c, 0.0)) - 0.60 * float(np.mean(corr_vals)) - style_pen
-                candidates.append((max_corr, -eff, c))
-            if not candidates:
-                break
-            candidates.sort()
-            best_code = int(candidates[0][2])
-
-        selected.append(best_code)
-        upd(0.78 + 0.04 * len(selected), f"Selecting {len(selected)}/5")
+    picked = greedy_diversify(
+        corr,
+        cand_top["Score"].to_numpy(dtype=float),
+        cand_top["Style"].tolist(),
+        corr_cap=corr_cap,
+        one_per_bucket=one_per_bucket,
+        progress_cb=lambda n: upd(0.78 + 0.04 * n, f"Selecting {n}/5"),
+    )
+    selected = [codes[i] for i in picked]
 
     sel_codes = selected[:5]
     if not sel_codes:
@@ -1251,12 +708,7 @@ def universe_scan_top5(
 
     # Stage 4: normalized chart
     upd(0.90, "Preparing chart")
-    histories = {}
-    for k, code in enumerate(sel_codes, start=1):
-        h = fetch_nav_history(int(code))
-        if not h.empty:
-            histories[int(code)] = h
-        upd(0.90 + 0.02 * (k / max(1, len(sel_codes))), f"Fetching {k}/{len(sel_codes)} histories")
+    histories = {int(code): histories[int(code)] for code in sel_codes if int(code) in histories}
 
     starts = [df["date"].iloc[0] for df in histories.values()] if histories else []
     if not starts:
@@ -1771,7 +1223,7 @@ with st.expander("🔧 SWP Framework (inflation + risk-weighted portfolio)", exp
     with colH:
         use_guardrails = st.checkbox("Enable guardrail spending", value=True)
     with colI:
-        mc_paths = st.selectbox("Monte Carlo paths", [0, 200, 500, 1000], index=2, help="0 disables MC simulation.")
+        mc_paths = st.selectbox("Monte Carlo paths", [0, 500, 1000, 5000, 10000], index=1, help="0 disables MC simulation.")
 
     guardrail_band = 0.20
     guardrail_cut_pct = 0.10
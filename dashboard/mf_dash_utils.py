@@ -1,55 +1,17 @@
 from __future__ import annotations
 
-import datetime as dt
+import importlib.util
+import sys
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
 
 import pandas as pd
 import requests
 
-SCHEME_LIST_URL = "https://api.mfapi.in/mf"
-NAV_URL_TEMPLATE = "https://api.mfapi.in/mf/{scheme_code}"
-NAV_CACHE_DIR = Path(__file__).resolve().parent / ".nav_cache"
-NAV_DISK_CACHE_MAX_AGE_HOURS = 24
-
-
-def _nav_cache_path(scheme_code: int) -> Path:
-    return NAV_CACHE_DIR / f"{int(scheme_code)}.csv"
-
-
-def _load_nav_from_disk_cache(scheme_code: int, max_age_hours: int = NAV_DISK_CACHE_MAX_AGE_HOURS) -> Optional[pd.DataFrame]:
-    path = _nav_cache_path(scheme_code)
-    if not path.exists():
-        return None
-    try:
-        age_sec = dt.datetime.now().timestamp() - path.stat().st_mtime
-        if age_sec > max_age_hours * 3600:
-            return None
-        df = pd.read_csv(path, parse_dates=["date"])
-        if "date" not in df.columns or "nav" not in df.columns:
-            return None
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
-        df = df.dropna(subset=["date", "nav"]).sort_values("date").reset_index(drop=True)
-        if df.empty:
-            return None
-        return df[["date", "nav"]]
-    except Exception:
-        return None
+from mf_nav_store import NAV_STORE_DIR, fetch_nav_history  # noqa: F401  (re-exported for the Dash MF tab)
 
-
-def _save_nav_to_disk_cache(scheme_code: int, nav_df: pd.DataFrame) -> None:
-    if nav_df is None or nav_df.empty:
-        return
-    try:
-        NAV_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        path = _nav_cache_path(scheme_code)
-        tmp = path.with_suffix(".tmp")
-        nav_df[["date", "nav"]].to_csv(tmp, index=False)
-        tmp.replace(path)
-    except Exception:
-        pass
+SCHEME_LIST_URL = "https://api.mfapi.in/mf"
+SCHEME_INDEX_PATH = Path(__file__).resolve().parents[1] / "Auto_Trader" / "mf_scheme_index.py"
 
 
 @lru_cache(maxsize=1)
@@ -64,23 +26,23 @@ def fetch_scheme_list() -> pd.DataFrame:
     return df
 
 
-@lru_cache(maxsize=256)
-def fetch_nav_history(scheme_code: int) -> pd.DataFrame:
-    cached = _load_nav_from_disk_cache(scheme_code)
-    if cached is not None:
-        return cached
+def _scheme_index_module():
+    # Loaded by file path: ``import Auto_Trader.mf_scheme_index`` runs the package
+    # __init__ (Kite session, my_secrets), which the app and tracker hosts lack.
+    module = sys.modules.get("mf_scheme_index")
+    if module is None:
+        spec = importlib.util.spec_from_file_location("mf_scheme_index", SCHEME_INDEX_PATH)
+        if spec is None or spec.loader is None:
+            raise RuntimeError(f"Could not load module mf_scheme_index from {SCHEME_INDEX_PATH}")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["mf_scheme_index"] = module
+        spec.loader.exec_module(module)
+    return module
 
-    r = requests.get(NAV_URL_TEMPLATE.format(scheme_code=scheme_code), timeout=30)
-    r.raise_for_status()
-    payload = r.json()
-    df = pd.DataFrame(payload["data"])
-    df["date"] = pd.to_datetime(df["date"], format="%d-%m-%Y", errors="coerce")
-    df = df.dropna(subset=["date"]).sort_values("date").reset_index(drop=True)
-    df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
-    df = df.dropna(subset=["nav"]).reset_index(drop=True)
-    out = df[["date", "nav"]]
-    _save_nav_to_disk_cache(scheme_code, out)
-    return out
+
+def load_scheme_index(texts, variant: str, tokenizer, normalizer=None):
+    """``mf_scheme_index.load_scheme_index`` persisted next to the NAV store."""
+    return _scheme_index_module().load_scheme_index(texts, variant, tokenizer, normalizer=normalizer, directory=NAV_STORE_DIR)
 
 
 def normalize_nav(nav_df: pd.DataFrame, base: float = 10.0) -> pd.DataFrame:
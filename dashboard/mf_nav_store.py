@@ -0,0 +1,290 @@
+"""Shared MFAPI NAV store with incremental daily updates.
+
+Each scheme's ``date``/``nav`` history is one feather partition under
+``NAV_STORE_DIR``. A partition's last date is its watermark and its mtime is
+the last time it was checked against MFAPI: once a partition is older than
+``NAV_STORE_MAX_AGE_HOURS``, only NAVs after the watermark are requested and
+appended, instead of re-downloading the scheme's full history. Missing or stale
+schemes are fetched in parallel over pooled keep-alive connections.
+
+``mf_app_core``, ``mf_dash_utils`` and the portfolio tracker all read NAVs
+through this module.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+NAV_URL_TEMPLATE = "https://api.mfapi.in/mf/{scheme_code}"
+NAV_STORE_DIR = Path(__file__).resolve().parent / ".nav_store"
+LEGACY_CSV_DIR = Path(__file__).resolve().parent / ".nav_cache"
+NAV_STORE_MAX_AGE_HOURS = 24
+FETCH_WORKERS = max(1, int(os.getenv("AT_MF_FETCH_WORKERS", "16")))
+FETCH_TIMEOUT = 30
+# A watermark NAV that moved by more than this means MFAPI restated the history.
+RESTATEMENT_RTOL = 1e-6
+
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """Per-thread session so every worker keeps its own connection alive."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
+
+
+def parse_nav_payload(payload: dict) -> pd.DataFrame:
+    df = pd.DataFrame(payload.get("data") or [], columns=["date", "nav"])
+    df["date"] = pd.to_datetime(df["date"], format="%d-%m-%Y", errors="coerce")
+    df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
+    df = df.dropna(subset=["date", "nav"]).sort_values("date").reset_index(drop=True)
+    return df[["date", "nav"]]
+
+
+def download_nav_history(scheme_code: int, since=None) -> pd.DataFrame:
+    """Fetch a scheme's NAVs from MFAPI, only from ``since`` onwards when given."""
+    params = None
+    if since is not None:
+        params = {
+            "startDate": pd.Timestamp(since).strftime("%Y-%m-%d"),
+            "endDate": dt.date.today().strftime("%Y-%m-%d"),
+        }
+    r = _session().get(NAV_URL_TEMPLATE.format(scheme_code=int(scheme_code)), params=params, timeout=FETCH_TIMEOUT)
+    r.raise_for_status()
+    out = parse_nav_payload(r.json())
+    if since is not None:
+        # Older MFAPI deployments ignore the range parameters.
+        out = out[out["date"] >= pd.Timestamp(since)].reset_index(drop=True)
+    return out
+
+
+def _partition_path(scheme_code: int) -> Path:
+    return NAV_STORE_DIR / f"{int(scheme_code)}.feather"
+
+
+def _is_fresh(path: Path, max_age_hours: Optional[float]) -> bool:
+    if max_age_hours is None:
+        return True
+    try:
+        return dt.datetime.now().timestamp() - path.stat().st_mtime <= max_age_hours * 3600
+    except OSError:
+        return False
+
+
+def _valid(df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    if df is None or df.empty or "date" not in df.columns or "nav" not in df.columns:
+        return None
+    return df[["date", "nav"]]
+
+
+def read_nav_history(scheme_code: int, max_age_hours: Optional[float] = None) -> Optional[pd.DataFrame]:
+    """Stored history, or ``None`` if absent or last checked over ``max_age_hours`` ago."""
+    path = _partition_path(scheme_code)
+    if not _is_fresh(path, max_age_hours):
+        return None
+    try:
+        return _valid(pd.read_feather(path))
+    except Exception:
+        return None
+
+
+def _read_legacy_csv(scheme_code: int) -> Optional[pd.DataFrame]:
+    """Seed from the pre-store per-scheme CSV cache so migration stays incremental."""
+    path = LEGACY_CSV_DIR / f"{int(scheme_code)}.csv"
+    if not path.exists():
+        return None
+    try:
+        df = pd.read_csv(path)
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
+        return _valid(df.dropna(subset=["date", "nav"]).sort_values("date").reset_index(drop=True))
+    except Exception:
+        return None
+
+
+def write_nav_history(scheme_code: int, nav_df: pd.DataFrame) -> None:
+    if nav_df is None or nav_df.empty:
+        return
+    try:
+        NAV_STORE_DIR.mkdir(parents=True, exist_ok=True)
+        path = _partition_path(scheme_code)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        nav_df[["date", "nav"]].reset_index(drop=True).to_feather(tmp)
+        tmp.replace(path)
+    except Exception:
+        # The store is best-effort; a failed write only costs a re-download.
+        pass
+
+
+def watermark(scheme_code: int) -> Optional[pd.Timestamp]:
+    df = read_nav_history(scheme_code)
+    return None if df is None else pd.Timestamp(df["date"].iloc[-1])
+
+
+def update_nav_history(
+    scheme_code: int,
+    max_age_hours: Optional[float] = NAV_STORE_MAX_AGE_HOURS,
+    full: bool = False,
+) -> pd.DataFrame:
+    """Bring one scheme's partition up to date and return its full history.
+
+    Fresh partitions are returned as stored. Stale ones request NAVs from the
+    watermark onwards and append the new rows; if the watermark NAV itself
+    changed, the history was restated and is re-downloaded in full. When the
+    incremental request fails the stored history is returned unchanged.
+    Raises only when there is no stored history and the download fails.
+    """
+    path = _partition_path(scheme_code)
+    local = None
+    from_legacy = False
+    if not full:
+        local = read_nav_history(scheme_code)
+        if local is not None and _is_fresh(path, max_age_hours):
+            return local
+        if local is None:
+            local = _read_legacy_csv(scheme_code)
+            from_legacy = local is not None
+
+    if local is None:
+        out = download_nav_history(scheme_code)
+        write_nav_history(scheme_code, out)
+        return out
+
+    mark = pd.Timestamp(local["date"].iloc[-1])
+    try:
+        recent = download_nav_history(scheme_code, since=mark)
+    except Exception:
+        return local
+    at_mark = recent.loc[recent["date"] == mark, "nav"]
+    if not at_mark.empty and not np.isclose(float(at_mark.iloc[-1]), float(local["nav"].iloc[-1]), rtol=RESTATEMENT_RTOL, atol=0.0):
+        return update_nav_history(scheme_code, full=True)
+
+    new_rows = recent[recent["date"] > mark]
+    if new_rows.empty and not from_legacy:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return local
+    out = pd.concat([local, new_rows], ignore_index=True)
+    write_nav_history(scheme_code, out)
+    return out
+
+
+def fetch_nav_history(scheme_code: int) -> pd.DataFrame:
+    return update_nav_history(int(scheme_code))
+
+
+def load_nav_histories(
+    scheme_codes: Iterable[int],
+    max_workers: int = FETCH_WORKERS,
+    max_age_hours: Optional[float] = NAV_STORE_MAX_AGE_HOURS,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    full: bool = False,
+) -> dict[int, pd.DataFrame]:
+    """Return ``{scheme_code: nav_df}`` for every scheme that could be loaded.
+
+    Fresh partitions are read from disk; the rest are updated (or, with
+    ``full=True``, backfilled from scratch) by at most ``max_workers``
+    threads. Schemes that fail with nothing stored are left out.
+    ``progress_cb(done, total)`` is called from the calling thread.
+    """
+    codes = list(dict.fromkeys(int(c) for c in scheme_codes))
+    total = len(codes)
+    out: dict[int, pd.DataFrame] = {}
+    pending = []
+    for code in codes:
+        cached = None if full else read_nav_history(code, max_age_hours)
+        if cached is None:
+            pending.append(code)
+        else:
+            out[code] = cached
+    done = len(out)
+    if progress_cb and done:
+        progress_cb(done, total)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(pending)))) as pool:
+            futures = {pool.submit(update_nav_history, code, max_age_hours, full): code for code in pending}
+            for fut in as_completed(futures):
+                done += 1
+                try:
+                    df = fut.result()
+                except Exception:
+                    df = None
+                if df is not None and not df.empty:
+                    out[futures[fut]] = df
+                if progress_cb:
+                    progress_cb(done, total)
+    return {code: out[code] for code in codes if code in out}
+
+
+def backfill_nav_store(scheme_codes: Iterable[int], max_workers: int = FETCH_WORKERS, progress_cb=None) -> dict[int, pd.DataFrame]:
+    """Download full histories for many schemes, replacing what is stored."""
+    return load_nav_histories(scheme_codes, max_workers=max_workers, progress_cb=progress_cb, full=True)
+
+
+def nav_matrix(
+    scheme_codes: Iterable[int],
+    start=None,
+    end=None,
+    ffill: bool = True,
+    histories: Optional[dict[int, pd.DataFrame]] = None,
+    **load_kwargs,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Date-aligned NAVs for many schemes as ``(dates, codes, navs)``.
+
+    ``navs`` is ``(len(dates), len(codes))`` on the union of the schemes'
+    NAV dates within ``[start, end]``. With ``ffill`` a scheme carries its
+    last NAV over dates it did not publish; cells before its first NAV stay
+    NaN. ``histories`` skips loading when the caller already has them.
+    """
+    if histories is None:
+        histories = load_nav_histories(scheme_codes, **load_kwargs)
+    codes = np.array([int(c) for c in dict.fromkeys(int(c) for c in scheme_codes) if int(c) in histories], dtype=np.int64)
+    lo = np.datetime64(pd.Timestamp(start), "ns") if start is not None else None
+    hi = np.datetime64(pd.Timestamp(end), "ns") if end is not None else None
+    cols_dates, cols_navs = [], []
+    for code in codes:
+        h = histories[int(code)]
+        d = h["date"].to_numpy(dtype="datetime64[ns]")
+        v = h["nav"].to_numpy(dtype=float)
+        keep = np.ones(len(d), dtype=bool)
+        if lo is not None:
+            keep &= d >= lo
+        if hi is not None:
+            keep &= d <= hi
+        cols_dates.append(d[keep])
+        cols_navs.append(v[keep])
+    dates = np.unique(np.concatenate(cols_dates)) if cols_dates else np.array([], dtype="datetime64[ns]")
+    navs = np.full((len(dates), len(codes)), np.nan)
+    for j, (d, v) in enumerate(zip(cols_dates, cols_navs)):
+        if len(d) == 0:
+            continue
+        rows = np.searchsorted(dates, d)
+        navs[rows, j] = v
+        if ffill:
+            filled = np.zeros(len(dates), dtype=np.int64)
+            filled[rows] = rows
+            np.maximum.accumulate(filled, out=filled)
+            live = np.arange(len(dates)) >= rows[0]
+            navs[live, j] = navs[filled[live], j]
+    return dates, codes, navs
@@ -0,0 +1,166 @@
+"""Vectorized kernels for the MF universe "best 5" scan.
+
+Everything works on a month × scheme return matrix so that ranking, pairwise
+correlation and the diversified greedy pick are array operations instead of
+per-fund pandas work. ``mf_app_core.universe_scan_top5`` wires them together.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def monthly_return_matrix(histories: Mapping[int, pd.DataFrame]) -> tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+    """Month-end returns for many schemes on one calendar-month grid.
+
+    Returns ``(months, codes, rets)`` with ``rets`` shaped ``(len(months),
+    len(codes))``. Each scheme's return is taken between consecutive months
+    in which it has a NAV, exactly like resampling one history at a time, and
+    is NaN where the scheme has no observation.
+    """
+    items = [(int(code), h) for code, h in histories.items() if h is not None and not h.empty]
+    if not items:
+        return pd.DatetimeIndex([]), np.array([], dtype=np.int64), np.empty((0, 0))
+    lengths = np.array([len(h) for _, h in items])
+    col = np.repeat(np.arange(len(items)), lengths)
+    month = np.concatenate([h["date"].to_numpy(dtype="datetime64[ns]").astype("datetime64[M]") for _, h in items]).astype(np.int64)
+    nav = np.concatenate([h["nav"].to_numpy(dtype=float) for _, h in items])
+
+    # Histories are date-sorted, so the last row of each (scheme, month) run is the month-end NAV.
+    last = np.r_[(col[1:] != col[:-1]) | (month[1:] != month[:-1]), True]
+    col, month, nav = col[last], month[last], nav[last]
+    same = np.r_[False, col[1:] == col[:-1]]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ret = np.where(same, nav / np.r_[np.nan, nav[:-1]] - 1.0, np.nan)
+    col, month, ret = col[same], month[same], ret[same]
+    if len(col) == 0:
+        return pd.DatetimeIndex([]), np.array([], dtype=np.int64), np.empty((0, 0))
+
+    used = np.unique(col)
+    grid = np.unique(month)
+    rets = np.full((len(grid), len(used)), np.nan)
+    rets[np.searchsorted(grid, month), np.searchsorted(used, col)] = ret
+    months = pd.DatetimeIndex(grid.astype("datetime64[M]").astype("datetime64[ns]")) + pd.offsets.MonthEnd(0)
+    codes = np.array([items[i][0] for i in used], dtype=np.int64)
+    return months, codes, rets
+
+
+def lookback_mask(months: pd.DatetimeIndex, rets: np.ndarray, lookback_months: int) -> np.ndarray:
+    """Observed cells within ``lookback_months`` of each scheme's last month."""
+    present = ~np.isnan(rets)
+    if rets.size == 0:
+        return present
+    last = len(months) - 1 - np.argmax(present[::-1], axis=0)
+    ends = months[last]
+    cuts = (ends - pd.DateOffset(months=int(lookback_months))).to_numpy()
+    return present & (months.to_numpy()[:, None] > cuts[None, :])
+
+
+def _masked_std(x: np.ndarray, mask: np.ndarray, n: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(mask, x, 0.0).sum(axis=0) / n
+        dev = np.where(mask, x - mean, 0.0)
+        std = np.sqrt((dev * dev).sum(axis=0) / (n - 1))
+    return np.where(n > 1, std, 0.0)
+
+
+def risk_metrics(rets: np.ndarray, mask: np.ndarray, vol_pen: float, down_pen: float) -> dict[str, np.ndarray]:
+    """Per-scheme annualized return/vol, downside vol and penalized score.
+
+    Matches ``annualize_from_monthlies`` on each masked column: invalid
+    monthly returns (non-finite or <= -100%) are dropped first, and schemes
+    whose metrics are not finite get NaN ``AnnRet``/``AnnVol``.
+    """
+    months = mask.sum(axis=0)
+    with np.errstate(invalid="ignore"):
+        clean = mask & np.isfinite(rets) & (rets > -0.999999)
+    n = clean.sum(axis=0)
+    with np.errstate(invalid="ignore", over="ignore", divide="ignore"):
+        log_growth = np.where(clean, np.log1p(np.where(clean, rets, 0.0)), 0.0).sum(axis=0)
+        ann_ret = np.exp(log_growth / np.maximum(n / 12.0, 1e-9)) - 1.0
+        ann_vol = _masked_std(rets, clean, n) * np.sqrt(12.0)
+        neg = clean & (rets < 0)
+        down_vol = _masked_std(rets, neg, neg.sum(axis=0)) * np.sqrt(12.0)
+    bad = (n == 0) | ~np.isfinite(ann_ret) | ~np.isfinite(ann_vol)
+    ann_ret = np.where(bad, np.nan, ann_ret)
+    ann_vol = np.where(bad, np.nan, ann_vol)
+    down_vol = np.where(np.isfinite(down_vol), down_vol, 0.0)
+    return {
+        "months": months,
+        "clean": n,
+        "AnnRet": ann_ret,
+        "AnnVol": ann_vol,
+        "DownVol": down_vol,
+        "Score": ann_ret - vol_pen * ann_vol - down_pen * down_vol,
+    }
+
+
+def pairwise_abs_corr(rets: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Absolute Pearson correlation over pairwise-complete months.
+
+    Same semantics as ``DataFrame.corr()`` on an outer-joined panel, with
+    undefined pairs (fewer than two common months or zero variance) set to 0.
+    """
+    m = mask.astype(float)
+    x = np.where(mask, rets, 0.0)
+    n = m.T @ m
+    sx = x.T @ m  # sx[i, j]: sum of scheme i over months shared with j
+    sxx = (x * x).T @ m
+    sxy = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sx.T / n
+        var_i = sxx - sx * sx / n
+        corr = cov / np.sqrt(var_i * var_i.T)
+    corr = np.where((n > 1) & np.isfinite(corr), np.clip(np.abs(corr), 0.0, 1.0), 0.0)
+    return corr
+
+
+def greedy_diversify(
+    corr: np.ndarray,
+    scores: np.ndarray,
+    styles: Sequence[str],
+    corr_cap: float,
+    one_per_bucket: bool = True,
+    n_pick: int = 5,
+    progress_cb: Optional[Callable[[int], None]] = None,
+) -> list[int]:
+    """Deterministic diversified pick over candidates in descending-score order.
+
+    Starts from candidate 0, then repeatedly adds the candidate maximizing
+    ``score - 0.60 * mean|corr to picks| - style penalty`` among those under
+    ``corr_cap``; if none qualify the cap is relaxed to the least-correlated
+    candidate. Returns positional indices.
+    """
+    k = len(scores)
+    if k == 0:
+        return []
+    scores = np.asarray(scores, dtype=float)
+    _, style_ids = np.unique(np.asarray(styles, dtype=object).astype(str), return_inverse=True)
+    selected = [0]
+    taken = np.zeros(k, dtype=bool)
+    taken[0] = True
+    corr_sum = corr[:, 0].copy()
+    corr_max = corr[:, 0].copy()
+    style_taken = np.zeros(style_ids.max() + 1, dtype=bool)
+    style_taken[style_ids[0]] = True
+    while len(selected) < n_pick and not taken.all():
+        style_pen = np.where(one_per_bucket & style_taken[style_ids], 0.12, 0.0)
+        eff = scores - 0.60 * (corr_sum / len(selected)) - style_pen
+        ok = ~taken & (corr_max <= corr_cap) & (eff > -1e9)
+        if ok.any():
+            best = int(np.flatnonzero(ok)[np.argmax(eff[ok])])
+        else:
+            # Fallback: relax hard cap to avoid empty outcomes.
+            idx = np.flatnonzero(~taken)
+            best = int(idx[np.lexsort((-eff[idx], corr_max[idx]))[0]])
+        selected.append(best)
+        taken[best] = True
+        corr_sum += corr[:, best]
+        np.maximum(corr_max, corr[:, best], out=corr_max)
+        style_taken[style_ids[best]] = True
+        if progress_cb:
+            progress_cb(len(selected))
+    return selected
@@ -0,0 +1,743 @@
+"""SWP (systematic withdrawal) simulations behind the MF FIRE planner.
+
+Single-fund runs (``simulate_swp_inflation``/``simulate_swp_inflation_many``)
+work on month-indexed NAV arrays. The multi-fund walk
+(``simulate_swp_multifund_inflation``) tracks FIFO lots for tax and exit
+load, rebalancing and guardrail spending. ``simulate_swp_multifund_paths``
+is its batched twin for bootstrapped Monte Carlo paths; one path reproduces
+the walk exactly. ``mf_app_core`` renders the results.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MC_PATH_CHUNK = 5000
+
+@dataclass
+class ExitLoadRule:
+    days: int
+    pct: float
+
+def infer_tax_profile_from_name(name: str) -> str:
+    n = str(name).lower()
+    debt_rx = r"(liquid|overnight|ultra\s*short|low\s*duration|short\s*duration|corporate\s*bond|gilt|money market|debt)"
+    if re.search(debt_rx, n):
+        return "Debt"
+    return "Equity"
+
+def _tax_rate_for_holding_days(profile: str, holding_days: int, cfg: Dict[str, float]) -> float:
+    if profile == "Debt":
+        th = int(cfg.get("debt_ltcg_days", 1095))
+        st = float(cfg.get("debt_stcg_rate", 0.30))
+        lt = float(cfg.get("debt_ltcg_rate", 0.20))
+        return lt if holding_days >= th else st
+    th = int(cfg.get("equity_ltcg_days", 365))
+    st = float(cfg.get("equity_stcg_rate", 0.15))
+    lt = float(cfg.get("equity_ltcg_rate", 0.10))
+    return lt if holding_days >= th else st
+
+def nav_on_or_after_months(nav_df: pd.DataFrame, months) -> np.ndarray:
+    # Vector form of nearest_nav_on_or_after for many months: one searchsorted
+    # over the (ascending) NAV dates; NaN where no row is on/after the month.
+    out = np.full(len(months), np.nan)
+    if nav_df is None or nav_df.empty:
+        return out
+    dates = pd.DatetimeIndex(nav_df["date"]).as_unit("ns").asi8
+    pos = np.searchsorted(dates, pd.DatetimeIndex(months).as_unit("ns").asi8, side="left")
+    ok = pos < len(dates)
+    out[ok] = nav_df["nav"].to_numpy(dtype=float)[pos[ok]]
+    return out
+
+def _swp_horizon(start_date, max_years: Optional[int], max_extra_years: int) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    start_month = pd.Timestamp(start_date).normalize().replace(day=1)
+    if max_years is None:
+        horizon_months = 12 * max_extra_years
+    else:
+        horizon_months = 12 * (max_years + max_extra_years)
+    return start_month, start_month + pd.offsets.MonthBegin(max(0, horizon_months - 1))
+
+def _extend_nav_frame(df: pd.DataFrame, need_until) -> pd.DataFrame:
+    # Carry the last observed monthly growth forward until need_until (same
+    # step-by-step float recurrence as before, without per-row concat).
+    if df["date"].iloc[-1] >= need_until:
+        return df
+    navs = df["nav"].to_numpy(dtype=float)
+    last = float(navs[-1])
+    prev = float(navs[-2]) if len(navs) > 1 else last
+    ext_dates = pd.date_range(df["date"].iloc[-1] + pd.offsets.MonthBegin(1), need_until, freq="MS")
+    ext_navs = []
+    for _ in range(len(ext_dates)):
+        growth = (last / max(prev, 1e-9)) - 1.0
+        prev, last = last, last * (1.0 + growth)
+        ext_navs.append(last)
+    return pd.concat([df, pd.DataFrame({"date": ext_dates, "nav": ext_navs})], ignore_index=True)
+
+def simulate_swp_inflation_many(
+    nav_series: pd.DataFrame,
+    start_date,
+    corpus_value: float,
+    start_withdrawals_monthly,
+    annual_inflation: float,
+    max_years: Optional[int] = None,
+    max_extra_years: int = 80,
+) -> Dict[str, np.ndarray]:
+    # Single-fund SWP for K starting withdrawals at once on month-indexed arrays.
+    # Returns dates/nav (M,), withdrawal/units_left/portfolio_value (K, M) and
+    # months_lasted (K,) = rows simulate_swp_inflation would emit per withdrawal
+    # (the depletion month included).
+    start_ws = np.atleast_1d(np.asarray(start_withdrawals_monthly, dtype=float))
+    k = len(start_ws)
+    empty = {
+        "dates": pd.DatetimeIndex([]),
+        "nav": np.empty(0),
+        "withdrawal": np.empty((k, 0)),
+        "units_left": np.empty((k, 0)),
+        "portfolio_value": np.empty((k, 0)),
+        "months_lasted": np.zeros(k, dtype=int),
+    }
+    if nav_series.empty or corpus_value <= 0:
+        return empty
+    start_month, need_until = _swp_horizon(start_date, max_years, max_extra_years)
+    df = nav_series[nav_series["date"] >= start_month].reset_index(drop=True)
+    if df.empty:
+        return empty
+    df = _extend_nav_frame(df, need_until)
+    months = pd.date_range(start_month, need_until, freq="MS")
+    nav_m = nav_on_or_after_months(df, months)
+    if np.isnan(nav_m[0]) or nav_m[0] <= 0:
+        return empty
+    if np.isnan(nav_m).any():
+        months = months[: int(np.argmax(np.isnan(nav_m)))]
+        nav_m = nav_m[: len(months)]
+    n = len(months)
+
+    infl = float(annual_inflation)
+    withdrawal = np.empty((k, n))
+    units = np.zeros((k, n))
+    value = np.zeros((k, n))
+    months_lasted = np.full(k, n, dtype=int)
+    units_left = np.full(k, corpus_value / float(nav_m[0]))
+    alive = start_ws >= 0
+    months_lasted[~alive] = 0
+    for i in range(n):
+        if not alive.any():
+            break
+        nav_val = float(nav_m[i])
+        w_this = start_ws * ((1.0 + infl) ** (i // 12))
+        withdrawal[:, i] = w_this
+        to_sell = w_this / nav_val if nav_val > 0 else np.full(k, np.inf)
+        out_now = alive & (to_sell > units_left + 1e-12)
+        months_lasted[out_now] = i + 1
+        alive &= ~out_now
+        units_left = np.where(alive, units_left - to_sell, units_left)
+        units[alive, i] = units_left[alive]
+        value[alive, i] = units_left[alive] * nav_val
+    return {
+        "dates": months,
+        "nav": nav_m,
+        "withdrawal": withdrawal,
+        "units_left": units,
+        "portfolio_value": value,
+        "months_lasted": months_lasted,
+    }
+
+def _swp_frame(res: Dict[str, np.ndarray], j: int = 0) -> pd.DataFrame:
+    n = int(res["months_lasted"][j])
+    if n == 0:
+        return pd.DataFrame(columns=["date","nav","withdrawal","units_left","portfolio_value"])
+    return pd.DataFrame({
+        "date": res["dates"][:n],
+        "nav": res["nav"][:n],
+        "withdrawal": res["withdrawal"][j, :n],
+        "units_left": res["units_left"][j, :n],
+        "portfolio_value": res["portfolio_value"][j, :n],
+    })
+
+def simulate_swp_inflation(
+    nav_series: pd.DataFrame,
+    start_date,
+    corpus_value: float,
+    start_withdrawal_monthly: float,
+    annual_inflation: float,
+    max_years: Optional[int] = None,
+    max_extra_years: int = 80,
+) -> pd.DataFrame:
+    if nav_series.empty or corpus_value <= 0 or start_withdrawal_monthly < 0:
+        return pd.DataFrame(columns=["date","nav","withdrawal","units_left","portfolio_value"])
+    res = simulate_swp_inflation_many(
+        nav_series, start_date, corpus_value, [start_withdrawal_monthly], annual_inflation,
+        max_years=max_years, max_extra_years=max_extra_years,
+    )
+    return _swp_frame(res)
+
+def simulate_swp_multifund_inflation(
+    nav_map: Dict[str, pd.DataFrame],
+    start_date,
+    corpus_value: float,
+    start_withdrawal_monthly: float,
+    annual_inflation: float,
+    target_weights: Dict[str, float],
+    rebalance_every_months: int = 24,
+    max_years: Optional[int] = None,
+    max_extra_years: int = 80,
+    withdrawal_mode: str = "lowest_return",
+    fund_tax_profiles: Optional[Dict[str, str]] = None,
+    tax_cfg: Optional[Dict[str, float]] = None,
+    exit_load_days: int = 365,
+    exit_load_pct: float = 0.01,
+    use_guardrails: bool = False,
+    guardrail_upper_mult: float = 1.20,
+    guardrail_lower_mult: float = 0.80,
+    guardrail_cut_pct: float = 0.10,
+    guardrail_raise_pct: float = 0.05,
+) -> pd.DataFrame:
+    out_cols = [
+        "date",
+        "nav",
+        "withdrawal",
+        "units_left",
+        "portfolio_value",
+        "draw_from",
+        "rebalanced",
+        "tax_paid",
+        "exit_load_paid",
+        "spending_mult",
+        "stop_reason",
+    ]
+    if (not nav_map) or corpus_value <= 0 or start_withdrawal_monthly < 0:
+        return pd.DataFrame(columns=out_cols)
+
+    start_month, need_until = _swp_horizon(start_date, max_years, max_extra_years)
+    months = pd.date_range(start_month, need_until, freq="MS")
+
+    start_navs: Dict[str, float] = {}
+    nav_by_month: Dict[str, np.ndarray] = {}
+    for nm, df in nav_map.items():
+        if df is None or df.empty:
+            continue
+        aligned = nav_on_or_after_months(df, months)
+        nv = float(aligned[0])
+        if nv > 0:
+            start_navs[nm] = nv
+            nav_by_month[nm] = aligned
+    if not start_navs:
+        return pd.DataFrame(columns=out_cols)
+
+    active = list(start_navs.keys())
+    w = np.array([max(0.0, float(target_weights.get(nm, 0.0))) for nm in active], dtype=float)
+    if float(w.sum()) <= 0:
+        w = np.ones(len(active), dtype=float) / len(active)
+    else:
+        w = w / float(w.sum())
+    w_map = {nm: float(wi) for nm, wi in zip(active, w)}
+    if tax_cfg is None:
+        tax_cfg = {
+            "equity_stcg_rate": 0.15,
+            "equity_ltcg_rate": 0.10,
+            "equity_ltcg_days": 365,
+            "debt_stcg_rate": 0.30,
+            "debt_ltcg_rate": 0.20,
+            "debt_ltcg_days": 1095,
+        }
+    if fund_tax_profiles is None:
+        fund_tax_profiles = {nm: infer_tax_profile_from_name(nm) for nm in active}
+
+    lots: Dict[str, List[Dict[str, object]]] = {
+        nm: [
+            {
+                "units": (float(corpus_value) * w_map[nm] / start_navs[nm]),
+                "buy_date": pd.Timestamp(start_month),
+                "buy_nav": float(start_navs[nm]),
+            }
+        ]
+        for nm in active
+    }
+
+    def _fund_units(nm: str) -> float:
+        return float(sum(float(l["units"]) for l in lots.get(nm, [])))
+
+    def _fund_value(nm: str, navs_now: Dict[str, float]) -> float:
+        return _fund_units(nm) * float(navs_now.get(nm, 0.0))
+
+    def _cleanup_lots(nm: str):
+        lots[nm] = [l for l in lots.get(nm, []) if float(l["units"]) > 1e-12]
+
+    def _marginal_cost_score(nm: str, nav_now: float, ts) -> float:
+        ll = lots.get(nm, [])
+        if not ll:
+            return 1e9
+        lot0 = ll[0]
+        hold_days = max(0, int((pd.Timestamp(ts) - pd.Timestamp(lot0["buy_date"])).days))
+        profile = fund_tax_profiles.get(nm, "Equity")
+        tax_rate = _tax_rate_for_holding_days(profile, hold_days, tax_cfg)
+        gain_ratio = max(0.0, (float(nav_now) - float(lot0["buy_nav"])) / max(float(nav_now), 1e-9))
+        load_rate = float(exit_load_pct) if hold_days < int(exit_load_days) else 0.0
+        return float(tax_rate * gain_ratio + load_rate)
+
+    def _sell_gross_fifo(nm: str, gross_target: float, nav_now: float, ts) -> Tuple[float, float, float]:
+        rem = float(max(0.0, gross_target))
+        sold = 0.0
+        tax_paid = 0.0
+        exit_paid = 0.0
+        profile = fund_tax_profiles.get(nm, "Equity")
+        ll = lots.get(nm, [])
+        for lot in ll:
+            if rem <= 1e-9:
+                break
+            u = float(lot["units"])
+            if u <= 1e-12:
+                continue
+            gross_avail = u * float(nav_now)
+            gross_part = min(gross_avail, rem)
+            if gross_part <= 0:
+                continue
+            units_sell = gross_part / max(float(nav_now), 1e-9)
+            buy_nav = float(lot["buy_nav"])
+            hold_days = max(0, int((pd.Timestamp(ts) - pd.Timestamp(lot["buy_date"])).days))
+            gain = max(0.0, (float(nav_now) - buy_nav) * units_sell)
+            tax_rate = _tax_rate_for_holding_days(profile, hold_days, tax_cfg)
+            tax_paid += gain * tax_rate
+            load_rate = float(exit_load_pct) if hold_days < int(exit_load_days) else 0.0
+            exit_paid += gross_part * load_rate
+            lot["units"] = u - units_sell
+            sold += gross_part
+            rem -= gross_part
+        _cleanup_lots(nm)
+        return float(sold), float(tax_paid), float(exit_paid)
+
+    spending_mult = 1.0
+    rows = []
+    start_w = float(start_withdrawal_monthly)
+    infl = float(annual_inflation)
+    initial_wr = (12.0 * start_w) / max(float(corpus_value), 1e-9)
+
+    for i, m in enumerate(months):
+        navs: Dict[str, float] = {}
+        for nm in active:
+            nv = float(nav_by_month[nm][i])
+            if nv > 0:
+                navs[nm] = nv
+        if not navs:
+            break
+
+        did_rebalance = bool(rebalance_every_months > 0 and i > 0 and (i % rebalance_every_months == 0))
+        if did_rebalance:
+            total_pre = sum(_fund_value(nm, navs) for nm in active)
+            if total_pre <= 0:
+                break
+            for nm in active:
+                nv = float(navs.get(nm, 0.0))
+                if nv > 0:
+                    target_units = (total_pre * w_map[nm]) / nv
+                    lots[nm] = [{"units": target_units, "buy_date": pd.Timestamp(m), "buy_nav": nv}]
+
+        year_no = i // 12
+        base_w = start_w * ((1.0 + infl) ** year_no)
+        if use_guardrails and i > 0 and (i % 12 == 0):
+            total_now_raw = sum(_fund_value(nm, navs) for nm in active)
+            total_now = max(1e-9, total_now_raw)
+            wr_now = (12.0 * base_w * spending_mult) / total_now
+            if wr_now > initial_wr * float(guardrail_upper_mult):
+                spending_mult = max(0.0, spending_mult * (1.0 - float(guardrail_cut_pct)))
+            elif wr_now < initial_wr * float(guardrail_lower_mult):
+                spending_mult = spending_mult * (1.0 + float(guardrail_raise_pct))
+
+        w_this = base_w * spending_mult
+        sold_amt = {nm: 0.0 for nm in active}
+        tax_paid_m = 0.0
+        exit_paid_m = 0.0
+        amt_left = float(w_this)
+
+        while amt_left > 1e-9:
+            # Lots worth <= 1e-9 are dust: _sell_gross_fifo would sell nothing and spin forever.
+            candidates = [
+                nm for nm in active
+                if _fund_units(nm) > 1e-12 and float(navs.get(nm, 0.0)) > 0.0 and _fund_value(nm, navs) > 1e-9
+            ]
+            if not candidates:
+                break
+            if withdrawal_mode == "tax_aware":
+                candidates.sort(
+                    key=lambda nm: (
+                        _marginal_cost_score(nm, float(navs[nm]), m),
+                        (float(navs[nm]) / max(float(start_navs[nm]), 1e-9)) - 1.0,
+                    )
+                )
+            else:
+                candidates.sort(key=lambda nm: ((float(navs[nm]) / max(float(start_navs[nm]), 1e-9)) - 1.0))
+            draw_nm = candidates[0]
+            max_amt = _fund_value(draw_nm, navs)
+            sell_amt = min(max_amt, amt_left)
+            if sell_amt <= 0:
+                break
+            sold, tx, ld = _sell_gross_fifo(draw_nm, sell_amt, float(navs[draw_nm]), m)
+            sold_amt[draw_nm] += sold
+            tax_paid_m += tx
+            exit_paid_m += ld
+            amt_left -= sold
+
+        total_value_raw = sum(_fund_value(nm, navs) for nm in active)
+        total_value = max(0.0, total_value_raw)
+        denom = sum(max(0.0, _fund_units(nm)) for nm in active)
+        nav_proxy = (total_value_raw / denom) if denom > 1e-12 else 0.0
+        draw_from = max(sold_amt, key=sold_amt.get) if float(max(sold_amt.values())) > 0 else ""
+        rows.append(
+            {
+                "date": pd.Timestamp(m),
+                "nav": nav_proxy,
+                "withdrawal": w_this,
+                "units_left": denom,
+                "portfolio_value": total_value,
+                "draw_from": draw_from,
+                "rebalanced": did_rebalance,
+                "tax_paid": tax_paid_m,
+                "exit_load_paid": exit_paid_m,
+                "spending_mult": spending_mult,
+                "stop_reason": "",
+            }
+        )
+        if amt_left > 1e-9:
+            rows[-1]["stop_reason"] = "insufficient_liquidity_for_withdrawal"
+            rows[-1]["portfolio_value"] = 0.0
+            break
+        if total_value <= 0:
+            rows[-1]["stop_reason"] = "corpus_depleted"
+            rows[-1]["portfolio_value"] = 0.0
+            break
+
+    return pd.DataFrame(rows)
+
+def _max_withdrawal_percent_sweep(
+    nav_series: pd.DataFrame,
+    start_date,
+    corpus_value: float,
+    annual_inflation: float,
+    years_needed: int,
+    rates_per_round: int = 64,
+    rounds: int = 6,
+) -> Tuple[float, pd.DataFrame]:
+    # Survival is monotone in the withdrawal rate, so instead of bisecting one
+    # full simulation at a time, evaluate a grid of rates per round and shrink
+    # the bracket around the last surviving one (64**6 ~ 7e10 resolution over
+    # the same 0-80%/month ceiling the bisection could reach).
+    need = max(0, years_needed * 12 - 1) + 1
+    lo, hi = 0.0, 0.80
+    best = 0.0
+    for _ in range(rounds):
+        rates = lo + (hi - lo) * np.arange(1, rates_per_round + 1) / rates_per_round
+        res = simulate_swp_inflation_many(
+            nav_series, start_date, corpus_value, rates * corpus_value, annual_inflation,
+            max_years=years_needed, max_extra_years=0,
+        )
+        ok = res["months_lasted"] >= need
+        if not ok.any():
+            hi = float(rates[0])
+            continue
+        j = int(np.nonzero(ok)[0].max())
+        best = lo = float(rates[j])
+        if j + 1 < len(rates):
+            hi = float(rates[j + 1])
+        else:
+            break
+    if best <= 0:
+        return 0.0, pd.DataFrame()
+    return best, simulate_swp_inflation(nav_series, start_date, corpus_value, best * corpus_value, annual_inflation, max_years=years_needed)
+
+def find_max_starting_withdrawal_percent(
+    nav_series: pd.DataFrame,
+    start_date,
+    corpus_value: float,
+    annual_inflation: float,
+    years_needed: int,
+    sim_fn: Optional[Callable[[float], pd.DataFrame]] = None,
+) -> Tuple[float, pd.DataFrame]:
+    if corpus_value <= 0:
+        return 0.0, pd.DataFrame()
+    if sim_fn is None:
+        return _max_withdrawal_percent_sweep(nav_series, start_date, corpus_value, annual_inflation, years_needed)
+    horizon_end = pd.Timestamp(start_date).normalize().replace(day=1) + pd.offsets.MonthBegin(max(0, years_needed * 12 - 1))
+    lo, hi = 0.0, 0.10
+    best_pct = 0.0
+    best_df = pd.DataFrame()
+    for _ in range(12):
+        start_w = hi * corpus_value
+        sim = sim_fn(start_w) if sim_fn is not None else simulate_swp_inflation(nav_series, start_date, corpus_value, start_w, annual_inflation, max_years=years_needed)
+        lasted_to = sim["date"].iloc[-1] if not sim.empty else pd.Timestamp(start_date)
+        if not sim.empty and lasted_to >= horizon_end:
+            best_pct = hi; best_df = sim; hi *= 2.0
+            if hi > 0.50: break
+        else:
+            break
+    for _ in range(36):
+        mid = 0.5 * (lo + hi)
+        start_w = mid * corpus_value
+        sim = sim_fn(start_w) if sim_fn is not None else simulate_swp_inflation(nav_series, start_date, corpus_value, start_w, annual_inflation, max_years=years_needed)
+        lasted_to = sim["date"].iloc[-1] if not sim.empty else pd.Timestamp(start_date)
+        if not sim.empty and lasted_to >= horizon_end:
+            best_pct = mid; best_df = sim; lo = mid
+        else:
+            hi = mid
+    return best_pct, best_df
+
+def longevity_for_withdrawal(
+    nav_series: pd.DataFrame,
+    start_date,
+    corpus_value: float,
+    start_withdrawal_monthly: float,
+    annual_inflation: float,
+    sim_fn: Optional[Callable[[float], pd.DataFrame]] = None,
+) -> Tuple[int, pd.DataFrame]:
+    sim = sim_fn(start_withdrawal_monthly) if sim_fn is not None else simulate_swp_inflation(nav_series, start_date, corpus_value, start_withdrawal_monthly, annual_inflation, max_years=None, max_extra_years=100)
+    return len(sim), sim
+
+def _seq_sum(mat: np.ndarray) -> np.ndarray:
+    # Fund-by-fund accumulation so totals round exactly like Python's sum() over funds.
+    out = np.zeros(mat.shape[0], dtype=float)
+    for j in range(mat.shape[1]):
+        out = out + mat[:, j]
+    return out
+
+def simulate_swp_multifund_paths(
+    start_navs: np.ndarray,
+    monthly_returns: np.ndarray,
+    sample_idx: np.ndarray,
+    start_date,
+    corpus_value: float,
+    start_withdrawal_monthly: float,
+    annual_inflation: float,
+    weights: np.ndarray,
+    tax_profiles: List[str],
+    tax_cfg: Dict[str, float],
+    rebalance_every_months: int = 24,
+    withdrawal_mode: str = "lowest_return",
+    exit_load_days: int = 365,
+    exit_load_pct: float = 0.01,
+    use_guardrails: bool = False,
+    guardrail_upper_mult: float = 1.20,
+    guardrail_lower_mult: float = 0.80,
+    guardrail_cut_pct: float = 0.10,
+    guardrail_raise_pct: float = 0.05,
+    record: bool = False,
+) -> Dict[str, np.ndarray]:
+    # Batched twin of simulate_swp_multifund_inflation for bootstrapped NAV paths.
+    # Path p, month t uses fund returns monthly_returns[sample_idx[p, t]] (row 0 of
+    # each path is the start NAV). State is (paths, funds) arrays stepped month by
+    # month; every float op mirrors the single-path loop so one path reproduces it
+    # exactly. Returns months_lasted / final_value per path, plus per-month arrays
+    # when record=True.
+    start_navs = np.asarray(start_navs, dtype=float)
+    monthly_returns = np.asarray(monthly_returns, dtype=float)
+    sample_idx = np.asarray(sample_idx)
+    n_paths, months = sample_idx.shape
+    n_funds = len(start_navs)
+    start_month = pd.Timestamp(start_date).normalize().replace(day=1)
+    day_no = np.asarray((pd.date_range(start_month, periods=months, freq="MS") - start_month).days, dtype=int)
+
+    w = np.array([max(0.0, float(x)) for x in weights], dtype=float)
+    if float(w.sum()) <= 0:
+        w = np.ones(n_funds, dtype=float) / n_funds
+    else:
+        w = w / float(w.sum())
+    w = [float(x) for x in w]
+
+    nav = np.tile(start_navs, (n_paths, 1))
+    units = np.tile(np.array([float(corpus_value) * w[j] / start_navs[j] for j in range(n_funds)]), (n_paths, 1))
+    buy_nav = nav.copy()
+    buy_day = 0
+    start_ref = np.maximum(start_navs, 1e-9)
+    spending_mult = np.ones(n_paths, dtype=float)
+    alive = np.ones(n_paths, dtype=bool)
+    months_lasted = np.zeros(n_paths, dtype=int)
+    final_value = np.zeros(n_paths, dtype=float)
+    start_w = float(start_withdrawal_monthly)
+    infl = float(annual_inflation)
+    initial_wr = (12.0 * start_w) / max(float(corpus_value), 1e-9)
+    tax_aware = withdrawal_mode == "tax_aware"
+    out: Dict[str, np.ndarray] = {}
+    if record:
+        for key in ("withdrawal", "portfolio_value", "units_left", "nav", "tax_paid", "exit_load_paid", "spending_mult"):
+            out[key] = np.full((n_paths, months), np.nan)
+
+    for i in range(months):
+        if not alive.any():
+            break
+        if i > 0:
+            nav = np.maximum(1e-9, nav * (1.0 + monthly_returns[sample_idx[:, i]]))
+
+        if rebalance_every_months > 0 and i > 0 and (i % rebalance_every_months == 0):
+            total_pre = _seq_sum(units * nav)
+            alive &= total_pre > 0
+            units = np.column_stack([(total_pre * w[j]) / nav[:, j] for j in range(n_funds)])
+            buy_nav = nav.copy()
+            buy_day = int(day_no[i])
+            if not alive.any():
+                break
+
+        hold_days = max(0, int(day_no[i]) - buy_day)
+        tax_rate = np.array([_tax_rate_for_holding_days(p, hold_days, tax_cfg) for p in tax_profiles], dtype=float)
+        load_rate = float(exit_load_pct) if hold_days < int(exit_load_days) else 0.0
+
+        base_w = start_w * ((1.0 + infl) ** (i // 12))
+        if use_guardrails and i > 0 and (i % 12 == 0):
+            total_now = np.maximum(1e-9, _seq_sum(units * nav))
+            wr_now = (12.0 * base_w * spending_mult) / total_now
+            cut = wr_now > initial_wr * float(guardrail_upper_mult)
+            lift = ~cut & (wr_now < initial_wr * float(guardrail_lower_mult))
+            spending_mult = np.where(cut, np.maximum(0.0, spending_mult * (1.0 - float(guardrail_cut_pct))), spending_mult)
+            spending_mult = np.where(lift, spending_mult * (1.0 + float(guardrail_raise_pct)), spending_mult)
+
+        w_this = base_w * spending_mult
+        amt_left = w_this.copy()
+        tax_paid = np.zeros(n_paths, dtype=float)
+        exit_paid = np.zeros(n_paths, dtype=float)
+        drawing = alive & (amt_left > 1e-9)
+        while drawing.any():
+            cand = (units > 1e-12) & (nav > 0.0) & (units * nav > 1e-9)
+            drawing &= cand.any(axis=1)
+            rows = np.nonzero(drawing)[0]
+            if len(rows) == 0:
+                break
+            c = cand[rows]
+            nv_r = nav[rows]
+            ret = np.where(c, (nv_r / start_ref) - 1.0, np.inf)
+            if tax_aware:
+                gain_ratio = np.maximum(0.0, (nv_r - buy_nav[rows]) / np.maximum(nv_r, 1e-9))
+                score = np.where(c, tax_rate * gain_ratio + load_rate, np.inf)
+                ret = np.where(score == score.min(axis=1, keepdims=True), ret, np.inf)
+            pick = ret.argmin(axis=1)
+            u = units[rows, pick]
+            nv = nv_r[np.arange(len(rows)), pick]
+            sell_amt = np.minimum(u * nv, amt_left[rows])
+            ok = sell_amt > 0
+            drawing[rows[~ok]] = False
+            rows, pick, u, nv, sell_amt = rows[ok], pick[ok], u[ok], nv[ok], sell_amt[ok]
+            units_sell = sell_amt / np.maximum(nv, 1e-9)
+            gain = np.maximum(0.0, (nv - buy_nav[rows, pick]) * units_sell)
+            tax_paid[rows] += gain * tax_rate[pick]
+            exit_paid[rows] += sell_amt * load_rate
+            left = u - units_sell
+            units[rows, pick] = np.where(left > 1e-12, left, 0.0)
+            amt_left[rows] -= sell_amt
+            drawing &= amt_left > 1e-9
+
+        total_raw = _seq_sum(units * nav)
+        total_value = np.maximum(0.0, total_raw)
+        short = alive & (amt_left > 1e-9)
+        depleted = alive & ~short & (total_value <= 0)
+        months_lasted[alive] = i + 1
+        final_value[alive] = np.where(short | depleted, 0.0, total_value)[alive]
+        if record:
+            denom = _seq_sum(np.maximum(0.0, units))
+            safe = np.where(denom > 1e-12, denom, 1.0)
+            out["withdrawal"][alive, i] = w_this[alive]
+            out["portfolio_value"][alive, i] = final_value[alive]
+            out["units_left"][alive, i] = denom[alive]
+            out["nav"][alive, i] = np.where(denom > 1e-12, total_raw / safe, 0.0)[alive]
+            out["tax_paid"][alive, i] = tax_paid[alive]
+            out["exit_load_paid"][alive, i] = exit_paid[alive]
+            out["spending_mult"][alive, i] = spending_mult[alive]
+        alive &= ~(short | depleted)
+
+    out["months_lasted"] = months_lasted
+    out["final_value"] = final_value
+    return out
+
+def monte_carlo_swp_survival(
+    start_date,
+    years_needed: int,
+    paths: int,
+    random_seed: int,
+    start_nav_map: Dict[str, float],
+    return_panel: pd.DataFrame,
+    corpus_value: float,
+    start_withdrawal_monthly: float,
+    annual_inflation: float,
+    target_weights: Dict[str, float],
+    withdrawal_mode: str,
+    fund_tax_profiles: Dict[str, str],
+    tax_cfg: Dict[str, float],
+    exit_load_days: int,
+    exit_load_pct: float,
+    use_guardrails: bool,
+    guardrail_upper_mult: float,
+    guardrail_lower_mult: float,
+    guardrail_cut_pct: float,
+    guardrail_raise_pct: float,
+) -> Dict[str, float]:
+    months = int(max(1, years_needed * 12))
+    if return_panel is None or return_panel.empty or len(return_panel) < 12 or not start_nav_map:
+        return {"survival_prob": np.nan, "p10_end": np.nan, "p50_end": np.nan, "p90_end": np.nan, "paths": 0}
+
+    funds = [f for f in start_nav_map.keys() if f in return_panel.columns]
+    if not funds:
+        return {"survival_prob": np.nan, "p10_end": np.nan, "p50_end": np.nan, "p90_end": np.nan, "paths": 0}
+
+    rp = return_panel[funds].dropna()
+    if rp.empty:
+        return {"survival_prob": np.nan, "p10_end": np.nan, "p50_end": np.nan, "p90_end": np.nan, "paths": 0}
+
+    rng = np.random.default_rng(int(random_seed))
+    n_paths = int(max(1, paths))
+    # One draw per path, in path order, so seeded results match the per-path loop.
+    sample_idx = np.empty((n_paths, months), dtype=np.int64)
+    for p in range(n_paths):
+        sample_idx[p] = rng.integers(0, len(rp), size=months)
+
+    active = [nm for nm in funds if float(start_nav_map[nm]) > 0]
+    if not active or corpus_value <= 0 or start_withdrawal_monthly < 0:
+        endings_arr = np.zeros(n_paths, dtype=float)
+        survived = np.zeros(n_paths, dtype=bool)
+    else:
+        if tax_cfg is None:
+            tax_cfg = {
+                "equity_stcg_rate": 0.15,
+                "equity_ltcg_rate": 0.10,
+                "equity_ltcg_days": 365,
+                "debt_stcg_rate": 0.30,
+                "debt_ltcg_rate": 0.20,
+                "debt_ltcg_days": 1095,
+            }
+        if fund_tax_profiles is None:
+            fund_tax_profiles = {nm: infer_tax_profile_from_name(nm) for nm in active}
+        rets = rp[active].to_numpy(dtype=float)
+        endings_parts, survived_parts = [], []
+        for lo in range(0, n_paths, MC_PATH_CHUNK):
+            res = simulate_swp_multifund_paths(
+                start_navs=np.array([float(start_nav_map[nm]) for nm in active], dtype=float),
+                monthly_returns=rets,
+                sample_idx=sample_idx[lo : lo + MC_PATH_CHUNK],
+                start_date=start_date,
+                corpus_value=corpus_value,
+                start_withdrawal_monthly=start_withdrawal_monthly,
+                annual_inflation=annual_inflation,
+                weights=np.array([float(target_weights.get(nm, 0.0)) for nm in active], dtype=float),
+                tax_profiles=[fund_tax_profiles.get(nm, "Equity") for nm in active],
+                tax_cfg=tax_cfg,
+                rebalance_every_months=24,
+                withdrawal_mode=withdrawal_mode,
+                exit_load_days=exit_load_days,
+                exit_load_pct=exit_load_pct,
+                use_guardrails=use_guardrails,
+                guardrail_upper_mult=guardrail_upper_mult,
+                guardrail_lower_mult=guardrail_lower_mult,
+                guardrail_cut_pct=guardrail_cut_pct,
+                guardrail_raise_pct=guardrail_raise_pct,
+            )
+            endings_parts.append(res["final_value"])
+            survived_parts.append(res["months_lasted"] >= months)
+        endings_arr = np.concatenate(endings_parts)
+        survived = np.concatenate(survived_parts)
+
+    return {
+        "survival_prob": float(survived.sum() / max(1, len(endings_arr))),
+        "p10_end": float(np.nanpercentile(endings_arr, 10)),
+        "p50_end": float(np.nanpercentile(endings_arr, 50)),
+        "p90_end": float(np.nanpercentile(endings_arr, 90)),
+        "paths": int(len(endings_arr)),
+    }
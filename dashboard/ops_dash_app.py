@@ -6,6 +6,7 @@ import os
 import re
 import secrets
 import subprocess
+import sys
 import time
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
@@ -18,9 +19,13 @@ from dash import Dash, Input, Output, dcc, html, dash_table, no_update
 from dash.exceptions import PreventUpdate
 from flask import Response, request
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.broker_gateway import STATUS_SCRIPT, GatewayError, GatewayUnavailable, gateway_call, parse_status_output  # noqa: E402
 from mf_dash_utils import fetch_nav_history, fetch_scheme_list, filter_nav_timeframe, normalize_nav
 
-ROOT = Path(__file__).resolve().parents[1]
 REPORTS_DIR = ROOT / "reports"
 INTERMEDIARY_DIR = ROOT / "intermediary_files"
 TWITTER_DIR = INTERMEDIARY_DIR / "twitter_sentiment"
@@ -402,17 +407,17 @@ def get_equity_spot_snapshot(symbol: str | None) -> dict[str, Any]:
         return cached.get("data") or {}
 
     data: dict[str, Any] = {}
-    hist_path = INTERMEDIARY_DIR / "Hist_Data" / f"{symbol}.feather"
     try:
-        if hist_path.exists():
-            hist = normalize_price_history(pd.read_feather(hist_path))
-            if hist is not None and not hist.empty:
-                last = hist.iloc[-1]
-                data = {
-                    "price": round(float(last["Close"]), 2),
-                    "date": pd.Timestamp(last["Date"]).isoformat(),
-                    "source": "local_hist",
-                }
+        from Auto_Trader import hist_data
+
+        hist = normalize_price_history(hist_data.read_history(INTERMEDIARY_DIR / "Hist_Data", symbol))
+        if hist is not None and not hist.empty:
+            last = hist.iloc[-1]
+            data = {
+                "price": round(float(last["Close"]), 2),
+                "date": pd.Timestamp(last["Date"]).isoformat(),
+                "source": "local_hist",
+            }
     except Exception:
         data = {}
 
@@ -915,32 +920,20 @@ def fetch_server_snapshot(force: bool = False) -> dict[str, Any]:
     now = time.time()
     if not force and SERVER_CACHE.get("data") is not None and now - SERVER_CACHE.get("ts", 0.0) < SSH_TTL_SECONDS:
         return SERVER_CACHE["data"]
+    try:
+        data = gateway_call("status", timeout=10)
+        SERVER_CACHE.update({"ts": now, "data": data})
+        return data
+    except GatewayUnavailable:
+        pass
+    except GatewayError as exc:
+        data = {"ok": False, "error": str(exc)}
+        SERVER_CACHE.update({"ts": now, "data": data})
+        return data
     if not SERVER_KEY.exists():
         data = {"ok": False, "error": f"Missing SSH key: {SERVER_KEY}"}
         SERVER_CACHE.update({"ts": now, "data": data})
         return data
-    remote = f"""
-set -e
-cd {SERVER_REPO}
-echo '[host]'
-hostname
-echo '[time]'
-date -Is
-echo '[service]'
-systemctl is-active auto_trade.service || true
-echo '[substate]'
-systemctl show auto_trade.service --property=SubState --value || true
-echo '[pid]'
-systemctl show auto_trade.service --property=ExecMainPID --value || true
-echo '[restarts]'
-systemctl show auto_trade.service --property=NRestarts --value || true
-echo '[active_since]'
-systemctl show auto_trade.service --property=ActiveEnterTimestamp --value || true
-echo '[recent_reports]'
-ls -1t reports | head -20 || true
-echo '[journal]'
-journalctl -u auto_trade.service -n 15 --no-pager || true
-"""
     try:
         proc = subprocess.run(
             [
@@ -952,35 +945,13 @@ journalctl -u auto_trade.service -n 15 --no-pager || true
                 "-o",
                 "ConnectTimeout=10",
                 SERVER_HOST,
-                remote,
+                STATUS_SCRIPT.format(repo=SERVER_REPO),
             ],
             capture_output=True,
             text=True,
             timeout=25,
         )
-        stdout = proc.stdout or ""
-        sections: dict[str, list[str]] = {}
-        current: str | None = None
-        for line in stdout.splitlines():
-            if line.startswith("[") and line.endswith("]"):
-                current = line.strip("[]")
-                sections[current] = []
-            elif current:
-                sections[current].append(line)
-        data = {
-            "ok": proc.returncode == 0,
-            "stdout": stdout,
-            "stderr": proc.stderr,
-            "host": "\n".join(sections.get("host", [])).strip(),
-            "time": "\n".join(sections.get("time", [])).strip(),
-            "service": "\n".join(sections.get("service", [])).strip(),
-            "substate": "\n".join(sections.get("substate", [])).strip(),
-            "pid": "\n".join(sections.get("pid", [])).strip(),
-            "restarts": "\n".join(sections.get("restarts", [])).strip(),
-            "active_since": "\n".join(sections.get("active_since", [])).strip(),
-            "recent_reports": sections.get("recent_reports", []),
-            "journal": sections.get("journal", []),
-        }
+        data = parse_status_output(proc.stdout or "", proc.stderr, proc.returncode)
     except Exception as exc:
         data = {"ok": False, "error": str(exc)}
     SERVER_CACHE.update({"ts": now, "data": data})
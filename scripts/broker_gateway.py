@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""Long-lived local broker gateway for Telegram/ops tooling.
+
+Every Telegram contract lookup, option history pull and ops-dashboard status
+probe used to pay ``ssh`` + a fresh remote interpreter + ``import Auto_Trader``
++ a new ``KiteConnect`` per request. This service runs once on the Auto_Trader
+host, keeps one authenticated Kite client (pooled HTTP connections, reloaded
+when ``access_token.json`` changes), the daily instrument master and a short
+TTL response cache in memory, and serves a small JSON API on localhost:
+
+- ``GET  /health``      gateway liveness and session state
+- ``GET  /status``      ``auto_trade.service`` status/journal snapshot
+- ``POST /ltp``         ``{"instruments": ["NFO:...", ...]}`` (chunked to API limits)
+- ``POST /quote``       same payload, full quotes
+- ``POST /contracts``   nearest-expiry option contracts for many calls
+- ``POST /resolve``     Telegram contract resolver (``telegram_contract_price_resolver``)
+- ``POST /historical``  ``{"instrument_token", "from", "to", "interval"}`` OHLC(+OI) rows
+
+Safety rule (same as ``kite_ws_price_fallback``): the gateway never creates a
+Kite access token. ``wednesday.py`` remains the only component that logs in.
+
+Laptop tooling reaches the gateway through an SSH tunnel
+(``ssh -N -L 8790:127.0.0.1:8790 ubuntu@<host>``) or ``AT_BROKER_GATEWAY_URL``.
+When the gateway is unreachable, callers fall back to their old SSH path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+GATEWAY_HOST = os.getenv("AT_BROKER_GATEWAY_HOST", "127.0.0.1")
+GATEWAY_PORT = int(os.getenv("AT_BROKER_GATEWAY_PORT", "8790"))
+GATEWAY_URL = os.getenv("AT_BROKER_GATEWAY_URL", f"http://127.0.0.1:{GATEWAY_PORT}")
+GATEWAY_ENABLED = os.getenv("AT_BROKER_GATEWAY", "1").strip().lower() not in {"0", "false", "no"}
+TOKEN_PATH = ROOT / "intermediary_files" / "access_token.json"
+
+QUOTE_TTL_SEC = float(os.getenv("AT_BROKER_GATEWAY_QUOTE_TTL_SEC", "1.0"))
+HISTORY_TTL_SEC = float(os.getenv("AT_BROKER_GATEWAY_HISTORY_TTL_SEC", "60"))
+STATUS_TTL_SEC = float(os.getenv("AT_BROKER_GATEWAY_STATUS_TTL_SEC", "5"))
+# Kite REST limits: ltp/ohlc accept 1000 instruments per call, quote 500.
+LTP_CHUNK = 1000
+QUOTE_CHUNK = 500
+
+logger = logging.getLogger("broker_gateway")
+
+STATUS_SCRIPT = """
+set -e
+cd {repo}
+echo '[host]'
+hostname
+echo '[time]'
+date -Is
+echo '[service]'
+systemctl is-active auto_trade.service || true
+echo '[substate]'
+systemctl show auto_trade.service --property=SubState --value || true
+echo '[pid]'
+systemctl show auto_trade.service --property=ExecMainPID --value || true
+echo '[restarts]'
+systemctl show auto_trade.service --property=NRestarts --value || true
+echo '[active_since]'
+systemctl show auto_trade.service --property=ActiveEnterTimestamp --value || true
+echo '[recent_reports]'
+ls -1t reports | head -20 || true
+echo '[journal]'
+journalctl -u auto_trade.service -n 15 --no-pager || true
+"""
+
+
+def parse_status_output(stdout: str, stderr: str, returncode: int) -> dict[str, Any]:
+    """Split the ``[section]`` blocks printed by ``STATUS_SCRIPT``."""
+    sections: dict[str, list[str]] = {}
+    current: str | None = None
+    for line in stdout.splitlines():
+        if line.startswith("[") and line.endswith("]"):
+            current = line.strip("[]")
+            sections[current] = []
+        elif current:
+            sections[current].append(line)
+
+    def _text(name: str) -> str:
+        return "\n".join(sections.get(name, [])).strip()
+
+    return {
+        "ok": returncode == 0,
+        "stdout": stdout,
+        "stderr": stderr,
+        "host": _text("host"),
+        "time": _text("time"),
+        "service": _text("service"),
+        "substate": _text("substate"),
+        "pid": _text("pid"),
+        "restarts": _text("restarts"),
+        "active_since": _text("active_since"),
+        "recent_reports": sections.get("recent_reports", []),
+        "journal": sections.get("journal", []),
+    }
+
+
+def nearest_contracts(master, queries: list[dict[str, Any]]) -> list[dict[str, Any] | None]:
+    """Nearest on/after-call-date contract per query (``telegram_options_paper_trader`` semantics)."""
+    from Auto_Trader.instrument_master import CONTRACT_KEYS
+
+    out: list[dict[str, Any] | None] = []
+    for q in queries:
+        if q.get("month_hint") and q.get("month") is None:
+            out.append(None)
+            continue
+        rec = master.nearest_expiry_on_or_after(q["symbol"], q["side"], q["strike"], q["call_date"], month=q.get("month"))
+        out.append({k: rec[k] for k in CONTRACT_KEYS} if rec else None)
+    return out
+
+
+def history_rows(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Kite ``historical_data`` rows in the Date/OHLCV/OI shape the paper trader expects."""
+    out = []
+    for row in rows:
+        dt = row.get("date")
+        if hasattr(dt, "isoformat"):
+            dt = dt.isoformat()
+        out.append({
+            "Date": dt,
+            "Open": row.get("open"),
+            "High": row.get("high"),
+            "Low": row.get("low"),
+            "Close": row.get("close"),
+            "Volume": row.get("volume"),
+            "OI": row.get("oi"),
+        })
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Client side
+# ---------------------------------------------------------------------------
+
+
+class GatewayError(RuntimeError):
+    """The gateway answered but could not serve the request."""
+
+
+class GatewayUnavailable(GatewayError):
+    """No gateway is listening (disabled, not running, or tunnel down)."""
+
+
+def gateway_call(endpoint: str, payload: dict[str, Any] | None = None, *, timeout: float = 30.0, url: str | None = None) -> Any:
+    """Call one gateway endpoint and return its ``data`` field.
+
+    ``payload=None`` issues a GET. Raises ``GatewayUnavailable`` when nothing
+    is listening so callers can fall back to their SSH path.
+    """
+    if not GATEWAY_ENABLED:
+        raise GatewayUnavailable("broker gateway disabled (AT_BROKER_GATEWAY=0)")
+    target = (url or GATEWAY_URL).rstrip("/") + "/" + endpoint.lstrip("/")
+    body = None if payload is None else json.dumps(payload, default=str).encode("utf-8")
+    req = urllib.request.Request(target, data=body, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            result = json.loads(resp.read().decode("utf-8") or "{}")
+    except urllib.error.HTTPError as exc:
+        try:
+            detail = json.loads(exc.read().decode("utf-8") or "{}").get("error")
+        except Exception:
+            detail = None
+        raise GatewayError(detail or f"gateway HTTP {exc.code}") from exc
+    except (urllib.error.URLError, ConnectionError, TimeoutError, OSError) as exc:
+        raise GatewayUnavailable(str(getattr(exc, "reason", exc))) from exc
+    if not result.get("ok", False):
+        raise GatewayError(result.get("error") or "gateway request failed")
+    return result.get("data")
+
+
+# ---------------------------------------------------------------------------
+# Server side
+# ---------------------------------------------------------------------------
+
+
+class KiteSession:
+    """One pooled KiteConnect, rebuilt only when the cached token file changes."""
+
+    def __init__(self, token_path: Path = TOKEN_PATH, pool_size: int = 10):
+        self.token_path = token_path
+        self.pool_size = pool_size
+        self._kite = None
+        self._mtime: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._kite is not None
+
+    def client(self):
+        try:
+            mtime = self.token_path.stat().st_mtime
+        except FileNotFoundError as exc:
+            raise RuntimeError(f"no Kite access token at {self.token_path}") from exc
+        with self._lock:
+            if self._kite is None or mtime != self._mtime:
+                from kiteconnect import KiteConnect  # type: ignore
+
+                from scripts.telegram_contract_price_resolver import API_KEY, read_access_token
+
+                kite = KiteConnect(api_key=API_KEY, pool={"pool_connections": self.pool_size, "pool_maxsize": self.pool_size})
+                kite.set_access_token(read_access_token())
+                self._kite, self._mtime = kite, mtime
+                logger.info("Kite session (re)loaded from %s", self.token_path)
+            return self._kite
+
+
+class TTLCache:
+    def __init__(self):
+        self._data: dict[Any, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, ttl: float) -> Any:
+        with self._lock:
+            hit = self._data.get(key)
+        if hit is None or time.monotonic() - hit[0] > ttl:
+            return None
+        return hit[1]
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            if len(self._data) > 50_000:
+                cutoff = time.monotonic() - max(HISTORY_TTL_SEC, QUOTE_TTL_SEC, STATUS_TTL_SEC)
+                self._data = {k: v for k, v in self._data.items() if v[0] >= cutoff}
+
+
+class Gateway:
+    """Request handlers; transport-independent so they can be exercised directly."""
+
+    def __init__(self, session: KiteSession | Any, *, repo: Path = ROOT):
+        self.session = session
+        self.repo = repo
+        self.cache = TTLCache()
+        self.started = time.time()
+        self.routes: dict[tuple[str, str], Callable[[dict[str, Any]], Any]] = {
+            ("GET", "/health"): self.health,
+            ("GET", "/status"): self.status,
+            ("POST", "/ltp"): self.ltp,
+            ("POST", "/quote"): self.quote,
+            ("POST", "/contracts"): self.contracts,
+            ("POST", "/resolve"): self.resolve,
+            ("POST", "/historical"): self.historical,
+        }
+
+    def health(self, _payload: dict[str, Any]) -> dict[str, Any]:
+        return {"session": bool(getattr(self.session, "ready", False)), "uptime_sec": round(time.time() - self.started, 1)}
+
+    def status(self, _payload: dict[str, Any]) -> dict[str, Any]:
+        cached = self.cache.get("status", STATUS_TTL_SEC)
+        if cached is not None:
+            return cached
+        proc = subprocess.run(
+            ["bash", "-c", STATUS_SCRIPT.format(repo=self.repo)], capture_output=True, text=True, timeout=20
+        )
+        data = parse_status_output(proc.stdout or "", proc.stderr or "", proc.returncode)
+        self.cache.put("status", data)
+        return data
+
+    def _batched(self, kind: str, instruments: list[str], chunk: int) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        missing: list[str] = []
+        for inst in dict.fromkeys(str(i) for i in instruments):
+            hit = self.cache.get((kind, inst), QUOTE_TTL_SEC)
+            if hit is None:
+                missing.append(inst)
+            else:
+                out[inst] = hit
+        if missing:
+            kite = self.session.client()
+            fetch = kite.ltp if kind == "ltp" else kite.quote
+            for i in range(0, len(missing), chunk):
+                for inst, item in (fetch(missing[i:i + chunk]) or {}).items():
+                    self.cache.put((kind, inst), item)
+                    out[inst] = item
+        return out
+
+    def ltp(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return self._batched("ltp", list(payload.get("instruments") or []), LTP_CHUNK)
+
+    def quote(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return self._batched("quote", list(payload.get("instruments") or []), QUOTE_CHUNK)
+
+    def contracts(self, payload: dict[str, Any]) -> list[dict[str, Any] | None]:
+        from Auto_Trader.instrument_master import load_instrument_master
+
+        master = load_instrument_master(self.session.client())
+        return nearest_contracts(master, list(payload.get("queries") or []))
+
+    def resolve(self, payload: dict[str, Any]) -> list[dict[str, Any]]:
+        from scripts.telegram_contract_price_resolver import resolve_contracts
+
+        calls = list(payload.get("calls") or [])
+        return resolve_contracts(self.session.client(), calls) if calls else []
+
+    def historical(self, payload: dict[str, Any]) -> list[dict[str, Any]]:
+        token = int(payload["instrument_token"])
+        start = datetime.fromisoformat(str(payload["from"]).replace("Z", "+00:00"))
+        end = datetime.fromisoformat(str(payload["to"]).replace("Z", "+00:00"))
+        interval = str(payload.get("interval") or "day")
+        oi = bool(payload.get("oi", True))
+        key = ("historical", token, start.isoformat(), end.isoformat(), interval, oi)
+        cached = self.cache.get(key, HISTORY_TTL_SEC)
+        if cached is not None:
+            return cached
+        rows = history_rows(self.session.client().historical_data(token, start, end, interval, oi=oi))
+        self.cache.put(key, rows)
+        return rows
+
+    def handle(self, method: str, path: str, payload: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        route = self.routes.get((method, path.split("?", 1)[0].rstrip("/") or "/"))
+        if route is None:
+            return 404, {"ok": False, "error": f"unknown endpoint {method} {path}"}
+        try:
+            return 200, {"ok": True, "data": route(payload)}
+        except (KeyError, TypeError, ValueError) as exc:
+            return 400, {"ok": False, "error": f"bad request: {exc}"}
+        except Exception as exc:
+            logger.warning("gateway %s %s failed: %s", method, path, exc)
+            return 502, {"ok": False, "error": str(exc)[:500]}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "GatewayServer"
+
+    def _reply(self, code: int, body: dict[str, Any]) -> None:
+        raw = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self) -> None:  # noqa: N802
+        self._reply(*self.server.gateway.handle("GET", self.path, {}))
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length).decode("utf-8") or "{}") if length else {}
+        except json.JSONDecodeError as exc:
+            self._reply(400, {"ok": False, "error": f"invalid json: {exc}"})
+            return
+        self._reply(*self.server.gateway.handle("POST", self.path, payload))
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        logger.debug("%s - " + fmt, self.address_string(), *args)
+
+
+class GatewayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], gateway: Gateway):
+        super().__init__(address, _Handler)
+        self.gateway = gateway
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Serve the local broker gateway (Kite session + instrument master + cache).")
+    ap.add_argument("--host", default=GATEWAY_HOST)
+    ap.add_argument("--port", type=int, default=GATEWAY_PORT)
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s %(message)s")
+    os.environ.setdefault("AT_RESEARCH_MODE", "1")  # no ticker/rule engines in this process
+    server = GatewayServer((args.host, args.port), Gateway(KiteSession()))
+    logger.info("Broker gateway listening on http://%s:%s", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
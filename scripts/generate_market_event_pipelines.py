@@ -4,11 +4,13 @@ from __future__ import annotations
 import json
 import re
 import sys
+import warnings
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 
@@ -16,6 +18,7 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from Auto_Trader import hist_data  # type: ignore
 from Auto_Trader.news_sentiment import SECTOR_STOCK_MAP  # type: ignore
 
 REPORTS = ROOT / 'reports'
@@ -120,11 +123,9 @@ def normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame | None:
 
 
 def load_local_history(symbol: str) -> pd.DataFrame | None:
-    path = HIST_DIR / f'{symbol}.feather'
-    if not path.exists():
-        return None
     try:
-        return normalize_ohlcv(pd.read_feather(path))
+        raw = hist_data.read_raw(HIST_DIR, symbol)
+        return normalize_ohlcv(raw) if raw is not None else None
     except Exception:
         return None
 
@@ -249,45 +250,132 @@ def direction_label(direction: int) -> str:
     return 'neutral'
 
 
-def compute_forward_behavior(symbol: str, event_dt: datetime, cache: dict[str, pd.DataFrame]) -> dict[str, Any] | None:
-    df = get_price_frame(symbol, cache, event_dt - timedelta(days=20), event_dt + timedelta(days=20))
-    if df is None or df.empty:
-        return None
-    forward = df[df['Date'] >= pd.Timestamp(event_dt.date())].reset_index(drop=True)
-    if forward.empty:
-        return None
-    entry = float(forward.iloc[0]['Close'])
-    if not entry:
-        return None
-    future = forward.iloc[1:].reset_index(drop=True)
-    out: dict[str, Any] = {'entry_price': round(entry, 4), 'available_bars': int(len(future))}
-    for n in [1, 3, 5, 10]:
-        if len(future) >= n:
-            out[f'ret_{n}d_pct'] = round((float(future.iloc[n - 1]['Close']) / entry - 1.0) * 100.0, 2)
-        else:
-            out[f'ret_{n}d_pct'] = None
-    window = future.head(5)
-    if not window.empty:
-        out['max_upside_5d_pct'] = round((float(window['High'].max()) / entry - 1.0) * 100.0, 2)
-        out['max_drawdown_5d_pct'] = round((float(window['Low'].min()) / entry - 1.0) * 100.0, 2)
-    else:
-        out['max_upside_5d_pct'] = None
-        out['max_drawdown_5d_pct'] = None
-    return out
+FORWARD_HORIZONS = (1, 3, 5, 10)
+EXCURSION_BARS = 5
+# Composite (symbol, day) search key: symbol code in the high digits, days since epoch below.
+_DAY_KEY_SPAN = 1_000_000
 
 
-def average(values: list[Any]) -> float | None:
-    clean = [float(v) for v in values if isinstance(v, (int, float))]
-    if not clean:
-        return None
-    return round(sum(clean) / len(clean), 2)
+def load_price_panel(event_days: dict[str, list[pd.Timestamp]], cache: dict[str, pd.DataFrame]) -> dict[str, Any]:
+    """Load every symbol once and flatten the bars into one (symbol, day)-sorted panel."""
+    symbols: list[str] = []
+    keys: list[Any] = []
+    closes: list[Any] = []
+    highs: list[Any] = []
+    lows: list[Any] = []
+    bounds: list[tuple[int, int]] = []
+    offset = 0
+    for symbol, days in event_days.items():
+        if not days:
+            continue
+        first, last = min(days), max(days)
+        df = get_price_frame(symbol, cache, first.to_pydatetime() - timedelta(days=20), last.to_pydatetime() + timedelta(days=20))
+        if df is None or df.empty:
+            continue
+        code = len(symbols)
+        day = df['Date'].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+        close = df['Close'].to_numpy(dtype=float)
+        high = df['High'].to_numpy(dtype=float) if 'High' in df.columns else np.full(len(df), np.nan)
+        low = df['Low'].to_numpy(dtype=float) if 'Low' in df.columns else np.full(len(df), np.nan)
+        symbols.append(symbol)
+        keys.append(code * _DAY_KEY_SPAN + day)
+        closes.append(close)
+        highs.append(high)
+        lows.append(low)
+        bounds.append((offset, offset + len(df)))
+        offset += len(df)
+    if not symbols:
+        return {'codes': {}}
+    return {
+        'codes': {sym: i for i, sym in enumerate(symbols)},
+        'key': np.concatenate(keys),
+        'close': np.concatenate(closes),
+        'high': np.concatenate(highs),
+        'low': np.concatenate(lows),
+        'end': np.array([b[1] for b in bounds], dtype=np.int64),
+    }
 
 
-def positive_rate(values: list[Any]) -> float | None:
-    clean = [float(v) for v in values if isinstance(v, (int, float))]
-    if not clean:
-        return None
-    return round(sum(1 for v in clean if v > 0) / len(clean) * 100.0, 1)
+def _pct_or_none(values: np.ndarray) -> list[float | None]:
+    return [round(float(v), 2) if np.isfinite(v) else None for v in values]
+
+
+def compute_forward_behavior_batch(
+    symbols: list[str],
+    event_dts: list[datetime],
+    cache: dict[str, pd.DataFrame],
+) -> list[dict[str, Any] | None]:
+    """Forward returns and 5-bar excursions for many (symbol, event) pairs in one gather.
+
+    Each event is mapped to its entry bar (first bar on or after the event date) with a
+    single ``searchsorted`` over the flattened panel; every horizon is then read with one
+    fancy-index lookup instead of slicing a frame per event.
+    """
+    if not symbols:
+        return []
+    event_day_ts = [pd.Timestamp(dt.date()) for dt in event_dts]
+    by_symbol: dict[str, list[pd.Timestamp]] = defaultdict(list)
+    for symbol, day in zip(symbols, event_day_ts):
+        by_symbol[symbol].append(day)
+    panel = load_price_panel(by_symbol, cache)
+    codes = panel['codes']
+    if not codes:
+        return [None] * len(symbols)
+
+    code = np.array([codes.get(sym, -1) for sym in symbols], dtype=np.int64)
+    known = code >= 0
+    code = np.where(known, code, 0)
+    day = np.array([ts.value // 86_400_000_000_000 for ts in event_day_ts], dtype=np.int64)
+    pos = np.searchsorted(panel['key'], code * _DAY_KEY_SPAN + day, side='left')
+    end = panel['end'][code]
+    valid = known & (pos < end)
+    safe_pos = np.where(valid, pos, 0)
+
+    close = panel['close']
+    entry = np.where(valid, close[safe_pos], np.nan)
+    valid &= np.isfinite(entry) & (entry != 0)
+    available = np.where(valid, end - pos - 1, 0)
+
+    horizons = np.asarray(FORWARD_HORIZONS, dtype=np.int64)
+    fwd_idx = safe_pos[:, None] + horizons[None, :]
+    fwd_ok = valid[:, None] & (horizons[None, :] <= available[:, None])
+    fwd_close = np.where(fwd_ok, close[np.where(fwd_ok, fwd_idx, 0)], np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = (fwd_close / entry[:, None] - 1.0) * 100.0
+
+    steps = np.arange(1, EXCURSION_BARS + 1, dtype=np.int64)
+    win_idx = safe_pos[:, None] + steps[None, :]
+    win_ok = valid[:, None] & (steps[None, :] <= available[:, None])
+    win_idx = np.where(win_ok, win_idx, 0)
+    win_high = np.where(win_ok, panel['high'][win_idx], np.nan)
+    win_low = np.where(win_ok, panel['low'][win_idx], np.nan)
+    has_window = win_ok.any(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        upside = (np.nanmax(np.where(has_window[:, None], win_high, 0.0), axis=1) / entry - 1.0) * 100.0
+        drawdown = (np.nanmin(np.where(has_window[:, None], win_low, 0.0), axis=1) / entry - 1.0) * 100.0
+    upside = np.where(has_window, upside, np.nan)
+    drawdown = np.where(has_window, drawdown, np.nan)
+
+    ret_cols = [_pct_or_none(returns[:, j]) for j in range(len(FORWARD_HORIZONS))]
+    upside_col = _pct_or_none(upside)
+    drawdown_col = _pct_or_none(drawdown)
+    out: list[dict[str, Any] | None] = []
+    for i in range(len(symbols)):
+        if not valid[i]:
+            out.append(None)
+            continue
+        item: dict[str, Any] = {'entry_price': round(float(entry[i]), 4), 'available_bars': int(available[i])}
+        for j, n in enumerate(FORWARD_HORIZONS):
+            item[f'ret_{n}d_pct'] = ret_cols[j][i]
+        item['max_upside_5d_pct'] = upside_col[i]
+        item['max_drawdown_5d_pct'] = drawdown_col[i]
+        out.append(item)
+    return out
+
+
+def compute_forward_behavior(symbol: str, event_dt: datetime, cache: dict[str, pd.DataFrame]) -> dict[str, Any] | None:
+    return compute_forward_behavior_batch([symbol], [event_dt], cache)[0]
 
 
 def safe_num(value: Any) -> float | None:
@@ -417,9 +505,31 @@ def get_earnings_snapshot(symbol: str, earnings_date: Any, cache: dict[str, dict
     }
 
 
+def _group_stats(frame: pd.DataFrame, keys: list[str], ret_cols: list[str]) -> pd.DataFrame:
+    """Per-group event counts, 2dp means and 3d positive rate in one grouped pass."""
+    grouped = frame.groupby(keys, sort=False)
+    stats = grouped.size().rename('events').to_frame()
+    for col in ret_cols:
+        stats[f'avg_{col}'] = grouped[col].mean().round(2)
+    ret_3d = frame['ret_3d_pct']
+    positive = (ret_3d > 0).astype(float).where(ret_3d.notna())
+    stats['positive_rate_3d'] = (positive.groupby([frame[k] for k in keys], sort=False).mean() * 100.0).round(1)
+    return stats
+
+
+def _none_if_nan(value: Any) -> Any:
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+
 def build_news_behavior(rows: list[dict[str, Any]], registry: dict[str, list[str]]) -> dict[str, Any]:
     cache: dict[str, pd.DataFrame] = {}
-    events: list[dict[str, Any]] = []
+    candidates: list[dict[str, Any]] = []
     seen: set[tuple[str, str]] = set()
 
     for row in rows:
@@ -443,47 +553,62 @@ def build_news_behavior(rows: list[dict[str, Any]], registry: dict[str, list[str
             if dedupe_key in seen:
                 continue
             seen.add(dedupe_key)
-            behavior = compute_forward_behavior(symbol, row['_dt'], cache)
-            if not behavior:
-                continue
-            event = {**base, 'symbol': symbol, **behavior}
-            ret_3d = event.get('ret_3d_pct')
-            event['alignment_3d_pct'] = round(float(ret_3d) * direction, 2) if direction and isinstance(ret_3d, (int, float)) else None
-            events.append(event)
-
-    pair_groups: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
-    topic_groups: dict[str, list[dict[str, Any]]] = defaultdict(list)
-    for event in events:
-        pair_groups[(str(event.get('topic') or ''), str(event.get('symbol') or ''))].append(event)
-        topic_groups[str(event.get('topic') or '')].append(event)
-
-    top_pairs = []
-    for (topic, symbol), bucket in pair_groups.items():
-        top_pairs.append({
-            'topic': topic,
-            'symbol': symbol,
-            'events': len(bucket),
-            'avg_sentiment': average([b.get('sentiment') for b in bucket]),
-            'avg_ret_1d_pct': average([b.get('ret_1d_pct') for b in bucket]),
-            'avg_ret_3d_pct': average([b.get('ret_3d_pct') for b in bucket]),
-            'avg_ret_5d_pct': average([b.get('ret_5d_pct') for b in bucket]),
-            'avg_alignment_3d_pct': average([b.get('alignment_3d_pct') for b in bucket]),
-            'positive_rate_3d': positive_rate([b.get('ret_3d_pct') for b in bucket]),
-            'latest_title': bucket[-1].get('title'),
-            'latest_published_at': bucket[-1].get('published_at'),
-        })
-    top_pairs.sort(key=lambda x: (x.get('events', 0), x.get('avg_alignment_3d_pct') or -999), reverse=True)
+            candidates.append({**base, 'symbol': symbol, '_dt': row['_dt']})
 
-    topic_rollup = []
-    for topic, bucket in topic_groups.items():
-        topic_rollup.append({
-            'topic': topic,
-            'events': len(bucket),
-            'symbols': len({b.get('symbol') for b in bucket}),
-            'avg_sentiment': average([b.get('sentiment') for b in bucket]),
-            'avg_ret_3d_pct': average([b.get('ret_3d_pct') for b in bucket]),
-            'avg_alignment_3d_pct': average([b.get('alignment_3d_pct') for b in bucket]),
-        })
+    behaviors = compute_forward_behavior_batch(
+        [c['symbol'] for c in candidates], [c['_dt'] for c in candidates], cache
+    )
+    events: list[dict[str, Any]] = []
+    for candidate, behavior in zip(candidates, behaviors):
+        if not behavior:
+            continue
+        candidate.pop('_dt')
+        direction = candidate['direction']
+        event = {**candidate, **behavior}
+        ret_3d = event.get('ret_3d_pct')
+        event['alignment_3d_pct'] = round(float(ret_3d) * direction, 2) if direction and isinstance(ret_3d, (int, float)) else None
+        events.append(event)
+
+    top_pairs: list[dict[str, Any]] = []
+    topic_rollup: list[dict[str, Any]] = []
+    if events:
+        frame = pd.DataFrame(events)
+        frame['topic'] = frame['topic'].fillna('').astype(str)
+        frame['symbol'] = frame['symbol'].fillna('').astype(str)
+        for col in ['sentiment', 'ret_1d_pct', 'ret_3d_pct', 'ret_5d_pct', 'alignment_3d_pct']:
+            frame[col] = pd.to_numeric(frame[col], errors='coerce')
+
+        pairs = _group_stats(frame, ['topic', 'symbol'], ['sentiment', 'ret_1d_pct', 'ret_3d_pct', 'ret_5d_pct', 'alignment_3d_pct'])
+        latest = frame.groupby(['topic', 'symbol'], sort=False).tail(1).set_index(['topic', 'symbol'])
+        pairs['latest_title'] = latest['title']
+        pairs['latest_published_at'] = latest['published_at']
+        for (topic, symbol), rec in pairs.iterrows():
+            top_pairs.append({
+                'topic': topic,
+                'symbol': symbol,
+                'events': int(rec['events']),
+                'avg_sentiment': _none_if_nan(rec['avg_sentiment']),
+                'avg_ret_1d_pct': _none_if_nan(rec['avg_ret_1d_pct']),
+                'avg_ret_3d_pct': _none_if_nan(rec['avg_ret_3d_pct']),
+                'avg_ret_5d_pct': _none_if_nan(rec['avg_ret_5d_pct']),
+                'avg_alignment_3d_pct': _none_if_nan(rec['avg_alignment_3d_pct']),
+                'positive_rate_3d': _none_if_nan(rec['positive_rate_3d']),
+                'latest_title': _none_if_nan(rec['latest_title']),
+                'latest_published_at': _none_if_nan(rec['latest_published_at']),
+            })
+
+        topics = _group_stats(frame, ['topic'], ['sentiment', 'ret_3d_pct', 'alignment_3d_pct'])
+        topics['symbols'] = frame.groupby('topic', sort=False)['symbol'].nunique()
+        for topic, rec in topics.iterrows():
+            topic_rollup.append({
+                'topic': topic,
+                'events': int(rec['events']),
+                'symbols': int(rec['symbols']),
+                'avg_sentiment': _none_if_nan(rec['avg_sentiment']),
+                'avg_ret_3d_pct': _none_if_nan(rec['avg_ret_3d_pct']),
+                'avg_alignment_3d_pct': _none_if_nan(rec['avg_alignment_3d_pct']),
+            })
+    top_pairs.sort(key=lambda x: (x.get('events', 0), x.get('avg_alignment_3d_pct') or -999), reverse=True)
     topic_rollup.sort(key=lambda x: (x.get('avg_alignment_3d_pct') or -999, x.get('events', 0)), reverse=True)
 
     recent_events = sorted(events, key=lambda x: x.get('published_at', 0), reverse=True)[:20]
@@ -510,7 +635,7 @@ def is_earnings_row(row: dict[str, Any]) -> bool:
 def build_earnings_pipeline(rows: list[dict[str, Any]], registry: dict[str, list[str]], eco: dict[str, Any]) -> dict[str, Any]:
     cache: dict[str, pd.DataFrame] = {}
     earnings_meta_cache: dict[str, dict[str, Any]] = {}
-    events: list[dict[str, Any]] = []
+    candidates: list[dict[str, Any]] = []
     seen: set[tuple[str, str]] = set()
 
     for row in rows:
@@ -529,44 +654,57 @@ def build_earnings_pipeline(rows: list[dict[str, Any]], registry: dict[str, list
             if dedupe_key in seen:
                 continue
             seen.add(dedupe_key)
-            behavior = compute_forward_behavior(symbol, row['_dt'], cache)
-            if not behavior:
-                continue
-            ret_3d = behavior.get('ret_3d_pct')
-            event_sentiment = float(((row.get('classification') or {}).get('sentiment')) or 0.0)
-            events.append({
+            candidates.append({
                 'symbol': symbol,
                 'title': headline,
                 'kind': row.get('kind'),
                 'source': row.get('source'),
                 'published_at': int(row.get('published_at') or row.get('fetched_at') or 0),
-                'sentiment': event_sentiment,
+                'sentiment': float(((row.get('classification') or {}).get('sentiment')) or 0.0),
                 'direction': direction,
                 'direction_label': direction_label(direction),
-                'alignment_3d_pct': round(float(ret_3d) * direction, 2) if direction and isinstance(ret_3d, (int, float)) else None,
-                **behavior,
+                '_dt': row['_dt'],
             })
 
-    grouped: dict[str, list[dict[str, Any]]] = defaultdict(list)
-    for event in events:
-        grouped[str(event.get('symbol') or '')].append(event)
+    behaviors = compute_forward_behavior_batch(
+        [c['symbol'] for c in candidates], [c['_dt'] for c in candidates], cache
+    )
+    events: list[dict[str, Any]] = []
+    for candidate, behavior in zip(candidates, behaviors):
+        if not behavior:
+            continue
+        candidate.pop('_dt')
+        direction = candidate['direction']
+        ret_3d = behavior.get('ret_3d_pct')
+        candidate['alignment_3d_pct'] = round(float(ret_3d) * direction, 2) if direction and isinstance(ret_3d, (int, float)) else None
+        events.append({**candidate, **behavior})
 
     eco_by_symbol = {str(row.get('symbol') or '').upper(): row for row in (eco.get('earnings') or [])}
     scoreboard = []
     latest_event_by_symbol: dict[str, dict[str, Any]] = {}
-    for symbol, bucket in grouped.items():
-        latest_event = sorted(bucket, key=lambda x: x.get('published_at', 0), reverse=True)[0]
-        latest_event_by_symbol[symbol] = latest_event
+    stats = pd.DataFrame()
+    if events:
+        frame = pd.DataFrame(events)
+        frame['symbol'] = frame['symbol'].fillna('').astype(str)
+        for col in ['ret_1d_pct', 'ret_3d_pct', 'ret_5d_pct', 'alignment_3d_pct']:
+            frame[col] = pd.to_numeric(frame[col], errors='coerce')
+        stats = _group_stats(frame, ['symbol'], ['ret_1d_pct', 'ret_3d_pct', 'ret_5d_pct', 'alignment_3d_pct'])
+        # Stable sort keeps the first-seen event on published_at ties, matching the per-bucket sort.
+        latest_rows = frame.sort_values('published_at', ascending=False, kind='stable').groupby('symbol', sort=False).head(1)
+        for idx, symbol in zip(latest_rows.index, latest_rows['symbol']):
+            latest_event_by_symbol[symbol] = events[idx]
+    for symbol, rec in stats.iterrows():
+        latest_event = latest_event_by_symbol[symbol]
         snapshot = get_earnings_snapshot(symbol, (eco_by_symbol.get(symbol) or {}).get('earnings_date'), earnings_meta_cache)
         headline = latest_event.get('title')
         scoreboard.append({
             'symbol': symbol,
-            'events': len(bucket),
-            'avg_ret_1d_pct': average([b.get('ret_1d_pct') for b in bucket]),
-            'avg_ret_3d_pct': average([b.get('ret_3d_pct') for b in bucket]),
-            'avg_ret_5d_pct': average([b.get('ret_5d_pct') for b in bucket]),
-            'avg_alignment_3d_pct': average([b.get('alignment_3d_pct') for b in bucket]),
-            'positive_rate_3d': positive_rate([b.get('ret_3d_pct') for b in bucket]),
+            'events': int(rec['events']),
+            'avg_ret_1d_pct': _none_if_nan(rec['avg_ret_1d_pct']),
+            'avg_ret_3d_pct': _none_if_nan(rec['avg_ret_3d_pct']),
+            'avg_ret_5d_pct': _none_if_nan(rec['avg_ret_5d_pct']),
+            'avg_alignment_3d_pct': _none_if_nan(rec['avg_alignment_3d_pct']),
+            'positive_rate_3d': _none_if_nan(rec['positive_rate_3d']),
             'latest_title': headline,
             'latest_published_at': latest_event.get('published_at'),
             'latest_signal': latest_event.get('direction_label'),
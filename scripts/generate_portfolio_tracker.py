@@ -35,6 +35,8 @@ DASHBOARD_DIR = ROOT / "dashboard"
 if str(DASHBOARD_DIR) not in sys.path:
     sys.path.insert(0, str(DASHBOARD_DIR))
 
+from scripts.mf_portfolio_analytics import CashflowLedger, order_key, xirr_many  # noqa: E402
+
 
 # ── Category & risk metadata ──────────────────────────────────────────
 
@@ -250,45 +252,6 @@ def _parse_dt(value: Any) -> datetime | None:
         return None
 
 
-def _xnpv(rate: float, cashflows: list[tuple[datetime, float]]) -> float:
-    if not cashflows:
-        return 0.0
-    t0 = min(d for d, _ in cashflows)
-    total = 0.0
-    for d, amount in cashflows:
-        years = max(0.0, (d - t0).days / 365.0)
-        total += amount / ((1.0 + rate) ** years)
-    return total
-
-
-def _xirr(cashflows: list[tuple[datetime, float]]) -> float | None:
-    flows = [(d, float(v)) for d, v in cashflows if d is not None and abs(float(v)) > 1e-9]
-    if len(flows) < 2 or not any(v < 0 for _, v in flows) or not any(v > 0 for _, v in flows):
-        return None
-    # Bisection is slower than Newton but much more stable for short MF cashflows.
-    low, high = -0.95, 5.0
-    f_low, f_high = _xnpv(low, flows), _xnpv(high, flows)
-    expand = 0
-    while f_low * f_high > 0 and expand < 8:
-        high *= 2
-        f_high = _xnpv(high, flows)
-        expand += 1
-    if f_low * f_high > 0:
-        return None
-    for _ in range(100):
-        mid = (low + high) / 2.0
-        f_mid = _xnpv(mid, flows)
-        if abs(f_mid) < 1e-5:
-            return mid
-        if f_low * f_mid <= 0:
-            high = mid
-            f_high = f_mid
-        else:
-            low = mid
-            f_low = f_mid
-    return (low + high) / 2.0
-
-
 def _order_cashflow_amount(order: dict[str, Any]) -> float:
     amount = _safe_float(order.get("amount"))
     if amount > 0:
@@ -298,10 +261,14 @@ def _order_cashflow_amount(order: dict[str, Any]) -> float:
     return qty * price
 
 
-def _build_mf_cashflows_by_symbol(mf_orders: list[dict[str, Any]], mf_entries: list[dict[str, Any]]) -> tuple[dict[str, list[tuple[datetime, float]]], dict[str, Any]]:
+def _build_mf_cashflows_by_symbol(
+    mf_orders: list[dict[str, Any]],
+    mf_entries: list[dict[str, Any]],
+    ledger: CashflowLedger | None = None,
+) -> tuple[dict[str, list[tuple[datetime, float]]], dict[str, Any]]:
     today = datetime.now().replace(tzinfo=None)
-    flows: dict[str, list[tuple[datetime, float]]] = {}
-    completed_orders = 0
+    ledger = ledger if ledger is not None else CashflowLedger()
+    new_orders = 0
     skipped_orders = 0
     for order in mf_orders or []:
         status = str(order.get("status") or "").upper()
@@ -311,6 +278,9 @@ def _build_mf_cashflows_by_symbol(mf_orders: list[dict[str, Any]], mf_entries: l
         symbol = str(order.get("tradingsymbol") or "").strip().upper()
         if not symbol:
             continue
+        key = order_key(order)
+        if key in ledger:
+            continue
         dt = _parse_dt(order.get("exchange_timestamp") or order.get("order_timestamp"))
         amount = _order_cashflow_amount(order)
         if not dt or amount <= 0:
@@ -318,8 +288,9 @@ def _build_mf_cashflows_by_symbol(mf_orders: list[dict[str, Any]], mf_entries: l
             continue
         tx = str(order.get("transaction_type") or "BUY").upper()
         sign = -1.0 if tx == "BUY" else 1.0
-        flows.setdefault(symbol, []).append((dt, sign * amount))
-        completed_orders += 1
+        ledger.add(key, symbol, dt, sign * amount)
+        new_orders += 1
+    flows = ledger.flows_by_symbol()
 
     total_terminal = 0.0
     for m in mf_entries:
@@ -329,7 +300,8 @@ def _build_mf_cashflows_by_symbol(mf_orders: list[dict[str, Any]], mf_entries: l
             flows.setdefault(symbol, []).append((today, value))
             total_terminal += value
     meta = {
-        "completed_orders_used": completed_orders,
+        "completed_orders_used": len(ledger.orders),
+        "new_orders_recorded": new_orders,
         "orders_skipped": skipped_orders,
         "terminal_value": round(total_terminal, 2),
         "as_of": today.isoformat(timespec="seconds"),
@@ -338,32 +310,47 @@ def _build_mf_cashflows_by_symbol(mf_orders: list[dict[str, Any]], mf_entries: l
 
 
 def enrich_mf_xirr(mf_entries: list[dict[str, Any]], mf_orders: list[dict[str, Any]]) -> dict[str, Any]:
-    flows_by_symbol, meta = _build_mf_cashflows_by_symbol(mf_orders, mf_entries)
+    ledger = CashflowLedger()
+    flows_by_symbol, meta = _build_mf_cashflows_by_symbol(mf_orders, mf_entries, ledger)
+    versions = ledger.symbol_versions()
     today = datetime.now().replace(tzinfo=None)
     all_flows: list[tuple[datetime, float]] = []
-    by_symbol: dict[str, dict[str, Any]] = {}
+    pending: list[tuple[dict[str, Any], str, list[tuple[datetime, float]], str, float, float, float]] = []
     for m in mf_entries:
         symbol = str(m.get("tradingsymbol") or "").strip().upper()
         flows = list(flows_by_symbol.get(symbol, []))
         terminal_value = _safe_float(m.get("current_value"))
         cost_value = _safe_float(m.get("cost_value"))
-        dated_invested = -sum(v for _, v in flows if v < 0)
+        cached = ledger.cached_metrics(symbol, versions.get(symbol, ""))
+        dated_invested = cached["dated_invested"]
         missing_cost = max(0.0, cost_value - dated_invested)
         xirr_source = "kite_completed_orders"
         if missing_cost > max(500.0, cost_value * 0.05):
             # Kite's MF order endpoint is often recent-only. Add a clearly marked
             # synthetic opening lot so the dashboard can still show a usable
             # estimated XIRR while surfacing that exact dated lots are missing.
-            first_dt = min((d for d, v in flows if v < 0), default=today)
+            first_dt = datetime.fromisoformat(cached["first_buy"]) if cached["first_buy"] else today
             synthetic_dt = min(first_dt - timedelta(days=365), today - timedelta(days=365))
             flows.append((synthetic_dt, -missing_cost))
             xirr_source = "estimated_with_synthetic_opening_lot"
         invested = -sum(v for _, v in flows if v < 0)
         redeemed = sum(v for _, v in flows if v > 0) - terminal_value
-        x = _xirr(flows)
+        pending.append((m, symbol, flows, xirr_source, missing_cost, invested, redeemed))
+        all_flows.extend(flows)
+
+    # One batched solve for every holding plus the portfolio, warm-started from the last run.
+    flow_sets = [flows for _, _, flows, *_ in pending] + [all_flows]
+    guesses = [(ledger.solutions.get(symbol) or {}).get("rate") for _, symbol, *_ in pending]
+    guesses.append((ledger.solutions.get("__portfolio__") or {}).get("rate"))
+    rates = xirr_many(flow_sets, guesses)
+
+    by_symbol: dict[str, dict[str, Any]] = {}
+    for (m, symbol, flows, xirr_source, missing_cost, invested, redeemed), x in zip(pending, rates):
         if x is not None:
             m["xirr_pct"] = round(x * 100.0, 2)
             m["xirr_available"] = True
+            if symbol in ledger.solutions:
+                ledger.solutions[symbol]["rate"] = x
         else:
             # Holding gain is not XIRR; keep it visibly separate.
             m["xirr_pct"] = None
@@ -379,13 +366,15 @@ def enrich_mf_xirr(mf_entries: list[dict[str, Any]], mf_orders: list[dict[str, A
             "current_value": m.get("current_value"),
             "cashflow_count": len(flows),
         }
-        all_flows.extend(flows)
-    portfolio_xirr = _xirr(all_flows)
+    portfolio_xirr = rates[-1]
+    if portfolio_xirr is not None:
+        ledger.solutions["__portfolio__"] = {"rate": portfolio_xirr}
+    ledger.save()
     return {
         "portfolio_xirr_pct": round(portfolio_xirr * 100.0, 2) if portfolio_xirr is not None else None,
         "by_symbol": by_symbol,
         **meta,
-        "method": "Completed Kite MF orders as dated cash outflows/inflows plus current holding value as terminal inflow. Processing orders are excluded.",
+        "method": "Completed Kite MF orders (kept in a persisted cashflow ledger across runs) as dated cash outflows/inflows plus current holding value as terminal inflow. Processing orders are excluded.",
     }
 
 
@@ -411,33 +400,28 @@ def _tokens(text: str) -> set[str]:
 
 def _match_scheme_code(query: str) -> tuple[int | None, str | None]:
     try:
-        from mf_dash_utils import fetch_scheme_list
+        import numpy as np
+        from mf_dash_utils import fetch_scheme_list, load_scheme_index
         schemes = fetch_scheme_list()
     except Exception:
         return None, None
     qtok = _tokens(query)
     if not qtok:
         return None, None
-    best_score = -1.0
-    best = None
-    for row in schemes.itertuples(index=False):
-        name = str(row.scheme_name)
-        ntok = _tokens(name)
-        if not ntok:
-            continue
-        score = len(qtok & ntok) / max(1, len(qtok | ntok))
-        # Prefer direct growth matches.
-        lname = name.lower()
-        if "direct" in lname:
-            score += 0.08
-        if "growth" in lname:
-            score += 0.05
-        if score > best_score:
-            best_score = score
-            best = row
-    if best is None or best_score < 0.28:
+    index = load_scheme_index(schemes["scheme_name"].astype(str).tolist(), "tracker_tokens", _tokens)
+    ids, overlap = index.overlap(qtok)
+    if not ids.size:
+        return None, None
+    # Jaccard over token sets; names sharing no token can never reach the threshold.
+    score = overlap / (len(qtok) + index.doc_len[ids] - overlap)
+    # Prefer direct growth matches.
+    score = score + 0.08 * index.contains("direct")[ids]
+    score = score + 0.05 * index.contains("growth")[ids]
+    best = int(np.argmax(score))
+    if score[best] < 0.28:
         return None, None
-    return int(best.scheme_code), str(best.scheme_name)
+    row = schemes.iloc[int(ids[best])]
+    return int(row["scheme_code"]), str(row["scheme_name"])
 
 
 def _nav_metric_for_query(query: str) -> dict[str, Any] | None:
@@ -445,7 +429,7 @@ def _nav_metric_for_query(query: str) -> dict[str, Any] | None:
     if not code:
         return None
     try:
-        from mf_dash_utils import fetch_nav_history
+        from mf_nav_store import fetch_nav_history
         import pandas as pd
         nav = fetch_nav_history(code)
         if nav is None or nav.empty or len(nav) < 120:
@@ -5,9 +5,10 @@ This script is intentionally *not* a replacement for ``wednesday.py``.
 It is a safety net:
 
 1. Stay dormant while ``wednesday.py`` / ``rt_compute.py`` is writing fresh
-   Kite prices to ``reports/live_prices.json``.
+   Kite prices to the shared price board (``Auto_Trader.price_board``).
 2. If that primary feed goes stale during market hours, open a lightweight Kite
-   WebSocket subscription and write the same live_prices.json format.
+   WebSocket subscription and publish to the same board under the fallback
+   source, exporting the legacy ``reports/live_prices.json`` snapshot too.
 3. As soon as the primary feed becomes fresh again, stop the fallback WebSocket
    so we do not run duplicate Kite tickers.
 
@@ -96,6 +97,12 @@ def _is_primary_payload_fresh(payload: dict[str, Any], *, max_age_sec: int = PRI
 
 
 def primary_price_feed_healthy() -> bool:
+    from Auto_Trader import price_board
+
+    board = price_board.open_board()
+    if board is not None:
+        last = board.last_write(PRIMARY_SOURCE)
+        return last is not None and time.time() - last <= PRIMARY_FRESH_SEC
     try:
         payload = json.loads(LIVE_PRICE_PATH.read_text())
     except Exception:
@@ -129,7 +136,7 @@ def _lookup_instrument(instruments_dict: dict[Any, dict[str, Any]], token: Any)
 def _extract_tick_prices(
     ticks: list[dict[str, Any]],
     instruments_dict: dict[Any, dict[str, Any]],
-    wanted: set[str],
+    wanted: set[str] | None = None,
 ) -> dict[str, float]:
     prices: dict[str, float] = {}
     for tick in ticks:
@@ -145,7 +152,7 @@ def _extract_tick_prices(
             or ""
         )
         symbol = str(symbol).strip().upper()
-        if symbol not in wanted:
+        if not symbol or (wanted is not None and symbol not in wanted):
             continue
         try:
             price = float(tick.get("last_price", 0.0) or 0.0)
@@ -156,42 +163,22 @@ def _extract_tick_prices(
     return prices
 
 
-def _write_live_prices(prices: dict[str, float], wanted: set[str]) -> None:
-    existing: dict[str, Any] = {}
-    try:
-        existing = json.loads(LIVE_PRICE_PATH.read_text())
-        if not isinstance(existing, dict):
-            existing = {}
-    except Exception:
-        existing = {}
-
-    now_str = datetime.now().isoformat(timespec="seconds")
-    merged_prices = existing.get("prices", {}) if isinstance(existing.get("prices"), dict) else {}
-    price_times = existing.get("price_times", {}) if isinstance(existing.get("price_times"), dict) else {}
-
-    for symbol, price in prices.items():
-        merged_prices[symbol] = price
-        price_times[symbol] = now_str
-
-    merged_prices = {sym: px for sym, px in merged_prices.items() if sym in wanted}
-    price_times = {sym: ts for sym, ts in price_times.items() if sym in wanted}
+def _write_live_prices(prices: dict[str, float], export_json: bool = True) -> None:
+    from Auto_Trader import price_board
 
-    payload = {
-        "time": now_str,
-        "prices": merged_prices,
-        "price_times": price_times,
-        "source": FALLBACK_SOURCE,
-        "source_pid": os.getpid(),
-    }
-    LIVE_PRICE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = LIVE_PRICE_PATH.with_suffix(".json.tmp")
-    tmp_path.write_text(json.dumps(payload, separators=(",", ":")))
-    tmp_path.replace(LIVE_PRICE_PATH)
+    board = price_board.open_board(create=True)
+    if board is None:
+        raise RuntimeError("price board unavailable")
+    board.publish(prices, FALLBACK_SOURCE)
+    if export_json:
+        board.export_json(LIVE_PRICE_PATH)
 
 
 def publish_fallback_prices(ticks: list[dict[str, Any]], instruments_dict: dict[Any, dict[str, Any]]) -> str:
     """Publish fallback prices from a tick batch.
 
+    Every subscribed symbol goes to the price board on each batch; the legacy
+    JSON snapshot is exported at most every ``LIVE_PRICE_INTERVAL`` seconds.
     Returns a short status string for logging/tests.
     """
 
@@ -200,19 +187,15 @@ def publish_fallback_prices(ticks: list[dict[str, Any]], instruments_dict: dict[
     if primary_price_feed_healthy():
         return "primary_healthy"
 
-    now = time.time()
-    if now - _last_dump_ts < LIVE_PRICE_INTERVAL:
-        return "throttled"
-
-    wanted = _load_wanted_symbols()
-    if not wanted:
-        return "no_positions"
-
-    prices = _extract_tick_prices(ticks, instruments_dict, wanted)
+    prices = _extract_tick_prices(ticks, instruments_dict)
     if not prices:
-        return "no_wanted_ticks"
+        return "no_ticks"
 
-    _write_live_prices(prices, wanted)
+    now = time.time()
+    export = now - _last_dump_ts >= LIVE_PRICE_INTERVAL
+    _write_live_prices(prices, export_json=export)
+    if not export:
+        return f"board:{len(prices)}"
     _last_dump_ts = now
     return f"published:{len(prices)}"
 
@@ -14,6 +14,11 @@ from typing import Any
 import pandas as pd
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.broker_gateway import GatewayError, GatewayUnavailable, gateway_call  # noqa: E402
+
 REPORTS = ROOT / 'reports'
 REPORTS.mkdir(exist_ok=True)
 TRACKED_CALLS = Path(os.getenv('AT_TRACKED_CALLS', os.path.expanduser('~/.openclaw/telegram-user/tracked_option_calls.json')))
@@ -75,13 +80,27 @@ def _ssh_target() -> tuple[str, str] | None:
     return host, key
 
 
-def fetch_contract_price(call: dict[str, Any]) -> dict[str, Any]:
-    """Resolve/price one Telegram contract through the dedicated resolver.
+def fetch_contract_prices(calls: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Resolve/price many Telegram contracts in one resolver batch.
 
-    Local/server mode runs the resolver directly. Laptop mode uses the primary
-    Auto_Trader host when AT_SERVER_HOST/AT_SERVER_KEY are available.
+    The broker gateway (scripts/broker_gateway.py) answers from its warm Kite
+    session when reachable. Otherwise local/server mode runs the resolver
+    directly and laptop mode uses the primary Auto_Trader host when
+    AT_SERVER_HOST/AT_SERVER_KEY are available. Either way the whole batch is
+    one instrument-master lookup pass plus chunked ``kite.ltp`` calls.
     """
-    payload = json.dumps(call, ensure_ascii=False)
+    if not calls:
+        return []
+    try:
+        out = gateway_call('resolve', {'calls': calls}, timeout=45)
+        if not isinstance(out, list) or len(out) != len(calls):
+            return [{'status': 'drop', 'reason': 'resolver_failed', 'stderr': 'unexpected gateway batch output'} for _ in calls]
+        return out
+    except GatewayUnavailable:
+        pass
+    except GatewayError as exc:
+        return [{'status': 'drop', 'reason': 'resolver_failed', 'stderr': str(exc)[-500:]} for _ in calls]
+    payload = json.dumps(calls, ensure_ascii=False)
     local_script = ROOT / 'scripts' / 'telegram_contract_price_resolver.py'
     use_local = os.getenv('AT_CONTRACT_RESOLVER_MODE') == 'local' or str(ROOT).startswith('/home/ubuntu/Auto_Trader')
     if use_local or not _ssh_target():
@@ -97,10 +116,59 @@ def fetch_contract_price(call: dict[str, Any]) -> dict[str, Any]:
     try:
         result = subprocess.run(cmd, input=payload, capture_output=True, text=True, timeout=45)
         if result.returncode != 0:
-            return {'status': 'drop', 'reason': 'resolver_failed', 'stderr': result.stderr[-500:]}
-        return json.loads(result.stdout.strip() or '{}')
+            return [{'status': 'drop', 'reason': 'resolver_failed', 'stderr': result.stderr[-500:]} for _ in calls]
+        out = json.loads(result.stdout.strip() or '[]')
+        if not isinstance(out, list) or len(out) != len(calls):
+            return [{'status': 'drop', 'reason': 'resolver_failed', 'stderr': 'unexpected resolver batch output'} for _ in calls]
+        return out
     except Exception as exc:
-        return {'status': 'drop', 'reason': 'resolver_exception', 'error': str(exc)[:500]}
+        return [{'status': 'drop', 'reason': 'resolver_exception', 'error': str(exc)[:500]} for _ in calls]
+
+
+def fetch_contract_price(call: dict[str, Any]) -> dict[str, Any]:
+    """Resolve/price one Telegram contract (see ``fetch_contract_prices``)."""
+    return fetch_contract_prices([call])[0]
+
+
+def _price_request(call: dict[str, Any], fallback_time: Any = None) -> dict[str, Any]:
+    return {
+        'symbol': call.get('symbol'),
+        'option_side': call.get('option_side'),
+        'option_strike': call.get('option_strike'),
+        'captured_at': call.get('captured_at') or call.get('tracking_started_at') or fallback_time,
+    }
+
+
+def _request_key(req: dict[str, Any]) -> str:
+    return json.dumps(req, sort_keys=True, default=str)
+
+
+def _position_request(pos: dict[str, Any]) -> dict[str, Any]:
+    """The request a position was opened with, so prefetch and refresh key it identically."""
+    return pos.get('price_request') or _price_request(pos.get('call') or {}, pos.get('entry_time'))
+
+
+def prefetch_contract_prices(state: dict[str, Any], calls: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Price every open position and pending option call in a single batch.
+
+    Returns resolver results keyed by ``_request_key`` so ``maybe_open_position``
+    and ``refresh_position`` can fan them back out without further broker calls.
+    """
+    positions = state.get('positions') or {}
+    requests: dict[str, dict[str, Any]] = {}
+    for call in calls:
+        if key_for(call) in positions or not call.get('option_side') or not call.get('option_strike'):
+            continue
+        req = _price_request(call, call.get('date'))
+        requests.setdefault(_request_key(req), req)
+    for pos in positions.values():
+        if pos.get('status') != 'open':
+            continue
+        req = _position_request(pos)
+        requests.setdefault(_request_key(req), req)
+    keys = list(requests)
+    return dict(zip(keys, fetch_contract_prices([requests[k] for k in keys])))
+
 
 def now_utc() -> datetime:
     return datetime.now(timezone.utc)
@@ -246,7 +314,12 @@ def stop_profile_for(chat: str) -> tuple[int, int]:
     return to_entry, to_last_target
 
 
-def maybe_open_position(state: dict[str, Any], call: dict[str, Any], capital_per_trade_pct: float) -> None:
+def maybe_open_position(
+    state: dict[str, Any],
+    call: dict[str, Any],
+    capital_per_trade_pct: float,
+    prices: dict[str, dict[str, Any]] | None = None,
+) -> None:
     positions = state.setdefault('positions', {})
     pos_key = key_for(call)
     if pos_key in positions:
@@ -279,7 +352,10 @@ def maybe_open_position(state: dict[str, Any], call: dict[str, Any], capital_per
     max_pct = 0.40
     adjusted_pct = min(adjusted_pct, max_pct)
 
-    resolved = fetch_contract_price(call)
+    request = _price_request(call, call.get('date'))
+    resolved = (prices or {}).get(_request_key(request))
+    if resolved is None:
+        resolved = fetch_contract_price(request)
     if resolved.get('status') != 'ok':
         reason = resolved.get('reason') or 'contract_not_found'
         positions[pos_key] = {
@@ -361,6 +437,7 @@ def maybe_open_position(state: dict[str, Any], call: dict[str, Any], capital_per
             'side': contract.get('side'),
         },
         'entry_time': call.get('captured_at') or call.get('tracking_started_at') or now_utc().isoformat(),
+        'price_request': request,
         'entry_price': round(entry_price, 2),
         'qty': int(qty),
         'remaining_qty': int(qty),
@@ -396,16 +473,20 @@ def _extract_targets(call: dict[str, Any]) -> list[float]:
     return [float(x) for x in re.findall(r'\d+(?:\.\d+)?', m.group(1))[:4]] if m else []
 
 
-def refresh_position(state: dict[str, Any], pos_key: str, pos: dict[str, Any], target_style: str) -> None:
+def refresh_position(
+    state: dict[str, Any],
+    pos_key: str,
+    pos: dict[str, Any],
+    target_style: str,
+    prices: dict[str, dict[str, Any]] | None = None,
+) -> None:
     if pos.get('status') != 'open':
         return
     call = pos.get('call') or {}
-    resolved = fetch_contract_price({
-        'symbol': call.get('symbol'),
-        'option_side': call.get('option_side'),
-        'option_strike': call.get('option_strike'),
-        'captured_at': call.get('captured_at') or call.get('tracking_started_at') or pos.get('entry_time'),
-    })
+    request = _position_request(pos)
+    resolved = (prices or {}).get(_request_key(request))
+    if resolved is None:
+        resolved = fetch_contract_price(request)
     if resolved.get('status') != 'ok':
         pos['last_snapshot_at'] = now_utc().isoformat()
         pos['status_note'] = resolved.get('reason') or 'contract_not_found_on_refresh'
@@ -674,11 +755,13 @@ def main() -> int:
     repair_position_placeholders(state)
     refresh_channel_learning_if_stale()
 
-    for call in tracked_calls():
-        maybe_open_position(state, call, float(args.capital_per_trade_pct))
+    calls = tracked_calls()
+    prices = prefetch_contract_prices(state, calls)
+    for call in calls:
+        maybe_open_position(state, call, float(args.capital_per_trade_pct), prices)
 
     for pos_key, pos in list((state.get('positions') or {}).items()):
-        refresh_position(state, pos_key, pos, args.target_style)
+        refresh_position(state, pos_key, pos, args.target_style, prices)
 
     summary = mark_to_market(state)
     summary.update({
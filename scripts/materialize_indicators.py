@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Nightly ``Indicators()`` materialization into ``Auto_Trader.indicator_store``.
+
+Run after the price fetch (``create_master`` launches it in the background
+once ``download_historical_quotes`` returns). ``create_master`` runs at market
+open, so it passes ``--after-close``: during weekday trading hours the process
+sleeps until ``AT_INDICATOR_STORE_RUN_AFTER`` (IST, default 15:45) instead of
+competing with the live ticker for CPU. Symbols whose stored frame still
+matches their ``Hist_Data`` history and the current indicator code are
+skipped, so reruns are cheap.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, time as dtime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+DEFAULT_WORKERS = max(1, int(os.getenv("AT_INDICATOR_STORE_WORKERS", str(max(1, (os.cpu_count() or 2) - 1)))))
+# Early enough that a run started before the 09:15 open cannot still be busy during it.
+PRE_OPEN = dtime(8, 0)
+RUN_AFTER = dtime.fromisoformat(os.getenv("AT_INDICATOR_STORE_RUN_AFTER", "15:45"))
+
+
+def seconds_until_off_hours(now: datetime) -> float:
+    """Wait before materializing so it starts after the close; 0 outside weekday trading hours."""
+    if now.weekday() >= 5 or not (PRE_OPEN <= now.time() < RUN_AFTER):
+        return 0.0
+    return (datetime.combine(now.date(), RUN_AFTER) - now).total_seconds()
+
+
+def main(argv: list[str] | None = None) -> int:
+    from Auto_Trader import indicator_store
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hist-dir", default=str(indicator_store.HIST_DIR))
+    parser.add_argument("--store-dir", default=str(indicator_store.STORE_DIR))
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--symbols", default="", help="comma-separated subset (default: every Hist_Data symbol)")
+    parser.add_argument("--after-close", action="store_true", help="during trading hours, wait until AT_INDICATOR_STORE_RUN_AFTER")
+    args = parser.parse_args(argv)
+
+    if args.after_close:
+        time.sleep(seconds_until_off_hours(datetime.now(ZoneInfo("Asia/Kolkata")).replace(tzinfo=None)))
+
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()] or None
+    started = time.time()
+    counts = indicator_store.materialize(
+        symbols, hist_dir=Path(args.hist_dir), store_dir=Path(args.store_dir), workers=args.workers
+    )
+    print(json.dumps({"counts": counts, "seconds": round(time.time() - started, 1)}))
+    return 0 if not counts.get("error") else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
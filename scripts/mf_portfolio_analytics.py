@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Persisted MF cashflow ledger and batched XIRR solver for the portfolio tracker.
+
+Kite's MF order endpoint only returns recent orders and every order timestamp
+used to be re-parsed on each tracker run. The ledger keeps every completed
+order that has ever been seen (keyed by order id), so a run only parses new
+orders, and older lots that have rolled off Kite's window keep counting as
+dated cashflows.
+
+XIRR for all holdings plus the whole portfolio is solved in one batch by
+``xirr_many``: a bracketed Newton iteration over a holdings × cashflows matrix,
+warm-started from the previous run's rate stored in the ledger.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+LEDGER_PATH = Path(os.getenv("AT_MF_CASHFLOW_LEDGER", str(ROOT / "intermediary_files" / "mf_cashflow_ledger.json")))
+LEDGER_VERSION = 1
+
+XIRR_LOW = -0.95
+XIRR_HIGH = 5.0
+XIRR_MAX_EXPANSIONS = 8
+XIRR_MAX_ITER = 100
+XIRR_NPV_TOL = 1e-7
+
+Cashflows = Sequence[tuple[datetime, float]]
+
+
+def _clean_flows(flows: Cashflows) -> list[tuple[datetime, float]] | None:
+    out = [(d, float(v)) for d, v in flows if d is not None and abs(float(v)) > 1e-9]
+    if len(out) < 2 or not any(v < 0 for _, v in out) or not any(v > 0 for _, v in out):
+        return None
+    return out
+
+
+def _flow_matrix(flow_sets: list[list[tuple[datetime, float]]]) -> tuple[np.ndarray, np.ndarray]:
+    """Pad cashflows into ``(years, amounts)`` matrices; padded amounts are 0."""
+    width = max(len(f) for f in flow_sets)
+    years = np.zeros((len(flow_sets), width))
+    amounts = np.zeros((len(flow_sets), width))
+    for i, flows in enumerate(flow_sets):
+        dates = np.array([np.datetime64(d, "us") for d, _ in flows])
+        # Whole elapsed days over 365, matching timedelta.days in the scalar XNPV.
+        days = (dates - dates.min()) // np.timedelta64(1, "D")
+        years[i, : len(flows)] = np.maximum(0.0, days.astype(float) / 365.0)
+        amounts[i, : len(flows)] = [v for _, v in flows]
+    return years, amounts
+
+
+def _npv(rate: np.ndarray, years: np.ndarray, amounts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    log_growth = np.log1p(rate)[:, None]
+    disc = np.exp(-years * log_growth)
+    value = (amounts * disc).sum(axis=1)
+    slope = (-years * amounts * disc).sum(axis=1) / (1.0 + rate)
+    return value, slope
+
+
+def xirr_many(flow_sets: Iterable[Cashflows], guesses: Sequence[float | None] | None = None) -> list[float | None]:
+    """XIRR for many cashflow sets at once; ``None`` where it is undefined.
+
+    Each root is bracketed like the old scalar bisection (from
+    ``[-0.95, 5.0]``, doubling the upper bound up to eight times) and then
+    found by Newton steps that fall back to bisection whenever a step leaves
+    the bracket. ``guesses`` (e.g. last run's rates) seed the iteration.
+    """
+    flow_sets = list(flow_sets)
+    guesses = list(guesses) if guesses is not None else [None] * len(flow_sets)
+    out: list[float | None] = [None] * len(flow_sets)
+    cleaned = [(_clean_flows(f), i) for i, f in enumerate(flow_sets)]
+    live = [(f, i) for f, i in cleaned if f is not None]
+    if not live:
+        return out
+    years, amounts = _flow_matrix([f for f, _ in live])
+    idx = np.array([i for _, i in live])
+    n = len(idx)
+
+    low = np.full(n, XIRR_LOW)
+    high = np.full(n, XIRR_HIGH)
+    f_low, _ = _npv(low, years, amounts)
+    f_high, _ = _npv(high, years, amounts)
+    for _ in range(XIRR_MAX_EXPANSIONS):
+        grow = f_low * f_high > 0
+        if not grow.any():
+            break
+        high = np.where(grow, high * 2.0, high)
+        f_high = np.where(grow, _npv(high, years, amounts)[0], f_high)
+    ok = f_low * f_high <= 0
+
+    x = np.array([g if g is not None and np.isfinite(g) else 0.1 for g in (guesses[i] for i in idx)], dtype=float)
+    x = np.where((x > low) & (x < high), x, (low + high) / 2.0)
+    done = ~ok
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for _ in range(XIRR_MAX_ITER):
+            f, df = _npv(x, years, amounts)
+            done |= np.abs(f) < XIRR_NPV_TOL
+            if done.all():
+                break
+            same_side = f * f_low > 0
+            low = np.where(same_side, x, low)
+            f_low = np.where(same_side, f, f_low)
+            high = np.where(same_side, high, x)
+            step = x - f / df
+            bisect = ~np.isfinite(step) | (step <= low) | (step >= high)
+            x_next = np.where(bisect, (low + high) / 2.0, step)
+            done |= np.abs(x_next - x) < 1e-14
+            x = np.where(done, x, x_next)
+    for j, i in enumerate(idx):
+        if ok[j] and np.isfinite(x[j]):
+            out[int(i)] = float(x[j])
+    return out
+
+
+def order_key(order: dict[str, Any]) -> str:
+    order_id = str(order.get("order_id") or "").strip()
+    if order_id:
+        return order_id
+    parts = [order.get(k) for k in ("tradingsymbol", "exchange_timestamp", "order_timestamp", "transaction_type", "amount", "quantity")]
+    return "|".join(str(p or "") for p in parts)
+
+
+class CashflowLedger:
+    """Completed MF orders as dated, signed cashflows, persisted between runs."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path or LEDGER_PATH)
+        self.orders: dict[str, dict[str, Any]] = {}
+        self.solutions: dict[str, dict[str, Any]] = {}
+        self._parsed: dict[str, tuple[datetime, float]] = {}
+        self._flows: dict[str, list[tuple[datetime, float]]] = {}
+        try:
+            data = json.loads(self.path.read_text())
+            if data.get("version") == LEDGER_VERSION:
+                self.orders = dict(data.get("orders") or {})
+                self.solutions = dict(data.get("solutions") or {})
+        except Exception:
+            pass
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.orders
+
+    def add(self, key: str, symbol: str, when: datetime, amount: float) -> None:
+        self.orders[key] = {"symbol": symbol, "date": when.isoformat(), "amount": float(amount)}
+        self._parsed[key] = (when, float(amount))
+
+    def flows_by_symbol(self) -> dict[str, list[tuple[datetime, float]]]:
+        out: dict[str, list[tuple[datetime, float]]] = {}
+        for key, row in self.orders.items():
+            flow = self._parsed.get(key)
+            if flow is None:
+                flow = (datetime.fromisoformat(row["date"]), float(row["amount"]))
+                self._parsed[key] = flow
+            out.setdefault(row["symbol"], []).append(flow)
+        for flows in out.values():
+            flows.sort(key=lambda f: f[0])
+        self._flows = out
+        return {sym: list(flows) for sym, flows in out.items()}
+
+    def symbol_versions(self) -> dict[str, str]:
+        """Per-symbol digest of ledger order keys; changes whenever a symbol gains an order."""
+        keys: dict[str, list[str]] = {}
+        for key, row in self.orders.items():
+            keys.setdefault(row["symbol"], []).append(key)
+        return {sym: hashlib.sha1("\x1f".join(sorted(ks)).encode()).hexdigest()[:16] for sym, ks in keys.items()}
+
+    def cached_metrics(self, symbol: str, version: str) -> dict[str, Any]:
+        """Ledger-only metrics for ``symbol``, recomputed only when its orders change.
+
+        Call after ``flows_by_symbol``.
+        """
+        hit = self.solutions.get(symbol) or {}
+        if hit.get("version") != version:
+            buys = [(d, v) for d, v in self._flows.get(symbol, []) if v < 0]
+            hit = {
+                "version": version,
+                "dated_invested": -sum(v for _, v in buys),
+                "first_buy": min(d for d, _ in buys).isoformat() if buys else None,
+                "rate": hit.get("rate"),
+            }
+            self.solutions[symbol] = hit
+        return hit
+
+    def save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"version": LEDGER_VERSION, "orders": self.orders, "solutions": self.solutions}))
+            tmp.replace(self.path)
+        except Exception:
+            # Losing the ledger only costs a re-parse and a cold start next run.
+            pass
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Long-lived RSI Momentum paper rebalancer hosted by ``wednesday.py``.
+
+The rebalancer used to poll the shadow signal and ledger state JSON every
+300 s and, on a new signal, spawn ``scripts/rsi_momentum_paper_ledger.py`` as a
+subprocess before re-reading the state file to build the Telegram summary.
+This worker instead hosts a ``LedgerEngine`` in-process (Hist_Data frames and
+portfolio state stay warm between runs) and wakes on either:
+
+- a UDP datagram on ``127.0.0.1:AT_REBALANCER_PORT`` sent by the shadow
+  producer right after it publishes a signal (``notify_rebalancer``), or
+- a change of the shadow signal file's mtime/size, checked every
+  ``AT_REBALANCER_POLL_SEC`` seconds with a ``stat`` call.
+
+A rebalance therefore starts within seconds of a new signal, and its result is
+returned directly rather than re-read from disk.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import select
+import socket
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts import rsi_momentum_paper_ledger as ledger  # noqa: E402
+
+REBALANCER_HOST = "127.0.0.1"
+REBALANCER_PORT = int(os.getenv("AT_REBALANCER_PORT", "8791"))
+POLL_SEC = max(0.5, float(os.getenv("AT_REBALANCER_POLL_SEC", "5")))
+HEARTBEAT_SEC = max(POLL_SEC, float(os.getenv("AT_REBALANCER_HEARTBEAT_SEC", "300")))
+ST_EXIT_MULT = float(os.getenv("AT_REBALANCER_ST_EXIT_MULT", "2.0"))
+
+logger = logging.getLogger("Auto_Trade_Logger")
+
+
+def notify_rebalancer(event: str = "signal", **info: Any) -> bool:
+    """Best-effort wake-up for a running rebalancer; ``False`` if nothing is listening."""
+    payload = json.dumps({"event": event, **info}).encode()
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(payload, (REBALANCER_HOST, REBALANCER_PORT))
+        return True
+    except OSError:
+        return False
+
+
+def format_rebalance_message(state: ledger.PortfolioState, signal_date: str, picks: list[str]) -> str:
+    """Telegram summary of the post-rebalance book (cost-basis allocation)."""
+    pos = state.positions
+    cost = state.cost_basis
+    invested = sum(float(pos[s]) * float(cost.get(s, 0)) for s in pos if cost.get(s, 0))
+    total_val = state.cash + invested
+    msgs = [
+        f"🔄 RSI Momentum Rebalance — {signal_date}",
+        f"💰 ₹{total_val:,.0f}  |  {len(pos)} positions  |  Cash: ₹{state.cash:,.0f}",
+    ]
+    if pos:
+        msgs.append("")
+        for sym in sorted(pos, key=lambda s: float(pos[s]) * float(cost.get(s, 0)), reverse=True):
+            q = float(pos[sym])
+            alloc = q * float(cost.get(sym, 0))
+            pct = (alloc / total_val * 100) if total_val else 0
+            msgs.append(f"  {sym}  {int(q)} sh  ₹{alloc:,.0f}  ({pct:.1f}%)")
+    if skipped := [s for s in picks if s not in pos]:
+        msgs.append(f"\n⚠️ Skipped: {', '.join(skipped)}")
+    st_exits = [t for t in state.trade_log if t.get("action") == "SELL_ST" and t.get("date") == signal_date]
+    if st_exits:
+        msgs.append(f"\n🔴 ST Exits: {', '.join(e['symbol'] for e in st_exits)}")
+    msgs.append("\n📝 Paper only — no live orders")
+    return "\n".join(msgs)
+
+
+class RebalancerService:
+    """Event-driven host for the paper ledger engine."""
+
+    def __init__(self, message_queue=None, engine: Optional[ledger.LedgerEngine] = None):
+        self.message_queue = message_queue
+        self.engine = engine or ledger.LedgerEngine(st_exit_mult=ST_EXIT_MULT)
+        self._signal_stamp: Optional[tuple[int, int]] = None
+        self._last_check = 0.0
+
+    def _send(self, text: str) -> None:
+        if self.message_queue is not None:
+            self.message_queue.put(text)
+
+    def pending_signal(self) -> Optional[dict]:
+        """The latest signal if it is newer than the ledger's last rebalance."""
+        if not ledger.PAPER_SHADOW_FILE.exists():
+            logger.debug("[REBALANCER] No shadow file — waiting for first signal")
+            return None
+        if not ledger.STATE_FILE.exists():
+            logger.debug("[REBALANCER] No state file — first run pending")
+            return None
+        signal = ledger.get_latest_signal() or {}
+        signal_date = signal.get("date", "")
+        last_rebalance = self.engine.load_state().last_rebalance_date
+        if signal_date and signal_date > last_rebalance:
+            return signal
+        logger.info(f"[REBALANCER] Heartbeat — signal {signal_date} = last {last_rebalance}, no action")
+        return None
+
+    def check(self) -> Optional[ledger.LedgerRun]:
+        """Run the ledger if a new signal is waiting; returns the run, if any."""
+        self._last_check = time.monotonic()
+        signal = self.pending_signal()
+        if signal is None:
+            return None
+        signal_date = signal.get("date", "")
+        picks = signal.get("picks", [])
+        logger.info(f"[REBALANCER] Triggering rebalance: signal {signal_date} | picks: {picks}")
+        started = time.monotonic()
+        try:
+            result = self.engine.run()
+        except Exception as exc:
+            logger.error(f"[REBALANCER] Rebalance FAILED: {exc}\n{traceback.format_exc()}")
+            self._send(f"⚠️ RSI Momentum Rebalance FAILED\nSignal: {signal_date}\nError: {exc}")
+            return None
+        if result.code != 0 or result.state is None:
+            logger.error(f"[REBALANCER] Rebalance FAILED (rc={result.code})")
+            self._send(f"⚠️ RSI Momentum Rebalance FAILED\nSignal: {signal_date}\nError: ledger exit code {result.code}")
+            return result
+        logger.info(f"[REBALANCER] Rebalance completed OK in {time.monotonic() - started:.2f}s")
+        try:
+            self._send(format_rebalance_message(result.state, signal_date, picks))
+        except Exception as msg_e:
+            logger.warning(f"[REBALANCER] Message formatting failed: {msg_e}")
+        return result
+
+    def _signal_changed(self) -> bool:
+        try:
+            st = ledger.PAPER_SHADOW_FILE.stat()
+            stamp: Optional[tuple[int, int]] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        changed = stamp != self._signal_stamp
+        self._signal_stamp = stamp
+        return changed
+
+    def _bind(self) -> Optional[socket.socket]:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.bind((REBALANCER_HOST, REBALANCER_PORT))
+        except OSError as exc:
+            logger.warning(f"[REBALANCER] Notify port {REBALANCER_PORT} unavailable ({exc}); file watch only")
+            sock.close()
+            return None
+        sock.setblocking(False)
+        return sock
+
+    def serve_forever(self) -> None:
+        sock = self._bind()
+        self._signal_changed()
+        try:
+            self._safe_check()
+            while True:
+                woke = False
+                if sock is not None:
+                    ready, _, _ = select.select([sock], [], [], POLL_SEC)
+                    while ready:
+                        try:
+                            sock.recvfrom(4096)
+                            woke = True
+                        except BlockingIOError:
+                            break
+                else:
+                    time.sleep(POLL_SEC)
+                if self._signal_changed():
+                    woke = True
+                # Without a wake-up, re-check (and retry failed runs) at the old poll cadence.
+                if woke or time.monotonic() - self._last_check >= HEARTBEAT_SEC:
+                    self._safe_check()
+        finally:
+            if sock is not None:
+                sock.close()
+
+    def _safe_check(self) -> None:
+        try:
+            self.check()
+        except Exception as e:
+            logger.error(f"[REBALANCER] Loop error: {e}\n{traceback.format_exc()}")
+
+
+def run_rebalancer(message_queue) -> None:
+    """Process target used by ``wednesday.start_processes``."""
+    RebalancerService(message_queue).serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s %(message)s")
+    run_rebalancer(None)
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import json
 import logging
+import math
 import os
 import tempfile
 from collections import Counter
@@ -19,6 +20,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from Auto_Trader import RULE_SET_2, RULE_SET_7, RULE_SET_OPTIONS_1
+from Auto_Trader import hist_data
 from Auto_Trader import options_support as opt_support
 from Auto_Trader import utils as at_utils
 from Auto_Trader.news_sentiment import (
@@ -75,10 +77,8 @@ def _normalize_hist_df(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def _persist_hist_cache(cache_name: str, df: pd.DataFrame) -> Path:
-    HIST_DIR.mkdir(parents=True, exist_ok=True)
-    path = HIST_DIR / f"{cache_name}.feather"
-    df.to_feather(path)
-    return path
+    hist_data.write_symbol(HIST_DIR, cache_name, df)
+    return hist_data.resolve_symbol(HIST_DIR, cache_name)
 
 
 
@@ -144,17 +144,12 @@ def _fetch_hist_from_kite(symbol: str):
 
 
 def load_hist(symbol="NIFTYETF"):
-    cache_paths = [
-        (symbol, HIST_DIR / f"{symbol}.feather"),
-        ("NIFTYBEES", HIST_DIR / "NIFTYBEES.feather"),
-        ("NIFTY50_INDEX", HIST_DIR / "NIFTY50_INDEX.feather"),
-    ]
-
-    for cache_name, path in cache_paths:
-        if not path.exists():
+    for cache_name in (symbol, "NIFTYBEES", "NIFTY50_INDEX"):
+        path = hist_data.resolve_symbol(HIST_DIR, cache_name)
+        if path is None:
             continue
         try:
-            out = _prepare_hist_df(pd.read_feather(path))
+            out = _prepare_hist_df(hist_data.read_raw(HIST_DIR, cache_name))
             if not out.empty:
                 return out, {"source": "cache", "cache_name": cache_name, "cache_path": str(path)}
         except Exception as exc:
@@ -414,21 +409,39 @@ def run_equity_shadow() -> dict:
 
 
 
+def _finite_or_none(value) -> float | None:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return round(value, 6) if math.isfinite(value) else None
+
+
 def run_options_shadow() -> dict:
     symbols = opt_support.discover_option_symbols()
     candidates = []
     skipped = {}
 
+    raw_frames = {}
+    errors: dict[str, str] = {}
     for symbol in symbols:
-        path = ROOT / "intermediary_files" / "Hist_Data" / f"{symbol}.feather"
-        if not path.exists():
+        if hist_data.resolve_symbol(HIST_DIR, symbol) is None:
             skipped[symbol] = "missing_file"
             continue
         try:
-            df = opt_support.enrich_option_frame(pd.read_feather(path))
+            raw_frames[symbol] = hist_data.read_raw(HIST_DIR, symbol)
         except Exception as exc:
-            skipped[symbol] = f"enrich_failed:{exc}"
+            errors[symbol] = str(exc)
+    # One merge/Greeks pass over the whole options universe instead of one per contract.
+    enriched = opt_support.enrich_option_frames(raw_frames, errors=errors)
+
+    for symbol in symbols:
+        if symbol in skipped:
+            continue
+        if symbol in errors:
+            skipped[symbol] = f"enrich_failed:{errors[symbol]}"
             continue
+        df = enriched.get(symbol)
         if df is None or df.empty or len(df) < 10:
             skipped[symbol] = "too_short"
             continue
@@ -460,6 +473,9 @@ def run_options_shadow() -> dict:
                 "underlying_close": float(df.iloc[-1].get("UL_Close", 0.0) or 0.0),
                 "expiry": str(df.iloc[-1].get("expiry", "")),
                 "strike": float(df.iloc[-1].get("strike", 0.0) or 0.0),
+                "iv": _finite_or_none(df.iloc[-1].get("IV")),
+                "delta": _finite_or_none(df.iloc[-1].get("Delta")),
+                "theta": _finite_or_none(df.iloc[-1].get("Theta")),
             }
         )
 
@@ -478,7 +494,10 @@ def run_options_shadow() -> dict:
         "paper_mode": True,
         "production_rule_model": "OPTIONS=RULE_SET_OPTIONS_1",
         "manifest_path": str(opt_support.OPTIONS_MANIFEST),
-        "underlying_context_path": str(opt_support.HIST_DIR / "NIFTY50_INDEX.feather"),
+        "underlying_context_path": str(
+            hist_data.resolve_symbol(opt_support.HIST_DIR, "NIFTY50_INDEX")
+            or hist_data.symbol_path(opt_support.HIST_DIR, "NIFTY50_INDEX")
+        ),
         "universe_size": len(symbols),
         "evaluated": len(candidates),
         "skipped": skipped,
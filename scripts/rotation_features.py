@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""On-disk cache of derived price-panel features for the RSI rotation jobs.
+
+The paper shadow, the RSI+momentum reports and the rotation lab each rebuilt
+RSI(22/44/66), momentum, SMA regime and MACD panels over the whole multi-year
+close panel, and the shadow did so several times per run. ``PanelFeatures``
+wraps one close panel and serves each feature from
+``AT_FEATURE_CACHE_DIR`` (default ``intermediary_files/feature_cache``):
+
+- an entry is keyed by feature name, parameters and the panel's symbol list,
+  and records the dates it covers plus a digest of the panel values for those
+  dates (the data version);
+- if the digest still matches and the panel only gained new dates, only the
+  new rows are computed, from a tail window as long as the feature's lookback.
+  MACD's EWM has unbounded memory and is recomputed in full instead;
+- any other change (edited history, different universe) recomputes and
+  replaces the entry;
+- results are memory-mapped ``.npy`` files, and each instance also memoizes
+  what it has served.
+
+Set ``AT_FEATURE_CACHE=0`` to compute in memory only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.getenv("AT_FEATURE_CACHE_DIR", str(ROOT / "intermediary_files" / "feature_cache")))
+CACHE_ENABLED = os.getenv("AT_FEATURE_CACHE", "1").strip().lower() not in {"0", "false", "no", "off"}
+CACHE_VERSION = 1
+
+
+def _index_ns(index: pd.Index) -> np.ndarray:
+    return np.asarray(index.values.astype("datetime64[ns]").view("int64"))
+
+
+def _macd_above_signal(prices: pd.DataFrame, fast: int, slow: int, signal: int) -> pd.DataFrame:
+    ema_fast = prices.ewm(span=fast, min_periods=fast).mean()
+    ema_slow = prices.ewm(span=slow, min_periods=slow).mean()
+    macd_line = ema_fast - ema_slow
+    macd_signal = macd_line.ewm(span=signal, min_periods=signal).mean()
+    return (macd_line > macd_signal).astype(float)
+
+
+class PanelFeatures:
+    """Cached derived panels for one close-price panel (dates × symbols)."""
+
+    def __init__(self, prices: pd.DataFrame, cache_dir: Optional[Path] = None, persist: Optional[bool] = None):
+        self.prices = prices
+        self.cache_dir = Path(cache_dir or CACHE_DIR)
+        self.persist = CACHE_ENABLED if persist is None else persist
+        self._values = prices.to_numpy(dtype="float64", na_value=np.nan)
+        self._index = _index_ns(prices.index)
+        self._columns = [str(c) for c in prices.columns]
+        self._digests: dict[int, str] = {}
+        self._memo: dict[tuple, pd.DataFrame] = {}
+        self.stats = {"hit": 0, "append": 0, "compute": 0}
+
+    # ── Features ─────────────────────────────────────────────────
+
+    def rsi(self, period: int) -> pd.DataFrame:
+        """``rsi_224466_rotation_lab.rsi_dataframe`` (rolling-mean RSI with a coverage mask)."""
+        from scripts.rsi_224466_rotation_lab import rsi_dataframe
+
+        return self._get("rsi", (int(period),), lambda p: rsi_dataframe(p, int(period)), warmup=int(period) + 1)
+
+    def momentum(self, period: int) -> pd.DataFrame:
+        return self._get(
+            "momentum", (int(period),), lambda p: p.pct_change(int(period), fill_method=None), warmup=int(period)
+        )
+
+    def sma(self, window: int) -> pd.DataFrame:
+        return self._get(
+            "sma", (int(window),), lambda p: p.rolling(int(window), min_periods=int(window)).mean(), warmup=int(window)
+        )
+
+    def macd_above_signal(self, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
+        """1.0 where the MACD line is above its signal line, else 0.0."""
+        return self._get(
+            "macd_above_signal", (fast, slow, signal), lambda p: _macd_above_signal(p, fast, slow, signal), warmup=None
+        )
+
+    # ── Cache ────────────────────────────────────────────────────
+
+    def _digest(self, rows: int) -> str:
+        if rows not in self._digests:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(self._index[:rows].tobytes())
+            h.update(np.ascontiguousarray(self._values[:rows]).tobytes())
+            self._digests[rows] = h.hexdigest()
+        return self._digests[rows]
+
+    def _key(self, name: str, params: tuple) -> str:
+        spec = json.dumps([CACHE_VERSION, name, list(params), self._columns])
+        return f"{name}_{hashlib.sha1(spec.encode()).hexdigest()[:20]}"
+
+    def _frame(self, values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=self.prices.index, columns=self.prices.columns, copy=False)
+
+    def _get(
+        self,
+        name: str,
+        params: tuple,
+        compute: Callable[[pd.DataFrame], pd.DataFrame],
+        warmup: Optional[int],
+    ) -> pd.DataFrame:
+        memo_key = (name, params)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+        rows = len(self.prices)
+        if not self.persist or rows == 0:
+            out = compute(self.prices)
+            self._memo[memo_key] = out
+            return out
+
+        key = self._key(name, params)
+        data_path = self.cache_dir / f"{key}.npy"
+        meta_path = self.cache_dir / f"{key}.json"
+        cached: Optional[np.ndarray] = None
+        try:
+            meta = json.loads(meta_path.read_text())
+            done = int(meta["rows"])
+            if (
+                0 < done <= rows
+                and meta.get("version") == CACHE_VERSION
+                and meta.get("first_ns") == int(self._index[0])
+                and meta.get("last_ns") == int(self._index[done - 1])
+                and meta.get("digest") == self._digest(done)
+            ):
+                cached = np.load(data_path, mmap_mode="r")
+                if cached.shape != (done, len(self._columns)):
+                    cached = None
+        except Exception:
+            cached = None
+
+        if cached is not None and len(cached) == rows:
+            self.stats["hit"] += 1
+            out = self._frame(cached)
+            self._memo[memo_key] = out
+            return out
+
+        if cached is not None and warmup is not None and len(cached) > warmup:
+            done = len(cached)
+            tail = compute(self.prices.iloc[done - warmup:]).to_numpy(dtype="float64", na_value=np.nan)[warmup:]
+            values = np.vstack([np.asarray(cached), tail])
+            self.stats["append"] += 1
+        else:
+            values = compute(self.prices).to_numpy(dtype="float64", na_value=np.nan)
+            self.stats["compute"] += 1
+        self._save(data_path, meta_path, values)
+        out = self._frame(values)
+        self._memo[memo_key] = out
+        return out
+
+    def _save(self, data_path: Path, meta_path: Path, values: np.ndarray) -> None:
+        rows = len(values)
+        meta = {
+            "version": CACHE_VERSION,
+            "rows": rows,
+            "first_ns": int(self._index[0]),
+            "last_ns": int(self._index[rows - 1]),
+            "digest": self._digest(rows),
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = data_path.with_suffix(f".{os.getpid()}.tmp.npy")
+            np.save(tmp, values)
+            tmp.replace(data_path)
+            tmp_meta = meta_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_meta.write_text(json.dumps(meta))
+            tmp_meta.replace(meta_path)
+        except OSError:
+            # A cache that cannot be written only costs a recompute next run.
+            pass
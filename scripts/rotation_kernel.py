@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Array kernel for top-N equal-weight rotation backtests.
+
+The rotation lab, the RSI+momentum reports and the paper shadow each looped
+over rebalance dates, sorting a score row per date and writing
+``weights.loc[mask, :]`` over a full date mask, which is
+O(rebalances × dates × symbols). ``rotate`` does the same simulation with:
+
+- rebalance rows found once with ``searchsorted``;
+- top-N selection for every rebalance row at once (``argpartition`` and then a
+  stable ordering of the chosen few);
+- sparse rebalance targets forward-filled in time into the weight matrix;
+- turnover as the absolute difference between consecutive targets, booked on
+  each trade date.
+
+Cost enters only through ``RotationBook.net``, so a cost sweep reuses one book.
+Semantics match the old loops: signals on rebalance date ``d`` trade on the
+next bar and are held through the next rebalance date (or the last bar), and a
+symbol is eligible when its score is finite and it has a price on ``d``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class RotationBook:
+    index: pd.DatetimeIndex
+    columns: pd.Index
+    signal_pos: np.ndarray  # rebalance rows that have a following trade bar
+    trade_pos: np.ndarray
+    picks: list[np.ndarray]  # column positions per rebalance, best score first
+    pick_scores: list[np.ndarray]
+    targets: np.ndarray  # rebalances × symbols
+    weights: np.ndarray  # dates × symbols
+    turnover: np.ndarray  # dates
+    gross: np.ndarray  # dates
+
+    def net(self, cost_bps: float) -> np.ndarray:
+        return self.gross - self.turnover * (cost_bps / 10000.0)
+
+    @property
+    def active(self) -> np.ndarray:
+        return self.weights.sum(axis=1) > 0
+
+    def net_series(self, cost_bps: float, active_only: bool = False) -> pd.Series:
+        net = pd.Series(self.net(cost_bps), index=self.index)
+        return net.loc[self.active].copy() if active_only else net
+
+    def weights_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.weights, index=self.index, columns=self.columns)
+
+    def turnover_series(self) -> pd.Series:
+        return pd.Series(self.turnover, index=self.index)
+
+    def pick_symbols(self, k: int) -> list[str]:
+        return [str(self.columns[j]) for j in self.picks[k]]
+
+
+def rebalance_positions(index: pd.DatetimeIndex, dates: Sequence[pd.Timestamp]) -> np.ndarray:
+    """Row of each rebalance date in ``index``; dates must be index members."""
+    pos = index.searchsorted(pd.DatetimeIndex(list(dates)))
+    return np.asarray(pos, dtype=np.int64)
+
+
+def top_n_rows(scores: np.ndarray, eligible: np.ndarray, top_n: int) -> list[np.ndarray]:
+    """Per row, up to ``top_n`` eligible column positions in descending score order."""
+    rows, cols = scores.shape
+    k = min(int(top_n), cols)
+    if k <= 0 or rows == 0:
+        return [np.empty(0, dtype=np.int64) for _ in range(rows)]
+    key = np.where(eligible, scores, -np.inf)
+    if k < cols:
+        cand = np.sort(np.argpartition(-key, k - 1, axis=1)[:, :k], axis=1)
+    else:
+        cand = np.broadcast_to(np.arange(cols), (rows, cols))
+    cand_key = np.take_along_axis(key, cand, axis=1)
+    # Stable on -score so ties keep column order.
+    order = np.argsort(-cand_key, axis=1, kind="stable")
+    ranked = np.take_along_axis(cand, order, axis=1)
+    ok = np.take_along_axis(eligible, ranked, axis=1)
+    return [ranked[r][ok[r]] for r in range(rows)]
+
+
+def rotate(
+    prices: pd.DataFrame,
+    score: pd.DataFrame | np.ndarray,
+    dates: Sequence[pd.Timestamp],
+    top_n: int,
+    returns: Optional[pd.DataFrame | np.ndarray] = None,
+    allow: Optional[np.ndarray] = None,
+) -> RotationBook:
+    """Simulate an equal-weight top-``top_n`` rotation on ``score``.
+
+    ``score`` is aligned with ``prices``; NaN marks an ineligible symbol.
+    ``returns`` defaults to ``prices.pct_change()`` with gaps as 0. ``allow``
+    is an optional per-rebalance bool array (aligned with ``dates``); a
+    ``False`` rebalance goes to cash.
+    """
+    index = prices.index
+    px = prices.to_numpy(dtype="float64", na_value=np.nan)
+    sc = np.asarray(score.to_numpy(dtype="float64", na_value=np.nan) if isinstance(score, pd.DataFrame) else score, dtype="float64")
+    if returns is None:
+        ret = prices.pct_change(fill_method=None).fillna(0).to_numpy(dtype="float64")
+    else:
+        ret = np.asarray(returns.to_numpy(dtype="float64") if isinstance(returns, pd.DataFrame) else returns, dtype="float64")
+    n_rows, n_cols = px.shape
+
+    pos = rebalance_positions(index, dates)
+    keep = pos + 1 < n_rows
+    signal_pos = pos[keep]
+    trade_pos = signal_pos + 1
+    allowed = np.ones(len(pos), dtype=bool) if allow is None else np.asarray(allow, dtype=bool)
+    allowed = allowed[keep]
+
+    rows = sc[signal_pos]
+    eligible = np.isfinite(rows) & ~np.isnan(px[signal_pos]) & allowed[:, None]
+    picks = top_n_rows(rows, eligible, top_n)
+
+    targets = np.zeros((len(signal_pos), n_cols))
+    for r, chosen in enumerate(picks):
+        if chosen.size:
+            targets[r, chosen] = 1.0 / chosen.size
+
+    # Forward-fill each rebalance's targets from its trade bar to the next one.
+    held = np.searchsorted(trade_pos, np.arange(n_rows), side="right") - 1
+    weights = np.where((held >= 0)[:, None], targets[np.maximum(held, 0)] if len(targets) else 0.0, 0.0)
+
+    turnover = np.zeros(n_rows)
+    if len(targets):
+        turnover[trade_pos] = np.abs(np.diff(targets, axis=0, prepend=np.zeros((1, n_cols)))).sum(axis=1)
+    gross = (weights * ret).sum(axis=1)
+
+    return RotationBook(
+        index=index,
+        columns=prices.columns,
+        signal_pos=signal_pos,
+        trade_pos=trade_pos,
+        picks=picks,
+        pick_scores=[rows[r, chosen] for r, chosen in enumerate(picks)],
+        targets=targets,
+        weights=weights,
+        turnover=turnover,
+        gross=gross,
+    )
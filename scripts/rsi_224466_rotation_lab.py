@@ -27,6 +27,12 @@ import numpy as np
 import pandas as pd
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.rotation_features import PanelFeatures  # noqa: E402
+from scripts.rotation_kernel import rebalance_positions, rotate  # noqa: E402
+
 OUT_DIR = ROOT / "reports"
 DEFAULT_HIST_DIRS = [
     ROOT / "intermediary_files" / "Hist_Data",
@@ -99,9 +105,10 @@ def load_prices(
     skipped: dict[str, int] = {"derivative": 0, "not_requested": 0, "too_short": 0, "stale": 0, "read_error": 0}
     summaries: list[dict] = []
 
-    files = sorted(hist_dir.glob("*.feather"))
-    for fp in files:
-        symbol = fp.stem.upper()
+    from Auto_Trader import hist_data
+
+    for name in hist_data.list_symbols(hist_dir):
+        symbol = name.upper()
         if symbols and symbol not in symbols:
             skipped["not_requested"] += 1
             continue
@@ -109,17 +116,11 @@ def load_prices(
             skipped["derivative"] += 1
             continue
         try:
-            df = pd.read_feather(fp)
-            cmap = {str(c).lower(): c for c in df.columns}
-            if "date" not in cmap or "close" not in cmap:
+            frame = hist_data.read_symbol(hist_data.resolve_symbol(hist_dir, name), ("close",))
+            if frame is None:
                 skipped["read_error"] += 1
                 continue
-            s = pd.DataFrame(
-                {
-                    "date": pd.to_datetime(df[cmap["date"]], errors="coerce"),
-                    "close": pd.to_numeric(df[cmap["close"]], errors="coerce"),
-                }
-            ).dropna()
+            s = frame.reset_index().dropna()
             s = s.drop_duplicates("date").sort_values("date")
             if len(s) < min_rows:
                 skipped["too_short"] += 1
@@ -255,37 +256,24 @@ def run_rotation(
     dates = rebalance_dates(prices.index, rebalance)
     regime_mask = build_regime_mask(prices, regime).fillna(False)
 
-    weights = pd.DataFrame(0.0, index=prices.index, columns=prices.columns)
-    turnover = pd.Series(0.0, index=prices.index)
-    previous = pd.Series(0.0, index=prices.columns)
+    allow = regime_mask.to_numpy(dtype=bool)[rebalance_positions(prices.index, dates)]
+    book = rotate(prices, score.reindex(index=prices.index, columns=prices.columns), dates, top_n, returns=returns, allow=allow)
     picks_log: list[dict] = []
-
-    for i, d in enumerate(dates):
-        pos = prices.index.get_loc(d)
-        if pos + 1 >= len(prices.index):
+    for k, chosen in enumerate(book.picks):
+        if not chosen.size:
             continue
-        trade_date = prices.index[pos + 1]
-        end_date = dates[i + 1] if i + 1 < len(dates) else prices.index[-1]
-        target = pd.Series(0.0, index=prices.columns)
-        if bool(regime_mask.loc[d]):
-            sc = score.loc[d].dropna().sort_values(ascending=False)
-            picks = [s for s in sc.index if pd.notna(prices.loc[d, s])][:top_n]
-            if picks:
-                target.loc[picks] = 1.0 / len(picks)
-                picks_log.append(
-                    {
-                        "signal_date": str(d.date()),
-                        "trade_date": str(trade_date.date()),
-                        "picks": picks,
-                        "scores": {s: round(float(sc.loc[s]), 2) for s in picks[:20]},
-                    }
-                )
-        turnover.loc[trade_date] = abs(target - previous).sum()
-        previous = target
-        weights.loc[(prices.index >= trade_date) & (prices.index <= end_date), :] = target.values
-
-    gross = (weights * returns).sum(axis=1)
-    net = gross - turnover * (cost_bps / 10000.0)
+        picks = book.pick_symbols(k)
+        picks_log.append(
+            {
+                "signal_date": str(book.index[book.signal_pos[k]].date()),
+                "trade_date": str(book.index[book.trade_pos[k]].date()),
+                "picks": picks,
+                "scores": {s: round(float(v), 2) for s, v in zip(picks[:20], book.pick_scores[k][:20])},
+            }
+        )
+    weights = book.weights_frame()
+    turnover = book.turnover_series()
+    net = book.net_series(cost_bps)
     name = f"rsi224466_{rebalance}_top{top_n}_{regime}"
     result = metrics(
         name,
@@ -356,7 +344,8 @@ def main() -> int:
         symbols=parse_symbols(args.symbols),
         max_symbols=args.max_symbols,
     )
-    score = (rsi_dataframe(prices, 22) + rsi_dataframe(prices, 44) + rsi_dataframe(prices, 66)) / 3.0
+    features = PanelFeatures(prices)
+    score = (features.rsi(22) + features.rsi(44) + features.rsi(66)) / 3.0
 
     top_ns = [int(x.strip()) for x in str(args.top_n).split(",") if x.strip()]
     rebalances = [x.strip() for x in str(args.rebalance).split(",") if x.strip()]
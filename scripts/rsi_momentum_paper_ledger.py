@@ -56,25 +56,43 @@ class RebalanceDataError(RuntimeError):
 
 # ── Data loading ──────────────────────────────────────────────
 
-def load_prices(hist_dir: Path, min_rows: int = 350) -> pd.DataFrame:
-    """Load OHLCV close prices from feather files."""
+_DERIVATIVE_MARKERS = ("FUT", "OPT", "-I", "-II")
+
+
+def _is_derivative(symbol: str) -> bool:
+    return any(kw in symbol for kw in _DERIVATIVE_MARKERS)
+
+
+def load_frames(hist_dir: Path, symbols: Optional[set] = None, with_hl: bool = False) -> dict:
+    """One projected read of Hist_Data shared by ``load_prices`` and ``load_ohlcv``.
+
+    Only ``symbols``' files are opened (every file when ``None``) and only
+    date/close (plus high/low, where present, when ``with_hl``) are read.
+    """
+    from Auto_Trader.hist_data import load_frames as _load_frames
+
+    if symbols is not None:
+        symbols = {s for s in symbols if not _is_derivative(s)}
+    frames = _load_frames(hist_dir, symbols, ("close",), optional=("high", "low") if with_hl else ())
+    return {sym: df for sym, df in frames.items() if not _is_derivative(sym)}
+
+
+def load_prices(
+    hist_dir: Path,
+    min_rows: int = 350,
+    symbols: Optional[set] = None,
+    frames: Optional[dict] = None,
+) -> pd.DataFrame:
+    """Close-price panel from ``frames`` (or a fresh projected read of ``symbols``)."""
     if not hist_dir.is_dir():
         return pd.DataFrame()
+    if frames is None:
+        frames = load_frames(hist_dir, symbols)
     loaded = {}
-    for fpath in sorted(hist_dir.glob("*.feather")):
-        symbol = fpath.stem
-        try:
-            df = pd.read_feather(fpath)
-        except Exception:
+    for symbol, df in frames.items():
+        if symbols is not None and symbol not in symbols:
             continue
-        if any(kw in symbol for kw in ["FUT", "OPT", "-I", "-II"]):
-            continue
-        date_col = next((c for c in ["date", "Date", "datetime"] if c in df.columns), None)
-        close_col = next((c for c in ["close", "Close", "CLOSE"] if c in df.columns), None)
-        if date_col is None or close_col is None:
-            continue
-        df[date_col] = pd.to_datetime(df[date_col]).dt.tz_localize(None)
-        s = df.set_index(date_col)[close_col].dropna().sort_index()
+        s = df["close"].dropna()
         if len(s) >= min_rows:
             loaded[symbol] = s
     prices_df = pd.DataFrame(loaded).sort_index()
@@ -83,78 +101,61 @@ def load_prices(hist_dir: Path, min_rows: int = 350) -> pd.DataFrame:
     return prices_df.ffill(limit=3)
 
 
-def load_ohlcv(hist_dir: Path, symbols: set) -> dict:
+def load_ohlcv(hist_dir: Path, symbols: set, frames: Optional[dict] = None) -> dict:
     """Load OHLCV data for SuperTrend. Returns {sym: DataFrame(Close,High,Low)}."""
+    if frames is None:
+        frames = load_frames(hist_dir, symbols, with_hl=True)
     ohlcv = {}
-    for fpath in sorted(hist_dir.glob("*.feather")):
-        sym = fpath.stem
-        if sym not in symbols or any(kw in sym for kw in ["FUT", "OPT", "-I", "-II"]):
-            continue
-        try:
-            df = pd.read_feather(fpath)
-        except Exception:
+    for sym in sorted(symbols):
+        df = frames.get(sym)
+        if df is None or not {"high", "low"}.issubset(df.columns):
             continue
-        dc = next((c for c in ["date", "Date", "datetime"] if c in df.columns), None)
-        cc = next((c for c in ["close", "Close", "CLOSE"] if c in df.columns), None)
-        hc = next((c for c in ["high", "High"] if c in df.columns), None)
-        lc = next((c for c in ["low", "Low"] if c in df.columns), None)
-        if not all([dc, cc, hc, lc]):
-            continue
-        df[dc] = pd.to_datetime(df[dc]).dt.tz_localize(None)
-        df = df.set_index(dc).sort_index()
-        df = df.rename(columns={cc: "Close", hc: "High", lc: "Low"})
-        ohlcv[sym] = df[["Close", "High", "Low"]]
+        ohlcv[sym] = df.rename(columns={"close": "Close", "high": "High", "low": "Low"})[["Close", "High", "Low"]]
     return ohlcv
 
 
-def _check_st_exits(state, ohlcv_data, prices_dict, today):
+def _check_st_exits(state, ohlcv_data, prices_dict, today, mult=None):
     """Check held positions against SuperTrend and sell if below.
     Returns list of exit trades for logging/alerts."""
     import traceback as _tb
 
-    if ST_EXIT_MULT <= 0:
+    mult = ST_EXIT_MULT if mult is None else mult
+    if mult <= 0:
         return []  # disabled
     
     if not ohlcv_data:
         print("[ST-EXIT] No OHLCV data available — skipping ST check")
         return []
     
+    from Auto_Trader.supertrend_panel import stack_bars, supertrend
+
+    held = {}
+    for sym in state.positions:
+        if sym not in ohlcv_data:
+            continue
+        odf = ohlcv_data[sym]
+        # Need at least 20 bars for ATR+ST
+        if len(odf) < 20:
+            print(f"[ST-EXIT] {sym}: insufficient data ({len(odf)} bars, need 20) — skipping")
+            continue
+        held[sym] = odf
+    if not held:
+        return []
+
+    # One panel pass over every holding; row -1 is each symbol's latest bar.
+    symbols, bars = stack_bars(held)
+    st_panel, _ = supertrend(bars["High"], bars["Low"], bars["Close"], multiplier=mult)
+    last_st = dict(zip(symbols, st_panel[-1]))
+
     exits = []
     for sym, shares in list(state.positions.items()):
         try:
-            if sym not in ohlcv_data:
+            if sym not in last_st:
                 continue
-            
-            odf = ohlcv_data[sym]
-            # Need at least 20 bars for ATR+ST
-            if len(odf) < 20:
-                print(f"[ST-EXIT] {sym}: insufficient data ({len(odf)} bars, need 20) — skipping")
-                continue
-            
-            h = odf["High"].values
-            l = odf["Low"].values
-            c = odf["Close"].values
-            
-            # ATR(14)
-            tr = np.maximum(h - l, np.maximum(
-                np.abs(h - np.roll(c, 1)), np.abs(l - np.roll(c, 1))))
-            atr = np.full(len(tr), np.nan)
-            atr[13] = np.nanmean(tr[:14])
-            for i in range(14, len(tr)):
-                atr[i] = (atr[i - 1] * 13 + tr[i]) / 14
-            
-            # SuperTrend
-            hl2 = (h + l) * 0.5
-            up = hl2 + ST_EXIT_MULT * atr
-            dn = hl2 - ST_EXIT_MULT * atr
-            
-            up_shift = np.roll(up, 1); up_shift[0] = np.nan
-            dn_shift = np.roll(dn, 1); dn_shift[0] = np.nan
-            
-            raw = np.where(c > up_shift, dn, np.where(c < dn_shift, up, np.nan))
-            st_line = pd.Series(raw).ffill().values
-            above_st = c[-1] > st_line[-1] if not np.isnan(st_line[-1]) else True
-            
+            c = held[sym]["Close"].values
+            st_last = last_st[sym]
+            above_st = c[-1] > st_last if not np.isnan(st_last) else True
+
             if not above_st:
                 # Position is below SuperTrend -> exit
                 px = prices_dict.get(sym, c[-1])
@@ -175,7 +176,7 @@ def _check_st_exits(state, ohlcv_data, prices_dict, today):
                     "gross": round(gross, 2),
                     "cost": round(cost, 2),
                     "net": round(net, 2),
-                    "reason": f"below Supertrend({ST_EXIT_MULT}xATR)",
+                    "reason": f"below Supertrend({mult}xATR)",
                 })
                 exits.append({"symbol": sym, "shares": shares, "price": px, "net": net})
                 # Track realized P&L before deleting cost basis
@@ -196,12 +197,13 @@ def _check_st_exits(state, ohlcv_data, prices_dict, today):
     return exits
 
 
-def _format_st_exit_alert(exits, today):
+def _format_st_exit_alert(exits, today, mult=None):
     """Format a compact ST exit Telegram alert."""
     if not exits:
         return ""
+    mult = ST_EXIT_MULT if mult is None else mult
     total_net = sum(e["net"] for e in exits)
-    lines = [f"[PAPER][RSI-MOM] ST Exit ({ST_EXIT_MULT}xATR)", f"Date: {today}"]
+    lines = [f"[PAPER][RSI-MOM] ST Exit ({mult}xATR)", f"Date: {today}"]
     for e in exits:
         lines.append(f'SELL {e["symbol"]} {e["shares"]} @ Rs.{e["price"]:,.2f} (Rs.{e["net"]:,.0f})')
     lines.append(f'Total exited: Rs.{total_net:,.0f}')
@@ -613,23 +615,116 @@ def log_daily(state: PortfolioState, value: float, date: str) -> None:
 
 # ── Main ────────────────────────────────────────────────────
 
+# ── Engine ───────────────────────────────────────────────────
+
+@dataclass
+class LedgerRun:
+    """Outcome of one ledger pass; ``code`` is the CLI exit status."""
+    code: int
+    output: Optional[dict] = None
+    state: Optional[PortfolioState] = None
+    new_trades: list[dict] = field(default_factory=list)
+    st_exits: list[dict] = field(default_factory=list)
+
+
+class LedgerEngine:
+    """Importable ledger that keeps prices and state warm between runs.
+
+    Hist_Data frames are cached per symbol and re-read only when the stored
+    history's mtime/size changes (either ``hist_data`` layout); the portfolio state is re-parsed only when the state
+    file changes on disk (e.g. after a cron run). A long-lived host such as
+    ``scripts/paper_rebalancer.py`` calls ``run()`` directly instead of
+    spawning this script.
+    """
+
+    def __init__(self, hist_dir: Optional[Path] = None, st_exit_mult: Optional[float] = None):
+        self.hist_dir = Path(hist_dir or HIST_DIR)
+        self.st_exit_mult = ST_EXIT_MULT if st_exit_mult is None else float(st_exit_mult)
+        self._frames: dict[str, tuple[tuple[int, int, bool], pd.DataFrame]] = {}
+        self._state: Optional[tuple[tuple[int, int], PortfolioState]] = None
+
+    @staticmethod
+    def _stamp(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def load_frames(self, symbols: set, with_hl: bool = False) -> dict:
+        from Auto_Trader.hist_data import symbol_stamp
+
+        if not self.hist_dir.is_dir():
+            return {}
+        out, stale = {}, set()
+        for sym in symbols:
+            stamp = symbol_stamp(self.hist_dir, sym)
+            hit = self._frames.get(sym)
+            if stamp is None:
+                self._frames.pop(sym, None)
+            elif hit is not None and hit[0][:2] == stamp and (hit[0][2] or not with_hl):
+                out[sym] = hit[1]
+            else:
+                stale.add(sym)
+        if stale:
+            fresh = load_frames(self.hist_dir, stale, with_hl=with_hl)
+            for sym, df in fresh.items():
+                stamp = symbol_stamp(self.hist_dir, sym)
+                if stamp is not None:
+                    self._frames[sym] = ((*stamp, with_hl), df)
+                out[sym] = df
+        return out
+
+    def load_state(self) -> PortfolioState:
+        stamp = self._stamp(STATE_FILE)
+        if stamp is None or self._state is None or self._state[0] != stamp:
+            state = load_state()
+            if stamp is None:
+                return state
+            self._state = (stamp, state)
+        # Runs mutate the state in place; hand out a copy so a failed run
+        # cannot leave the warm copy ahead of the file.
+        return copy.deepcopy(self._state[1])
+
+    def remember_state(self, state: PortfolioState) -> None:
+        stamp = self._stamp(STATE_FILE)
+        if stamp is not None:
+            self._state = (stamp, copy.deepcopy(state))
+
+    def run(self) -> LedgerRun:
+        return run_ledger(self)
+
+
 def main() -> int:
-    prices_df = load_prices(HIST_DIR, min_rows=MIN_PRICE_ROWS)
-    if prices_df.empty:
-        print("ERROR: no price data")
-        return 1
+    return run_ledger().code
 
+
+def run_ledger(engine: Optional[LedgerEngine] = None) -> LedgerRun:
+    engine = engine or LedgerEngine()
+    st_mult = engine.st_exit_mult
     signal = get_latest_signal()
+    # Load state
+    state = engine.load_state()
+
+    # Only the signal's picks and current holdings are priced; read just
+    # those files, once, for both the close panel and the SuperTrend check.
+    needed = set(state.positions) | set((signal or {}).get("picks") or [])
+    frames = engine.load_frames(needed, with_hl=st_mult > 0)
+    prices_df = load_prices(engine.hist_dir, min_rows=MIN_PRICE_ROWS, frames=frames)
+    if prices_df.empty and needed:
+        print("ERROR: no price data")
+        return LedgerRun(1)
+
     if signal is None:
         print("WARN: no paper shadow signal found — skipping")
-        return 0
+        return LedgerRun(0)
 
     signal_date = signal.get("date", "")
     picks = signal.get("picks", [])
 
     if not picks:
         print("WARN: no picks in signal")
-        return 0
+        return LedgerRun(0)
 
     # Today = latest available date in price data (end-of-day)
     # In cron: this is today's EOD data
@@ -648,9 +743,6 @@ def main() -> int:
         else:
             signal_prices = prices_df.iloc[-1]
 
-    # Load state
-    state = load_state()
-
     # Check if rebalance needed
     new_trades: list[dict] = []
     trade_log_len_before = len(state.trade_log)
@@ -666,9 +758,12 @@ def main() -> int:
             new_trades = state.trade_log[trade_log_len_before:]
     except RebalanceDataError as exc:
         print(f"ERROR: rebalance aborted without state changes: {exc}")
-        return 2
+        return LedgerRun(2)
+
+    # MTM current positions — prefer live prices from the shared price board
+    # (legacy JSON snapshot when no board exists), fall back to Hist_Data
+    from Auto_Trader.price_board import load_live_payload
 
-    # MTM current positions — prefer live prices from rt_compute, fall back to Hist_Data
     LIVE_PRICE_FILE = ROOT / "reports" / "live_prices.json"
 
     prices_dict: dict[str, float] = {}
@@ -677,9 +772,9 @@ def main() -> int:
     live_age_sec: float | None = None
     fresh_live_count = 0
 
-    if LIVE_PRICE_FILE.exists():
+    live = load_live_payload(LIVE_PRICE_FILE, symbols=state.positions)
+    if live:
         try:
-            live = json.loads(LIVE_PRICE_FILE.read_text())
             live_time = live.get("time", "")
             live_prices = live.get("prices", {})
             price_times = live.get("price_times", {}) if isinstance(live.get("price_times"), dict) else {}
@@ -746,9 +841,9 @@ def main() -> int:
 
     # ── SuperTrend exit check (daily, between rebalances) ──
     st_exits = []
-    if ST_EXIT_MULT > 0 and len(state.positions) > 0:
-        st_ohlcv = load_ohlcv(HIST_DIR, set(state.positions.keys()))
-        st_exits = _check_st_exits(state, st_ohlcv, prices_dict, today)
+    if st_mult > 0 and len(state.positions) > 0:
+        st_ohlcv = load_ohlcv(engine.hist_dir, set(state.positions.keys()), frames=frames)
+        st_exits = _check_st_exits(state, st_ohlcv, prices_dict, today, mult=st_mult)
         if st_exits:
             # Recompute portfolio value after exits
             current_value = portfolio_value(state, prices_dict)
@@ -760,11 +855,12 @@ def main() -> int:
     # Save state before sending Telegram so a notification retry cannot duplicate
     # the same paper rebalance on the next 5-minute cron tick.
     save_state(state)
+    engine.remember_state(state)
 
     telegram_alert_sent = False
     if st_exits:
         telegram_alert_sent = send_paper_telegram_alert(
-            _format_st_exit_alert(st_exits, today)
+            _format_st_exit_alert(st_exits, today, mult=st_mult)
         )
     if new_trades:
         telegram_alert_sent = send_paper_telegram_alert(
@@ -837,7 +933,7 @@ def main() -> int:
         print(f"Return:     {metrics['total_return_pct']:+.2f}%  CAGR: {metrics.get('cagr_pct', 0):+.2f}%")
         print(f"MaxDD:      {metrics['max_drawdown_pct']:+.2f}%  Sharpe: {metrics.get('sharpe', 0):.3f}")
     print(f"Saved: {OUTPUT_FILE}")
-    return 0
+    return LedgerRun(0, output=output, state=state, new_trades=new_trades, st_exits=st_exits)
 
 
 if __name__ == "__main__":
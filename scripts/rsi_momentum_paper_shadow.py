@@ -28,8 +28,8 @@ from scripts.rsi_momentum_robustness_report import strategy_daily_returns
 from scripts.rsi_224466_rotation_lab import (
     load_prices as lab_load_prices,
     rebalance_dates as lab_rebalance_dates,
-    rsi_dataframe as lab_rsi,
 )
+from scripts.rotation_features import PanelFeatures
 
 OUT_DIR = ROOT / "reports"
 HIST_DIR = ROOT / "intermediary_files" / "Hist_Data"
@@ -63,25 +63,21 @@ def _load_instruments_master():
 
 def _filter_universe(prices):
     """Apply volume, market cap, and sector filters to the price universe."""
+    from Auto_Trader import hist_data
+
     hist_dir = ROOT / "intermediary_files" / "Hist_Data"
     instruments = _load_instruments_master()
 
     keep = []
     for col in prices.columns:
         sym = str(col).strip().upper()
-        f = hist_dir / f"{sym}.feather"
-
-        # Volume filter
-        if MIN_AVG_VOLUME > 0 and f.exists():
-            try:
-                df = pd.read_feather(f)
-                vol_col = "volume" if "volume" in df.columns else ("Volume" if "Volume" in df.columns else None)
-                if vol_col:
-                    avg_vol = df[vol_col].tail(20).mean()
-                    if avg_vol < MIN_AVG_VOLUME:
-                        continue
-            except Exception:
-                pass
+        f = hist_data.resolve_symbol(hist_dir, sym)
+
+        # Volume filter (projected read of the volume column only)
+        if MIN_AVG_VOLUME > 0 and f is not None:
+            vol = hist_data.read_symbol(f, ("volume",))
+            if vol is not None and vol["volume"].tail(20).mean() < MIN_AVG_VOLUME:
+                continue
 
         # Market cap filter (only for stocks in watchlist)
         if MIN_MARKET_CAP_CR > 0 and not instruments.empty:
@@ -180,25 +176,23 @@ def compute_rotation(prices: pd.DataFrame, top_n: int = TOP_N) -> dict:
     instruments = _load_instruments_master()
 
     prices_ffill = prices
+    # Derived panels come from the on-disk feature cache; only new dates are computed.
+    features = PanelFeatures(prices_ffill)
 
     # SMA200 filter: price must be above 200-day moving average
     # Regime filter: configurable SMA (sma100 best in backtest sweep)
     regime_window = 100 if REGIME_MODE == "sma100" else 200
-    regime_ma = prices_ffill.rolling(regime_window, min_periods=regime_window).mean()
+    regime_ma = features.sma(regime_window)
     regime_filter = (prices_ffill > regime_ma).astype(float) if REGIME_MODE != "none" else (prices_ffill > 0).astype(float)
 
     # MACD filter: MACD line must be above signal line
-    ema_fast = prices_ffill.ewm(span=12, min_periods=12).mean()
-    ema_slow = prices_ffill.ewm(span=26, min_periods=26).mean()
-    macd_line = ema_fast - ema_slow
-    macd_signal = macd_line.ewm(span=9, min_periods=9).mean()
-    macd_filter = (macd_line > macd_signal).astype(float)
-    mom_1m = prices_ffill.pct_change(MOMENTUM_PERIOD, fill_method=None)
+    macd_filter = features.macd_above_signal(12, 26, 9)
+    mom_1m = features.momentum(MOMENTUM_PERIOD)
 
     # RSI composite score
-    rsi22 = lab_rsi(prices_ffill, 22)
-    rsi44 = lab_rsi(prices_ffill, 44)
-    rsi66 = lab_rsi(prices_ffill, 66)
+    rsi22 = features.rsi(22)
+    rsi44 = features.rsi(44)
+    rsi66 = features.rsi(66)
     score = (rsi22 + rsi44 + rsi66) / 3.0
 
     # Rebalance dates (configurable, default bi-weekly Friday)
@@ -239,6 +233,7 @@ def compute_rotation(prices: pd.DataFrame, top_n: int = TOP_N) -> dict:
         cost_bps=COST_BPS,
         momentum_period=MOMENTUM_PERIOD,
         rebalance_freq=REBALANCE_FREQ,
+        features=features,
     )
     if r.empty or not pick_log:
         return {"error": "no active periods in backtest"}
@@ -357,7 +352,7 @@ def compute_rotation(prices: pd.DataFrame, top_n: int = TOP_N) -> dict:
     eq_12m = (1 + last_12m).cumprod()
     ret_12m = eq_12m.iloc[-1] - 1 if len(eq_12m) > 0 else 0.0
 
-    headline = run_is_headline(prices_ffill, top_n=top_n, cost_bps=COST_BPS)
+    headline = run_is_headline(prices_ffill, top_n=top_n, cost_bps=COST_BPS, features=features)
 
     quality_error = signal_data_quality_error(
         prices_ffill,
@@ -420,6 +415,12 @@ def main():
     output_path = OUT_DIR / "paper_shadow_rsi_momentum_latest.json"
     output_path.write_text(json.dumps(result, indent=2), encoding="utf-8")
 
+    # Wake the in-process rebalancer (if wednesday.py is running) instead of
+    # waiting for its file watch to notice the new signal.
+    from scripts.paper_rebalancer import notify_rebalancer
+
+    notify_rebalancer("signal", date=result["latest_signal"]["date"])
+
     # Print summary
     picks = result["latest_signal"]["picks"]
     scores = result["latest_signal"]["scores"]
@@ -30,6 +30,8 @@ from scripts.rsi_224466_rotation_lab import (
     rebalance_dates as lab_rebalance_dates,
     find_hist_dir as lab_find_hist_dir,
 )
+from scripts.rotation_features import PanelFeatures
+from scripts.rotation_kernel import rotate
 
 OUT_DIR = ROOT / "reports"
 OUT_DIR.mkdir(exist_ok=True)
@@ -85,40 +87,28 @@ class Report:
         }
 
 
-def run_is_headline(prices: pd.DataFrame, top_n: int, cost_bps: float = 10.0) -> dict:
-    """In-sample full-period metrics for the RSI+momentum strategy."""
-    rsi_score = (lab_rsi(prices, 22) + lab_rsi(prices, 44) + lab_rsi(prices, 66)) / 3.0
-    mom_1m = prices.pct_change(21, fill_method=None)
-    returns = prices.pct_change(fill_method=None).fillna(0)
+def rotation_score(
+    prices: pd.DataFrame, momentum_period: int = 21, features: PanelFeatures | None = None
+) -> pd.DataFrame:
+    """RSI 22/44/66 average where 1-month momentum is positive; NaN marks ineligible."""
+    if features is None:
+        rsi_score = (lab_rsi(prices, 22) + lab_rsi(prices, 44) + lab_rsi(prices, 66)) / 3.0
+        mom_1m = prices.pct_change(momentum_period, fill_method=None)
+    else:
+        rsi_score = (features.rsi(22) + features.rsi(44) + features.rsi(66)) / 3.0
+        mom_1m = features.momentum(momentum_period)
+    combined = rsi_score.where(mom_1m > 0, 0)
+    return combined.where(combined > 0)
 
-    dates = lab_rebalance_dates(prices.index, "ME")
-    weights = pd.DataFrame(0.0, index=prices.index, columns=prices.columns)
-    turnover_l = pd.Series(0.0, index=prices.index)
-    prev = pd.Series(0.0, index=prices.columns)
 
-    for i, d in enumerate(dates):
-        pos = prices.index.get_loc(d)
-        if pos + 1 >= len(prices.index):
-            continue
-        td = prices.index[pos + 1]
-        ed = dates[i + 1] if i + 1 < len(dates) else prices.index[-1]
-        target = pd.Series(0.0, index=prices.columns)
-        rsi_at = rsi_score.loc[d].copy()
-        mom_at = mom_1m.loc[d].copy()
-        combined = rsi_at.where(mom_at > 0, 0)
-        sc = combined.dropna().sort_values(ascending=False)
-        picks = [s for s in sc.index if s in prices.columns and pd.notna(prices.loc[d, s]) and sc[s] > 0][:top_n]
-        if picks:
-            target.loc[picks] = 1.0 / len(picks)
-        turnover_l.loc[td] = abs(target - prev).sum()
-        prev = target
-        mask = (prices.index >= td) & (prices.index <= ed)
-        weights.loc[mask, :] = target.values
-
-    gross = (weights * returns).sum(axis=1)
-    net = gross - turnover_l * (cost_bps / 10000.0)
-
-    active = weights.sum(axis=1) > 0
+def run_is_headline(
+    prices: pd.DataFrame, top_n: int, cost_bps: float = 10.0, features: PanelFeatures | None = None
+) -> dict:
+    """In-sample full-period metrics for the RSI+momentum strategy."""
+    book = rotate(prices, rotation_score(prices, 21, features), lab_rebalance_dates(prices.index, "ME"), top_n)
+    net = book.net_series(cost_bps)
+
+    active = book.active
     if not active.any():
         raise ValueError("No active periods")
 
@@ -155,10 +145,10 @@ def run_is_headline(prices: pd.DataFrame, top_n: int, cost_bps: float = 10.0) ->
 
 
 def run_walkforward(prices: pd.DataFrame, top_n: int, cost_bps: float = 10.0,
-                    test_months: int = 6, min_train_years: int = 2) -> list[WFFold]:
+                    test_months: int = 6, min_train_years: int = 2,
+                    features: PanelFeatures | None = None) -> list[WFFold]:
     """Expanding-window walk-forward validation."""
-    rsi_score = (lab_rsi(prices, 22) + lab_rsi(prices, 44) + lab_rsi(prices, 66)) / 3.0
-    mom_1m = prices.pct_change(21, fill_method=None)
+    score = rotation_score(prices, 21, features)
     returns = prices.pct_change(fill_method=None).fillna(0)
     all_dates = prices.index
 
@@ -186,31 +176,10 @@ def run_walkforward(prices: pd.DataFrame, top_n: int, cost_bps: float = 10.0,
             continue
 
         fi += 1
-        weights = pd.DataFrame(0.0, index=test_dates, columns=prices.columns)
-        turnover_l = pd.Series(0.0, index=test_dates)
-        prev = pd.Series(0.0, index=prices.columns)
-
-        for i, d in enumerate(rb_dates):
-            pos_idx = test_dates.get_loc(d)
-            if pos_idx + 1 >= len(test_dates):
-                continue
-            td = test_dates[pos_idx + 1]
-            ed = test_dates[test_dates.get_loc(rb_dates[i + 1])] if i + 1 < len(rb_dates) else test_dates[-1]
-            target = pd.Series(0.0, index=prices.columns)
-            rsi_at = rsi_score.loc[d].copy()
-            mom_at = mom_1m.loc[d].copy()
-            combined = rsi_at.where(mom_at > 0, 0)
-            sc = combined.dropna().sort_values(ascending=False)
-            picks = [s for s in sc.index if s in prices.columns and pd.notna(prices.loc[d, s]) and sc[s] > 0][:top_n]
-            if picks:
-                target.loc[picks] = 1.0 / len(picks)
-            turnover_l.loc[td] = abs(target - prev).sum()
-            prev = target
-            mask = (test_dates >= td) & (test_dates <= ed)
-            weights.loc[mask, :] = target.values
-
-        gross = (weights * returns.loc[test_dates]).sum(axis=1).fillna(0)
-        net = gross - turnover_l * (cost_bps / 10000.0)
+        book = rotate(
+            prices.loc[test_dates], score.loc[test_dates], rb_dates, top_n, returns=returns.loc[test_dates]
+        )
+        net = book.net_series(cost_bps)
         eq = (1 + net).cumprod()
 
         if eq.iloc[-1] > 0 and len(net) > 30:
@@ -270,6 +239,7 @@ def main() -> int:
     print(f"Loaded {prices.shape[1]} symbols, {prices.shape[0]} days ({prices.index[0].date()} to {prices.index[-1].date()})")
 
     all_reports = []
+    features = PanelFeatures(prices)
 
     for top_n in args.top_n:
         print(f"\n{'='*60}")
@@ -284,7 +254,7 @@ def main() -> int:
 
         if not args.skip_is:
             print("\n  --- IN-SAMPLE HEADLINE ---")
-            headline = run_is_headline(prices, top_n, args.cost_bps)
+            headline = run_is_headline(prices, top_n, args.cost_bps, features=features)
             report.is_headline = headline
             print(f"  CAGR  = {headline['cagr_pct']:.2f}%")
             print(f"  XIRR  = {headline['xirr_pct']:.2f}%")
@@ -294,7 +264,7 @@ def main() -> int:
 
         if not args.skip_wf:
             print("\n  --- WALK-FORWARD ---")
-            folds = run_walkforward(prices, top_n, args.cost_bps, args.test_months, args.min_train_years)
+            folds = run_walkforward(prices, top_n, args.cost_bps, args.test_months, args.min_train_years, features=features)
             report.wf_folds = folds
             report.finalize_wf()
 
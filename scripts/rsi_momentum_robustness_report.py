@@ -26,12 +26,14 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from scripts.rsi_momentum_report import find_hist_dir
+from scripts.rsi_momentum_report import find_hist_dir, rotation_score
 from scripts.rsi_224466_rotation_lab import (
     load_prices as lab_load_prices,
     rebalance_dates as lab_rebalance_dates,
-    rsi_dataframe as lab_rsi,
 )
+from scripts.bootstrap_engine import METHODS as BOOTSTRAP_METHODS, bootstrap_paths, default_block, summarize
+from scripts.rotation_features import PanelFeatures
+from scripts.rotation_kernel import RotationBook, rotate
 
 OUT_DIR = ROOT / "reports"
 OUT_DIR.mkdir(exist_ok=True)
@@ -49,57 +51,42 @@ def load_research_prices(hist_dir_override: str = "") -> tuple[pd.DataFrame, dic
     return prices_raw.ffill(limit=3), ctx
 
 
+def strategy_book(
+    prices: pd.DataFrame,
+    top_n: int = 10,
+    momentum_period: int = 21,
+    rebalance_freq: str = "ME",
+    score: pd.DataFrame | None = None,
+) -> RotationBook:
+    """Cost-free rotation book; pass ``score`` to reuse one across a sweep."""
+    if score is None:
+        score = rotation_score(prices, momentum_period)
+    return rotate(prices, score, lab_rebalance_dates(prices.index, rebalance_freq), top_n)
+
+
+def book_pick_log(book: RotationBook) -> list[dict]:
+    return [
+        {
+            "signal_date": str(book.index[sp].date()),
+            "trade_date": str(book.index[tp].date()),
+            "pick_count": int(len(book.picks[k])),
+            "picks": book.pick_symbols(k),
+        }
+        for k, (sp, tp) in enumerate(zip(book.signal_pos, book.trade_pos))
+    ]
+
+
 def strategy_daily_returns(
     prices: pd.DataFrame,
     top_n: int = 10,
     cost_bps: float = 10.0,
     momentum_period: int = 21,
     rebalance_freq: str = "ME",
+    features: PanelFeatures | None = None,
 ) -> tuple[pd.Series, list[dict]]:
-    rsi_score = (lab_rsi(prices, 22) + lab_rsi(prices, 44) + lab_rsi(prices, 66)) / 3.0
-    mom_1m = prices.pct_change(momentum_period, fill_method=None)
-    returns = prices.pct_change(fill_method=None).fillna(0)
-    dates = lab_rebalance_dates(prices.index, rebalance_freq)
-    weights = pd.DataFrame(0.0, index=prices.index, columns=prices.columns)
-    turnover_l = pd.Series(0.0, index=prices.index)
-    prev = pd.Series(0.0, index=prices.columns)
-    pick_log: list[dict] = []
-
-    for i, d in enumerate(dates):
-        pos = prices.index.get_loc(d)
-        if pos + 1 >= len(prices.index):
-            continue
-        td = prices.index[pos + 1]
-        ed = dates[i + 1] if i + 1 < len(dates) else prices.index[-1]
-        target = pd.Series(0.0, index=prices.columns)
-        rsi_at = rsi_score.loc[d].copy()
-        mom_at = mom_1m.loc[d].copy()
-        combined = rsi_at.where(mom_at > 0, 0)
-        scored = combined.dropna().sort_values(ascending=False)
-        picks = [
-            s
-            for s in scored.index
-            if s in prices.columns and pd.notna(prices.loc[d, s]) and scored[s] > 0
-        ][:top_n]
-        if picks:
-            target.loc[picks] = 1.0 / len(picks)
-        turnover_l.loc[td] = abs(target - prev).sum()
-        prev = target
-        mask = (prices.index >= td) & (prices.index <= ed)
-        weights.loc[mask, :] = target.values
-        pick_log.append(
-            {
-                "signal_date": str(d.date()),
-                "trade_date": str(td.date()),
-                "pick_count": int(len(picks)),
-                "picks": picks,
-            }
-        )
-
-    gross = (weights * returns).sum(axis=1)
-    net = gross - turnover_l * (cost_bps / 10000.0)
-    active = weights.sum(axis=1) > 0
-    return net.loc[active].copy(), pick_log
+    score = rotation_score(prices, momentum_period, features) if features is not None else None
+    book = strategy_book(prices, top_n, momentum_period, rebalance_freq, score=score)
+    return book.net_series(cost_bps, active_only=True), book_pick_log(book)
 
 
 def metrics_from_returns(r: pd.Series) -> dict:
@@ -151,32 +138,23 @@ def rolling_window_checks(r: pd.Series, years_list: list[int]) -> dict:
     return out
 
 
-def monte_carlo_monthly_bootstrap(r: pd.Series, simulations: int, seed: int) -> dict:
+def monte_carlo_monthly_bootstrap(
+    r: pd.Series,
+    simulations: int,
+    seed: int,
+    method: str = "iid",
+    block: int = 0,
+    workers: int = 0,
+) -> dict:
     monthly = (1 + r).groupby(pd.Grouper(freq="ME")).prod() - 1
     vals = monthly.values
-    n_months = len(vals)
-    rng = np.random.default_rng(seed)
-    mc = []
-    for _ in range(simulations):
-        sample = rng.choice(vals, size=n_months, replace=True)
-        eq = np.cumprod(1 + sample)
-        total = eq[-1]
-        cagr = total ** (12 / n_months) - 1 if n_months else 0.0
-        dd = np.min(eq / np.maximum.accumulate(eq) - 1) if len(eq) else 0.0
-        mc.append((cagr * 100, dd * 100, (total - 1) * 100))
-    mc_arr = np.array(mc)
-    return {
-        "simulations": int(len(mc_arr)),
-        "cagr_pct_p5": round(float(np.percentile(mc_arr[:, 0], 5)), 2),
-        "cagr_pct_p25": round(float(np.percentile(mc_arr[:, 0], 25)), 2),
-        "cagr_pct_p50": round(float(np.percentile(mc_arr[:, 0], 50)), 2),
-        "cagr_pct_p75": round(float(np.percentile(mc_arr[:, 0], 75)), 2),
-        "cagr_pct_p95": round(float(np.percentile(mc_arr[:, 0], 95)), 2),
-        "pct_sims_above_30_cagr": round(float(np.mean(mc_arr[:, 0] > 30.0) * 100), 1),
-        "max_dd_pct_p50": round(float(np.percentile(mc_arr[:, 1], 50)), 2),
-        "max_dd_pct_p95_worse": round(float(np.percentile(mc_arr[:, 1], 5)), 2),
-        "total_return_pct_p50": round(float(np.percentile(mc_arr[:, 2], 50)), 2),
-    }
+    block = block or default_block(len(vals))
+    stats = bootstrap_paths(vals, simulations, seed, method=method, block=block, periods_per_year=12, workers=workers)
+    out = summarize(stats)
+    out["method"] = method
+    if method != "iid":
+        out["block_months"] = int(block)
+    return out
 
 
 def top_symbol_frequency(pick_log: list[dict], limit: int = 10) -> dict:
@@ -198,22 +176,24 @@ def main() -> int:
     parser.add_argument("--rolling-years", default="1,2,3")
     parser.add_argument("--simulations", type=int, default=5000)
     parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--bootstrap", choices=BOOTSTRAP_METHODS, default="iid")
+    parser.add_argument("--block-months", type=int, default=0, help="block/stationary mean block length (0 = n^(1/3))")
+    parser.add_argument("--mc-workers", type=int, default=0, help="process-pool shards for the Monte Carlo (0 = in-process)")
     args = parser.parse_args()
 
     prices, data_ctx = load_research_prices(args.hist_dir)
-    base_returns, pick_log = strategy_daily_returns(
-        prices,
-        top_n=args.top_n,
-        cost_bps=args.cost_bps,
-        momentum_period=args.momentum_period,
-    )
+    score = rotation_score(prices, args.momentum_period, PanelFeatures(prices))
+    base_book = strategy_book(prices, top_n=args.top_n, score=score)
+    base_returns = base_book.net_series(args.cost_bps, active_only=True)
+    pick_log = book_pick_log(base_book)
     cost_grid = [float(x) for x in args.cost_grid.split(",") if x.strip()]
     topn_grid = [int(x) for x in args.topn_grid.split(",") if x.strip()]
     rolling_years = [int(x) for x in args.rolling_years.split(",") if x.strip()]
 
+    # Cost only scales turnover, so every cost point reuses the base book.
     cost_sensitivity = {}
     for bps in cost_grid:
-        r, _ = strategy_daily_returns(prices, top_n=args.top_n, cost_bps=bps, momentum_period=args.momentum_period)
+        r = base_book.net_series(bps, active_only=True)
         m = metrics_from_returns(r)
         cost_sensitivity[str(int(bps) if float(bps).is_integer() else bps)] = {
             k: m[k]
@@ -222,7 +202,7 @@ def main() -> int:
 
     topn_sensitivity = {}
     for top_n in topn_grid:
-        r, _ = strategy_daily_returns(prices, top_n=top_n, cost_bps=args.cost_bps, momentum_period=args.momentum_period)
+        r = strategy_book(prices, top_n=top_n, score=score).net_series(args.cost_bps, active_only=True)
         m = metrics_from_returns(r)
         topn_sensitivity[str(top_n)] = {
             k: m[k]
@@ -239,6 +219,7 @@ def main() -> int:
             "momentum_period": args.momentum_period,
             "simulations": args.simulations,
             "seed": args.seed,
+            "bootstrap": args.bootstrap,
         },
         "data_context": {
             "symbols_loaded": int(prices.shape[1]),
@@ -251,7 +232,9 @@ def main() -> int:
         "cost_sensitivity": cost_sensitivity,
         "top_n_sensitivity": topn_sensitivity,
         "rolling_window_checks": rolling_window_checks(base_returns, rolling_years),
-        "monte_carlo_monthly_bootstrap": monte_carlo_monthly_bootstrap(base_returns, args.simulations, args.seed),
+        "monte_carlo_monthly_bootstrap": monte_carlo_monthly_bootstrap(
+            base_returns, args.simulations, args.seed, args.bootstrap, args.block_months, args.mc_workers
+        ),
         "trade_shape": {
             "rebalance_count": int(len(pick_log)),
             "avg_pick_count": round(float(pick_counts.mean()), 2),
@@ -24,6 +24,26 @@ from kiteconnect import KiteConnect  # type: ignore
 _secrets: dict[str, Any] = {}
 exec((ROOT / "Auto_Trader" / "my_secrets.py").read_text(encoding="utf-8"), _secrets)
 API_KEY = _secrets["API_KEY"]
+
+
+def _load_instrument_master_module():
+    # By file path, like my_secrets above: ``import Auto_Trader.instrument_master``
+    # would run the full package __init__ on every resolver call.
+    module = sys.modules.get("Auto_Trader.instrument_master") or sys.modules.get("instrument_master")
+    if module is None:
+        import importlib.util
+
+        path = ROOT / "Auto_Trader" / "instrument_master.py"
+        spec = importlib.util.spec_from_file_location("instrument_master", path)
+        if spec is None or spec.loader is None:
+            raise RuntimeError(f"Could not load module instrument_master from {path}")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["instrument_master"] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+load_instrument_master = _load_instrument_master_module().load_instrument_master
 TOKEN_PATH = ROOT / "intermediary_files" / "access_token.json"
 
 
@@ -38,6 +58,8 @@ def read_access_token() -> str:
     raise RuntimeError("access_token_missing_or_unreadable")
 
 VALID_SIDES = {"CE", "PE"}
+# Kite REST ltp accepts up to 1000 instruments per request.
+LTP_CHUNK = 1000
 
 
 def _parse_date(value: Any) -> date | None:
@@ -57,21 +79,12 @@ def _parse_date(value: Any) -> date | None:
             return None
 
 
-def _inst_expiry(inst: dict[str, Any]) -> date | None:
-    expiry = inst.get("expiry")
-    if expiry is None:
-        return None
-    if isinstance(expiry, date):
-        return expiry
-    return _parse_date(expiry)
-
-
-def resolve_contract(kite: KiteConnect, call: dict[str, Any]) -> dict[str, Any]:
+def _match_contract(master, call: dict[str, Any], today: date) -> dict[str, Any]:
+    """Pick the nearest live contract for one call; pricing is left to the caller."""
     symbol = str(call.get("symbol") or "").strip().upper()
     side = str(call.get("option_side") or call.get("side") or "").strip().upper()
     strike_raw = call.get("option_strike") or call.get("strike")
-    as_of = _parse_date(call.get("captured_at") or call.get("tracking_started_at") or call.get("date")) or date.today()
-    today = date.today()
+    as_of = _parse_date(call.get("captured_at") or call.get("tracking_started_at") or call.get("date")) or today
 
     if not symbol:
         return {"status": "drop", "reason": "symbol_missing"}
@@ -84,26 +97,16 @@ def resolve_contract(kite: KiteConnect, call: dict[str, Any]) -> dict[str, Any]:
 
     candidates: list[dict[str, Any]] = []
     expired_matches: list[dict[str, Any]] = []
-    for inst in kite.instruments("NFO"):
-        if str(inst.get("name") or "").strip().upper() != symbol:
-            continue
-        if str(inst.get("instrument_type") or "").strip().upper() != side:
-            continue
-        try:
-            inst_strike = float(inst.get("strike") or 0.0)
-        except Exception:
-            continue
-        if inst_strike != strike:
-            continue
-        expiry = _inst_expiry(inst)
-        if expiry is None:
+    for inst in master.contracts(symbol, side, strike, exchange="NFO"):
+        if not inst.get("expiry"):
             continue
+        expiry = date.fromisoformat(inst["expiry"])
         row = {
             "tradingsymbol": inst.get("tradingsymbol"),
             "instrument_token": inst.get("instrument_token"),
             "exchange_token": inst.get("exchange_token"),
             "expiry": expiry.isoformat(),
-            "strike": inst_strike,
+            "strike": float(inst.get("strike") or 0.0),
             "side": side,
             "lot_size": int(inst.get("lot_size") or 0),
             "name": inst.get("name"),
@@ -127,15 +130,6 @@ def resolve_contract(kite: KiteConnect, call: dict[str, Any]) -> dict[str, Any]:
 
     candidates.sort(key=lambda r: (r["expiry"], r["tradingsymbol"] or ""))
     contract = candidates[0]
-    last_price = 0.0
-    if contract.get("tradingsymbol"):
-        try:
-            payload = kite.ltp([f"NFO:{contract['tradingsymbol']}"])
-            item = payload.get(f"NFO:{contract['tradingsymbol']}") or {}
-            last_price = float(item.get("last_price") or 0.0)
-        except Exception:
-            last_price = 0.0
-    contract["last_price"] = last_price
     return {
         "status": "ok",
         "symbol": symbol,
@@ -143,13 +137,46 @@ def resolve_contract(kite: KiteConnect, call: dict[str, Any]) -> dict[str, Any]:
         "strike": strike,
         "contract": contract,
         "nearest_expiry": contract.get("expiry"),
-        "last_price": last_price,
     }
 
 
+def resolve_contracts(kite: KiteConnect, calls: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Resolve many calls, pricing every matched contract with chunked ``kite.ltp`` batches."""
+    master = load_instrument_master(kite)
+    today = date.today()
+    results = [_match_contract(master, call, today) for call in calls]
+
+    keys = sorted({
+        f"NFO:{r['contract']['tradingsymbol']}"
+        for r in results
+        if r.get("status") == "ok" and r["contract"].get("tradingsymbol")
+    })
+    prices: dict[str, float] = {}
+    for i in range(0, len(keys), LTP_CHUNK):
+        try:
+            payload = kite.ltp(keys[i:i + LTP_CHUNK]) or {}
+        except Exception:
+            continue
+        for key, item in payload.items():
+            prices[key] = float((item or {}).get("last_price") or 0.0)
+
+    for r in results:
+        if r.get("status") != "ok":
+            continue
+        tradingsymbol = r["contract"].get("tradingsymbol")
+        last_price = prices.get(f"NFO:{tradingsymbol}", 0.0) if tradingsymbol else 0.0
+        r["contract"]["last_price"] = last_price
+        r["last_price"] = last_price
+    return results
+
+
+def resolve_contract(kite: KiteConnect, call: dict[str, Any]) -> dict[str, Any]:
+    return resolve_contracts(kite, [call])[0]
+
+
 def main() -> int:
-    parser = argparse.ArgumentParser(description="Resolve one Telegram option suggestion to a live Kite contract price.")
-    parser.add_argument("--json", help="Call JSON. Use '-' to read stdin.")
+    parser = argparse.ArgumentParser(description="Resolve Telegram option suggestions to live Kite contract prices.")
+    parser.add_argument("--json", help="Call JSON object, or a list of calls to resolve in one batch. Use '-' to read stdin.")
     parser.add_argument("--symbol")
     parser.add_argument("--side")
     parser.add_argument("--strike", type=float)
@@ -168,17 +195,18 @@ def main() -> int:
             "captured_at": args.captured_at,
         }
 
+    calls = call if isinstance(call, list) else [call]
     try:
         kite = KiteConnect(api_key=API_KEY)
         kite.set_access_token(read_access_token())
-        result = resolve_contract(kite, call)
+        results = resolve_contracts(kite, calls)
     except Exception as exc:
-        result = {
+        results = [{
             "status": "drop",
             "reason": "resolver_unavailable",
             "error": str(exc)[:500],
-        }
-    print(json.dumps(result, default=str))
+        } for _ in calls]
+    print(json.dumps(results if isinstance(call, list) else results[0], default=str))
     return 0
 
 
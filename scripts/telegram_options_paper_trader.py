@@ -17,6 +17,11 @@ import numpy as np
 import pandas as pd
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.broker_gateway import GatewayUnavailable, gateway_call  # noqa: E402
+
 REPORTS = ROOT / 'reports'
 REPORTS.mkdir(exist_ok=True)
 
@@ -91,10 +96,13 @@ class Position:
     exit_time: pd.Timestamp | None = None
     exit_price: float | None = None
     exit_reason: str | None = None
+    partial_exits: list[dict[str, Any]] | None = None
 
     def __post_init__(self):
         if self.target_hits is None:
             self.target_hits = []
+        if self.partial_exits is None:
+            self.partial_exits = []
 
 
 def _run_oracle_python(script: str, timeout: int = 60) -> dict[str, Any]:
@@ -157,94 +165,75 @@ def parse_option_calls(messages: list[dict[str, Any]], channel_name: str) -> lis
     return calls
 
 
-def resolve_contract(call: OptionCall) -> dict[str, Any] | None:
-    call_dt = datetime.fromisoformat(call.date.replace('Z', '+00:00')).astimezone(timezone.utc)
+def resolve_contracts(calls: list[OptionCall]) -> list[dict[str, Any] | None]:
+    """Resolve many calls in one oracle round-trip against the daily instrument master."""
+    if not calls:
+        return []
+    queries = [
+        {
+            'symbol': call.symbol,
+            'side': call.side,
+            'strike': float(call.strike),
+            'month': MONTH_MAP.get(call.month_hint) if call.month_hint else None,
+            'month_hint': call.month_hint,
+            'call_date': datetime.fromisoformat(call.date.replace('Z', '+00:00')).astimezone(timezone.utc).date().isoformat(),
+        }
+        for call in calls
+    ]
+    try:
+        return gateway_call('contracts', {'queries': queries}, timeout=90)
+    except GatewayUnavailable:
+        pass
     script = f"""
 import sys, json
-from datetime import datetime
 sys.path.insert(0, '/home/ubuntu/Auto_Trader')
 from Auto_Trader.my_secrets import API_KEY
 from Auto_Trader.utils import read_session_data
+from Auto_Trader.instrument_master import load_instrument_master
+from scripts.broker_gateway import nearest_contracts
 from kiteconnect import KiteConnect
 kite = KiteConnect(api_key=API_KEY)
 kite.set_access_token(read_session_data())
-call_dt = datetime.fromisoformat({call_dt.isoformat()!r}.replace('Z','+00:00'))
-symbol = {call.symbol!r}
-side = {call.side!r}
-strike = float({call.strike!r})
-month_hint = {call.month_hint!r}
-month_map = {MONTH_MAP!r}
-rows = []
-for inst in kite.instruments('NFO'):
-    if inst.get('name') != symbol:
-        continue
-    if inst.get('instrument_type') != side:
-        continue
-    if float(inst.get('strike') or 0.0) != strike:
-        continue
-    expiry = inst.get('expiry')
-    if expiry is None:
-        continue
-    if hasattr(expiry, 'isoformat'):
-        expiry_iso = expiry.isoformat()
-    else:
-        expiry_iso = str(expiry)
-    try:
-        expiry_dt = datetime.fromisoformat(expiry_iso)
-    except Exception:
-        continue
-    if expiry_dt.date() < call_dt.date():
-        continue
-    if month_hint and expiry_dt.month != month_map.get(month_hint):
-        continue
-    rows.append({{
-        'tradingsymbol': inst.get('tradingsymbol'),
-        'instrument_token': inst.get('instrument_token'),
-        'exchange_token': inst.get('exchange_token'),
-        'expiry': expiry_iso,
-        'lot_size': int(inst.get('lot_size') or 0),
-        'strike': float(inst.get('strike') or 0.0),
-        'instrument_type': inst.get('instrument_type'),
-        'name': inst.get('name'),
-    }})
-rows.sort(key=lambda x: x['expiry'])
-print(json.dumps(rows[0] if rows else None, default=str))
+print(json.dumps(nearest_contracts(load_instrument_master(kite), json.loads({json.dumps(queries)!r})), default=str))
 """
     return _run_oracle_python(script, timeout=90)
 
 
-def fetch_contract_history(contract: dict[str, Any], start: datetime, end: datetime, interval: str = 'day') -> pd.DataFrame:
+def resolve_contract(call: OptionCall) -> dict[str, Any] | None:
+    return resolve_contracts([call])[0]
+
+
+def _fetch_contract_history_over_ssh(contract: dict[str, Any], start: datetime, end: datetime, interval: str) -> list[dict[str, Any]]:
     script = f"""
 import sys, json
-from datetime import datetime, timedelta
+from datetime import datetime
 sys.path.insert(0, '/home/ubuntu/Auto_Trader')
 from Auto_Trader.my_secrets import API_KEY
 from Auto_Trader.utils import read_session_data
+from scripts.broker_gateway import history_rows
 from kiteconnect import KiteConnect
 kite = KiteConnect(api_key=API_KEY)
 kite.set_access_token(read_session_data())
 inst_token = int({int(contract['instrument_token'])!r})
 start = datetime.fromisoformat({start.isoformat()!r}.replace('Z','+00:00'))
 end = datetime.fromisoformat({end.isoformat()!r}.replace('Z','+00:00'))
-interval = {interval!r}
-rows = kite.historical_data(inst_token, start, end, interval, oi=True)
-out = []
-for row in rows:
-    dt = row.get('date')
-    if hasattr(dt, 'isoformat'):
-        dt = dt.isoformat()
-    out.append({{
-        'Date': dt,
-        'Open': row.get('open'),
-        'High': row.get('high'),
-        'Low': row.get('low'),
-        'Close': row.get('close'),
-        'Volume': row.get('volume'),
-        'OI': row.get('oi'),
-    }})
-print(json.dumps(out, default=str))
+rows = kite.historical_data(inst_token, start, end, {interval!r}, oi=True)
+print(json.dumps(history_rows(rows), default=str))
 """
-    data = _run_oracle_python(script, timeout=120)
+    return _run_oracle_python(script, timeout=120)
+
+
+def fetch_contract_history(contract: dict[str, Any], start: datetime, end: datetime, interval: str = 'day') -> pd.DataFrame:
+    try:
+        data = gateway_call('historical', {
+            'instrument_token': int(contract['instrument_token']),
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'interval': interval,
+            'oi': True,
+        }, timeout=120)
+    except GatewayUnavailable:
+        data = _fetch_contract_history_over_ssh(contract, start, end, interval)
     df = pd.DataFrame(data)
     if df.empty:
         return df
@@ -255,34 +244,115 @@ print(json.dumps(out, default=str))
     return df.dropna(subset=['Close']).sort_values('Date').reset_index(drop=True)
 
 
+EQUITY_CHUNK_CELLS = 4_000_000
+
+
+def _close_matrix(history_by_symbol: dict[str, pd.DataFrame], symbols: list[str], dates: np.ndarray) -> np.ndarray:
+    """Last close at or before each date for every symbol (NaN before its first bar)."""
+    out = np.full((len(symbols), len(dates)), np.nan)
+    for i, sym in enumerate(symbols):
+        hist = history_by_symbol.get(sym)
+        if hist is None or hist.empty:
+            continue
+        h = hist.assign(Date=pd.to_datetime(hist['Date'])).sort_values('Date', kind='mergesort')
+        h_dates = h['Date'].to_numpy(dtype='datetime64[ns]')
+        pos = np.searchsorted(h_dates, dates, side='right') - 1
+        ok = pos >= 0
+        out[i, ok] = h['Close'].to_numpy(dtype=float)[pos[ok]]
+    return out
+
+
+def _partial_exit_events(trades: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(trade_idx, time, qty_sold, cash) for every partial exit.
+
+    Trades without a ``partial_exits`` log (older reports) book their whole
+    ``realized_partial_cash`` at entry, with the sold quantity recovered from
+    ``realized_value = realized_partial_cash + remaining_qty * exit_price``.
+    """
+    idx, times, qty, cash = [], [], [], []
+    logs = trades['partial_exits'] if 'partial_exits' in trades.columns else [None] * len(trades)
+    for t, (log, row) in enumerate(zip(logs, trades.itertuples(index=False))):
+        if isinstance(log, list):
+            for ev in log:
+                idx.append(t)
+                times.append(pd.Timestamp(ev['time']))
+                qty.append(float(ev['qty']))
+                cash.append(float(ev['qty']) * float(ev['price']))
+            continue
+        partial_cash = float(getattr(row, 'realized_partial_cash', 0.0) or 0.0)
+        if partial_cash == 0.0:
+            continue
+        exit_price = float(getattr(row, 'exit_price', 0.0) or 0.0)
+        remaining = (float(row.realized_value) - partial_cash) / exit_price if exit_price > 0 else float(row.qty)
+        idx.append(t)
+        times.append(pd.Timestamp(row.entry_time))
+        qty.append(float(row.qty) - round(remaining))
+        cash.append(partial_cash)
+    return (
+        np.asarray(idx, dtype=np.int64),
+        np.asarray(pd.DatetimeIndex(times), dtype='datetime64[ns]'),
+        np.asarray(qty, dtype=float),
+        np.asarray(cash, dtype=float),
+    )
+
+
 def build_equity_curve(history_by_symbol: dict[str, pd.DataFrame], trades: pd.DataFrame, initial_capital: float) -> pd.DataFrame:
-    all_dates = sorted({d for df in history_by_symbol.values() for d in pd.to_datetime(df['Date']).tolist()})
-    if not all_dates:
+    """Mark-to-market equity on every bar date seen in any contract history.
+
+    Closed trades contribute their realized P&L from ``exit_time`` on; trades
+    open on a date (``entry_time <= date < exit_time``) are marked at the
+    latest close of their contract, with quantity and booked cash stepped by
+    their partial-exit events. Everything is a (trade x date) array op.
+    """
+    date_set = set()
+    for df in history_by_symbol.values():
+        date_set.update(pd.to_datetime(df['Date']).tolist())
+    if not date_set:
         return pd.DataFrame([{'Date': pd.Timestamp.utcnow().tz_localize(None), 'equity': initial_capital}])
-    trades = trades.copy()
-    trades['entry_time'] = pd.to_datetime(trades['entry_time'])
-    trades['exit_time'] = pd.to_datetime(trades['exit_time'])
-    rows = []
-    for dt in all_dates:
-        closed = trades[trades['exit_time'] <= dt]
-        open_trades = trades[(trades['entry_time'] <= dt) & (trades['exit_time'] > dt)]
-
-        realized_pnl = float((closed['realized_value'] - closed['invested']).sum()) if not closed.empty else 0.0
-        open_unrealized = 0.0
-        for _, tr in open_trades.iterrows():
-            hist = history_by_symbol.get(tr['tradingsymbol'])
-            if hist is None or hist.empty:
-                continue
-            sub = hist[hist['Date'] <= dt]
-            if sub.empty:
-                continue
-            px = float(sub.iloc[-1]['Close'])
-            current_value = float(tr['realized_partial_cash']) + float(tr['remaining_qty']) * px
-            open_unrealized += current_value - float(tr['invested'])
-        equity = float(initial_capital) + realized_pnl + open_unrealized
-        rows.append({'Date': dt, 'equity': equity})
-    out = pd.DataFrame(rows).drop_duplicates(subset=['Date']).sort_values('Date').reset_index(drop=True)
-    return out
+    dates = np.asarray(pd.DatetimeIndex(sorted(date_set)), dtype='datetime64[ns]')
+    n_dates = len(dates)
+
+    trades = trades.reset_index(drop=True)
+    entry = pd.to_datetime(trades['entry_time']).to_numpy(dtype='datetime64[ns]')
+    exit_ = pd.to_datetime(trades['exit_time']).to_numpy(dtype='datetime64[ns]')
+    invested = trades['invested'].to_numpy(dtype=float)
+    pnl = (trades['realized_value'] - trades['invested']).to_numpy(dtype=float)
+
+    # Realized P&L: each trade's pnl lands on the first date >= exit_time.
+    realized_step = np.zeros(n_dates + 1)
+    has_exit = ~np.isnat(exit_)
+    np.add.at(realized_step, np.searchsorted(dates, exit_[has_exit], side='left'), pnl[has_exit])
+    realized = np.cumsum(realized_step[:-1])
+
+    # Partial exits step quantity down and booked cash up from their date on.
+    ev_trade, ev_time, ev_qty, ev_cash = _partial_exit_events(trades)
+    ev_col = np.searchsorted(dates, ev_time, side='left')
+
+    symbols = list(dict.fromkeys(trades['tradingsymbol']))
+    closes = _close_matrix(history_by_symbol, symbols, dates)
+    sym_idx = trades['tradingsymbol'].map({s: i for i, s in enumerate(symbols)}).to_numpy()
+    qty = trades['qty'].to_numpy(dtype=float)
+
+    unrealized = np.zeros(n_dates)
+    chunk = max(1, EQUITY_CHUNK_CELLS // max(n_dates, 1))
+    for lo in range(0, len(trades), chunk):
+        hi = min(lo + chunk, len(trades))
+        rows = hi - lo
+        sold = np.zeros((rows, n_dates + 1))
+        booked = np.zeros((rows, n_dates + 1))
+        sel = (ev_trade >= lo) & (ev_trade < hi)
+        np.add.at(sold, (ev_trade[sel] - lo, ev_col[sel]), ev_qty[sel])
+        np.add.at(booked, (ev_trade[sel] - lo, ev_col[sel]), ev_cash[sel])
+        sold = np.cumsum(sold[:, :-1], axis=1)
+        booked = np.cumsum(booked[:, :-1], axis=1)
+
+        price = closes[sym_idx[lo:hi]]
+        is_open = (entry[lo:hi, None] <= dates[None, :]) & (exit_[lo:hi, None] > dates[None, :]) & ~np.isnan(price)
+        value = booked + (qty[lo:hi, None] - sold) * np.nan_to_num(price) - invested[lo:hi, None]
+        unrealized += np.where(is_open, value, 0.0).sum(axis=0)
+
+    equity = float(initial_capital) + realized + unrealized
+    return pd.DataFrame({'Date': pd.DatetimeIndex(dates), 'equity': equity})
 
 
 def summarize_period_returns(equity: pd.DataFrame, freq: str) -> list[dict[str, Any]]:
@@ -311,8 +381,7 @@ def simulate_calls(
 
     # Pre-resolve and prefetch.
     resolved = []
-    for call in calls:
-        contract = resolve_contract(call)
+    for call, contract in zip(calls, resolve_contracts(calls)):
         if not contract:
             continue
         start = datetime.fromisoformat(call.date.replace('Z', '+00:00')).replace(tzinfo=None)
@@ -414,6 +483,7 @@ def simulate_calls(
                             pos.realized_cash += sell_qty * float(tgt)
                             pos.remaining_qty -= sell_qty
                             pos.target_hits.append(idx)
+                            pos.partial_exits.append({'time': pd.Timestamp(dt).isoformat(), 'qty': int(sell_qty), 'price': float(tgt)})
                             if idx == 0 and pos.stop_loss is not None:
                                 pos.stop_loss = max(pos.stop_loss, pos.entry_price)
                             if pos.remaining_qty <= 0:
@@ -451,6 +521,7 @@ def simulate_calls(
                     'qty': int(pos.qty),
                     'invested': round(pos.invested, 2),
                     'realized_partial_cash': round(pos.realized_cash, 2),
+                    'partial_exits': list(pos.partial_exits or []),
                     'exit_time': pd.Timestamp(dt).isoformat(),
                     'exit_price': round(float(exit_price), 2),
                     'exit_reason': exit_reason,
@@ -487,6 +558,7 @@ def simulate_calls(
             'qty': int(pos.qty),
             'invested': round(pos.invested, 2),
             'realized_partial_cash': round(pos.realized_cash, 2),
+            'partial_exits': list(pos.partial_exits or []),
             'exit_time': pd.Timestamp(last_row['Date']).isoformat(),
             'exit_price': round(float(last_row['Close']), 2),
             'exit_reason': 'mark_to_market',
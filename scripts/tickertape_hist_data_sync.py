@@ -22,6 +22,9 @@ from typing import Any
 import pandas as pd
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
 DEFAULT_SOURCE = ROOT / "intermediary_files" / "Hist_Data"
 DEFAULT_OUTPUT = ROOT / "intermediary_files" / "Tickertape_Hist_Data"
 DEFAULT_SID_CACHE = ROOT / "intermediary_files" / "tickertape_sid_map.json"
@@ -201,18 +204,19 @@ def compose_output_history(
     return _normalise_seed(tickertape).sort_values("Date").reset_index(drop=True)
 
 
-def _eligible_seed_files(source_dir: Path, min_rows: int) -> list[Path]:
-    eligible: list[Path] = []
-    for path in sorted(source_dir.glob("*.feather")):
-        symbol = path.stem.upper()
-        if any(marker in symbol for marker in ("FUT", "OPT", "-I", "-II")):
+def _eligible_seed_symbols(source_dir: Path, min_rows: int) -> list[str]:
+    from Auto_Trader import hist_data
+
+    eligible: list[str] = []
+    for name in hist_data.list_symbols(source_dir):
+        if any(marker in name.upper() for marker in ("FUT", "OPT", "-I", "-II")):
             continue
         try:
-            frame = pd.read_feather(path)
+            frame = hist_data.read_raw(source_dir, name)
         except Exception:
             continue
-        if len(frame) >= min_rows:
-            eligible.append(path)
+        if frame is not None and len(frame) >= min_rows:
+            eligible.append(name)
     return eligible
 
 
@@ -261,10 +265,12 @@ def build_dataset(
     include_seed_history: bool = False,
     limit: int = 0,
 ) -> dict[str, Any]:
-    seed_files = _eligible_seed_files(source_dir, min_seed_rows)
+    from Auto_Trader import hist_data
+
+    seed_symbols = _eligible_seed_symbols(source_dir, min_seed_rows)
     if limit > 0:
-        seed_files = seed_files[:limit]
-    if not seed_files:
+        seed_symbols = seed_symbols[:limit]
+    if not seed_symbols:
         raise TickertapeDataError("no eligible seed files")
 
     sid_map = _load_sid_cache(sid_cache_path)
@@ -294,8 +300,8 @@ def build_dataset(
     successes: list[str] = []
 
     try:
-        for seed_path in seed_files:
-            symbol = seed_path.stem.upper()
+        for seed_name in seed_symbols:
+            symbol = seed_name.upper()
             sid = sid_map.get(symbol)
             try:
                 if not sid:
@@ -312,7 +318,7 @@ def build_dataset(
                     max_age_days=max_age_days,
                     min_points=min_chart_points,
                 )
-                seed_frame = pd.read_feather(seed_path)
+                seed_frame = hist_data.read_raw(source_dir, seed_name)
                 merged = compose_output_history(
                     seed_frame,
                     recent,
@@ -323,16 +329,16 @@ def build_dataset(
                     raise TickertapeDataError(
                         f"output history has {len(merged)} rows (minimum {required_rows})"
                     )
-                merged.to_feather(staging / seed_path.name)
+                merged.to_feather(staging / f"{seed_name}.feather")
                 successes.append(symbol)
             except Exception as exc:
                 failures[symbol] = str(exc)[:300]
 
-        coverage = len(successes) / len(seed_files)
-        required = required_success_count(len(seed_files), min_coverage)
+        coverage = len(successes) / len(seed_symbols)
+        required = required_success_count(len(seed_symbols), min_coverage)
         if len(successes) < required:
             raise TickertapeDataError(
-                f"coverage gate failed: {len(successes)}/{len(seed_files)} "
+                f"coverage gate failed: {len(successes)}/{len(seed_symbols)} "
                 f"({coverage:.1%}); require {required}"
             )
 
@@ -340,7 +346,7 @@ def build_dataset(
             "generated_at": datetime.now().isoformat(),
             "source": "tickertape_1y_plus_seed" if include_seed_history else "tickertape_1y",
             "seed_dir": str(source_dir),
-            "symbols_total": len(seed_files),
+            "symbols_total": len(seed_symbols),
             "symbols_synced": len(successes),
             "coverage": round(coverage, 4),
             "symbols": successes,
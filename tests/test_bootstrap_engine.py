@@ -0,0 +1,51 @@
+import os
+import unittest
+
+import numpy as np
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from scripts import bootstrap_engine as be  # noqa: E402
+
+
+class BootstrapEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(5).normal(0.015, 0.05, 48)
+
+    def test_path_stats_match_per_path_loop(self):
+        samples = self.values[np.random.default_rng(1).integers(0, 48, size=(50, 48))]
+        cagr, dd, total = be.path_stats(samples, 12)
+        for i, sample in enumerate(samples):
+            eq = np.cumprod(1 + sample)
+            self.assertAlmostEqual(cagr[i], eq[-1] ** (12 / 48) - 1, places=12)
+            self.assertAlmostEqual(dd[i], np.min(eq / np.maximum.accumulate(eq) - 1), places=12)
+            self.assertAlmostEqual(total[i], eq[-1] - 1, places=12)
+
+    def test_block_indices_are_circular_runs(self):
+        idx = be.resample_indices(np.random.default_rng(2), 10, 200, "block", 4)
+        self.assertEqual(idx.shape, (200, 10))
+        runs = idx.reshape(200, -1)[:, :8].reshape(200, 2, 4)
+        np.testing.assert_array_equal(np.diff(runs, axis=2) % 10, 1)
+
+    def test_stationary_indices_follow_on_within_blocks(self):
+        idx = be.resample_indices(np.random.default_rng(3), 60, 500, "stationary", 6)
+        self.assertTrue(((idx >= 0) & (idx < 60)).all())
+        follow_on = np.mean(np.diff(idx, axis=1) % 60 == 1)
+        self.assertGreater(follow_on, 0.75)
+        self.assertLess(follow_on, 0.9)
+
+    def test_results_depend_on_seed_and_chunk_not_workers(self):
+        a = be.bootstrap_paths(self.values, 2500, seed=9, method="stationary", block=3, chunk=1000)
+        b = be.bootstrap_paths(self.values, 2500, seed=9, method="stationary", block=3, chunk=1000, workers=2)
+        np.testing.assert_array_equal(a, b)
+        self.assertEqual(a.shape, (3, 2500))
+        summary = be.summarize(a)
+        self.assertEqual(summary["simulations"], 2500)
+        self.assertLessEqual(summary["cagr_pct_p5"], summary["cagr_pct_p95"])
+        with self.assertRaises(ValueError):
+            be.bootstrap_paths(self.values, 10, seed=1, method="jackknife")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import threading
+import unittest
+from unittest import mock
+
+from scripts import broker_gateway as gw
+
+
+class FakeKite:
+    def __init__(self):
+        self.ltp_calls = []
+
+    def ltp(self, instruments):
+        self.ltp_calls.append(list(instruments))
+        return {inst: {"instrument_token": i, "last_price": 100.0 + i} for i, inst in enumerate(instruments)}
+
+    def historical_data(self, token, start, end, interval, oi=False):
+        raise ValueError("historical not stubbed")
+
+
+class FakeSession:
+    ready = True
+
+    def __init__(self):
+        self.kite = FakeKite()
+
+    def client(self):
+        return self.kite
+
+
+class BrokerGatewayTests(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeSession()
+        self.server = gw.GatewayServer(("127.0.0.1", 0), gw.Gateway(self.session))
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_ltp_batches_are_chunked_and_cached(self):
+        instruments = [f"NFO:SYM{i}" for i in range(5)]
+        with mock.patch.object(gw, "LTP_CHUNK", 2):
+            first = gw.gateway_call("ltp", {"instruments": instruments}, url=self.url)
+            again = gw.gateway_call("ltp", {"instruments": instruments[:3]}, url=self.url)
+        self.assertEqual(sorted(first), sorted(instruments))
+        self.assertEqual([len(c) for c in self.session.kite.ltp_calls], [2, 2, 1])
+        self.assertEqual(again, {k: first[k] for k in instruments[:3]})
+        self.assertTrue(gw.gateway_call("health", url=self.url)["session"])
+
+    def test_errors_and_missing_gateway_are_distinguished(self):
+        with self.assertRaises(gw.GatewayError) as ctx:
+            gw.gateway_call("historical", {"instrument_token": 1, "from": "2025-01-01", "to": "2025-01-02"}, url=self.url)
+        self.assertNotIsInstance(ctx.exception, gw.GatewayUnavailable)
+        self.assertIn("historical not stubbed", str(ctx.exception))
+        with self.assertRaises(gw.GatewayError):
+            gw.gateway_call("nope", {}, url=self.url)
+
+        port = self.server.server_address[1]
+        self.server.shutdown()
+        self.server.server_close()
+        with self.assertRaises(gw.GatewayUnavailable):
+            gw.gateway_call("health", url=f"http://127.0.0.1:{port}", timeout=2)
+
+    def test_status_sections_parse_like_the_ssh_snapshot(self):
+        stdout = "[host]\nbox\n[service]\nactive\n[recent_reports]\na.json\nb.json\n[journal]\nline 1\n"
+        data = gw.parse_status_output(stdout, "", 0)
+        self.assertTrue(data["ok"])
+        self.assertEqual(data["host"], "box")
+        self.assertEqual(data["service"], "active")
+        self.assertEqual(data["recent_reports"], ["a.json", "b.json"])
+        self.assertEqual(data["pid"], "")
+
+
+if __name__ == "__main__":
+    unittest.main()
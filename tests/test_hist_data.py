@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from Auto_Trader import hist_data  # noqa: E402
+from scripts import rsi_momentum_paper_ledger as ledger  # noqa: E402
+
+
+class HistDataTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = Path(self._tmp.name)
+        dates = pd.bdate_range("2024-01-01", periods=10)
+        px = np.arange(10, dtype=float) + 100.0
+        pd.DataFrame({"Date": dates, "Open": px, "High": px + 1, "Low": px - 1, "Close": px, "Extra": px}).to_feather(self.dir / "AAA.feather")
+        pd.DataFrame({"date": dates.tz_localize("Asia/Kolkata")[::-1], "close": px[::-1]}).to_feather(self.dir / "BBB.feather")
+        pd.DataFrame({"datetime": dates, "CLOSE": px, "High": px + 2, "Low": px - 2}).to_feather(self.dir / "NIFTYFUT.feather")
+        pd.DataFrame({"when": dates, "close": px}).to_feather(self.dir / "BAD.feather")
+
+    def test_projection_aliases_and_date_predicates(self):
+        frames = hist_data.load_frames(self.dir, ["AAA", "BBB", "BAD", "MISSING"], ("close",), start="2024-01-03", end="2024-01-08", optional=("high",))
+        self.assertEqual(sorted(frames), ["AAA", "BBB"])
+        self.assertEqual(list(frames["AAA"].columns), ["close", "high"])
+        self.assertEqual(list(frames["BBB"].columns), ["close"])
+        bbb = frames["BBB"]
+        self.assertIsNone(bbb.index.tz)
+        self.assertEqual((bbb.index[0], bbb.index[-1]), (pd.Timestamp("2024-01-03"), pd.Timestamp("2024-01-08")))
+        self.assertTrue(bbb.index.is_monotonic_increasing)
+        np.testing.assert_array_equal(bbb["close"].to_numpy(), [102.0, 103.0, 104.0, 105.0])
+        self.assertIsNone(hist_data.read_symbol(self.dir / "BBB.feather", ("close", "high")))
+        self.assertEqual(hist_data.list_symbols(self.dir), ["AAA", "BAD", "BBB", "NIFTYFUT"])
+
+    def test_ledger_loaders_share_one_filtered_read(self):
+        real_read = hist_data.read_symbol
+        with mock.patch.object(hist_data, "read_symbol", side_effect=real_read) as read:
+            frames = ledger.load_frames(self.dir, {"AAA", "BBB", "NIFTYFUT"}, with_hl=True)
+            prices = ledger.load_prices(self.dir, min_rows=5, frames=frames)
+            ohlcv = ledger.load_ohlcv(self.dir, {"AAA", "BBB"}, frames=frames)
+        self.assertEqual(sorted(p.args[0].stem for p in read.call_args_list), ["AAA", "BBB"])
+        self.assertEqual(list(prices.columns), ["AAA", "BBB"])
+        self.assertEqual(float(prices["BBB"].iloc[-1]), 109.0)
+        self.assertEqual(list(ohlcv), ["AAA"])
+        self.assertEqual(list(ohlcv["AAA"].columns), ["Close", "High", "Low"])
+
+    def test_partitioned_append_rewrites_only_touched_years(self):
+        dates = pd.bdate_range("2023-12-18", periods=20, tz="Asia/Kolkata")
+        bars = pd.DataFrame({"date": dates, "open": 1, "high": 2, "low": 0.5, "close": np.arange(20.0), "volume": 7, "oi": 0})
+        hist_data.write_symbol(self.dir, "AAA", bars.iloc[:15], layout="partitioned")
+        self.assertFalse((self.dir / "AAA.feather").exists())
+        old_year = self.dir / "AAA" / "2023.feather"
+        os.utime(old_year, ns=(1, 1))
+        hist_data.append_symbol(self.dir, "AAA", bars.iloc[13:].assign(close=-1.0), layout="partitioned")
+        self.assertEqual(old_year.stat().st_mtime_ns, 1)
+        self.assertEqual(sorted(p.name for p in (self.dir / "AAA").iterdir()), ["2023.feather", "2024.feather"])
+
+        hist = hist_data.read_history(self.dir, "AAA")
+        self.assertEqual(list(hist.columns), list(hist_data.CANONICAL_COLUMNS))
+        self.assertEqual(str(hist["Date"].dtype), "datetime64[ns]")
+        self.assertTrue((hist.drop(columns="Date").dtypes == "float64").all())
+        self.assertEqual(len(hist), 20)
+        np.testing.assert_array_equal(hist["Close"].to_numpy()[12:], [12.0] + [-1.0] * 7)
+        self.assertEqual(hist_data.last_timestamp(self.dir, "AAA"), pd.Timestamp("2024-01-12"))
+        self.assertIn("AAA", hist_data.list_symbols(self.dir))
+        recent = hist_data.load_frames(self.dir, ["AAA"], start="2024-01-08")["AAA"]
+        self.assertEqual(len(recent), 5)
+
+    def test_flat_history_migrates_and_stamp_tracks_changes(self):
+        stamp = hist_data.symbol_stamp(self.dir, "BBB")
+        bar = pd.DataFrame({"Date": [pd.Timestamp("2024-01-15")], "Close": [200.0]})
+        hist_data.append_symbol(self.dir, "BBB", bar, layout="partitioned")
+        self.assertFalse((self.dir / "BBB.feather").exists())
+        self.assertNotEqual(hist_data.symbol_stamp(self.dir, "BBB"), stamp)
+        frames = hist_data.load_frames(self.dir, ["BBB"])
+        np.testing.assert_array_equal(frames["BBB"]["close"].to_numpy()[-2:], [109.0, 200.0])
+        hist_data.write_symbol(self.dir, "BBB", hist_data.read_history(self.dir, "BBB"), layout="flat")
+        self.assertFalse((self.dir / "BBB").exists())
+        self.assertEqual(len(hist_data.read_history(self.dir, "BBB")), 11)
+
+    def test_raw_reads_and_seed_discovery_follow_partitioned_symbols(self):
+        from scripts import tickertape_hist_data_sync as sync
+
+        raw = hist_data.read_raw(self.dir, "AAA")
+        self.assertIn("Extra", raw.columns)
+        hist_data.write_symbol(self.dir, "AAA", raw, layout="partitioned")
+        self.assertFalse((self.dir / "AAA.feather").exists())
+        migrated = hist_data.read_raw(self.dir, "AAA")
+        self.assertEqual(list(migrated.columns), list(hist_data.CANONICAL_COLUMNS))
+        np.testing.assert_array_equal(migrated["Close"].to_numpy(), raw["Close"].to_numpy())
+        self.assertIsNone(hist_data.read_raw(self.dir, "MISSING"))
+        self.assertEqual(sync._eligible_seed_symbols(self.dir, 10), ["AAA", "BAD", "BBB"])
+        self.assertEqual(sync._eligible_seed_symbols(self.dir, 11), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
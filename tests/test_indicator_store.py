@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import talib
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from Auto_Trader import hist_data, indicator_store as store_mod  # noqa: E402
+from Auto_Trader.supertrend_panel import supertrend  # noqa: E402
+from scripts import materialize_indicators  # noqa: E402
+
+
+def core_indicators(df):
+    """A recursive subset of ``utils.Indicators`` (EMA, RSI, ATR, SuperTrend)."""
+    high, low, close = (df[c].to_numpy(dtype="float64") for c in ("High", "Low", "Close"))
+    for p in (10, 20, 50):
+        df[f"EMA{p}"] = talib.EMA(close, timeperiod=p)
+    df["RSI"] = talib.RSI(close, timeperiod=14)
+    df["ATR"] = talib.ATR(high, low, close, timeperiod=14)
+    st, direction = supertrend(high[:, None], low[:, None], close[:, None], 2.0, atr=df["ATR"].to_numpy()[:, None])
+    df["Supertrend"], df["Supertrend_Direction"] = st[:, 0], direction[:, 0]
+    return df
+
+
+def other_indicators(df):
+    df["SMA5"] = df["Close"].rolling(5).mean()
+    return df
+
+
+class IndicatorStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.hist = Path(self._tmp.name) / "Hist_Data"
+        self.store_dir = Path(self._tmp.name) / "store"
+        rng = np.random.default_rng(11)
+        n = 400
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, n)))
+        self.bars = pd.DataFrame(
+            {
+                "Date": pd.bdate_range("2023-01-02", periods=n),
+                "Open": close,
+                "High": close * (1 + rng.uniform(0, 0.02, n)),
+                "Low": close * (1 - rng.uniform(0, 0.02, n)),
+                "Close": close,
+                "Volume": rng.uniform(1e5, 5e5, n),
+            }
+        )
+        for sym in ("AAA", "BBB"):
+            hist_data.write_symbol(self.hist, sym, self.bars.iloc[:-1], layout="flat")
+
+    def _store(self, fn=core_indicators):
+        return store_mod.IndicatorStore(store_dir=self.store_dir, hist_dir=self.hist, indicators=fn)
+
+    def test_materialize_serves_until_history_changes(self):
+        counts = store_mod.materialize(hist_dir=self.hist, store_dir=self.store_dir, indicators=core_indicators)
+        self.assertEqual(counts, {"written": 2})
+        store = self._store()
+        expected = core_indicators(store_mod.prepare_history(hist_data.read_history(self.hist, "AAA")))
+        pd.testing.assert_frame_equal(store.load("AAA"), expected)
+
+        again = store_mod.materialize(["AAA"], hist_dir=self.hist, store_dir=self.store_dir, indicators=core_indicators)
+        self.assertEqual(again, {"fresh": 1})
+        hist_data.append_symbol(self.hist, "AAA", self.bars.iloc[-1:], layout="flat")
+        self.assertIsNone(store.load("AAA"))
+        self.assertIsNotNone(store.load("BBB"))
+
+        store_mod.materialize(hist_dir=self.hist, store_dir=self.store_dir, indicators=other_indicators)
+        self.assertNotEqual(store_mod.code_version(other_indicators), store.version)
+        self.assertEqual([p.name for p in self.store_dir.iterdir()], [store_mod.code_version(other_indicators)])
+
+    def test_default_store_reads_the_loader_history_directory(self):
+        store = store_mod.IndicatorStore(store_dir=self.store_dir, indicators=core_indicators)
+        self.assertEqual(store.hist_dir, hist_data.HIST_DIR)
+        self.assertTrue(hist_data.HIST_DIR.is_absolute())
+
+    def test_materialization_waits_out_trading_hours(self):
+        wait = materialize_indicators.seconds_until_off_hours
+        self.assertEqual(wait(datetime(2025, 6, 2, 9, 20)), (6 * 60 + 25) * 60)  # Monday, market open
+        self.assertEqual(wait(datetime(2025, 6, 2, 15, 40)), 5 * 60)
+        self.assertEqual(wait(datetime(2025, 6, 2, 16, 0)), 0.0)
+        self.assertEqual(wait(datetime(2025, 6, 2, 7, 30)), 0.0)
+        self.assertEqual(wait(datetime(2025, 6, 7, 11, 0)), 0.0)  # Saturday
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from Auto_Trader import instrument_master as im  # noqa: E402
+
+
+def _opt(symbol, name, side, strike, expiry, token):
+    return {
+        "instrument_token": token,
+        "exchange_token": str(token // 256),
+        "tradingsymbol": symbol,
+        "name": name,
+        "last_price": 0.0,
+        "expiry": expiry,
+        "strike": strike,
+        "tick_size": 0.05,
+        "lot_size": 75,
+        "instrument_type": side,
+        "segment": "NFO-OPT",
+        "exchange": "NFO",
+    }
+
+
+class FakeKite:
+    def __init__(self):
+        self.calls = []
+
+    def instruments(self, exchange=None):
+        self.calls.append(exchange)
+        if exchange == "NFO":
+            return [
+                _opt("NIFTY25APR22000CE", "NIFTY", "CE", 22000.0, date(2025, 4, 24), 1001),
+                _opt("NIFTY25MAR22000CE", "NIFTY", "CE", 22000.0, date(2025, 3, 27), 1002),
+                _opt("NIFTY2531322000CE", "NIFTY", "CE", 22000.0, date(2025, 3, 13), 1003),
+                _opt("NIFTY25MAR22000PE", "NIFTY", "PE", 22000.0, date(2025, 3, 27), 1004),
+                _opt("NIFTY25MAR22100CE", "NIFTY", "CE", 22100.0, date(2025, 3, 27), 1005),
+                {**_opt("NIFTY25MARFUT", "NIFTY", "FUT", 0.0, date(2025, 3, 27), 1006), "segment": "NFO-FUT"},
+            ]
+        eq = {"instrument_type": "EQ", "expiry": "", "strike": 0.0, "lot_size": 1, "tick_size": 0.05, "name": ""}
+        if exchange == "NSE":
+            return [{**eq, "instrument_token": 2001, "exchange_token": "1", "tradingsymbol": "INFY", "segment": "NSE", "exchange": "NSE"}]
+        if exchange == "BSE":
+            return [{**eq, "instrument_token": 3001, "exchange_token": "2", "tradingsymbol": "INFY", "segment": "BSE", "exchange": "BSE"}]
+        return []
+
+
+class InstrumentMasterTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(im, "MASTER_DIR", Path(self._tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+        im._CACHE.clear()
+
+    def test_nearest_expiry_and_month_filter(self):
+        master = im.refresh_instrument_master(FakeKite(), day=date(2025, 3, 10))
+        hit = master.nearest_expiry_on_or_after("nifty", "CE", 22000, "2025-03-14T04:00:00Z")
+        self.assertEqual(hit["tradingsymbol"], "NIFTY25MAR22000CE")
+        self.assertEqual(hit["expiry"], "2025-03-27")
+        self.assertEqual(master.nearest_expiry_on_or_after("NIFTY", "CE", 22000, date(2025, 3, 13))["instrument_token"], 1003)
+        self.assertEqual(master.nearest_expiry_on_or_after("NIFTY", "CE", 22000, date(2025, 3, 1), month=4)["instrument_token"], 1001)
+        self.assertIsNone(master.nearest_expiry_on_or_after("NIFTY", "CE", 22000, date(2025, 4, 25)))
+        self.assertIsNone(master.nearest_expiry_on_or_after("NIFTY", "CE", 22050, date(2025, 3, 1)))
+        self.assertEqual(
+            [c["expiry"] for c in master.contracts("NIFTY", "CE", 22000)],
+            ["2025-03-13", "2025-03-27", "2025-04-24"],
+        )
+        self.assertEqual(master.lookup("nifty25marfut")["instrument_type"], "FUT")
+
+    def test_equities_match_legacy_shape_and_prefer_nse_when_mapped(self):
+        master = im.refresh_instrument_master(FakeKite(), day=date(2025, 3, 10))
+        eq = master.equities()
+        self.assertEqual(list(eq.columns), ["instrument_token", "tradingsymbol", "exchange"])
+        self.assertEqual(dict(zip(eq["tradingsymbol"], eq["instrument_token"]))["INFY"], 2001)
+
+    def test_downloads_once_per_day_and_reloads_from_disk(self):
+        kite = FakeKite()
+        first = im.load_instrument_master(kite, day=date(2025, 3, 10))
+        again = im.load_instrument_master(kite, day=date(2025, 3, 10))
+        self.assertIs(first, again)
+        self.assertEqual(kite.calls, list(im.DEFAULT_EXCHANGES))
+
+        im._CACHE.clear()
+        reloaded = im.load_instrument_master(None, day=date(2025, 3, 10))
+        self.assertEqual(len(reloaded), len(first))
+        stale = im.load_instrument_master(None, day=date(2025, 3, 11))
+        self.assertEqual(stale.as_of, date(2025, 3, 10))
+        with self.assertRaises(FileNotFoundError):
+            im.load_instrument_master(None, day=date(2025, 3, 11), allow_stale=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from scripts import generate_market_event_pipelines as pipelines  # noqa: E402
+
+
+def per_event_forward_behavior(symbol, event_dt, cache):
+    """The per-event frame slicing ``compute_forward_behavior_batch`` replaced."""
+    df = pipelines.get_price_frame(symbol, cache, event_dt - timedelta(days=20), event_dt + timedelta(days=20))
+    if df is None or df.empty:
+        return None
+    forward = df[df['Date'] >= pd.Timestamp(event_dt.date())].reset_index(drop=True)
+    if forward.empty:
+        return None
+    entry = float(forward.iloc[0]['Close'])
+    if not entry:
+        return None
+    future = forward.iloc[1:].reset_index(drop=True)
+    out = {'entry_price': round(entry, 4), 'available_bars': int(len(future))}
+    for n in [1, 3, 5, 10]:
+        out[f'ret_{n}d_pct'] = round((float(future.iloc[n - 1]['Close']) / entry - 1.0) * 100.0, 2) if len(future) >= n else None
+    window = future.head(5)
+    if not window.empty:
+        out['max_upside_5d_pct'] = round((float(window['High'].max()) / entry - 1.0) * 100.0, 2)
+        out['max_drawdown_5d_pct'] = round((float(window['Low'].min()) / entry - 1.0) * 100.0, 2)
+    else:
+        out['max_upside_5d_pct'] = None
+        out['max_drawdown_5d_pct'] = None
+    return out
+
+
+def _bars(dates, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+    return pd.DataFrame({
+        'Date': pd.DatetimeIndex(dates),
+        'Open': close,
+        'High': close * (1 + rng.uniform(0, 0.03, len(dates))),
+        'Low': close * (1 - rng.uniform(0, 0.03, len(dates))),
+        'Close': close,
+        'Volume': rng.uniform(1e5, 1e6, len(dates)),
+    })
+
+
+def _at(day, hour=9):
+    return datetime(day.year, day.month, day.day, hour, 30, tzinfo=timezone.utc)
+
+
+class ForwardBehaviorBatchTests(unittest.TestCase):
+    def setUp(self):
+        days = pd.bdate_range('2025-03-03', periods=40)
+        gappy = days.delete([5, 6, 7, 12, 20, 21])  # holidays / missing bars mid-window
+        self.days = days
+        self.cache = {
+            'AAA': _bars(days, 1),
+            'GAPPY': _bars(gappy, 2),
+            'SHORT': _bars(days[:3], 3),
+            'EMPTY': _bars(days[:0], 4),
+            'NONE': None,
+        }
+        d = days
+        self.events = [
+            ('AAA', _at(d[0])),
+            ('AAA', _at(d[0] - pd.Timedelta(days=10))),  # before the first bar
+            ('AAA', _at(d[4] + pd.Timedelta(days=1))),  # Saturday
+            ('AAA', _at(d[4] + pd.Timedelta(days=2), hour=23)),  # Sunday, late UTC
+            ('AAA', _at(d[-11])),  # exactly 10 bars left
+            ('AAA', _at(d[-4])),  # fewer bars than the longer horizons
+            ('AAA', _at(d[-1])),  # last bar: no forward bars
+            ('AAA', _at(d[-1] + pd.Timedelta(days=3))),  # after the panel
+            ('GAPPY', _at(d[5])),  # event on a missing bar
+            ('GAPPY', _at(d[3])),  # horizons straddle the gaps
+            ('GAPPY', _at(d[19])),
+            ('SHORT', _at(d[0])),
+            ('SHORT', _at(d[2])),
+            ('EMPTY', _at(d[0])),
+            ('NONE', _at(d[0])),
+        ]
+
+    def test_batch_matches_per_event_slicing(self):
+        symbols = [s for s, _ in self.events]
+        dts = [dt for _, dt in self.events]
+        batch = pipelines.compute_forward_behavior_batch(symbols, dts, self.cache)
+        self.assertEqual(len(batch), len(self.events))
+        for (symbol, dt), got in zip(self.events, batch):
+            with self.subTest(symbol=symbol, dt=dt.isoformat()):
+                self.assertEqual(got, per_event_forward_behavior(symbol, dt, self.cache))
+                self.assertEqual(got, pipelines.compute_forward_behavior(symbol, dt, self.cache))
+
+        outcomes = {(s, dt): r for (s, dt), r in zip(self.events, batch)}
+        self.assertIsNone(outcomes[self.events[7]])
+        self.assertEqual(outcomes[self.events[6]]['available_bars'], 0)
+        self.assertIsNone(outcomes[self.events[6]]['max_upside_5d_pct'])
+        self.assertIsNotNone(outcomes[self.events[4]]['ret_10d_pct'])
+        self.assertIsNone(outcomes[self.events[5]]['ret_5d_pct'])
+        self.assertIsNone(outcomes[self.events[-1]])
+
+    def test_empty_batch(self):
+        self.assertEqual(pipelines.compute_forward_behavior_batch([], [], self.cache), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
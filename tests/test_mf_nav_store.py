@@ -0,0 +1,116 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from dashboard import mf_nav_store as store
+
+
+def _nav(start, periods, base=10.0):
+    dates = pd.bdate_range(start, periods=periods)
+    return pd.DataFrame({"date": dates, "nav": base + np.arange(periods, dtype=float)})
+
+
+class NavStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        for name, path in (("NAV_STORE_DIR", root / "store"), ("LEGACY_CSV_DIR", root / "legacy")):
+            patcher = mock.patch.object(store, name, path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+
+    def _age(self, code, hours=48):
+        old = time.time() - hours * 3600
+        os.utime(store._partition_path(code), (old, old))
+
+    def test_stale_partition_appends_only_new_navs(self):
+        full = _nav("2024-01-01", 30)
+        store.write_nav_history(7, full.iloc[:20])
+        self._age(7)
+        calls = []
+
+        def fake_download(code, since=None):
+            calls.append(since)
+            return full[full["date"] >= pd.Timestamp(since)] if since is not None else full
+
+        with mock.patch.object(store, "download_nav_history", side_effect=fake_download):
+            out = store.fetch_nav_history(7)
+            again = store.fetch_nav_history(7)
+        self.assertEqual(calls, [full["date"].iloc[19]])
+        pd.testing.assert_frame_equal(out, full)
+        pd.testing.assert_frame_equal(again, full)
+        self.assertEqual(store.watermark(7), full["date"].iloc[-1])
+
+    def test_restated_watermark_triggers_full_backfill_and_failures_keep_stored_data(self):
+        full = _nav("2024-01-01", 30)
+        store.write_nav_history(7, full.iloc[:20].assign(nav=lambda d: d["nav"] / 2))
+        self._age(7)
+        calls = []
+
+        def fake_download(code, since=None):
+            calls.append(since)
+            return full[full["date"] >= pd.Timestamp(since)] if since is not None else full
+
+        with mock.patch.object(store, "download_nav_history", side_effect=fake_download):
+            pd.testing.assert_frame_equal(store.fetch_nav_history(7), full)
+        self.assertEqual(calls, [full["date"].iloc[19], None])
+
+        self._age(7)
+        with mock.patch.object(store, "download_nav_history", side_effect=ConnectionError("offline")):
+            pd.testing.assert_frame_equal(store.fetch_nav_history(7), full)
+            with self.assertRaises(ConnectionError):
+                store.fetch_nav_history(8)
+
+    def test_legacy_csv_seeds_store_and_many_schemes_align(self):
+        store.LEGACY_CSV_DIR.mkdir(parents=True)
+        _nav("2024-01-01", 10).to_csv(store.LEGACY_CSV_DIR / "1.csv", index=False)
+        store.write_nav_history(2, _nav("2024-01-03", 6, base=100.0).iloc[::2])
+
+        def fake_download(code, since=None):
+            if code != 1:
+                raise ConnectionError("unknown scheme")
+            return _nav("2024-01-01", 12)[lambda d: d["date"] >= pd.Timestamp(since)]
+
+        with mock.patch.object(store, "download_nav_history", side_effect=fake_download):
+            dates, codes, navs = store.nav_matrix([1, 2, 3], start="2024-01-02")
+        self.assertEqual(codes.tolist(), [1, 2])
+        self.assertEqual(len(store.read_nav_history(1)), 12)
+        self.assertEqual(pd.Timestamp(dates[0]), pd.Timestamp("2024-01-02"))
+        np.testing.assert_array_equal(navs[:, 0], np.arange(1, 12, dtype=float) + 10.0)
+        col = navs[:, 1]
+        self.assertTrue(np.isnan(col[0]))
+        np.testing.assert_array_equal(col[1:8], [100.0, 100.0, 102.0, 102.0, 104.0, 104.0, 104.0])
+
+    def test_store_reuses_fresh_partitions_and_downloads_the_rest(self):
+        store.write_nav_history(1, _nav("2020-01-01", 50))
+        store.write_nav_history(4, _nav("2020-01-01", 30))
+        self._age(4)
+        calls = []
+
+        def fake_download(code, since=None):
+            calls.append(code)
+            if code in (3, 4):
+                raise ValueError("boom")
+            return _nav("2020-01-01", 40)
+
+        progress = []
+        with mock.patch.object(store, "download_nav_history", side_effect=fake_download):
+            out = store.load_nav_histories([1, 2, 3, 2, 4], max_workers=4, progress_cb=lambda d, t: progress.append((d, t)))
+        self.assertEqual(sorted(calls), [2, 3, 4])
+        self.assertEqual(list(out), [1, 2, 4])
+        pd.testing.assert_frame_equal(out[1], store.read_nav_history(1))
+        self.assertEqual(len(out[4]), 30)
+        self.assertEqual(len(store.read_nav_history(2)), 40)
+        self.assertEqual(progress[0], (1, 4))
+        self.assertEqual(progress[-1], (4, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import json
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from scripts.mf_portfolio_analytics import CashflowLedger, order_key, xirr_many
+
+
+def _bisect_xirr(flows):
+    t0 = min(d for d, _ in flows)
+
+    def npv(rate):
+        return sum(v / (1.0 + rate) ** ((d - t0).days / 365.0) for d, v in flows)
+
+    low, high = -0.95, 5.0
+    for _ in range(200):
+        mid = (low + high) / 2.0
+        if npv(low) * npv(mid) <= 0:
+            high = mid
+        else:
+            low = mid
+    return (low + high) / 2.0
+
+
+class XirrManyTests(unittest.TestCase):
+    def test_batch_matches_scalar_bisection_and_warm_start(self):
+        base = datetime(2022, 1, 1)
+        sets = [
+            [(base, -1000.0), (base + timedelta(days=365), 1100.0)],
+            [(base, -500.0), (base + timedelta(days=40), -700.0), (base + timedelta(days=900), 1500.0)],
+            [(base, -1000.0), (base + timedelta(days=30), 950.0)],
+            [(base, -100.0)],
+            [(base, 0.0), (base + timedelta(days=10), 50.0)],
+        ]
+        rates = xirr_many(sets)
+        self.assertAlmostEqual(rates[0], 0.10, places=6)
+        for flows, rate in zip(sets[:3], rates[:3]):
+            self.assertAlmostEqual(rate, _bisect_xirr(flows), places=6)
+        self.assertEqual(rates[3:], [None, None])
+        warm = xirr_many(sets, guesses=[0.5, 0.2, -0.4, None, None])
+        for cold, hot in zip(rates[:3], warm[:3]):
+            self.assertAlmostEqual(cold, hot, places=9)
+
+
+class CashflowLedgerTests(unittest.TestCase):
+    def test_ledger_persists_orders_and_versions_cached_metrics(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "ledger.json"
+            ledger = CashflowLedger(path)
+            order = {"order_id": "A1", "tradingsymbol": "INF1"}
+            ledger.add(order_key(order), "INF1", datetime(2023, 5, 1), -1000.0)
+            ledger.add("A2", "INF1", datetime(2023, 1, 1), -500.0)
+            flows = ledger.flows_by_symbol()
+            self.assertEqual([d.month for d, _ in flows["INF1"]], [1, 5])
+            version = ledger.symbol_versions()["INF1"]
+            metrics = ledger.cached_metrics("INF1", version)
+            self.assertEqual((metrics["dated_invested"], metrics["first_buy"]), (1500.0, "2023-01-01T00:00:00"))
+            metrics["rate"] = 0.12
+            ledger.save()
+
+            reloaded = CashflowLedger(path)
+            self.assertIn("A1", reloaded)
+            reloaded.add("A3", "INF1", datetime(2024, 1, 1), -250.0)
+            reloaded.flows_by_symbol()
+            new_version = reloaded.symbol_versions()["INF1"]
+            self.assertNotEqual(new_version, version)
+            refreshed = reloaded.cached_metrics("INF1", new_version)
+            self.assertEqual(refreshed["dated_invested"], 1750.0)
+            self.assertEqual(refreshed["rate"], 0.12)
+
+            path.write_text(json.dumps({"version": -1, "orders": {"X": {}}}))
+            self.assertEqual(CashflowLedger(path).orders, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from dashboard import mf_scan as scan
+
+
+def _history(seed, start, periods):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=periods)
+    keep = rng.random(periods) > 0.05
+    nav = 10 * np.exp(np.cumsum(rng.normal(0.0004, 0.01, periods)))
+    return pd.DataFrame({"date": dates[keep], "nav": nav[keep]}).reset_index(drop=True)
+
+
+def _monthly(h):
+    me = h.assign(ME=h["date"].dt.to_period("M").dt.to_timestamp("M")).groupby("ME")["nav"].last()
+    return me.pct_change().dropna()
+
+
+class MfScanTests(unittest.TestCase):
+    def test_return_matrix_window_and_metrics_match_per_fund_math(self):
+        histories = {101: _history(1, "2015-01-01", 2000), 102: _history(2, "2019-03-01", 900), 103: _history(3, "2016-06-01", 1500)}
+        months, codes, rets = scan.monthly_return_matrix(histories)
+        self.assertEqual(codes.tolist(), [101, 102, 103])
+        mask = scan.lookback_mask(months, rets, 24)
+        m = scan.risk_metrics(rets, mask, 0.75, 0.55)
+        for j, code in enumerate(codes):
+            mr = _monthly(histories[int(code)])
+            np.testing.assert_allclose(rets[~np.isnan(rets[:, j]), j], mr.to_numpy())
+            window = mr[mr.index > mr.index[-1] - pd.DateOffset(months=24)].to_numpy()
+            self.assertEqual(int(m["months"][j]), len(window))
+            ann_ret = np.exp(np.log1p(window).sum() / (len(window) / 12.0)) - 1.0
+            self.assertAlmostEqual(float(m["AnnRet"][j]), ann_ret, places=12)
+            self.assertAlmostEqual(float(m["AnnVol"][j]), np.std(window, ddof=1) * np.sqrt(12.0), places=12)
+
+        panel = pd.DataFrame(np.where(mask, rets, np.nan)).corr().abs().fillna(0.0).to_numpy()
+        np.testing.assert_allclose(scan.pairwise_abs_corr(rets, mask), panel, atol=1e-10)
+
+    def test_greedy_respects_cap_and_falls_back(self):
+        corr = np.array(
+            [
+                [1.0, 0.95, 0.10, 0.20],
+                [0.95, 1.0, 0.30, 0.10],
+                [0.10, 0.30, 1.0, 0.92],
+                [0.20, 0.10, 0.92, 1.0],
+            ]
+        )
+        scores = np.array([0.30, 0.29, 0.10, 0.05])
+        picked = scan.greedy_diversify(corr, scores, ["A", "A", "B", "C"], corr_cap=0.9, n_pick=3)
+        self.assertEqual(picked, [0, 2, 3])
+        self.assertEqual(scan.greedy_diversify(corr, scores, ["A"] * 4, corr_cap=0.05, n_pick=2), [0, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from Auto_Trader import mf_execution  # noqa: E402
+from Auto_Trader import mf_scheme_index as msi  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+NAMES = [
+    "HDFC Flexi Cap Fund - Direct Plan - Growth",
+    "HDFC Flexi Cap Fund - Regular Plan - IDCW",
+    "Parag Parikh Flexi Cap Fund - Direct Growth",
+    "ICICI Prudential Nasdaq 100 Index Fund Direct Growth",
+    "SBI Gold Fund - Direct Plan - Growth",
+]
+
+
+def _tokens(text):
+    return [t for t in text.lower().replace("-", " ").split() if t not in {"fund", "plan", "direct", "growth", "regular"}]
+
+
+class FakeKite:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    def mf_instruments(self):
+        self.calls += 1
+        return self.rows
+
+
+class SchemeIndexTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = Path(self._tmp.name)
+        msi._MEMO.clear()
+
+    def test_overlap_counts_and_substring_match_a_linear_scan(self):
+        index = msi.SchemeIndex(NAMES, _tokens)
+        ids, counts = index.overlap(["hdfc", "flexi", "cap", "missing"])
+        self.assertEqual(ids.tolist(), [0, 1, 2])
+        self.assertEqual(counts.tolist(), [3, 3, 2])
+        ids, counts = index.overlap(["hdfc", "flexi"], within=[1, 2, 3])
+        self.assertEqual((ids.tolist(), counts.tolist()), ([1, 2], [2, 1]))
+        self.assertEqual(index.contains("direct").tolist(), [True, False, True, True, True])
+        for query in ("flexi cap fund - d", "fund", "gr", "zzz", "- direct plan -"):
+            expected = [i for i, name in enumerate(NAMES) if query in name.lower()]
+            self.assertEqual(index.substring(query), expected)
+        self.assertEqual(index.substring("fund", limit=2), [0, 1])
+
+    def test_index_is_persisted_and_rebuilt_only_when_the_list_changes(self):
+        first = msi.load_scheme_index(NAMES, "t", _tokens, directory=self.dir)
+        self.assertIs(msi.load_scheme_index(list(NAMES), "t", _tokens, directory=self.dir), first)
+        msi._MEMO.clear()
+        with mock.patch.object(msi.SchemeIndex, "__init__", side_effect=AssertionError("rebuilt")):
+            reloaded = msi.load_scheme_index(NAMES, "t", _tokens, directory=self.dir)
+        self.assertEqual(reloaded.key, first.key)
+        self.assertEqual(reloaded.overlap(["gold"])[0].tolist(), [4])
+        changed = msi.load_scheme_index(NAMES[:-1], "t", _tokens, directory=self.dir)
+        self.assertNotEqual(changed.key, first.key)
+        self.assertEqual(len(changed), len(NAMES) - 1)
+
+    def test_index_without_directory_is_memoized_only(self):
+        first = msi.load_scheme_index(NAMES, "t", _tokens)
+        self.assertIs(msi.load_scheme_index(NAMES, "t", _tokens), first)
+        self.assertEqual(os.listdir(self.dir), [])
+
+    def test_dashboard_loads_the_index_without_the_package_init(self):
+        # The FIRE app and portfolio tracker run on hosts without my_secrets/kiteconnect.
+        script = (
+            "import sys; sys.path.insert(0, sys.argv[1]);"
+            "import mf_dash_utils as u; from pathlib import Path; u.NAV_STORE_DIR = Path(sys.argv[2]);"
+            "idx = u.load_scheme_index(['HDFC Flexi Cap', 'SBI Gold'], 'fund_tokens', str.split);"
+            "assert 'Auto_Trader' not in sys.modules, sorted(m for m in sys.modules if m.startswith('Auto_Trader'));"
+            "print(idx.overlap(['Gold'])[0].tolist())"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "AT_RESEARCH_MODE"}
+        out = subprocess.run(
+            [sys.executable, "-c", script, str(ROOT / "dashboard"), str(self.dir)],
+            capture_output=True, text=True, env=env, cwd=self.dir, timeout=60,
+        )
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertEqual(out.stdout.strip(), "[1]")
+        self.assertEqual(os.listdir(self.dir), ["scheme_index_fund_tokens.pkl"])
+
+    def test_search_mf_instruments_uses_daily_list_and_keeps_scan_order(self):
+        rows = [{"tradingsymbol": f"INF{i:04d}", "name": name, "amc": name.split()[0] + "_MF"} for i, name in enumerate(NAMES)]
+        kite = FakeKite(rows)
+        with mock.patch.object(mf_execution, "MF_INDEX_DIR", self.dir):
+            self.assertEqual([r["tradingsymbol"] for r in mf_execution.search_mf_instruments(kite, "Flexi Cap", limit=2)], ["INF0000", "INF0001"])
+            self.assertEqual([r["tradingsymbol"] for r in mf_execution.search_mf_instruments(kite, "hdfc_mf inf")], [])
+            self.assertEqual([r["tradingsymbol"] for r in mf_execution.search_mf_instruments(kite, "inf0004")], ["INF0004"])
+        self.assertEqual(kite.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from dashboard import mf_swp as swp
+
+FUNDS = ["Alpha Flexi Cap Fund", "Beta Liquid Fund", "Gamma Nasdaq 100 FoF"]
+START = "2021-03-15"
+YEARS = 6
+TAX_CFG = {
+    "equity_stcg_rate": 0.15,
+    "equity_ltcg_rate": 0.10,
+    "equity_ltcg_days": 365,
+    "debt_stcg_rate": 0.30,
+    "debt_ltcg_rate": 0.20,
+    "debt_ltcg_days": 1095,
+}
+SWP_COLUMNS = ["date", "nav", "withdrawal", "units_left", "portfolio_value"]
+RECORDED = ("withdrawal", "portfolio_value", "units_left", "nav", "tax_paid", "exit_load_paid", "spending_mult")
+
+
+def _nav_map(start_navs, rets, path):
+    # The NAV walk simulate_swp_multifund_paths applies to one sampled path.
+    months = pd.date_range(pd.Timestamp(START).replace(day=1), periods=len(path), freq="MS")
+    navs = np.empty((len(path), len(start_navs)))
+    navs[0] = start_navs
+    for t in range(1, len(path)):
+        navs[t] = np.maximum(1e-9, navs[t - 1] * (1.0 + rets[path[t]]))
+    return {nm: pd.DataFrame({"date": months, "nav": navs[:, j]}) for j, nm in enumerate(FUNDS)}
+
+
+class MultiFundPathParityTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.rets = np.column_stack([
+            rng.normal(0.010, 0.06, 48),
+            rng.normal(0.005, 0.002, 48),
+            rng.normal(0.012, 0.08, 48),
+        ])
+        self.start_navs = np.array([55.0, 1020.0, 14.0])
+        self.sample_idx = rng.integers(0, len(self.rets), size=(6, YEARS * 12))
+        self.weights = {"Alpha Flexi Cap Fund": 0.5, "Beta Liquid Fund": 0.2, "Gamma Nasdaq 100 FoF": 0.3}
+        self.profiles = {nm: swp.infer_tax_profile_from_name(nm) for nm in FUNDS}
+
+    def _check(self, start_w, **kw):
+        batch = swp.simulate_swp_multifund_paths(
+            self.start_navs, self.rets, self.sample_idx, START, 1_000_000.0, start_w, 0.06,
+            np.array([self.weights[nm] for nm in FUNDS]), [self.profiles[nm] for nm in FUNDS], TAX_CFG,
+            rebalance_every_months=12, record=True, **kw,
+        )
+        lasted = []
+        for p, path in enumerate(self.sample_idx):
+            single = swp.simulate_swp_multifund_inflation(
+                _nav_map(self.start_navs, self.rets, path), START, 1_000_000.0, start_w, 0.06, self.weights,
+                rebalance_every_months=12, max_years=YEARS, max_extra_years=0,
+                fund_tax_profiles=self.profiles, tax_cfg=TAX_CFG, **kw,
+            )
+            n = len(single)
+            self.assertEqual(int(batch["months_lasted"][p]), n)
+            self.assertEqual(float(batch["final_value"][p]), float(single["portfolio_value"].iloc[-1]))
+            for key in RECORDED:
+                np.testing.assert_array_equal(batch[key][p, :n], single[key].to_numpy(dtype=float), err_msg=f"path {p} {key}")
+                self.assertTrue(np.isnan(batch[key][p, n:]).all())
+            lasted.append(n)
+        return batch, lasted
+
+    def test_tax_exit_load_and_guardrail_branches_match_single_path_walk(self):
+        for mode in ("lowest_return", "tax_aware"):
+            with self.subTest(mode=mode):
+                batch, lasted = self._check(
+                    9_000.0, withdrawal_mode=mode, exit_load_days=400, exit_load_pct=0.01,
+                    use_guardrails=True, guardrail_upper_mult=1.05, guardrail_lower_mult=0.95,
+                )
+                self.assertGreater(np.nansum(batch["tax_paid"]), 0.0)
+                self.assertGreater(np.nansum(batch["exit_load_paid"]), 0.0)
+                mults = batch["spending_mult"][~np.isnan(batch["spending_mult"])]
+                self.assertTrue((mults < 1.0).any() and (mults > 1.0).any())
+                self.assertEqual(max(lasted), YEARS * 12)
+
+    def test_depleted_paths_stop_in_the_same_month(self):
+        for mode in ("lowest_return", "tax_aware"):
+            with self.subTest(mode=mode):
+                _batch, lasted = self._check(30_000.0, withdrawal_mode=mode)
+                self.assertLess(min(lasted), YEARS * 12)
+
+
+def _legacy_swp(nav_series, start_date, corpus_value, start_w, infl, max_years=None, max_extra_years=80):
+    # The row-by-row nearest_nav_on_or_after walk simulate_swp_inflation replaced.
+    def on_or_after(df, when):
+        idx = df.index[df["date"] >= pd.Timestamp(when)]
+        return None if len(idx) == 0 else df.loc[idx[0]]
+
+    if nav_series.empty or corpus_value <= 0 or start_w < 0:
+        return pd.DataFrame(columns=SWP_COLUMNS)
+    start_month = pd.Timestamp(start_date).normalize().replace(day=1)
+    df = nav_series[nav_series["date"] >= start_month].reset_index(drop=True)
+    if df.empty:
+        return pd.DataFrame(columns=SWP_COLUMNS)
+    horizon_months = 12 * max_extra_years if max_years is None else 12 * (max_years + max_extra_years)
+    need_until = start_month + pd.offsets.MonthBegin(max(0, horizon_months - 1))
+    while df["date"].iloc[-1] < need_until:
+        growth = (float(df["nav"].iloc[-1]) / max(float(df["nav"].iloc[-2]) if len(df) > 1 else float(df["nav"].iloc[-1]), 1e-9)) - 1.0
+        next_date = df["date"].iloc[-1] + pd.offsets.MonthBegin(1)
+        next_nav = float(df["nav"].iloc[-1]) * (1.0 + growth)
+        df = pd.concat([df, pd.DataFrame({"date": [next_date], "nav": [next_nav]})], ignore_index=True)
+    first_row = on_or_after(df, start_month)
+    if first_row is None or float(first_row["nav"]) <= 0:
+        return pd.DataFrame(columns=SWP_COLUMNS)
+    units_left = corpus_value / float(first_row["nav"])
+    rows = []
+    for i, m in enumerate(pd.date_range(start_month, need_until, freq="MS")):
+        row = on_or_after(df, m)
+        if row is None:
+            break
+        nav_val = float(row["nav"])
+        w_this = float(start_w) * ((1.0 + float(infl)) ** (i // 12))
+        units_to_sell = w_this / nav_val if nav_val > 0 else np.inf
+        if units_to_sell > units_left + 1e-12:
+            rows.append({"date": pd.Timestamp(m), "nav": nav_val, "withdrawal": w_this, "units_left": 0.0, "portfolio_value": 0.0})
+            break
+        units_left -= units_to_sell
+        rows.append({"date": pd.Timestamp(m), "nav": nav_val, "withdrawal": w_this, "units_left": units_left, "portfolio_value": units_left * nav_val})
+    return pd.DataFrame(rows)
+
+
+class SingleFundSwpParityTests(unittest.TestCase):
+    def setUp(self):
+        # Business-day NAVs with gaps, so month starts usually fall between NAV dates.
+        rng = np.random.default_rng(5)
+        dates = pd.bdate_range("2015-01-01", "2021-06-30")
+        dates = dates[rng.random(len(dates)) > 0.1]
+        nav = 20.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(dates))))
+        self.nav = pd.DataFrame({"date": dates, "nav": nav})
+
+    def assert_same(self, got, want):
+        self.assertEqual(len(got), len(want))
+        if len(want):
+            self.assertEqual(list(got["date"]), list(want["date"]))
+            for col in SWP_COLUMNS[1:]:
+                np.testing.assert_array_equal(got[col].to_numpy(dtype=float), want[col].to_numpy(dtype=float), err_msg=col)
+
+    def test_matches_nearest_nav_walk_off_grid_start_and_depletion(self):
+        start = "2016-05-17"
+        self.assertNotIn(pd.Timestamp("2016-05-01"), set(self.nav["date"]))
+        cases = [
+            (1_000_000.0, 4_000.0, 0.06, 10, 0),  # survives into the projected tail
+            (1_000_000.0, 15_000.0, 0.07, 10, 0),  # depletes mid-horizon
+            (500_000.0, 2_500.0, 0.05, None, 100),  # longevity_for_withdrawal's call
+            (500_000.0, 0.0, 0.05, 3, 0),
+        ]
+        for corpus, w, infl, years, extra in cases:
+            with self.subTest(w=w, years=years):
+                want = _legacy_swp(self.nav, start, corpus, w, infl, max_years=years, max_extra_years=extra)
+                got = swp.simulate_swp_inflation(self.nav, start, corpus, w, infl, max_years=years, max_extra_years=extra)
+                self.assert_same(got, want)
+        self.assertEqual(want["withdrawal"].iloc[0], 0.0)
+        depleted = _legacy_swp(self.nav, start, 1_000_000.0, 15_000.0, 0.07, max_years=10, max_extra_years=0)
+        self.assertEqual(depleted["portfolio_value"].iloc[-1], 0.0)
+        self.assertLess(len(depleted), 120)
+
+    def test_many_withdrawals_match_one_at_a_time(self):
+        ws = [0.0, 3_000.0, 9_000.0, 20_000.0, 250_000.0]
+        res = swp.simulate_swp_inflation_many(self.nav, "2017-07-09", 800_000.0, ws, 0.06, max_years=8, max_extra_years=0)
+        for j, w in enumerate(ws):
+            with self.subTest(w=w):
+                want = _legacy_swp(self.nav, "2017-07-09", 800_000.0, w, 0.06, max_years=8, max_extra_years=0)
+                self.assertEqual(int(res["months_lasted"][j]), len(want))
+                self.assert_same(swp._swp_frame(res, j), want)
+
+
+if __name__ == "__main__":
+    unittest.main()
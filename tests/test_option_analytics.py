@@ -0,0 +1,103 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from Auto_Trader import option_analytics as oa  # noqa: E402
+
+
+def _chain(vol=0.18):
+    dates = pd.bdate_range("2025-01-01", periods=15)
+    ul = pd.DataFrame({"Date": dates, "UL_Close": np.linspace(22000.0, 22600.0, len(dates))})
+    frames = []
+    strikes = np.arange(20000, 25050, 100)
+    for side in ("CE", "PE"):
+        for d, spot in zip(dates, ul["UL_Close"]):
+            t = oa.years_to_expiry([d] * len(strikes), ["2025-02-27"] * len(strikes))
+            frames.append(pd.DataFrame({
+                "tradingsymbol": [f"NIFTY25FEB{k}{side}" for k in strikes],
+                "Date": d,
+                "strike": strikes,
+                "expiry": "2025-02-27",
+                "option_type": side,
+                "Close": oa.option_price(spot, strikes, t, vol, side == "CE"),
+            }))
+    return pd.concat(frames, ignore_index=True), ul
+
+
+class OptionAnalyticsTests(unittest.TestCase):
+    def test_implied_vol_round_trips_bs_and_black76(self):
+        rng = np.random.default_rng(3)
+        n = 5000
+        s = rng.uniform(20000, 25000, n)
+        k = np.round(s * rng.uniform(0.85, 1.15, n) / 50) * 50
+        t = rng.uniform(2 / 365, 0.5, n)
+        sigma = rng.uniform(0.08, 0.6, n)
+        is_call = rng.random(n) < 0.5
+        for model in ("bs", "black76"):
+            price = oa.option_price(s, k, t, sigma, is_call, model=model)
+            iv = oa.implied_volatility(price, s, k, t, is_call, model=model)
+            vega = oa.option_greeks(s, k, t, sigma, is_call, model=model)["Vega"]
+            well_posed = vega > 0.05
+            np.testing.assert_allclose(iv[well_posed], sigma[well_posed], atol=1e-6)
+        self.assertTrue(np.isnan(oa.implied_volatility([0.0, 1e9], 22000, 22000, 0.1, True)).all())
+
+    def test_greeks_match_finite_differences(self):
+        s, k, t, sigma = 22000.0, np.array([21000.0, 22000.0, 23500.0]), 0.2, 0.17
+        for is_call in (True, False):
+            g = oa.option_greeks(s, k, t, sigma, is_call)
+            h = 1.0
+            up = oa.option_price(s + h, k, t, sigma, is_call)
+            mid = oa.option_price(s, k, t, sigma, is_call)
+            dn = oa.option_price(s - h, k, t, sigma, is_call)
+            np.testing.assert_allclose(g["Delta"], (up - dn) / (2 * h), atol=1e-6)
+            np.testing.assert_allclose(g["Gamma"], (up - 2 * mid + dn) / h ** 2, atol=1e-7)
+            dv = (oa.option_price(s, k, t, sigma + 1e-5, is_call) - oa.option_price(s, k, t, sigma - 1e-5, is_call)) / 2e-5
+            np.testing.assert_allclose(g["Vega"], dv / 100.0, rtol=1e-6)
+            dt = 1e-5
+            dtheta = -(oa.option_price(s, k, t + dt, sigma, is_call) - oa.option_price(s, k, t - dt, sigma, is_call)) / (2 * dt)
+            np.testing.assert_allclose(g["Theta"], dtheta / 365.0, rtol=1e-5)
+
+    def test_chain_analytics_recovers_surface_and_reuses_cache(self):
+        oa._CACHE.clear()
+        chain, ul = _chain()
+        out = oa.chain_analytics(chain, underlying=ul)
+        informative = out["Vega"] > 0.05
+        self.assertGreater(int(informative.sum()), 500)
+        np.testing.assert_allclose(out.loc[informative, "IV"], 0.18, atol=1e-6)
+        self.assertTrue(((out["option_type"] == "CE") <= (out["Delta"].fillna(0) >= 0)).all())
+
+        again = oa.chain_analytics(chain, underlying=ul)
+        np.testing.assert_array_equal(again[oa.GREEK_COLUMNS].to_numpy(), out[oa.GREEK_COLUMNS].to_numpy())
+        moved = chain.copy()
+        moved.loc[0, "Close"] += 5.0
+        changed = oa.chain_analytics(moved, underlying=ul)
+        self.assertNotEqual(changed.loc[0, "IV"], out.loc[0, "IV"])
+        np.testing.assert_array_equal(changed.loc[1:, "IV"].to_numpy(), out.loc[1:, "IV"].to_numpy())
+
+    def test_cache_separates_contracts_without_tradingsymbol(self):
+        oa._CACHE.clear()
+        bar = {"Date": pd.Timestamp("2025-01-10"), "expiry": "2025-01-30", "option_type": "CE", "Close": 150.0, "UL_Close": 22500.0}
+        rows = [
+            dict(bar, strike=22000.0),
+            dict(bar, strike=23000.0),
+            dict(bar, strike=22000.0, expiry="2025-02-27"),
+            dict(bar, strike=22000.0, option_type="PE"),
+        ]
+        uncached = [oa.chain_analytics(pd.DataFrame([row]), use_cache=False) for row in rows]
+        for row, want in zip(rows, uncached):
+            got = oa.chain_analytics(pd.DataFrame([row]))
+            np.testing.assert_array_equal(got[oa.GREEK_COLUMNS].to_numpy(), want[oa.GREEK_COLUMNS].to_numpy())
+        self.assertNotAlmostEqual(float(uncached[0]["IV"].iloc[0]), float(uncached[1]["IV"].iloc[0]), places=3)
+        both = oa.chain_analytics(pd.DataFrame(rows))
+        np.testing.assert_array_equal(
+            both[oa.GREEK_COLUMNS].to_numpy(), pd.concat(uncached)[oa.GREEK_COLUMNS].to_numpy()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
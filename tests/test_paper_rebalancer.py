@@ -0,0 +1,89 @@
+import json
+import os
+import queue
+import socket
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from scripts import paper_rebalancer as rebalancer  # noqa: E402
+from scripts import rsi_momentum_paper_ledger as ledger  # noqa: E402
+
+PICKS = [f"S{i}" for i in range(8)]
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class PaperRebalancerTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        root = Path(self._tmp.name)
+        self.hist = root / "Hist_Data"
+        self.hist.mkdir()
+        dates = pd.bdate_range(end="2026-10-16", periods=400)
+        for i in range(10):
+            close = 100.0 + i + np.arange(400.0)
+            pd.DataFrame({"date": dates, "close": close, "high": close + 1, "low": close - 1}).to_feather(self.hist / f"S{i}.feather")
+        self.shadow = root / "shadow.json"
+        self.state = root / "state.json"
+        patcher = mock.patch.multiple(
+            ledger,
+            ROOT=root,
+            PAPER_SHADOW_FILE=self.shadow,
+            STATE_FILE=self.state,
+            OUTPUT_FILE=root / "out.json",
+            TELEGRAM_ALERTS=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _signal(self, date):
+        self.shadow.write_text(json.dumps({"latest_signal": {"date": date, "picks": PICKS}}))
+
+    def test_new_signal_runs_engine_in_process_with_warm_frames(self):
+        ledger.save_state(ledger.PortfolioState(last_rebalance_date="2026-08-31"))
+        self._signal("2026-09-30")
+        messages = queue.Queue()
+        engine = ledger.LedgerEngine(hist_dir=self.hist, st_exit_mult=2.0)
+        service = rebalancer.RebalancerService(messages, engine=engine)
+
+        with mock.patch.object(ledger, "load_frames", side_effect=ledger.load_frames) as reads:
+            result = service.check()
+            self.assertEqual(result.code, 0)
+            self.assertEqual(sorted(result.state.positions), PICKS)
+            self.assertEqual(result.state.last_rebalance_date, "2026-09-30")
+            self.assertEqual(len(result.new_trades), 8)
+            self.assertIsNone(service.check())
+            engine.run()
+        self.assertEqual(reads.call_count, 1)
+        text = messages.get_nowait()
+        self.assertIn("RSI Momentum Rebalance — 2026-09-30", text)
+        self.assertIn("8 positions", text)
+        self.assertTrue(messages.empty())
+        self.assertEqual(json.loads(self.state.read_text())["last_rebalance_date"], "2026-09-30")
+
+    def test_notify_reaches_a_bound_service(self):
+        with mock.patch.object(rebalancer, "REBALANCER_PORT", _free_port()):
+            service = rebalancer.RebalancerService(engine=ledger.LedgerEngine(hist_dir=self.hist))
+            sock = service._bind()
+            self.addCleanup(sock.close)
+            self.assertTrue(rebalancer.notify_rebalancer("signal", date="2026-09-30"))
+            sock.settimeout(2)
+            payload, _ = sock.recvfrom(4096)
+        self.assertEqual(json.loads(payload), {"event": "signal", "date": "2026-09-30"})
+
+
+if __name__ == "__main__":
+    unittest.main()
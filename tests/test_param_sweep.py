@@ -0,0 +1,106 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from test_rule_backtest_parity import make_indicator_frame
+
+from Auto_Trader import param_sweep  # noqa: E402
+
+
+def _frames():
+    return {f"SYM{i}": make_indicator_frame(n=260, seed=20 + i) for i in range(4)}
+
+
+VARIANTS = [
+    {"name": "baseline", "buy": {"rsi_floor": 0.0, "vwap_buy_above": 0.0, "max_extension_atr": 10.0}},
+    {"name": "tight_rvol", "buy": {"rsi_floor": 0.0, "vwap_buy_above": 0.0, "max_extension_atr": 10.0}, "sell": {"relative_volume_exit": 1.2}},
+    {"name": "strict_rsi", "buy": {"rsi_floor": 55.0}},
+]
+
+
+class ParamSweepTests(unittest.TestCase):
+    def test_shared_panel_round_trips_numeric_frames(self):
+        frames = _frames()
+        with param_sweep.SharedPanel(frames) as panel:
+            views = panel.frames()
+            for sym, df in frames.items():
+                view = views[sym]
+                self.assertTrue(view.index.equals(df.index))
+                np.testing.assert_array_equal(view["Close"].to_numpy(), df["Close"].to_numpy())
+                np.testing.assert_array_equal(
+                    view["Supertrend_Direction"].to_numpy(), df["Supertrend_Direction"].to_numpy(dtype=float)
+                )
+            del views, view
+
+    def test_pool_results_match_in_process_and_resume_skips_finished(self):
+        frames = _frames()
+        with tempfile.TemporaryDirectory() as tmp:
+            serial = param_sweep.run_sweep(frames, VARIANTS, results_path=Path(tmp) / "serial.jsonl", max_workers=1, abandon_dominated_by=0)
+            pooled_path = Path(tmp) / "pooled.jsonl"
+            pooled = param_sweep.run_sweep(frames, VARIANTS, results_path=pooled_path, max_workers=2, abandon_dominated_by=0)
+            self.assertEqual([r["name"] for r in serial], [v["name"] for v in VARIANTS])
+            for a, b in zip(serial, pooled):
+                self.assertEqual(a["metrics"], b["metrics"])
+
+            lines_before = pooled_path.read_text().splitlines()
+            with pooled_path.open("a") as fh:
+                fh.write('{"variant_id": "torn')  # simulated crash mid-write
+            resumed = param_sweep.run_sweep(frames, VARIANTS, results_path=pooled_path, max_workers=2, abandon_dominated_by=0)
+            self.assertEqual([r["metrics"] for r in resumed], [r["metrics"] for r in pooled])
+            self.assertEqual(len(pooled_path.read_text().splitlines()), len(lines_before) + 1)
+
+    def test_dominated_variants_are_abandoned_but_baseline_is_kept(self):
+        probes = {
+            "base": {"total_return_pct": -5.0, "max_drawdown_pct": -9.0},
+            "a": {"total_return_pct": 3.0, "max_drawdown_pct": -2.0},
+            "b": {"total_return_pct": 1.0, "max_drawdown_pct": -4.0},
+            "c": {"total_return_pct": 1.0, "max_drawdown_pct": -1.0},
+        }
+        counts = param_sweep.dominated_counts(probes)
+        self.assertEqual(counts, {"base": 3, "a": 0, "b": 2, "c": 0})
+
+        frames = _frames()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "sweep.jsonl"
+            records = param_sweep.run_sweep(frames, VARIANTS, results_path=path, max_workers=1, probe_fraction=0.5, abandon_dominated_by=1)
+            statuses = {r["name"]: r["status"] for r in records}
+            self.assertEqual(statuses["baseline"], "done")
+            self.assertTrue(all(r.get("probe") for r in records))
+            for rec in records:
+                if rec["status"] == "abandoned":
+                    self.assertGreaterEqual(rec["dominated_by"], 1)
+            logged = [json.loads(line)["status"] for line in path.read_text().splitlines()]
+            self.assertEqual(logged.count("probed"), len(VARIANTS))
+
+    def test_failed_variants_are_returned_in_order_and_retried(self):
+        frames = _frames()
+        real = param_sweep.rule_backtest.run_backtest
+
+        def run_backtest(frames, buy_config=None, sell_config=None, **kw):
+            if (buy_config or {}).get("rsi_floor") == 55.0:
+                raise ValueError("boom")
+            return real(frames, buy_config=buy_config, sell_config=sell_config, **kw)
+
+        variants = [VARIANTS[0], VARIANTS[2], VARIANTS[1]]
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(param_sweep.rule_backtest, "run_backtest", side_effect=run_backtest):
+            path = Path(tmp) / "sweep.jsonl"
+            records = param_sweep.run_sweep(frames, variants, results_path=path, max_workers=1, abandon_dominated_by=0)
+            self.assertEqual([r["name"] for r in records], ["baseline", "strict_rsi", "tight_rvol"])
+            self.assertEqual([r["status"] for r in records], ["done", "error", "done"])
+            self.assertIn("boom", records[1]["error"])
+            self.assertNotIn("metrics", records[1])
+
+            rerun = param_sweep.run_sweep(frames, variants, results_path=path, max_workers=1, abandon_dominated_by=0)
+            self.assertEqual([r["status"] for r in rerun], ["done", "error", "done"])
+            self.assertEqual(rerun[0]["updated_at"], records[0]["updated_at"])
+            logged = [json.loads(line)["status"] for line in path.read_text().splitlines()]
+            self.assertEqual(logged, ["done", "error", "done", "error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
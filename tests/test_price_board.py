@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from Auto_Trader import price_board as pb  # noqa: E402
+from scripts import kite_ws_price_fallback as fallback  # noqa: E402
+
+
+class PriceBoardTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = Path(self._tmp.name)
+        self.path = self.dir / "board.bin"
+        patcher = mock.patch.object(pb, "BOARD_PATH", self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        pb._BOARDS.clear()
+        self.addCleanup(pb._BOARDS.clear)
+
+    def test_writer_and_reader_mappings_share_slots(self):
+        writer = pb.PriceBoard(self.path, create=True, slots=16)
+        reader = pb.PriceBoard(self.path)
+        self.assertEqual(reader.read(), {})
+        exch = datetime(2026, 1, 5, 10, 15)
+        self.assertEqual(writer.publish({"INFY": 1500.5, "TCS": 0.0}, pb.PRIMARY_SOURCE, {"INFY": exch}, now=1000.0), 1)
+        writer.publish({"RELIANCE": 2900.0}, pb.FALLBACK_SOURCE, now=1005.0)
+        rows = reader.read(["RELIANCE", "INFY", "MISSING"])
+        self.assertEqual(list(rows), ["RELIANCE", "INFY"])
+        self.assertEqual(rows["INFY"], {"price": 1500.5, "exch_ts": exch.timestamp(), "write_ts": 1000.0, "source": pb.PRIMARY_SOURCE})
+        self.assertEqual(rows["RELIANCE"]["source"], pb.FALLBACK_SOURCE)
+        self.assertEqual(reader.last_write(pb.PRIMARY_SOURCE), 1000.0)
+
+        writer.publish({"INFY": 1501.0}, pb.PRIMARY_SOURCE, now=1010.0)
+        snap = reader.snapshot()
+        self.assertEqual(snap["prices"], {"INFY": 1501.0, "RELIANCE": 2900.0})
+        self.assertEqual(snap["source"], pb.PRIMARY_SOURCE)
+        self.assertEqual(snap["time"], datetime.fromtimestamp(1010.0).isoformat(timespec="seconds"))
+
+        writer.publish({f"S{i}": 1.0 for i in range(20)}, pb.PRIMARY_SOURCE)
+        self.assertEqual(len(reader.symbols()), 16)
+
+    def test_legacy_payload_prefers_board_and_falls_back_to_json(self):
+        legacy = self.dir / "live_prices.json"
+        legacy.write_text(json.dumps({"time": "2026-01-05T10:00:00", "prices": {"OLD": 1.0}}))
+        self.assertEqual(pb.load_live_payload(legacy)["prices"], {"OLD": 1.0})
+
+        board = pb.open_board(create=True)
+        self.assertEqual(pb.load_live_payload(legacy)["prices"], {"OLD": 1.0})
+        board.publish({"INFY": 10.0, "TCS": 20.0}, pb.PRIMARY_SOURCE)
+        self.assertEqual(pb.load_live_payload(legacy, symbols=["TCS"])["prices"], {"TCS": 20.0})
+        board.export_json(legacy)
+        exported = json.loads(legacy.read_text())
+        self.assertEqual(exported["prices"], {"INFY": 10.0, "TCS": 20.0})
+        self.assertEqual(set(exported["price_times"]), {"INFY", "TCS"})
+        self.assertEqual(exported["source"], pb.PRIMARY_SOURCE)
+
+    def test_fallback_publishes_full_tick_batch_only_while_primary_is_stale(self):
+        ticks = [{"instrument_token": 1, "last_price": 100.0}, {"instrument_token": 2, "last_price": 200.0}]
+        instruments = {1: {"Symbol": "INFY"}, 2: {"Symbol": "TCS"}}
+        with mock.patch.object(fallback, "LIVE_PRICE_PATH", self.dir / "live_prices.json"), mock.patch.object(fallback, "_last_dump_ts", 0.0):
+            self.assertEqual(fallback.publish_fallback_prices(ticks, instruments), "published:2")
+            self.assertEqual(fallback.publish_fallback_prices(ticks, instruments), "board:2")
+            board = pb.open_board()
+            self.assertEqual(board.read()["TCS"]["source"], pb.FALLBACK_SOURCE)
+            board.publish({"INFY": 101.0}, pb.PRIMARY_SOURCE, now=time.time() - 2 * fallback.PRIMARY_FRESH_SEC)
+            self.assertFalse(fallback.primary_price_feed_healthy())
+            board.publish({"INFY": 102.0}, pb.PRIMARY_SOURCE)
+            self.assertTrue(fallback.primary_price_feed_healthy())
+            self.assertEqual(fallback.publish_fallback_prices(ticks, instruments), "primary_healthy")
+        self.assertEqual(board.read(["INFY"])["INFY"]["price"], 102.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from scripts.rotation_features import PanelFeatures  # noqa: E402
+from scripts.rsi_224466_rotation_lab import rsi_dataframe  # noqa: E402
+
+
+class PanelFeaturesTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = Path(self._tmp.name)
+        rng = np.random.default_rng(3)
+        idx = pd.bdate_range("2023-01-02", periods=300)
+        px = 100 * np.exp(np.cumsum(rng.normal(0.0004, 0.02, (len(idx), 12)), axis=0))
+        self.prices = pd.DataFrame(px, index=idx, columns=[f"S{i}" for i in range(12)])
+        self.prices.iloc[:120, 2] = np.nan
+
+    def test_appends_new_dates_and_matches_full_compute(self):
+        first = PanelFeatures(self.prices.iloc[:-7], cache_dir=self.dir, persist=True)
+        first.rsi(22)
+        first.sma(50)
+        first.macd_above_signal()
+        full = PanelFeatures(self.prices, cache_dir=self.dir, persist=True)
+        rsi = full.rsi(22)
+        sma = full.sma(50)
+        full.macd_above_signal()
+        self.assertEqual(full.stats, {"hit": 0, "append": 2, "compute": 1})
+        np.testing.assert_allclose(rsi.to_numpy(), rsi_dataframe(self.prices, 22).to_numpy(), rtol=1e-12, equal_nan=True)
+        expected = self.prices.rolling(50, min_periods=50).mean().to_numpy()
+        np.testing.assert_allclose(sma.to_numpy(), expected, rtol=1e-12, equal_nan=True)
+
+        again = PanelFeatures(self.prices, cache_dir=self.dir, persist=True)
+        np.testing.assert_array_equal(again.rsi(22).to_numpy(), rsi.to_numpy())
+        self.assertEqual(again.stats["hit"], 1)
+
+    def test_changed_history_recomputes(self):
+        PanelFeatures(self.prices, cache_dir=self.dir, persist=True).momentum(21)
+        edited = self.prices.copy()
+        edited.iloc[10, 0] *= 1.5
+        feats = PanelFeatures(edited, cache_dir=self.dir, persist=True)
+        mom = feats.momentum(21)
+        self.assertEqual(feats.stats["compute"], 1)
+        np.testing.assert_array_equal(mom.to_numpy(), edited.pct_change(21, fill_method=None).to_numpy())
+
+    def test_persist_off_writes_nothing(self):
+        feats = PanelFeatures(self.prices, cache_dir=self.dir, persist=False)
+        feats.rsi(44)
+        self.assertIs(feats.rsi(44), feats.rsi(44))
+        self.assertEqual(list(self.dir.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from scripts import rotation_kernel as rk  # noqa: E402
+from scripts.rsi_224466_rotation_lab import rebalance_dates  # noqa: E402
+from scripts.rsi_momentum_robustness_report import strategy_daily_returns  # noqa: E402
+
+
+def _loop_reference(prices, score, dates, top_n, cost_bps):
+    """The per-date loop the kernel replaced."""
+    returns = prices.pct_change(fill_method=None).fillna(0)
+    weights = pd.DataFrame(0.0, index=prices.index, columns=prices.columns)
+    turnover = pd.Series(0.0, index=prices.index)
+    prev = pd.Series(0.0, index=prices.columns)
+    for i, d in enumerate(dates):
+        pos = prices.index.get_loc(d)
+        if pos + 1 >= len(prices.index):
+            continue
+        td = prices.index[pos + 1]
+        ed = dates[i + 1] if i + 1 < len(dates) else prices.index[-1]
+        target = pd.Series(0.0, index=prices.columns)
+        sc = score.loc[d].dropna().sort_values(ascending=False)
+        picks = [s for s in sc.index if pd.notna(prices.loc[d, s])][:top_n]
+        if picks:
+            target.loc[picks] = 1.0 / len(picks)
+        turnover.loc[td] = abs(target - prev).sum()
+        prev = target
+        weights.loc[(prices.index >= td) & (prices.index <= ed), :] = target.values
+    return (weights * returns).sum(axis=1) - turnover * (cost_bps / 10000.0), weights
+
+
+class RotationKernelTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        idx = pd.bdate_range("2022-01-03", periods=260)
+        px = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (len(idx), 25)), axis=0))
+        self.prices = pd.DataFrame(px, index=idx, columns=[f"S{i:02d}" for i in range(25)])
+        self.prices.iloc[:80, 3] = np.nan
+        self.prices.iloc[[100, 101, 150], 5] = np.nan
+        score = self.prices.pct_change(20, fill_method=None)
+        self.score = score.where(score > 0)
+
+    def test_matches_date_loop(self):
+        dates = rebalance_dates(self.prices.index, "W-FRI")
+        book = rk.rotate(self.prices, self.score, dates, top_n=5)
+        ref_net, ref_weights = _loop_reference(self.prices, self.score, dates, 5, 25.0)
+        np.testing.assert_allclose(book.net(25.0), ref_net.to_numpy(), atol=1e-15)
+        np.testing.assert_array_equal(book.weights, ref_weights.to_numpy())
+
+    def test_cost_sweep_reuses_one_book_and_allow_goes_to_cash(self):
+        dates = rebalance_dates(self.prices.index, "ME")
+        allow = np.ones(len(dates), dtype=bool)
+        allow[2] = False
+        book = rk.rotate(self.prices, self.score, dates, top_n=4, allow=allow)
+        np.testing.assert_allclose(book.net(0.0) - book.net(50.0), book.turnover * 0.005)
+        self.assertEqual(book.picks[2].size, 0)
+        held = slice(book.trade_pos[2], book.trade_pos[3])
+        self.assertTrue((book.weights[held] == 0).all())
+        self.assertAlmostEqual(book.turnover[book.trade_pos[2]], 1.0)
+
+    def test_strategy_daily_returns_pick_log(self):
+        r, log = strategy_daily_returns(self.prices, top_n=6, cost_bps=10.0, momentum_period=21)
+        self.assertTrue(log)
+        self.assertTrue(all(row["pick_count"] == len(row["picks"]) <= 6 for row in log))
+        self.assertEqual(r.index[0].date().isoformat(), next(row["trade_date"] for row in log if row["picks"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import talib
+
+_STATE_DIR = tempfile.mkdtemp(prefix="rule_backtest_state_")
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+os.environ.setdefault("AT_STATE_DIR", _STATE_DIR)
+
+from Auto_Trader import RULE_SET_2, RULE_SET_7, rule_backtest as bt  # noqa: E402
+
+
+def make_indicator_frame(n=320, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0008, 0.018, n)))
+    high = close * (1 + rng.uniform(0.0, 0.02, n))
+    low = close * (1 - rng.uniform(0.0, 0.02, n))
+    volume = rng.uniform(1e5, 5e5, n)
+    df = pd.DataFrame(
+        {"Close": close, "High": high, "Low": low, "Volume": volume},
+        index=pd.bdate_range("2024-01-01", periods=n, name="Date"),
+    )
+    for p in (10, 20, 50, 200):
+        df[f"EMA{p}"] = talib.EMA(close, timeperiod=p)
+    df["RSI"] = talib.RSI(close, timeperiod=14)
+    df["MACD"], df["MACD_Signal"], df["MACD_Hist"] = talib.MACD(close)
+    df["ADX"] = talib.ADX(high, low, close, timeperiod=14)
+    df["ATR"] = talib.ATR(high, low, close, timeperiod=14)
+    df["OBV"] = talib.OBV(close, volume)
+    df["OBV_EMA20"] = talib.EMA(df["OBV"].to_numpy(), timeperiod=20)
+    df["OBV_ZScore20"] = rng.normal(0.5, 1.5, n)
+    df["SMA_20_Volume"] = df["Volume"].rolling(20).mean()
+    df["CMF"] = rng.normal(0.05, 0.08, n)
+    df["HHV_20"] = df["High"].rolling(20).max().shift(1)
+    df["Stochastic_%K"], _ = talib.STOCH(high, low, close)
+    df["BB_PercentB"] = rng.uniform(-0.2, 1.2, n)
+    df["BB_Width"] = rng.uniform(0.01, 0.2, n)
+    df["Supertrend"] = close * rng.uniform(0.9, 1.05, n)
+    df["Supertrend_Direction"] = close > df["Supertrend"]
+    df["VWAP"] = close * rng.uniform(0.95, 1.05, n)
+    df["CCI"] = rng.normal(0, 120, n)
+    df["PPO_Hist"] = rng.normal(0, 1, n)
+    df["SR_Support"] = close * rng.uniform(0.96, 1.0, n)
+    df["SR_Resistance"] = close * rng.uniform(1.0, 1.05, n)
+    df["Pivot_S1"] = close * rng.uniform(0.97, 1.01, n)
+    df["Pivot_R1"] = close * rng.uniform(0.99, 1.03, n)
+    df["Prev_5D_Low"] = df["Low"].rolling(5).min().shift(1)
+    df["Prev_5D_High"] = df["High"].rolling(5).max().shift(1)
+    df["Volume_Profile_POC"] = close * rng.uniform(0.97, 1.03, n)
+    return df
+
+
+class _FixedDate(date):
+    current = date(2024, 1, 1)
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+class RuleBacktestParityTests(unittest.TestCase):
+    def setUp(self):
+        # evaluate_signal imports get_mmi_now lazily; keep the parity check offline
+        # without leaking a stub Auto_Trader.utils into other test modules.
+        fake_utils = types.ModuleType("Auto_Trader.utils")
+        fake_utils.get_mmi_now = lambda force_refresh=False: None
+        patcher = mock.patch.dict(sys.modules, {"Auto_Trader.utils": fake_utils})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_buy_gates_match_evaluate_signal_bar_for_bar(self):
+        df = make_indicator_frame()
+        configs = [
+            {},
+            {"sr_bounce_enabled": 1.0, "sr_breakout_enabled": 1.0, "sr_resistance_room_pct": 0.01, "sr_round_guard_pct": 0.0},
+            {"meanrev_enabled": 0.0, "vwap_buy_above": 0.0, "rsi_floor": 30.0, "max_extension_atr": 5.0},
+        ]
+        for overrides in configs:
+            frame = bt.buy_signal_frame(df, config=overrides)
+            with mock.patch.dict(RULE_SET_7.CONFIG, overrides):
+                for t in range(len(df)):
+                    decision, info = RULE_SET_7.evaluate_signal(df.iloc[: t + 1], {}, pd.DataFrame())
+                    self.assertEqual(decision == "BUY", bool(frame["decision_buy"].iloc[t]), (overrides, t))
+                    if t < 2:
+                        continue
+                    expected_blocks = [name for name in bt.HARD_BLOCK_NAMES if frame[f"block_{name}"].iloc[t]]
+                    self.assertEqual(info["hard_blocks"], expected_blocks, (overrides, t))
+                    for gate, value in info["gate_status"].items():
+                        if gate in frame.columns:
+                            self.assertEqual(bool(value), bool(frame[gate].iloc[t]), (overrides, t, gate))
+
+    def test_exit_walk_matches_rule_set_2_bar_for_bar(self):
+        df = make_indicator_frame(seed=11)
+        feats = bt.sell_feature_arrays(df)
+        holdings_path = Path(_STATE_DIR) / "parity_holdings.json"
+        with mock.patch.object(RULE_SET_2, "HOLDINGS_FILE_PATH", str(holdings_path)), \
+                mock.patch.object(RULE_SET_2, "LOCK_FILE_PATH", str(holdings_path) + ".lock"), \
+                mock.patch.object(RULE_SET_2, "date", _FixedDate):
+            for entry in range(30, len(df) - 5, 17):
+                holdings_path.unlink(missing_ok=True)
+                avg = float(df["Close"].iloc[entry])
+                holdings = pd.DataFrame({"instrument_token": [1], "tradingsymbol": ["ABC"], "average_price": [avg]})
+                state = bt.PositionState(average_price=avg)
+                for j in range(entry + 1, len(df)):
+                    today = df.index[j].date()
+                    _FixedDate.current = today
+                    live = RULE_SET_2.buy_or_sell(df.iloc[: j + 1], {"instrument_token": 1}, holdings)
+                    engine, _ = bt.evaluate_exit(j, "ABC", today, state, feats, RULE_SET_2.CONFIG, False)
+                    self.assertEqual(live, engine, (entry, j))
+                    if live == "SELL":
+                        break
+                    persisted = RULE_SET_2.load_position_state_json().get("ABC", {})
+                    self.assertEqual(persisted.get("stop_loss"), state.stop_loss, (entry, j))
+
+    def test_run_backtest_reports_trades_equity_and_attribution(self):
+        frames = {"ABC": make_indicator_frame(seed=3), "XYZ": make_indicator_frame(seed=5)}
+        result = bt.run_backtest(frames, buy_config={"rsi_floor": 0.0, "vwap_buy_above": 0.0, "max_extension_atr": 10.0})
+        self.assertGreater(len(result.trades), 0)
+        self.assertEqual(len(result.equity), len(frames["ABC"]))
+        self.assertIn("mmi_risk_off", set(result.gate_attribution["gate"]))
+        self.assertEqual(int(result.exit_attribution["trades"].sum()), len(result.trades))
+        entries = result.trades.sort_values(["symbol", "entry_index"])
+        for _, group in entries.groupby("symbol"):
+            self.assertTrue((group["entry_index"].iloc[1:].to_numpy() > group["exit_index"].iloc[:-1].to_numpy()).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
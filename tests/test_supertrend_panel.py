@@ -0,0 +1,84 @@
+import ast
+import os
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import talib
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from Auto_Trader import supertrend_panel as stp  # noqa: E402
+from scripts import rsi_momentum_paper_ledger as ledger  # noqa: E402
+
+
+def _load_compute_supertrend():
+    # utils pulls in broker secrets at import time; compile just the reference function.
+    path = Path(__file__).resolve().parents[1] / "Auto_Trader" / "utils.py"
+    tree = ast.parse(path.read_text())
+    node = next(n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == "compute_supertrend")
+    namespace = {"np": np, "pd": pd}
+    exec(compile(ast.Module(body=[node], type_ignores=[]), str(path), "exec"), namespace)
+    return namespace["compute_supertrend"]
+
+
+compute_supertrend = _load_compute_supertrend()
+
+
+def _bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    return pd.DataFrame({"High": close + spread, "Low": close - spread, "Close": close + rng.normal(0, 0.2, n)})
+
+
+class SuperTrendPanelTests(unittest.TestCase):
+    def setUp(self):
+        self.frames = {f"S{i}": _bars(n, i) for i, n in enumerate([300, 120, 16, 15, 60])}
+
+    def _reference(self, df, mult):
+        df = df.copy()
+        atr = talib.ATR(df["High"].to_numpy(), df["Low"].to_numpy(), df["Close"].to_numpy(), timeperiod=14)
+        compute_supertrend(df, atr, multiplier=mult)
+        return atr, df["Supertrend"].to_numpy(), df["Supertrend_Direction"].to_numpy()
+
+    def test_matches_talib_and_compute_supertrend_per_symbol(self):
+        symbols, bars = stp.stack_bars(self.frames)
+        atr = stp.wilder_atr(bars["High"], bars["Low"], bars["Close"])
+        st, direction = stp.supertrend(bars["High"], bars["Low"], bars["Close"], multiplier=2.5, atr=atr)
+        for j, sym in enumerate(symbols):
+            n = len(self.frames[sym])
+            ref_atr, ref_st, ref_dir = self._reference(self.frames[sym], 2.5)
+            np.testing.assert_allclose(atr[-n:, j], ref_atr, rtol=1e-12, equal_nan=True)
+            np.testing.assert_allclose(st[-n:, j], ref_st, rtol=1e-12, equal_nan=True)
+            np.testing.assert_array_equal(direction[-n:, j], ref_dir)
+            self.assertTrue(np.isnan(st[:-n, j]).all())
+
+    def test_advance_matches_full_recompute(self):
+        frames = {s: df for s, df in self.frames.items() if len(df) > 20}
+        symbols, bars = stp.stack_bars(frames)
+        state, _, _ = stp.SuperTrendState.from_bars(
+            symbols, bars["High"][:-5], bars["Low"][:-5], bars["Close"][:-5], multiplier=2.0
+        )
+        state = stp.SuperTrendState.from_dict(state.to_dict())
+        full, full_dir = stp.supertrend(bars["High"], bars["Low"], bars["Close"], multiplier=2.0)
+        for t in range(-5, 0):
+            st, direction = state.advance(bars["High"][t], bars["Low"][t], bars["Close"][t])
+            np.testing.assert_allclose(st, full[t], rtol=1e-12, equal_nan=True)
+            np.testing.assert_array_equal(direction, full_dir[t])
+
+    def test_ledger_exits_holdings_below_panel_supertrend(self):
+        symbols, bars = stp.stack_bars(self.frames)
+        st, direction = stp.supertrend(bars["High"], bars["Low"], bars["Close"], multiplier=2.0)
+        # No SuperTrend yet (no band crossed) counts as "hold".
+        below = {s for j, s in enumerate(symbols) if len(self.frames[s]) >= 20 and not np.isnan(st[-1, j]) and not direction[-1, j]}
+        state = ledger.PortfolioState(cash=0.0, positions={s: 1.0 for s in symbols}, cost_basis={s: 100.0 for s in symbols})
+        exits = ledger._check_st_exits(state, self.frames, {}, "2024-06-28", mult=2.0)
+        self.assertEqual({e["symbol"] for e in exits}, below)
+        self.assertEqual(set(state.positions), set(symbols) - below)
+
+
+if __name__ == "__main__":
+    unittest.main()
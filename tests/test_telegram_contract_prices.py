@@ -0,0 +1,165 @@
+import json
+import subprocess
+import unittest
+from unittest import mock
+
+from scripts import live_telegram_options_paper_ledger as ledger
+from scripts.broker_gateway import GatewayError, GatewayUnavailable
+
+
+class FakeGateway:
+    """Stands in for ``gateway_call('resolve', ...)``; ``MISSING`` symbols resolve to drops."""
+
+    MISSING = {"GONE"}
+
+    def __init__(self, exc=None):
+        self.exc = exc
+        self.batches = []
+
+    def __call__(self, endpoint, payload=None, *, timeout=30.0, url=None):
+        self.last_call = (endpoint, timeout)
+        self.batches.append([dict(c) for c in payload["calls"]])
+        if self.exc is not None:
+            raise self.exc
+        return [self._resolve(c) for c in payload["calls"]]
+
+    def _resolve(self, call):
+        if call["symbol"] in self.MISSING:
+            return {"status": "drop", "reason": "contract_not_found", "symbol": call["symbol"]}
+        price = float(call["option_strike"]) / 100.0
+        return {
+            "status": "ok",
+            "symbol": call["symbol"],
+            "contract": {
+                "tradingsymbol": f"{call['symbol']}{call['option_strike']}{call['option_side']}",
+                "last_price": price,
+                "lot_size": 50,
+            },
+            "last_price": price,
+        }
+
+
+def _call(msg_id, symbol, strike, side="CE", date="2025-06-02T04:00:00+00:00"):
+    return {
+        "source_chat": "chan",
+        "source_message_id": msg_id,
+        "symbol": symbol,
+        "option_side": side,
+        "option_strike": strike,
+        "date": date,
+    }
+
+
+class FetchContractPricesTests(unittest.TestCase):
+    def setUp(self):
+        self.gateway = FakeGateway()
+        patcher = mock.patch.object(ledger, "gateway_call", self.gateway)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_results_follow_request_order_with_partial_drops(self):
+        calls = [ledger._price_request(c) for c in (_call(1, "NIFTY", 24500), _call(2, "GONE", 100), _call(3, "BANKNIFTY", 52000, "PE"))]
+        out = ledger.fetch_contract_prices(calls)
+        self.assertEqual(len(self.gateway.batches), 1)
+        self.assertEqual(self.gateway.last_call, ("resolve", 45))
+        self.assertEqual([r.get("symbol") for r in out], ["NIFTY", "GONE", "BANKNIFTY"])
+        self.assertEqual([r["status"] for r in out], ["ok", "drop", "ok"])
+        self.assertEqual(out[2]["last_price"], 520.0)
+        self.assertEqual(ledger.fetch_contract_prices([]), [])
+        self.assertEqual(len(self.gateway.batches), 1)
+
+    def test_prefetch_dedupes_and_keys_results_back_to_each_request(self):
+        state = {"positions": {
+            "chan::10": {"status": "open", "entry_time": "2025-06-01T04:00:00+00:00", "call": _call(10, "RELIANCE", 3000)},
+            "chan::11": {"status": "closed", "call": _call(11, "TCS", 4000)},
+        }}
+        calls = [
+            _call(1, "NIFTY", 24500),
+            _call(2, "NIFTY", 24500),  # same contract and date: priced once
+            _call(3, "GONE", 100),
+            _call(10, "RELIANCE", 3000),  # already a position
+            {"source_chat": "chan", "source_message_id": 4, "symbol": "INFY"},  # not an option call
+        ]
+        prices = ledger.prefetch_contract_prices(state, calls)
+        self.assertEqual(len(self.gateway.batches), 1)
+        self.assertEqual([c["symbol"] for c in self.gateway.batches[0]], ["NIFTY", "GONE", "RELIANCE"])
+        for call, symbol, status in ((calls[0], "NIFTY", "ok"), (calls[1], "NIFTY", "ok"), (calls[2], "GONE", "drop")):
+            got = prices[ledger._request_key(ledger._price_request(call, call["date"]))]
+            self.assertEqual((got["symbol"], got["status"]), (symbol, status))
+        open_pos = state["positions"]["chan::10"]
+        key = ledger._request_key(ledger._price_request(open_pos["call"], open_pos["entry_time"]))
+        self.assertEqual(prices[key]["contract"]["tradingsymbol"], "RELIANCE3000CE")
+
+    def test_positions_missing_from_the_batch_fall_back_to_a_single_call(self):
+        pos = {"status": "open", "entry_time": "2025-06-01T04:00:00+00:00", "call": _call(7, "GONE", 100)}
+        ledger.refresh_position({"cash": 0.0}, "chan::7", pos, "ladder", prices={})
+        self.assertEqual(self.gateway.batches, [[ledger._price_request(pos["call"], pos["entry_time"])]])
+        self.assertEqual(pos["status"], "open")
+        self.assertEqual(pos["status_note"], "contract_not_found")
+
+        prefetched = {ledger._request_key(ledger._price_request(pos["call"], pos["entry_time"])): {"status": "drop", "reason": "contract_expired"}}
+        pos.update(last_price=12.0, remaining_qty=10, realized_cash=0.0, invested=100.0)
+        state = {"cash": 0.0}
+        ledger.refresh_position(state, "chan::7", pos, "ladder", prices=prefetched)
+        self.assertEqual(len(self.gateway.batches), 1)
+        self.assertEqual((pos["status"], state["cash"]), ("closed", 120.0))
+
+        self.assertEqual(ledger.fetch_contract_price(_call(8, "NIFTY", 24500))["last_price"], 245.0)
+        self.assertEqual(len(self.gateway.batches[-1]), 1)
+
+    def test_position_opened_this_run_reuses_its_prefetched_price(self):
+        # No captured_at: entry_time becomes "now", but the refresh must still hit the batch.
+        call = _call(20, "NIFTY", 24500)
+        state = {"starting_capital": 1_000_000.0, "cash": 1_000_000.0, "positions": {}}
+        with mock.patch.object(ledger, "load_channel_learning_row", return_value={}):
+            prices = ledger.prefetch_contract_prices(state, [call])
+            ledger.maybe_open_position(state, call, 0.1, prices)
+            pos = state["positions"]["chan::20"]
+            self.assertEqual(pos["status"], "open")
+            ledger.refresh_position(state, "chan::20", pos, "ladder", prices)
+            self.assertEqual(len(self.gateway.batches), 1)
+
+            ledger.prefetch_contract_prices(state, [call])
+            self.assertEqual(self.gateway.batches[-1], [ledger._price_request(call, call["date"])])
+
+    def test_short_gateway_batch_drops_the_whole_batch(self):
+        calls = [_call(1, "NIFTY", 24500), _call(2, "TCS", 4000)]
+        with mock.patch.object(ledger, "gateway_call", return_value=[FakeGateway()._resolve(calls[0])]):
+            out = ledger.fetch_contract_prices(calls)
+        self.assertEqual([r["reason"] for r in out], ["resolver_failed", "resolver_failed"])
+
+    def test_gateway_error_drops_the_whole_batch(self):
+        self.gateway.exc = GatewayError("kite session expired")
+        out = ledger.fetch_contract_prices([_call(1, "NIFTY", 24500), _call(2, "TCS", 4000)])
+        self.assertEqual([r["reason"] for r in out], ["resolver_failed", "resolver_failed"])
+        self.assertIn("kite session expired", out[0]["stderr"])
+
+    def test_unavailable_gateway_falls_back_to_the_resolver_script(self):
+        self.gateway.exc = GatewayUnavailable("nothing listening")
+        calls = [_call(1, "NIFTY", 24500), _call(2, "GONE", 100)]
+        resolved = [FakeGateway()._resolve(c) for c in calls]
+
+        def run(stdout="", returncode=0, stderr=""):
+            return subprocess.CompletedProcess([], returncode, stdout=stdout, stderr=stderr)
+
+        with mock.patch.dict("os.environ", {"AT_CONTRACT_RESOLVER_MODE": "local"}), \
+                mock.patch.object(ledger.subprocess, "run") as sub:
+            sub.return_value = run(json.dumps(resolved))
+            self.assertEqual(ledger.fetch_contract_prices(calls), resolved)
+            cmd = sub.call_args.args[0]
+            self.assertTrue(cmd[1].endswith("telegram_contract_price_resolver.py"))
+            self.assertEqual(cmd[2:], ["--json", "-"])
+            self.assertEqual(json.loads(sub.call_args.kwargs["input"]), calls)
+
+            sub.return_value = run(json.dumps(resolved[:1]))
+            self.assertEqual([r["reason"] for r in ledger.fetch_contract_prices(calls)], ["resolver_failed"] * 2)
+
+            sub.return_value = run(returncode=1, stderr="Traceback")
+            self.assertEqual([r["stderr"] for r in ledger.fetch_contract_prices(calls)], ["Traceback"] * 2)
+
+            sub.side_effect = subprocess.TimeoutExpired("resolver", 45)
+            self.assertEqual([r["reason"] for r in ledger.fetch_contract_prices(calls)], ["resolver_exception"] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
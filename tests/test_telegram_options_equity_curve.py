@@ -0,0 +1,121 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from scripts import telegram_options_paper_trader as trader
+
+CAPITAL = 100_000.0
+
+
+def loop_equity_curve(history_by_symbol, trades, initial_capital):
+    """The per-date loop ``build_equity_curve`` replaced.
+
+    Open trades are marked as ``cash booked + quantity held * last close``.
+    With a ``partial_exits`` log both are taken as of the date; without one
+    they are the trade's final ``realized_partial_cash``/``remaining_qty``,
+    which is how the loop always read them.
+    """
+    all_dates = sorted({d for df in history_by_symbol.values() for d in pd.to_datetime(df['Date']).tolist()})
+    trades = trades.copy()
+    trades['entry_time'] = pd.to_datetime(trades['entry_time'])
+    trades['exit_time'] = pd.to_datetime(trades['exit_time'])
+    rows = []
+    for dt in all_dates:
+        closed = trades[trades['exit_time'] <= dt]
+        open_trades = trades[(trades['entry_time'] <= dt) & (trades['exit_time'] > dt)]
+        realized_pnl = float((closed['realized_value'] - closed['invested']).sum()) if not closed.empty else 0.0
+        open_unrealized = 0.0
+        for _, tr in open_trades.iterrows():
+            hist = history_by_symbol.get(tr['tradingsymbol'])
+            if hist is None or hist.empty:
+                continue
+            sub = hist[hist['Date'] <= dt]
+            if sub.empty:
+                continue
+            px = float(sub.iloc[-1]['Close'])
+            log = tr.get('partial_exits')
+            if isinstance(log, list):
+                done = [ev for ev in log if pd.Timestamp(ev['time']) <= dt]
+                cash = sum(ev['qty'] * ev['price'] for ev in done)
+                held = tr['qty'] - sum(ev['qty'] for ev in done)
+            else:
+                cash, held = float(tr['realized_partial_cash']), float(tr['remaining_qty'])
+            open_unrealized += cash + held * px - float(tr['invested'])
+        rows.append({'Date': dt, 'equity': float(initial_capital) + realized_pnl + open_unrealized})
+    return pd.DataFrame(rows).drop_duplicates(subset=['Date']).sort_values('Date').reset_index(drop=True)
+
+
+def _history(dates, closes):
+    return pd.DataFrame({'Date': pd.to_datetime(dates), 'Close': closes})
+
+
+class EquityCurveParityTests(unittest.TestCase):
+    def setUp(self):
+        days = pd.bdate_range('2025-01-06', periods=30)
+        rng = np.random.default_rng(3)
+        # CE1 trades every day; PE1 is missing a run of bars mid-trade; CE2 starts
+        # after the first trade opens; GONE never has any bars.
+        self.history = {
+            'CE1': _history(days, 100 + np.cumsum(rng.normal(0, 2, 30))),
+            'PE1': _history(days[np.r_[0:8, 14:30]], 50 + np.cumsum(rng.normal(0, 1, 24))),
+            'CE2': _history(days[10:], 80 + np.cumsum(rng.normal(0, 3, 20))),
+        }
+        self.days = days
+        self.trades = pd.DataFrame([
+            # entry, exit, symbol, qty, entry px, exit px, partial cash, remaining
+            self._trade(1, 12, 'CE1', 100, 100.0, 104.0, 3_000.0, 70),
+            self._trade(3, 20, 'PE1', 50, 50.0, 48.0, 0.0, 50),
+            self._trade(6, 25, 'PE1', 75, 51.0, 55.0, 1_620.0, 45),
+            self._trade(12, 29, 'CE2', 40, 82.0, 90.0, 1_800.0, 20),
+            self._trade(4, 9, 'GONE', 10, 20.0, 22.0, 0.0, 10),
+            self._trade(15, 15, 'CE1', 25, 101.0, 99.0, 0.0, 25),
+        ])
+
+    def _trade(self, entry, exit_, sym, qty, entry_px, exit_px, partial_cash, remaining):
+        return {
+            'tradingsymbol': sym,
+            'entry_time': self.days[entry],
+            'exit_time': self.days[exit_],
+            'qty': qty,
+            'invested': qty * entry_px,
+            'exit_price': exit_px,
+            'realized_partial_cash': partial_cash,
+            'realized_value': partial_cash + remaining * exit_px,
+            'remaining_qty': remaining,
+        }
+
+    def assert_same_curve(self, got, want):
+        self.assertEqual(list(got['Date']), list(want['Date']))
+        np.testing.assert_allclose(got['equity'].to_numpy(), want['equity'].to_numpy(), rtol=0, atol=1e-8)
+        for freq in ('W-FRI', 'ME'):
+            self.assertEqual(
+                trader.summarize_period_returns(got, freq), trader.summarize_period_returns(want, freq)
+            )
+
+    def test_trades_without_partial_exit_log_match_the_loop(self):
+        trades = self.trades.copy()
+        got = trader.build_equity_curve(self.history, trades.drop(columns='remaining_qty'), CAPITAL)
+        self.assert_same_curve(got, loop_equity_curve(self.history, trades, CAPITAL))
+
+    def test_logged_partial_exits_are_marked_with_quantity_held_on_each_date(self):
+        trades = self.trades.copy()
+        trades['partial_exits'] = [
+            [{'time': self.days[4].isoformat(), 'qty': 20, 'price': 105.0},
+             {'time': (self.days[7] + pd.Timedelta(hours=11)).isoformat(), 'qty': 10, 'price': 90.0}],
+            [],
+            [{'time': self.days[10].isoformat(), 'qty': 30, 'price': 54.0}],
+            [{'time': self.days[20].isoformat(), 'qty': 20, 'price': 90.0}],
+            [],
+            [],
+        ]
+        got = trader.build_equity_curve(self.history, trades.drop(columns='remaining_qty'), CAPITAL)
+        want = loop_equity_curve(self.history, trades, CAPITAL)
+        self.assert_same_curve(got, want)
+        # The held quantity steps down on the event dates, unlike a final-state mark.
+        legacy = loop_equity_curve(self.history, trades.drop(columns='partial_exits'), CAPITAL)
+        self.assertFalse(np.allclose(got['equity'].to_numpy(), legacy['equity'].to_numpy()))
+
+
+if __name__ == '__main__':
+    unittest.main()
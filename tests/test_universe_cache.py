@@ -0,0 +1,42 @@
+import os
+import queue
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("AT_RESEARCH_MODE", "1")
+os.environ.setdefault("AT_DISABLE_FILE_LOGGING", "1")
+
+from Auto_Trader import universe_cache  # noqa: E402
+
+
+class UniverseCacheTests(unittest.TestCase):
+    def test_round_trip_and_diff(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "universe_cache.json"
+            self.assertEqual(universe_cache.load_tokens(path), [])
+            universe_cache.save([5, 3, 9], ["C", "A", "B"], path=path)
+            self.assertEqual(universe_cache.load_tokens(path), [5, 3, 9])
+            path.write_text("{not json")
+            self.assertEqual(universe_cache.load_tokens(path), [])
+        self.assertEqual(universe_cache.diff_tokens([5, 3, 9], [9, 7, 5, 8]), ([7, 8], [3]))
+
+    def test_follow_token_updates_subscribes_only_new_tokens(self):
+        updates = queue.Queue()
+        subscribed = [1, 2]
+        calls = []
+        worker = threading.Thread(target=universe_cache.follow_token_updates, args=(updates, subscribed, calls.append))
+        worker.start()
+        updates.put([2, 3, 3, 4])
+        updates.put([1])
+        updates.put([4, 5])
+        updates.put(None)
+        worker.join(timeout=5)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(calls, [[3, 4], [5]])
+        self.assertEqual(subscribed, [1, 2, 3, 4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()